@@ -10,6 +10,7 @@ import fs from 'fs/promises';
 import path from 'path';
 import { fileURLToPath } from 'url';
 import { createGzip } from 'zlib';
+import { createHash } from 'crypto';
 import { promisify } from 'util';
 
 const __filename = fileURLToPath(import.meta.url);
@@ -46,6 +47,8 @@ function formatFileSize(bytes) {
 async function compressFile(inputPath, outputPath) {
   try {
     const inputBuffer = await fs.readFile(inputPath);
+    // Nanosecond mtime as a string: it does not fit a JSON number
+    const { mtimeNs } = await fs.stat(inputPath, { bigint: true });
     const compressedBuffer = await new Promise((resolve, reject) => {
       const gzip = createGzip({ level: 9 }); // Maximum compression
       const chunks = [];
@@ -62,9 +65,13 @@ async function compressFile(inputPath, outputPath) {
     const originalSize = inputBuffer.length;
     const compressedSize = compressedBuffer.length;
     const compressionRatio = ((originalSize - compressedSize) / originalSize * 100);
+    // Content digest for hashed, immutably cacheable asset URLs
+    const sha256 = createHash('sha256').update(inputBuffer).digest('hex');
     
     return {
+      sha256,
       originalSize,
+      mtimeNs: mtimeNs.toString(),
       compressedSize,
       compressionRatio,
       success: true
@@ -188,7 +195,9 @@ async function generateCacheManifest(distDir, jsResults, wasmResults) {
     files: {
       javascript: jsResults.map(result => ({
         name: result.file,
+        sha256: result.sha256,
         original_size: result.originalSize,
+        mtime_ns: result.mtimeNs,
         compressed_size: result.compressedSize,
         compression_ratio: result.compressionRatio,
         cache_headers: {
@@ -199,7 +208,9 @@ async function generateCacheManifest(distDir, jsResults, wasmResults) {
       })),
       wasm: wasmResults.map(result => ({
         name: result.file,
+        sha256: result.sha256,
         original_size: result.originalSize,
+        mtime_ns: result.mtimeNs,
         compressed_size: result.compressedSize,
         compression_ratio: result.compressionRatio,
         cache_headers: result.file.endsWith('.wasm') ? {
@@ -5,6 +5,120 @@
  * for improved performance and offline capabilities.
  */
 
+/**
+ * Persistent store for compiled WebAssembly modules
+ *
+ * Keeps compiled `WebAssembly.Module`s in IndexedDB keyed by asset digest so
+ * repeat visits skip compilation and go straight to instantiation. Browsers
+ * that refuse to structured-clone modules get the raw bytes stored instead,
+ * which still saves the download.
+ */
+export class CompiledModuleStore {
+    constructor(dbName = 'openscad-wasm-modules', storeName = 'modules') {
+        this.dbName = dbName;
+        this.storeName = storeName;
+        this.enabled = typeof indexedDB !== 'undefined';
+        this.dbPromise = null;
+    }
+
+    /**
+     * Open (and create on first use) the IndexedDB database
+     * @private
+     */
+    _open() {
+        if (!this.enabled) {
+            return Promise.resolve(null);
+        }
+        if (!this.dbPromise) {
+            this.dbPromise = new Promise((resolve) => {
+                const request = indexedDB.open(this.dbName, 1);
+                request.onupgradeneeded = () => {
+                    request.result.createObjectStore(this.storeName);
+                };
+                request.onsuccess = () => resolve(request.result);
+                request.onerror = () => {
+                    console.warn('WASM Module Store: IndexedDB unavailable:', request.error);
+                    this.enabled = false;
+                    resolve(null);
+                };
+            });
+        }
+        return this.dbPromise;
+    }
+
+    /**
+     * Run a single request inside a transaction
+     * @private
+     */
+    async _request(mode, operation) {
+        const db = await this._open();
+        if (!db) {
+            return null;
+        }
+        return new Promise((resolve, reject) => {
+            const transaction = db.transaction(this.storeName, mode);
+            const request = operation(transaction.objectStore(this.storeName));
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    }
+
+    /**
+     * Get a stored entry ({ module } or { bytes })
+     * @param {string} key - Asset digest
+     * @returns {Promise<Object|null>} Stored entry or null
+     */
+    async get(key) {
+        try {
+            return (await this._request('readonly', store => store.get(key))) || null;
+        } catch (error) {
+            console.warn(`WASM Module Store: Failed to read ${key}:`, error);
+            return null;
+        }
+    }
+
+    /**
+     * Persist a compiled module, falling back to its bytes if the browser
+     * cannot serialize WebAssembly.Module
+     * @param {string} key - Asset digest
+     * @param {WebAssembly.Module} module - Compiled module
+     * @param {Function} getBytes - Lazily provides the module bytes
+     * @returns {Promise<string|null>} 'module', 'bytes' or null
+     */
+    async put(key, module, getBytes) {
+        const entry = { timestamp: Date.now() };
+        try {
+            await this._request('readwrite', store => store.put({ ...entry, module }, key));
+            return 'module';
+        } catch (error) {
+            if (error && error.name !== 'DataCloneError') {
+                console.warn(`WASM Module Store: Failed to store ${key}:`, error);
+                return null;
+            }
+        }
+        try {
+            const bytes = await getBytes();
+            await this._request('readwrite', store => store.put({ ...entry, bytes }, key));
+            return 'bytes';
+        } catch (error) {
+            console.warn(`WASM Module Store: Failed to store bytes for ${key}:`, error);
+            return null;
+        }
+    }
+
+    /**
+     * Remove all stored modules
+     * @returns {Promise<void>}
+     */
+    async clear() {
+        try {
+            await this._request('readwrite', store => store.clear());
+        } catch (error) {
+            console.warn('WASM Module Store: Failed to clear:', error);
+        }
+    }
+}
+
 export class WASMCacheManager {
     constructor() {
         this.cache = null;
@@ -12,6 +126,12 @@ export class WASMCacheManager {
         this.cacheName = 'openscad-wasm-v1';
         this.maxCacheAge = 7 * 24 * 60 * 60 * 1000; // 7 days
         this.initPromise = null;
+
+        // Compiled WebAssembly.Module cache (memory + IndexedDB)
+        this.moduleStore = new CompiledModuleStore();
+        this.compiledModules = new Map();
+        this.compilePromises = new Map();
+        this.moduleStats = { memoryHits: 0, storeHits: 0, byteHits: 0, compiled: 0 };
     }
 
     /**
@@ -165,6 +285,130 @@ export class WASMCacheManager {
         }
     }
 
+    /**
+     * Derive a content-based key for a compiled module
+     * @private
+     */
+    _moduleKey(url, digest = null, response = null) {
+        if (digest) {
+            return `sha256:${digest}`;
+        }
+        // Content-hashed asset URL, e.g. openscad.<digest>.wasm
+        const match = /\.([0-9a-f]{16})\.wasm(?:[?#]|$)/.exec(url);
+        if (match) {
+            return `sha256:${match[1]}`;
+        }
+        const etag = response && response.headers.get('etag');
+        return etag ? `${url}#${etag}` : null;
+    }
+
+    /**
+     * Get a compiled WebAssembly.Module, compiling at most once per digest
+     *
+     * The first load uses WebAssembly.compileStreaming so compilation
+     * overlaps the download; the result is persisted in IndexedDB and later
+     * page loads only instantiate it.
+     * @param {string} url - URL of the .wasm file
+     * @param {Object} options - Options
+     * @param {string} options.digest - Content digest (defaults to the one in a hashed URL)
+     * @returns {Promise<WebAssembly.Module>} Compiled module
+     */
+    async getCompiledModule(url, options = {}) {
+        const key = this._moduleKey(url, options.digest);
+        const memoKey = key || url;
+
+        if (this.compiledModules.has(memoKey)) {
+            this.moduleStats.memoryHits++;
+            return this.compiledModules.get(memoKey);
+        }
+        if (this.compilePromises.has(memoKey)) {
+            return this.compilePromises.get(memoKey);
+        }
+
+        const compilePromise = this._loadCompiledModule(url, key)
+            .then(module => {
+                this.compiledModules.set(memoKey, module);
+                return module;
+            })
+            .finally(() => this.compilePromises.delete(memoKey));
+        this.compilePromises.set(memoKey, compilePromise);
+        return compilePromise;
+    }
+
+    /**
+     * Load a compiled module from IndexedDB or compile it from the network
+     * @private
+     */
+    async _loadCompiledModule(url, key) {
+        const stored = key ? await this._getStoredModule(key) : null;
+        if (stored) {
+            return stored;
+        }
+
+        const response = await fetch(url);
+        if (!response.ok) {
+            throw new Error(`Failed to fetch ${url}: ${response.status}`);
+        }
+
+        // Without a digest in the URL, the server ETag identifies the content
+        const storeKey = key || this._moduleKey(url, null, response);
+        if (!key && storeKey) {
+            const storedByEtag = await this._getStoredModule(storeKey);
+            if (storedByEtag) {
+                response.body && response.body.cancel().catch(() => {});
+                return storedByEtag;
+            }
+        }
+
+        const copy = storeKey ? response.clone() : null;
+        const startTime = performance.now();
+        const module = await this._compileResponse(response);
+        this.moduleStats.compiled++;
+        console.log(`WASM Cache: Compiled ${url} in ${(performance.now() - startTime).toFixed(2)}ms`);
+
+        if (storeKey) {
+            const storedAs = await this.moduleStore.put(storeKey, module, () => copy.arrayBuffer());
+            if (storedAs !== 'bytes' && copy.body) {
+                copy.body.cancel().catch(() => {});
+            }
+        }
+        return module;
+    }
+
+    /**
+     * Read a module from IndexedDB, compiling stored bytes if necessary
+     * @private
+     */
+    async _getStoredModule(key) {
+        const entry = await this.moduleStore.get(key);
+        if (!entry) {
+            return null;
+        }
+        if (entry.module instanceof WebAssembly.Module) {
+            this.moduleStats.storeHits++;
+            console.log(`WASM Cache: Using compiled module from IndexedDB (${key})`);
+            return entry.module;
+        }
+        if (entry.bytes) {
+            this.moduleStats.byteHits++;
+            return WebAssembly.compile(entry.bytes);
+        }
+        return null;
+    }
+
+    /**
+     * Compile a fetch Response, streaming when the server allows it
+     * @private
+     */
+    async _compileResponse(response) {
+        const contentType = response.headers.get('content-type') || '';
+        if (typeof WebAssembly.compileStreaming === 'function' &&
+            contentType.includes('application/wasm')) {
+            return WebAssembly.compileStreaming(response);
+        }
+        return WebAssembly.compile(await response.arrayBuffer());
+    }
+
     /**
      * Preload critical WASM resources
      * @param {string[]} urls - URLs to preload
@@ -224,6 +468,8 @@ export class WASMCacheManager {
         try {
             await caches.delete(this.cacheName);
             this.cache = await caches.open(this.cacheName);
+            this.compiledModules.clear();
+            await this.moduleStore.clear();
             console.log('WASM Cache: Cache cleared successfully');
         } catch (error) {
             console.warn('WASM Cache: Failed to clear cache:', error);
@@ -272,7 +518,8 @@ export class WASMCacheManager {
                 entries: validEntries,
                 totalSize: totalSize,
                 maxAge: this.maxCacheAge,
-                cacheName: this.cacheName
+                cacheName: this.cacheName,
+                compiledModules: { ...this.moduleStats, persistent: this.moduleStore.enabled }
             };
             
         } catch (error) {
@@ -7,12 +7,31 @@
 
 import { wasmCacheManager } from './wasm-cache-manager.js';
 
+/**
+ * Detect which optional libraries SCAD code needs (client-side fallback
+ * for the feature manifest the Python backend sends as scad_features)
+ * @param {string} scadCode - OpenSCAD source
+ * @returns {{mcad: boolean, fonts: boolean}} Required libraries
+ */
+export function detectSCADFeatures(scadCode = '') {
+    const code = scadCode
+        .replace(/"(?:\\.|[^"\\])*"|\/\*[\s\S]*?\*\/|\/\/[^\n]*/g,
+                 match => (match.startsWith('"') ? '""' : ' '));
+    return {
+        mcad: /\b(?:include|use)\s*<\s*MCAD\//.test(code),
+        fonts: /(?<![\w$])(?:text|textmetrics|fontmetrics)\s*\(/.test(code)
+    };
+}
+
 class OpenSCADWASMLoader {
     constructor() {
         this.instance = null;
         this.isInitialized = false;
         this.isInitializing = false;
         this.initializationPromise = null;
+        // Optional libraries are fetched and mounted on first use only
+        this.mountedLibraries = { fonts: false, mcad: false };
+        this.libraryPromises = {};
         this.wasmBasePath = this.detectWASMBasePath();
     }
 
@@ -66,7 +85,21 @@ class OpenSCADWASMLoader {
      * @private
      */
     async loadWASMWithFallbacks(filename) {
-        const fallbackPaths = [
+        const fallbackPaths = [];
+        
+        // Content-hashed URL from the Python backend is cached immutably
+        if (typeof window !== 'undefined' && window.anywidget && window.anywidget.model) {
+            try {
+                const assetUrls = window.anywidget.model.get('wasm_asset_urls') || {};
+                if (assetUrls[filename]) {
+                    fallbackPaths.push(assetUrls[filename]);
+                }
+            } catch (e) {
+                console.warn('🔍 Phase 2: Could not get wasm_asset_urls from model:', e);
+            }
+        }
+        
+        fallbackPaths.push(
             `${this.wasmBasePath}${filename}`,           // Primary detected path (includes HTTP server)
             `${this.wasmBasePath}wasm/${filename}`,      // HTTP server with wasm/ prefix
             `/static/wasm/${filename}`,                  // Package static
@@ -76,7 +109,7 @@ class OpenSCADWASMLoader {
             `/dist/wasm/${filename}`,                    // Deployed build
             `http://localhost:8000/wasm/${filename}`,    // Local HTTP server fallback
             `http://127.0.0.1:8000/wasm/${filename}`     // Alternative local server
-        ];
+        );
         
         for (const path of fallbackPaths) {
             try {
@@ -100,8 +133,9 @@ class OpenSCADWASMLoader {
      * Initialize the OpenSCAD WASM module
      * @param {Object} options - Configuration options
      * @param {string} options.basePath - Base path for WASM files
-     * @param {boolean} options.includeFonts - Whether to load fonts
-     * @param {boolean} options.includeMCAD - Whether to load MCAD library
+     * @param {boolean} options.includeFonts - Whether to load fonts eagerly (default: on demand)
+     * @param {boolean} options.includeMCAD - Whether to load MCAD library eagerly (default: on demand)
+     * @param {WebAssembly.Module} options.wasmModule - Precompiled module (e.g. shared by a worker pool)
      * @returns {Promise<Object>} The initialized OpenSCAD instance
      */
     async initialize(options = {}) {
@@ -139,8 +173,9 @@ class OpenSCADWASMLoader {
     async _doInitialize(options) {
         const {
             basePath = this.wasmBasePath,
-            includeFonts = true,
-            includeMCAD = true
+            includeFonts = false,
+            includeMCAD = false,
+            wasmModule = null
         } = options;
 
         try {
@@ -157,16 +192,34 @@ class OpenSCADWASMLoader {
                         return basePath + path;
                     }
                     return prefix + path;
+                },
+                // Compile once per digest; repeat visits instantiate the
+                // module persisted in IndexedDB without recompiling
+                instantiateWasm: (imports, successCallback) => {
+                    const wasmUrl = this._getAssetUrl('openscad.wasm', basePath);
+                    const modulePromise = wasmModule
+                        ? Promise.resolve(wasmModule)
+                        : wasmCacheManager.getCompiledModule(wasmUrl);
+                    modulePromise
+                        .then(module => WebAssembly.instantiate(module, imports)
+                            .then(wasmInstance => successCallback(wasmInstance, module)))
+                        .catch(error => console.error('Failed to instantiate OpenSCAD WASM:', error));
+                    return {};
                 }
             });
 
-            // Add optional libraries
+            this.instanceBasePath = basePath;
+            this.mountedLibraries = { fonts: false, mcad: false };
+            this.libraryPromises = {};
+
+            // Add optional libraries requested up front; everything else is
+            // mounted by ensureLibraries() when a model needs it
             if (includeFonts) {
-                await this._loadFonts(instance, basePath);
+                this.mountedLibraries.fonts = await this._loadFonts(instance, basePath);
             }
 
             if (includeMCAD) {
-                await this._loadMCAD(instance, basePath);
+                this.mountedLibraries.mcad = await this._loadMCAD(instance, basePath);
             }
 
             console.log('OpenSCAD WASM instance initialized successfully');
@@ -178,6 +231,24 @@ class OpenSCADWASMLoader {
         }
     }
 
+    /**
+     * Resolve an asset URL, preferring the content-hashed URL from the backend
+     * @private
+     */
+    _getAssetUrl(filename, basePath) {
+        if (typeof window !== 'undefined' && window.anywidget && window.anywidget.model) {
+            try {
+                const assetUrls = window.anywidget.model.get('wasm_asset_urls') || {};
+                if (assetUrls[filename]) {
+                    return assetUrls[filename];
+                }
+            } catch (e) {
+                // Fall through to the base path
+            }
+        }
+        return basePath + filename;
+    }
+
     /**
      * Load the main OpenSCAD module with caching
      * @private
@@ -222,7 +293,7 @@ class OpenSCADWASMLoader {
             const response = await wasmCacheManager.fetchWithCache(basePath + 'openscad.fonts.js');
             if (!response.ok) {
                 console.warn('Fonts library not available, continuing without fonts');
-                return;
+                return false;
             }
             
             const fontsText = await response.text();
@@ -235,9 +306,12 @@ class OpenSCADWASMLoader {
             if (fontsModule.addFonts) {
                 await fontsModule.addFonts(instance);
                 console.log('Fonts loaded successfully (cached)');
+                return true;
             }
+            return false;
         } catch (error) {
             console.warn('Failed to load fonts, continuing without:', error.message);
+            return false;
         }
     }
 
@@ -250,7 +324,7 @@ class OpenSCADWASMLoader {
             const response = await wasmCacheManager.fetchWithCache(basePath + 'openscad.mcad.js');
             if (!response.ok) {
                 console.warn('MCAD library not available, continuing without MCAD');
-                return;
+                return false;
             }
             
             const mcadText = await response.text();
@@ -263,10 +337,50 @@ class OpenSCADWASMLoader {
             if (mcadModule.addMCAD) {
                 await mcadModule.addMCAD(instance);
                 console.log('MCAD library loaded successfully (cached)');
+                return true;
             }
+            return false;
         } catch (error) {
             console.warn('Failed to load MCAD library, continuing without:', error.message);
+            return false;
+        }
+    }
+
+    /**
+     * Mount the optional libraries a model needs, fetching each at most once
+     * @param {Object} features - Feature manifest ({ mcad, fonts })
+     * @returns {Promise<Object>} Mounted library flags
+     */
+    async ensureLibraries(features = {}) {
+        if (!this.instance) {
+            return { ...this.mountedLibraries };
+        }
+
+        const loaders = {
+            fonts: () => this._loadFonts(this.instance, this.instanceBasePath || this.wasmBasePath),
+            mcad: () => this._loadMCAD(this.instance, this.instanceBasePath || this.wasmBasePath)
+        };
+
+        const pending = [];
+        for (const [name, load] of Object.entries(loaders)) {
+            if (!features[name] || this.mountedLibraries[name]) {
+                continue;
+            }
+            if (!this.libraryPromises[name]) {
+                this.libraryPromises[name] = load().then(mounted => {
+                    this.mountedLibraries[name] = mounted;
+                    if (!mounted) {
+                        // Allow a later model to retry
+                        delete this.libraryPromises[name];
+                    }
+                    return mounted;
+                });
+            }
+            pending.push(this.libraryPromises[name]);
         }
+
+        await Promise.all(pending);
+        return { ...this.mountedLibraries };
     }
 
     /**
@@ -293,6 +407,8 @@ class OpenSCADWASMLoader {
         this.isInitialized = false;
         this.isInitializing = false;
         this.initializationPromise = null;
+        this.mountedLibraries = { fonts: false, mcad: false };
+        this.libraryPromises = {};
     }
 
     /**
@@ -306,22 +422,28 @@ class OpenSCADWASMLoader {
             isInitialized: this.isInitialized,
             isInitializing: this.isInitializing,
             hasInstance: this.instance !== null,
+            mountedLibraries: { ...this.mountedLibraries },
             cache: cacheStats
         };
     }
 
     /**
      * Preload WASM resources for faster initialization
+     * @param {Object} features - Also preload optional libraries ({ mcad, fonts })
      * @returns {Promise<void>}
      */
-    async preloadResources() {
+    async preloadResources(features = {}) {
         const resources = [
             'openscad.js',
             'openscad.wasm.js',
-            'openscad.wasm',
-            'openscad.fonts.js',
-            'openscad.mcad.js'
+            'openscad.wasm'
         ];
+        if (features.fonts) {
+            resources.push('openscad.fonts.js');
+        }
+        if (features.mcad) {
+            resources.push('openscad.mcad.js');
+        }
 
         const basePath = this.wasmBasePath;
         const urls = resources.map(resource => basePath + resource);
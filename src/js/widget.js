@@ -163,7 +163,7 @@ class WASMRenderingManager {
     /**
      * Render SCAD code to STL using WASM (Main Thread)
      */
-    async renderScadCode(scadCode, renderId = null) {
+    async renderScadCode(scadCode, renderId = null, renderOptions = {}) {
         if (!this.isWasmReady) {
             throw new Error('WASM renderer not ready');
         }
@@ -180,7 +180,7 @@ class WASMRenderingManager {
             console.log(`🔄 Starting WASM render: ${requestId}`);
             
             // Track active render
-            const renderPromise = this.directRenderer.renderToSTL(scadCode);
+            const renderPromise = this.directRenderer.renderToSTL(scadCode, renderOptions);
             this.activeRender = { id: requestId, promise: renderPromise };
             
             const stlData = await renderPromise;
@@ -466,7 +466,7 @@ class SceneManager {
             try {
                 console.log('🚀 Using WASM renderer for real-time rendering');
                 
-                const result = await this.wasmManager.renderScadCode(scadCode);
+                const result = await this.wasmManager.renderScadCode(scadCode, null, { features: options.features });
                 this.lastRenderId = result.metadata.renderId;
                 
                 // Load the resulting STL data
@@ -700,7 +700,7 @@ export function render({ model, el }) {
                 
                 statusElement.textContent = 'Rendering SCAD code...';
                 
-                sceneManager.renderScadCode(scadCode)
+                sceneManager.renderScadCode(scadCode, { features: model.get('scad_features') })
                     .then(result => {
                         if (result.success) {
                             statusElement.textContent = `WASM render completed (${result.metadata?.size || 'unknown'} bytes)`;
@@ -786,7 +786,7 @@ export function render({ model, el }) {
                     
                     console.log(`🚀 Executing WASM render for hash ${hash}`);
                     
-                    sceneManager.renderScadCode(scadCode)
+                    sceneManager.renderScadCode(scadCode, { features: model.get('scad_features') })
                         .then(result => {
                             if (result.success) {
                                 console.log(`✅ WASM Bridge Success: ${result.metadata?.size || 'unknown'} bytes STL generated`);
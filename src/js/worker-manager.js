@@ -5,6 +5,8 @@
  * for non-blocking OpenSCAD rendering.
  */
 
+import { wasmCacheManager } from './wasm-cache-manager.js';
+
 export class OpenSCADWorkerManager {
     constructor() {
         this.worker = null;
@@ -267,11 +269,230 @@ export class OpenSCADWorkerManager {
     }
 }
 
+/**
+ * Pool of OpenSCAD workers for parallel renders across viewers
+ *
+ * The WASM module is compiled once on the main thread and handed to every
+ * worker, so adding workers costs instantiation only. Scheduling is
+ * latest-wins per viewer: each viewer has at most one render running and
+ * one waiting, and a newer request replaces the waiting one.
+ */
+export class OpenSCADWorkerPool {
+    /**
+     * @param {Object} options - Pool options
+     * @param {number} options.size - Number of workers (default: from hardwareConcurrency)
+     * @param {number} options.maxWorkers - Upper bound for the default size
+     * @param {Function} options.createWorker - Factory for worker managers (testing)
+     */
+    constructor(options = {}) {
+        this.size = options.size || OpenSCADWorkerPool.defaultSize(options.maxWorkers);
+        this.createWorker = options.createWorker || (() => new OpenSCADWorkerManager());
+        this.workers = [];
+        this.idleWorkers = [];
+        this.pendingByViewer = new Map();  // viewerId -> queued job (insertion order = fairness)
+        this.runningByViewer = new Map();  // viewerId -> running job
+        this.latestRequest = new Map();    // viewerId -> sequence number of newest request
+        this.sequence = 0;
+        this.initPromise = null;
+        this.stats = {
+            completed: 0,
+            superseded: 0,
+            failed: 0,
+            totalRenderTime: 0
+        };
+    }
+
+    /**
+     * Default pool size: one worker per spare core, bounded because every
+     * worker holds its own WASM heap
+     * @param {number} maxWorkers - Upper bound
+     * @returns {number} Worker count
+     */
+    static defaultSize(maxWorkers = 4) {
+        const cores = (typeof navigator !== 'undefined' && navigator.hardwareConcurrency) || 2;
+        return Math.max(1, Math.min(cores - 1, maxWorkers));
+    }
+
+    /**
+     * Start all workers with one shared compiled module
+     * @param {Object} options - Worker initialization options
+     * @param {string} options.wasmUrl - URL of openscad.wasm to compile once
+     * @returns {Promise<boolean>} True if at least one worker started
+     */
+    async initialize(options = {}) {
+        if (!this.initPromise) {
+            this.initPromise = this._doInitialize(options);
+        }
+        return this.initPromise;
+    }
+
+    /**
+     * Internal initialization logic
+     * @private
+     */
+    async _doInitialize(options) {
+        if (!OpenSCADWorkerManager.isSupported()) {
+            console.warn('Worker Pool: Web Workers not supported');
+            return false;
+        }
+
+        const { wasmUrl, ...workerOptions } = options;
+        let wasmModule = options.wasmModule || null;
+        if (!wasmModule && wasmUrl) {
+            try {
+                wasmModule = await wasmCacheManager.getCompiledModule(wasmUrl);
+            } catch (error) {
+                console.warn('Worker Pool: Could not precompile WASM, workers compile their own:', error);
+            }
+        }
+
+        const candidates = Array.from({ length: this.size }, () => this.createWorker());
+        const started = await Promise.all(candidates.map(worker =>
+            worker.initialize({ ...workerOptions, wasmModule }).catch(() => false)
+        ));
+
+        candidates.forEach((worker, index) => {
+            if (started[index]) {
+                this.workers.push(worker);
+                this.idleWorkers.push(worker);
+            } else {
+                worker.terminate();
+            }
+        });
+
+        console.log(`Worker Pool: ${this.workers.length}/${this.size} workers ready`);
+        return this.workers.length > 0;
+    }
+
+    /**
+     * Render SCAD code for a viewer; an older waiting request from the same
+     * viewer is superseded
+     * @param {string} viewerId - Identifies the requesting viewer
+     * @param {string} scadCode - OpenSCAD code to render
+     * @param {Object} options - Rendering options
+     * @returns {Promise<Object>} Worker result, or { success: false, superseded: true }
+     */
+    render(viewerId, scadCode, options = {}) {
+        if (this.workers.length === 0) {
+            return Promise.reject(new Error('Worker pool not initialized'));
+        }
+
+        const sequence = ++this.sequence;
+        this.latestRequest.set(viewerId, sequence);
+
+        const previous = this.pendingByViewer.get(viewerId);
+        if (previous) {
+            this.pendingByViewer.delete(viewerId);
+            this._supersede(previous);
+        }
+
+        return new Promise((resolve, reject) => {
+            this.pendingByViewer.set(viewerId, { viewerId, sequence, scadCode, options, resolve, reject });
+            this._dispatch();
+        });
+    }
+
+    /**
+     * Hand waiting jobs to idle workers, oldest viewer first
+     * @private
+     */
+    _dispatch() {
+        for (const [viewerId, job] of this.pendingByViewer) {
+            if (this.idleWorkers.length === 0) {
+                return;
+            }
+            if (this.runningByViewer.has(viewerId)) {
+                continue;  // One running render per viewer
+            }
+            this.pendingByViewer.delete(viewerId);
+            this._run(this.idleWorkers.shift(), job);
+        }
+    }
+
+    /**
+     * Run a job on a worker and recycle the worker afterwards
+     * @private
+     */
+    async _run(worker, job) {
+        this.runningByViewer.set(job.viewerId, job);
+        const startTime = performance.now();
+
+        try {
+            const result = await worker.renderToSTL(job.scadCode, job.options);
+            if (this.latestRequest.get(job.viewerId) !== job.sequence) {
+                this._supersede(job);
+            } else {
+                this.stats.completed++;
+                this.stats.totalRenderTime += performance.now() - startTime;
+                job.resolve(result);
+            }
+        } catch (error) {
+            this.stats.failed++;
+            job.reject(error);
+        } finally {
+            this.runningByViewer.delete(job.viewerId);
+            this.idleWorkers.push(worker);
+            this._dispatch();
+        }
+    }
+
+    /**
+     * Resolve a job that a newer request from the same viewer replaced
+     * @private
+     */
+    _supersede(job) {
+        this.stats.superseded++;
+        job.resolve({ success: false, superseded: true, error: 'Superseded by a newer render' });
+    }
+
+    /**
+     * Get pool statistics
+     * @returns {Object} Pool statistics
+     */
+    getStats() {
+        return {
+            size: this.workers.length,
+            busy: this.workers.length - this.idleWorkers.length,
+            queued: this.pendingByViewer.size,
+            ...this.stats,
+            averageRenderTime: this.stats.completed > 0
+                ? this.stats.totalRenderTime / this.stats.completed
+                : 0
+        };
+    }
+
+    /**
+     * Terminate all workers and reject queued jobs
+     */
+    terminate() {
+        for (const job of this.pendingByViewer.values()) {
+            job.reject(new Error('Worker pool terminated'));
+        }
+        this.pendingByViewer.clear();
+        this.workers.forEach(worker => worker.terminate());
+        this.workers = [];
+        this.idleWorkers = [];
+        this.initPromise = null;
+    }
+}
+
 /**
  * Singleton worker manager instance
  */
 export const workerManager = new OpenSCADWorkerManager();
 
+/**
+ * Shared worker pool, created on first use
+ */
+let sharedWorkerPool = null;
+
+export function getWorkerPool(options = {}) {
+    if (!sharedWorkerPool) {
+        sharedWorkerPool = new OpenSCADWorkerPool(options);
+    }
+    return sharedWorkerPool;
+}
+
 /**
  * Utility functions for worker management
  */
@@ -306,11 +527,33 @@ export const WorkerUtils = {
     },
 
     /**
-     * Performance comparison between worker and main thread
+     * Performance comparison between worker, worker pool and main thread
      */
-    async benchmarkRenderers(scadCode, iterations = 3) {
+    async benchmarkRenderers(scadCode, iterations = 3, poolOptions = {}) {
         const results = {};
 
+        // Test pool throughput: independent viewers rendering concurrently
+        try {
+            const pool = getWorkerPool(poolOptions);
+            if (await pool.initialize(poolOptions)) {
+                const start = performance.now();
+                await Promise.all(Array.from({ length: iterations * pool.workers.length }, (_, i) =>
+                    pool.render(`benchmark-${i}`, scadCode)
+                ));
+                const totalTime = performance.now() - start;
+                const renders = iterations * pool.workers.length;
+                results.pool = {
+                    workers: pool.workers.length,
+                    renders: renders,
+                    totalTime: totalTime,
+                    throughput: renders / (totalTime / 1000),  // renders per second
+                    averageTime: totalTime / renders
+                };
+            }
+        } catch (error) {
+            results.pool = { error: error.message };
+        }
+
         // Test worker renderer
         try {
             const workerRenderer = await this.createRenderer(true);
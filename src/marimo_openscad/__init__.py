@@ -14,6 +14,11 @@ from .renderer_config import (
     enable_auto_hybrid,
     create_hybrid_renderer
 )
+from .tracing import Tracer, RingBufferExporter, JsonlExporter, OpenTelemetryExporter
+from .render_history import RenderHistoryStore
+from .render_cost import RenderCostModel, estimate_render_cost
+from .render_daemon import RenderDaemon, RenderDaemonClient
+from .render_scheduler import RenderScheduler, get_render_scheduler
 
 __version__ = "0.1.0"
 __author__ = "Claude Code Assistant"
@@ -28,5 +33,16 @@ __all__ = [
     "enable_wasm_only",
     "enable_local_only",
     "enable_auto_hybrid",
-    "create_hybrid_renderer"
+    "create_hybrid_renderer",
+    "Tracer",
+    "RingBufferExporter",
+    "JsonlExporter",
+    "OpenTelemetryExporter",
+    "RenderHistoryStore",
+    "RenderCostModel",
+    "estimate_render_cost",
+    "RenderDaemon",
+    "RenderDaemonClient",
+    "RenderScheduler",
+    "get_render_scheduler"
 ]
\ No newline at end of file
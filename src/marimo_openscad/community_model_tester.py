@@ -12,6 +12,9 @@ import aiohttp
 import hashlib
 import tempfile
 import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Dict, List, Optional, NamedTuple, Tuple, Union
 from dataclasses import dataclass, asdict
@@ -22,8 +25,11 @@ from .migration_engine import (
     OpenSCADSyntaxAnalyzer, 
     MigrationEngine,
     SyntaxIssue,
+    SyntaxIssueType,
     MigrationResult
 )
+from .openscad_renderer import OpenSCADRenderer, OpenSCADError
+from .scad_tree_shaker import SCADTreeShaker
 from .version_manager import VersionInfo
 
 logger = logging.getLogger(__name__)
@@ -424,54 +430,7 @@ class CommunityModelTester:
             # Read model content
             scad_content = model.local_path.read_text(encoding='utf-8')
             
-            # Analyze syntax issues
-            syntax_issues = self.syntax_analyzer.analyze_scad_code(scad_content)
-            
-            # Determine minimum version required
-            min_version = self.syntax_analyzer.get_minimum_version_required(scad_content)
-            
-            # Calculate compatibility score
-            compatibility_score = self._calculate_compatibility_score(
-                syntax_issues, min_version, target_version
-            )
-            
-            # Test migration if needed
-            migration_result = None
-            if min_version != target_version:
-                try:
-                    suggestions = self.migration_engine.create_migration_plan(
-                        scad_content, min_version, target_version
-                    )
-                    migration_result = self.migration_engine.apply_migration(
-                        scad_content, suggestions
-                    )
-                except Exception as e:
-                    logger.warning(f"Migration failed for {model.name}: {e}")
-            
-            # Determine test status
-            test_status = "passed" if compatibility_score >= self.compatibility_threshold else "failed"
-            if compatibility_score == 0.0:
-                test_status = "error"
-            
-            # Generate notes
-            notes = []
-            if syntax_issues:
-                notes.append(f"Found {len(syntax_issues)} syntax issues")
-            if migration_result and migration_result.success:
-                notes.append(f"Migration successful: {len(migration_result.applied_rules)} rules applied")
-            if min_version != "2015.03":
-                notes.append(f"Requires OpenSCAD {min_version} or later")
-            
-            return ModelTestResult(
-                model=model,
-                test_timestamp=datetime.now(),
-                syntax_issues=syntax_issues,
-                minimum_version_required=min_version,
-                compatibility_score=compatibility_score,
-                migration_result=migration_result,
-                test_status=test_status,
-                notes=notes
-            )
+            return self._evaluate_model(model, scad_content, target_version)
             
         except Exception as e:
             logger.error(f"Error testing model {model.name}: {e}")
@@ -485,6 +444,58 @@ class CommunityModelTester:
                 error_message=str(e)
             )
     
+    def _evaluate_model(self, model: CommunityModel, scad_content: str,
+                        target_version: str) -> ModelTestResult:
+        """Analyze model code and test its migration to target_version."""
+        # Analyze syntax issues
+        syntax_issues = self.syntax_analyzer.analyze_scad_code(scad_content)
+        
+        # Determine minimum version required
+        min_version = self.syntax_analyzer.get_minimum_version_required(scad_content)
+        
+        # Calculate compatibility score
+        compatibility_score = self._calculate_compatibility_score(
+            syntax_issues, min_version, target_version
+        )
+        
+        # Test migration if needed
+        migration_result = None
+        if min_version != target_version:
+            try:
+                suggestions = self.migration_engine.create_migration_plan(
+                    scad_content, min_version, target_version
+                )
+                migration_result = self.migration_engine.apply_migration(
+                    scad_content, suggestions
+                )
+            except Exception as e:
+                logger.warning(f"Migration failed for {model.name}: {e}")
+        
+        # Determine test status
+        test_status = "passed" if compatibility_score >= self.compatibility_threshold else "failed"
+        if compatibility_score == 0.0:
+            test_status = "error"
+        
+        # Generate notes
+        notes = []
+        if syntax_issues:
+            notes.append(f"Found {len(syntax_issues)} syntax issues")
+        if migration_result and migration_result.success:
+            notes.append(f"Migration successful: {len(migration_result.applied_rules)} rules applied")
+        if min_version != "2015.03":
+            notes.append(f"Requires OpenSCAD {min_version} or later")
+        
+        return ModelTestResult(
+            model=model,
+            test_timestamp=datetime.now(),
+            syntax_issues=syntax_issues,
+            minimum_version_required=min_version,
+            compatibility_score=compatibility_score,
+            migration_result=migration_result,
+            test_status=test_status,
+            notes=notes
+        )
+    
     async def test_popular_models(self, limit: int = 10, 
                                  target_version: str = "2023.06") -> List[ModelTestResult]:
         """
@@ -577,6 +588,103 @@ class CommunityModelTester:
             failed_models=failed_models
         )
     
+    def run_corpus(self, corpus_dir: Path, output_path: Path,
+                   target_version: str = "2023.06",
+                   render: bool = False,
+                   openscad_path: Optional[str] = None,
+                   max_workers: Optional[int] = None,
+                   resume: bool = True,
+                   report_path: Optional[Path] = None) -> TestSuite:
+        """
+        Test every .scad file below a local directory.
+        
+        Files are analyzed (and optionally rendered) across a process pool;
+        each result is appended to output_path as one JSON line as soon as
+        it completes. With resume, files already recorded in output_path
+        are skipped, so an interrupted run continues where it stopped.
+        
+        Args:
+            corpus_dir: Directory searched recursively for .scad files
+            output_path: JSONL file results are streamed to
+            target_version: Target OpenSCAD version for compatibility
+            render: Also render every model with OpenSCAD
+            openscad_path: Path to OpenSCAD executable for rendering
+            max_workers: Worker processes (default: CPU count); 1 runs in
+                this process
+            resume: Skip files already recorded in output_path
+            report_path: Write generate_test_report() output here
+        
+        Returns:
+            Test suite over the whole corpus, including resumed results
+        """
+        corpus_dir = Path(corpus_dir)
+        output_path = Path(output_path)
+        
+        files = sorted(path.relative_to(corpus_dir).as_posix() for path in corpus_dir.rglob("*.scad")
+                       if path.is_file())
+        records = _load_corpus_records(output_path) if resume else {}
+        known = set(files)
+        records = {path: record for path, record in records.items() if path in known}
+        pending = [path for path in files if path not in records]
+        logger.info(f"Corpus {corpus_dir}: {len(files)} files, {len(records)} already tested")
+        
+        # Resolve OpenSCAD once so a missing binary fails before any work starts
+        if render:
+            openscad_path = OpenSCADRenderer(openscad_path=openscad_path).openscad_path
+        
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "a" if resume else "w", encoding="utf-8") as output:
+            def record_result(record: Dict) -> None:
+                records[record["path"]] = record
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+            
+            workers = max_workers or os.cpu_count() or 1
+            if workers == 1 or len(pending) <= 1:
+                worker = _CorpusWorker(self, corpus_dir, target_version,
+                                       openscad_path if render else None)
+                for path in pending:
+                    record_result(worker(path))
+            elif pending:
+                with ProcessPoolExecutor(
+                    max_workers=min(workers, len(pending)),
+                    initializer=_init_corpus_worker,
+                    initargs=(self.downloader.cache_dir, self.compatibility_threshold, corpus_dir,
+                              target_version, openscad_path if render else None)
+                ) as executor:
+                    futures = {executor.submit(_run_corpus_task, path): path for path in pending}
+                    for future in as_completed(futures):
+                        try:
+                            record_result(future.result())
+                        except BrokenProcessPool as e:
+                            # Left unrecorded so a resumed run retries it
+                            logger.error(f"Corpus worker died testing {futures[future]}: {e}")
+                        except Exception as e:
+                            logger.error(f"Corpus task failed for {futures[future]}: {e}")
+                            record_result(_error_record(futures[future], str(e)))
+        
+        results = [_result_from_record(records[path], corpus_dir) for path in files if path in records]
+        passed_models = len([r for r in results if r.test_status == "passed"])
+        failed_models = len([r for r in results if r.test_status == "failed"])
+        
+        test_suite = TestSuite(
+            name=f"Corpus {corpus_dir.name}",
+            description=f"Local corpus {corpus_dir}",
+            models=[r.model for r in results],
+            target_versions=[target_version],
+            test_results=results,
+            created_date=datetime.now(),
+            last_run=datetime.now(),
+            pass_rate=passed_models / len(results) if results else 0.0,
+            total_models=len(results),
+            passed_models=passed_models,
+            failed_models=failed_models
+        )
+        
+        if report_path is not None:
+            Path(report_path).write_text(self.generate_test_report(test_suite), encoding="utf-8")
+        return test_suite
+    
     def _calculate_compatibility_score(self, syntax_issues: List[SyntaxIssue],
                                      min_version: str, target_version: str) -> float:
         """Calculate compatibility score based on issues and version requirements."""
@@ -725,6 +833,177 @@ class CommunityModelTester:
         return "\n".join(report_lines)
 
 
+class _CorpusWorker:
+    """Tests one corpus file and returns its JSONL record."""
+    
+    def __init__(self, tester: CommunityModelTester, corpus_dir: Path,
+                 target_version: str, openscad_path: Optional[str] = None):
+        self.tester = tester
+        self.corpus_dir = corpus_dir
+        self.target_version = target_version
+        self.renderer = OpenSCADRenderer(openscad_path=openscad_path) if openscad_path else None
+        # Libraries parsed once per worker are shared by all files it renders
+        self.tree_shaker = SCADTreeShaker() if openscad_path else None
+    
+    def __call__(self, relative_path: str) -> Dict:
+        path = self.corpus_dir / relative_path
+        start_time = time.perf_counter()
+        try:
+            data = path.read_bytes()
+        except OSError as e:
+            return _error_record(relative_path, f"Failed to read model: {e}")
+        
+        scad_content = data.decode('utf-8', errors='replace')
+        model = _corpus_model(self.corpus_dir, relative_path, len(data), hashlib.sha256(data).hexdigest())
+        try:
+            result = self.tester._evaluate_model(model, scad_content, self.target_version)
+        except Exception as e:
+            logger.error(f"Error testing model {relative_path}: {e}")
+            return _error_record(relative_path, str(e))
+        metrics = {"analysis_seconds": time.perf_counter() - start_time}
+        
+        if self.renderer is not None and result.test_status != "error":
+            render_start = time.perf_counter()
+            try:
+                # The renderer works in a temp dir; flatten relative includes first
+                scad_code = self.tree_shaker.flatten(scad_content, base_dir=path.parent)
+                metrics["stl_bytes"] = len(self.renderer.render_scad_to_stl(scad_code))
+            except (OpenSCADError, OSError) as e:
+                metrics["render_error"] = str(e)
+                result.test_status = "failed"
+                result.notes.append("Render failed")
+            metrics["render_seconds"] = time.perf_counter() - render_start
+        
+        result.performance_metrics = metrics
+        return _result_to_record(relative_path, result)
+
+
+_corpus_worker: Optional[_CorpusWorker] = None
+
+
+def _init_corpus_worker(cache_dir: Path, compatibility_threshold: float, corpus_dir: Path,
+                        target_version: str, openscad_path: Optional[str]) -> None:
+    """Process pool initializer: one tester per worker process."""
+    global _corpus_worker
+    tester = CommunityModelTester(cache_dir=cache_dir)
+    tester.compatibility_threshold = compatibility_threshold
+    _corpus_worker = _CorpusWorker(tester, corpus_dir, target_version, openscad_path)
+
+
+def _run_corpus_task(relative_path: str) -> Dict:
+    return _corpus_worker(relative_path)
+
+
+def _corpus_model(corpus_dir: Path, relative_path: str, file_size: int,
+                  checksum: Optional[str] = None) -> CommunityModel:
+    path = corpus_dir / relative_path
+    return CommunityModel(
+        name=relative_path,
+        source_url=path.absolute().as_uri(),
+        description=f"Local corpus file {relative_path}",
+        author="unknown",
+        license="unknown",
+        tags=[],
+        file_size=file_size,
+        download_url=path.absolute().as_uri(),
+        local_path=path,
+        checksum=checksum
+    )
+
+
+def _error_record(relative_path: str, message: str) -> Dict:
+    return {
+        "path": relative_path,
+        "timestamp": datetime.now().isoformat(),
+        "status": "error",
+        "minimum_version_required": "unknown",
+        "compatibility_score": 0.0,
+        "issues": [],
+        "notes": [],
+        "error": message,
+    }
+
+
+def _result_to_record(relative_path: str, result: ModelTestResult) -> Dict:
+    """JSON-serializable form of a corpus test result."""
+    issues = []
+    for issue in result.syntax_issues:
+        issue_dict = asdict(issue)
+        issue_dict["issue_type"] = issue.issue_type.value
+        issues.append(issue_dict)
+    
+    migration = None
+    if result.migration_result is not None:
+        migration = {
+            "success": result.migration_result.success,
+            "applied_rules": [rule.rule_id for rule in result.migration_result.applied_rules],
+            "issues_resolved": len(result.migration_result.issues_resolved),
+        }
+    
+    return {
+        "path": relative_path,
+        "timestamp": result.test_timestamp.isoformat(),
+        "status": result.test_status,
+        "file_size": result.model.file_size,
+        "checksum": result.model.checksum,
+        "minimum_version_required": result.minimum_version_required,
+        "compatibility_score": result.compatibility_score,
+        "issues": issues,
+        "notes": result.notes,
+        "error": result.error_message,
+        "migration": migration,
+        "metrics": result.performance_metrics,
+    }
+
+
+def _result_from_record(record: Dict, corpus_dir: Path) -> ModelTestResult:
+    """
+    Rebuild a test result from its JSONL record.
+    
+    The migration itself is not stored; its outcome is kept in the notes.
+    """
+    issues = [SyntaxIssue(**{**issue, "issue_type": SyntaxIssueType(issue["issue_type"])})
+              for issue in record.get("issues", [])]
+    return ModelTestResult(
+        model=_corpus_model(corpus_dir, record["path"], record.get("file_size", 0), record.get("checksum")),
+        test_timestamp=datetime.fromisoformat(record["timestamp"]),
+        syntax_issues=issues,
+        minimum_version_required=record["minimum_version_required"],
+        compatibility_score=record["compatibility_score"],
+        performance_metrics=record.get("metrics"),
+        test_status=record["status"],
+        error_message=record.get("error"),
+        notes=list(record.get("notes", []))
+    )
+
+
+def _load_corpus_records(output_path: Path) -> Dict[str, Dict]:
+    """
+    Records of a previous corpus run, by relative path.
+    
+    A line cut off by an interrupted run is truncated away so appended
+    records start on a fresh line; its file is tested again.
+    """
+    if not output_path.exists():
+        return {}
+    
+    records = {}
+    with open(output_path, "rb+") as output:
+        valid_end = 0
+        for line in output:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping unreadable record in {output_path}")
+            else:
+                records[record["path"]] = record
+            valid_end += len(line)
+        output.truncate(valid_end)
+    return records
+
+
 # Convenience functions
 async def test_popular_models(limit: int = 10) -> List[ModelTestResult]:
     """Quick test of popular community models."""
@@ -740,4 +1019,10 @@ async def create_compatibility_test_suite(name: str = "Community Compatibility")
         description="Standard community model compatibility testing",
         model_selection="popular",
         limit=10
-    )
\ No newline at end of file
+    )
+
+
+def run_corpus_tests(corpus_dir: Path, output_path: Path, **kwargs) -> TestSuite:
+    """Test a local directory of .scad files (see CommunityModelTester.run_corpus)."""
+    tester = CommunityModelTester()
+    return tester.run_corpus(corpus_dir, output_path, **kwargs)
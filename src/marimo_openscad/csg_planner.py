@@ -0,0 +1,352 @@
+"""
+Parallel CSG Planner
+
+OpenSCAD evaluates a top-level union() serially in one process. When the
+children of that union do not overlap, their union is just the combined
+set of triangles, so groups of disjoint children can be rendered in
+separate OpenSCAD processes and the resulting meshes concatenated.
+
+Bounding boxes are computed conservatively from the SolidPython2 tree;
+children that overlap, touch, or cannot be bounded (text, imports, OpenSCAD
+variables) are kept in one group so OpenSCAD still unions them.
+"""
+
+import logging
+import math
+import os
+import re
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .openscad_renderer import OpenSCADRenderer, OpenSCADError
+from .solid_bridge import GROUP_NODES, TRANSFORM_NODES, transform_matrix
+
+logger = logging.getLogger(__name__)
+
+# Nodes whose geometry is the union of their children
+PASSTHROUGH_NODES = GROUP_NODES | {'hull', 'color', 'render'}
+
+# Default height of linear_extrude() in OpenSCAD
+DEFAULT_EXTRUDE_HEIGHT = 100.0
+
+BINARY_STL_HEADER = b"marimo-openscad parallel CSG".ljust(80, b" ")
+
+
+@dataclass
+class BoundingBox:
+    """Axis-aligned bounding box; 2D shapes have a flat z extent"""
+    min: Tuple[float, float, float]
+    max: Tuple[float, float, float]
+    
+    def union(self, other: "BoundingBox") -> "BoundingBox":
+        return BoundingBox(tuple(map(min, self.min, other.min)), tuple(map(max, self.max, other.max)))
+    
+    def intersection(self, other: "BoundingBox") -> "BoundingBox":
+        return BoundingBox(tuple(map(max, self.min, other.min)), tuple(map(min, self.max, other.max)))
+    
+    def overlaps(self, other: "BoundingBox", tolerance: float = 1e-6) -> bool:
+        """True if the boxes overlap or touch (touching solids must still be unioned)"""
+        return all(a_min <= b_max + tolerance and b_min <= a_max + tolerance
+                   for a_min, a_max, b_min, b_max in zip(self.min, self.max, other.min, other.max))
+    
+    def corners(self) -> List[Tuple[float, float, float]]:
+        return [(x, y, z) for x in (self.min[0], self.max[0])
+                for y in (self.min[1], self.max[1])
+                for z in (self.min[2], self.max[2])]
+    
+    def transformed(self, matrix: List[List[float]]) -> "BoundingBox":
+        """Box around the eight transformed corners"""
+        points = [tuple(sum(matrix[row][col] * point[col] for col in range(3)) + matrix[row][3]
+                        for row in range(3))
+                  for point in self.corners()]
+        return _points_box(points)
+
+
+@dataclass
+class CSGPlan:
+    """Children of a top-level union, grouped so groups are pairwise disjoint"""
+    groups: List[List[Any]]
+    boxes: List[Optional[BoundingBox]] = field(default_factory=list)
+    
+    @property
+    def is_parallel(self) -> bool:
+        return len(self.groups) > 1
+
+
+def _points_box(points: Sequence[Sequence[float]]) -> BoundingBox:
+    padded = [tuple(float(v) for v in point) + (0.0,) * (3 - len(point)) for point in points]
+    return BoundingBox(tuple(min(p[i] for p in padded) for i in range(3)),
+                       tuple(max(p[i] for p in padded) for i in range(3)))
+
+
+def _radius(params: dict, radius_key: str, diameter_key: str) -> Optional[float]:
+    if params.get(radius_key) is not None:
+        return float(params[radius_key])
+    if params.get(diameter_key) is not None:
+        return float(params[diameter_key]) / 2
+    return None
+
+
+def _box_from_size(size, center, dimensions: int) -> BoundingBox:
+    if isinstance(size, (int, float)):
+        size = [size] * dimensions
+    extent = [float(v) for v in size][:dimensions] + [0.0] * (3 - dimensions)
+    if center:
+        return BoundingBox(tuple(-v / 2 for v in extent), tuple(v / 2 for v in extent))
+    return BoundingBox((0.0, 0.0, 0.0), tuple(extent))
+
+
+def _children_box(children) -> Optional[BoundingBox]:
+    box = None
+    for child in children:
+        child_box = bounding_box(child)
+        if child_box is None:
+            return None
+        box = child_box if box is None else box.union(child_box)
+    return box
+
+
+def _extrude_box(params: dict, child_box: BoundingBox) -> BoundingBox:
+    height = params.get('height')
+    height = DEFAULT_EXTRUDE_HEIGHT if height is None else float(height)
+    
+    if params.get('twist'):
+        # Twisting sweeps the outline around the z axis
+        radius = max(math.hypot(x, y) for x, y, _ in child_box.corners())
+        xy = BoundingBox((-radius, -radius, 0.0), (radius, radius, 0.0))
+    else:
+        xy = child_box
+    
+    scale = params.get('scale')
+    if scale is not None:
+        sx, sy = (float(scale), float(scale)) if isinstance(scale, (int, float)) else map(float, scale)
+        top = BoundingBox((xy.min[0] * sx, xy.min[1] * sy, 0.0), (xy.max[0] * sx, xy.max[1] * sy, 0.0))
+        xy = xy.union(top)
+    
+    z_min, z_max = (-height / 2, height / 2) if params.get('center') else (0.0, height)
+    return BoundingBox((xy.min[0], xy.min[1], z_min), (xy.max[0], xy.max[1], z_max))
+
+
+def _node_box(node) -> Optional[BoundingBox]:
+    name = getattr(node, '_name', None)
+    params = getattr(node, '_params', {}) or {}
+    children = getattr(node, '_children', None) or []
+    
+    if name in ('cube', 'square'):
+        size = 1 if params.get('size') is None else params['size']
+        return _box_from_size(size, params.get('center'), 3 if name == 'cube' else 2)
+    if name in ('sphere', 'circle'):
+        r = _radius(params, 'r', 'd')
+        r = 1.0 if r is None else abs(r)
+        return BoundingBox((-r, -r, -r if name == 'sphere' else 0.0), (r, r, r if name == 'sphere' else 0.0))
+    if name == 'cylinder':
+        r = _radius(params, 'r', 'd')
+        r1 = _radius(params, 'r1', 'd1')
+        r2 = _radius(params, 'r2', 'd2')
+        default = 1.0 if r is None else r
+        radius = max(abs(default if r1 is None else r1), abs(default if r2 is None else r2))
+        height = 1.0 if params.get('h') is None else float(params['h'])
+        z_min, z_max = (-height / 2, height / 2) if params.get('center') else (0.0, height)
+        return BoundingBox((-radius, -radius, z_min), (radius, radius, z_max))
+    if name in ('polyhedron', 'polygon'):
+        points = params.get('points')
+        return _points_box(points) if points else None
+    
+    if name in PASSTHROUGH_NODES:
+        return _children_box(children)
+    if name in TRANSFORM_NODES:
+        box = _children_box(children)
+        return box.transformed(transform_matrix(node)) if box is not None else None
+    if name == 'difference':
+        # The result never leaves the first child
+        return bounding_box(children[0]) if children else None
+    if name == 'intersection':
+        boxes = [box for box in map(bounding_box, children) if box is not None]
+        if not boxes:
+            return None
+        box = boxes[0]
+        for other in boxes[1:]:
+            box = box.intersection(other)
+        return box
+    if name == 'minkowski':
+        boxes = [bounding_box(child) for child in children]
+        if not boxes or any(box is None for box in boxes):
+            return None
+        return BoundingBox(tuple(sum(box.min[i] for box in boxes) for i in range(3)),
+                           tuple(sum(box.max[i] for box in boxes) for i in range(3)))
+    if name == 'offset':
+        box = _children_box(children)
+        grow = abs(float(params.get('r') or params.get('delta') or 0))
+        if box is None:
+            return None
+        return BoundingBox((box.min[0] - grow, box.min[1] - grow, 0.0), (box.max[0] + grow, box.max[1] + grow, 0.0))
+    if name == 'linear_extrude':
+        box = _children_box(children)
+        return _extrude_box(params, box) if box is not None else None
+    if name == 'rotate_extrude':
+        box = _children_box(children)
+        if box is None:
+            return None
+        radius = max(abs(box.min[0]), abs(box.max[0]))
+        return BoundingBox((-radius, -radius, box.min[1]), (radius, radius, box.max[1]))
+    
+    # text(), import(), surface(), projection(), user modules, ...
+    return None
+
+
+def bounding_box(node) -> Optional[BoundingBox]:
+    """
+    Conservative bounding box of a SolidPython2 node
+    
+    Returns:
+        BoundingBox containing the node's geometry, or None if it cannot be
+        bounded in Python (unknown node or non-numeric parameters)
+    """
+    try:
+        return _node_box(node)
+    except (TypeError, ValueError, KeyError, IndexError):
+        return None
+
+
+def plan_union(model, tolerance: float = 1e-6) -> CSGPlan:
+    """
+    Group the top-level union children of a model into disjoint groups
+    
+    Children whose boxes overlap (transitively) share a group. A child that
+    cannot be bounded overlaps everything, collapsing the plan to one group.
+    
+    Args:
+        model: SolidPython2 object
+        tolerance: Distance at which boxes count as touching
+    
+    Returns:
+        CSGPlan with groups in first-appearance order
+    """
+    if getattr(model, '_name', None) in GROUP_NODES:
+        children = list(model._children)
+    else:
+        children = [model]
+    boxes = [bounding_box(child) for child in children]
+    
+    parent = list(range(len(children)))
+    
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+    
+    for i in range(len(children)):
+        for j in range(i + 1, len(children)):
+            if boxes[i] is None or boxes[j] is None or boxes[i].overlaps(boxes[j], tolerance):
+                parent[find(j)] = find(i)
+    
+    groups = {}
+    for index, child in enumerate(children):
+        groups.setdefault(find(index), []).append(child)
+    return CSGPlan(groups=list(groups.values()), boxes=boxes)
+
+
+_ASCII_FACET = re.compile(
+    r"facet\s+normal\s+(\S+)\s+(\S+)\s+(\S+)\s+outer\s+loop"
+    r"\s+vertex\s+(\S+)\s+(\S+)\s+(\S+)"
+    r"\s+vertex\s+(\S+)\s+(\S+)\s+(\S+)"
+    r"\s+vertex\s+(\S+)\s+(\S+)\s+(\S+)")
+
+
+def read_stl_triangles(stl_data: bytes) -> List[Tuple[float, ...]]:
+    """
+    Read binary or ASCII STL into (nx, ny, nz, x1, y1, z1, ..., z3) tuples
+    """
+    if len(stl_data) >= 84:
+        count = struct.unpack_from("<I", stl_data, 80)[0]
+        if len(stl_data) == 84 + 50 * count:
+            return [struct.unpack_from("<12f", stl_data, 84 + 50 * i) for i in range(count)]
+    
+    text = stl_data.decode('utf-8', errors='replace')
+    return [tuple(float(v) for v in match.groups()) for match in _ASCII_FACET.finditer(text)]
+
+
+def write_binary_stl(triangles: Sequence[Sequence[float]]) -> bytes:
+    """Write (normal, v1, v2, v3) tuples as binary STL"""
+    parts = [BINARY_STL_HEADER, struct.pack("<I", len(triangles))]
+    parts.extend(struct.pack("<12fH", *triangle, 0) for triangle in triangles)
+    return b"".join(parts)
+
+
+def concatenate_stl(stl_parts: Sequence[bytes]) -> bytes:
+    """Concatenate the triangles of several STL meshes into one binary STL"""
+    triangles = []
+    for stl_data in stl_parts:
+        triangles.extend(read_stl_triangles(stl_data))
+    return write_binary_stl(triangles)
+
+
+class ParallelCSGRenderer:
+    """
+    Render top-level unions of disjoint parts in parallel OpenSCAD processes
+    
+    Falls back to one monolithic render when the children cannot be split
+    into disjoint groups, or when any group render fails.
+    """
+    
+    def __init__(self, renderer: Optional[OpenSCADRenderer] = None,
+                 openscad_path: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 tolerance: float = 1e-6):
+        """
+        Initialize parallel CSG renderer
+        
+        Args:
+            renderer: Renderer used for every OpenSCAD process (default: OpenSCADRenderer)
+            openscad_path: Path to OpenSCAD executable if no renderer is given
+            max_workers: Maximum concurrent OpenSCAD processes (default: CPU count)
+            tolerance: Distance at which bounding boxes count as touching
+        """
+        self.renderer = renderer if renderer is not None else OpenSCADRenderer(openscad_path=openscad_path)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.tolerance = tolerance
+        self.last_plan: Optional[CSGPlan] = None
+    
+    def render_scad_to_stl(self, scad_code: str) -> bytes:
+        """Render plain SCAD code; it has no tree to plan, so it renders monolithically"""
+        return self.renderer.render_scad_to_stl(scad_code)
+    
+    def render_solidpython_to_stl(self, model) -> bytes:
+        """
+        Render a SolidPython2 model, splitting disjoint union children
+        
+        Args:
+            model: SolidPython2 object with as_scad() method
+        
+        Returns:
+            STL file contents as bytes
+        
+        Raises:
+            OpenSCADError: If model is invalid or rendering fails
+        """
+        if not hasattr(model, 'as_scad'):
+            raise OpenSCADError("Model must be a SolidPython2 object with as_scad() method")
+        
+        plan = plan_union(model, tolerance=self.tolerance)
+        self.last_plan = plan
+        if not plan.is_parallel:
+            return self.renderer.render_scad_to_stl(model.as_scad())
+        
+        from solid2 import union
+        group_codes = [(group[0] if len(group) == 1 else union()(*group)).as_scad()
+                       for group in plan.groups]
+        
+        try:
+            workers = min(self.max_workers, len(group_codes))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                stl_parts = list(executor.map(self.renderer.render_scad_to_stl, group_codes))
+        except OpenSCADError as e:
+            # An empty group is an error on its own but fine inside the whole model
+            logger.warning(f"Parallel CSG render failed, rendering monolithically: {e}")
+            return self.renderer.render_scad_to_stl(model.as_scad())
+        
+        logger.info(f"Parallel CSG: {len(plan.groups)} disjoint groups rendered with {workers} processes")
+        return concatenate_stl(stl_parts)
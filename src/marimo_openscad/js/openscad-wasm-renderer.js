@@ -5,7 +5,7 @@
  * using the WebAssembly OpenSCAD module.
  */
 
-import wasmLoader from './wasm-loader.js';
+import wasmLoader, { detectSCADFeatures } from './wasm-loader.js';
 
 export class OpenSCADWASMRenderer {
     constructor(options = {}) {
@@ -40,6 +40,7 @@ export class OpenSCADWASMRenderer {
      * Render OpenSCAD code to STL binary data
      * @param {string} scadCode - The OpenSCAD code to render
      * @param {Object} options - Rendering options
+     * @param {Object} options.features - Feature manifest ({ mcad, fonts }) from the backend
      * @returns {Promise<Uint8Array>} The STL binary data
      */
     async renderToSTL(scadCode, options = {}) {
@@ -53,6 +54,13 @@ export class OpenSCADWASMRenderer {
         }
 
         const renderOptions = { ...this.options, ...options };
+
+        // Mount MCAD/fonts only if this model uses them; an empty manifest
+        // means the backend sent none, so detect the features here
+        const manifest = renderOptions.features;
+        const hasManifest = manifest && Object.keys(manifest).length > 0;
+        await wasmLoader.ensureLibraries(hasManifest ? manifest : detectSCADFeatures(scadCode));
+
         const renderContext = this._createRenderContext();
 
         try {
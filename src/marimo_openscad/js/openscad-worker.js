@@ -183,12 +183,16 @@ self.onmessage = async function(event) {
                 };
         }
         
-        // Send result back to main thread
+        // Send result back to main thread; STL bytes are transferred, not copied
+        const transfer = [];
+        if (result && result.stlData && result.stlData.buffer instanceof ArrayBuffer) {
+            transfer.push(result.stlData.buffer);
+        }
         self.postMessage({
             id: id,
             success: true,
             result: result
-        });
+        }, transfer);
         
     } catch (error) {
         console.error('Worker: Message handling error:', error);
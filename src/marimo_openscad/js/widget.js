@@ -164,7 +164,7 @@ class WASMRenderingManager {
     /**
      * Render SCAD code to STL using WASM
      */
-    async renderScadCode(scadCode, renderId = null) {
+    async renderScadCode(scadCode, renderId = null, renderOptions = {}) {
         if (!this.isWasmReady) {
             throw new Error('WASM renderer not ready');
         }
@@ -175,7 +175,7 @@ class WASMRenderingManager {
             console.log(`🔄 Starting WASM render: ${requestId}`);
             
             // Add to pending renders
-            const renderPromise = this.wasmRenderer.renderToSTL(scadCode);
+            const renderPromise = this.wasmRenderer.renderToSTL(scadCode, renderOptions);
             this.pendingRenders.set(requestId, renderPromise);
             
             const stlData = await renderPromise;
@@ -502,7 +502,7 @@ class SceneManager {
             try {
                 console.log('🚀 Using WASM renderer for real-time rendering');
                 
-                const result = await this.wasmManager.renderScadCode(scadCode);
+                const result = await this.wasmManager.renderScadCode(scadCode, null, { features: options.features });
                 this.lastRenderId = result.metadata.renderId;
                 
                 // Load the resulting STL data
@@ -725,7 +725,7 @@ export function render({ model, el }) {
                 
                 statusElement.textContent = "Rendering SCAD code...";
                 
-                sceneManager.renderScadCode(scadCode)
+                sceneManager.renderScadCode(scadCode, { features: model.get('scad_features') })
                     .then(result => {
                         if (result.success) {
                             statusElement.textContent = `WASM render completed (${result.metadata?.size || 'unknown'} bytes)`;
@@ -7,15 +7,34 @@ for OpenSCAD code across different versions.
 
 import re
 import ast
+import hashlib
+import heapq
 import json
 import logging
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, NamedTuple, Tuple, Union
-from dataclasses import dataclass, asdict
+from typing import Dict, Iterator, List, Optional, NamedTuple, Tuple, Union
+from dataclasses import dataclass, asdict, replace
 from enum import Enum
 from datetime import datetime
 
 from .version_manager import VersionInfo
+from .scad_parser import (
+    FEATURE_MIN_VERSIONS,
+    CallCollector,
+    FeatureVisitor,
+    IncludeCollector,
+    Node,
+    NodeVisitor,
+    ParseResult,
+    Region,
+    parse,
+    parse_cached,
+    tokenize,
+    visit_regions,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -80,6 +99,8 @@ class MigrationSuggestion:
     confidence: float
     explanation: str
     requires_manual_review: bool = False
+    start: Optional[int] = None  # Offsets of original_code in the planned code
+    end: Optional[int] = None
 
 
 @dataclass
@@ -184,9 +205,13 @@ class OpenSCADSyntaxAnalyzer:
         }
     
     def _load_deprecated_patterns(self) -> List[Dict]:
-        """Load patterns for deprecated syntax."""
+        """
+        Load deprecated modules and functions, matched by call name; the
+        pattern is the part of the call an issue reports.
+        """
         return [
             {
+                "name": "assign",
                 "pattern": r"assign\s*\(",
                 "message": "assign() is deprecated, use direct assignment",
                 "replacement": "// Use direct assignment: variable = value;",
@@ -194,6 +219,7 @@ class OpenSCADSyntaxAnalyzer:
                 "deprecated_in": "2019.05"
             },
             {
+                "name": "child",
                 "pattern": r"child\s*\(\s*\d+\s*\)",
                 "message": "child() is deprecated, use children() instead",
                 "replacement": "children()",
@@ -201,6 +227,7 @@ class OpenSCADSyntaxAnalyzer:
                 "deprecated_in": "2019.05"
             },
             {
+                "name": "import_stl",
                 "pattern": r"import_stl\s*\(",
                 "message": "import_stl() is deprecated, use import() instead",
                 "replacement": "import()",
@@ -208,6 +235,7 @@ class OpenSCADSyntaxAnalyzer:
                 "deprecated_in": "2019.05"
             },
             {
+                "name": "import_dxf",
                 "pattern": r"import_dxf\s*\(",
                 "message": "import_dxf() is deprecated, use import() instead", 
                 "replacement": "import()",
@@ -220,209 +248,127 @@ class OpenSCADSyntaxAnalyzer:
         """
         Analyze OpenSCAD code for syntax issues.
         
+        The code is parsed once (and cached) by scad_parser; the checks
+        are AST visitors, and only regions whose text could contain what
+        a visitor reports are parsed at all.
+        
         Args:
             scad_code: OpenSCAD code to analyze
             
         Returns:
             List of detected syntax issues
         """
-        issues = []
-        lines = scad_code.split('\n')
-        
-        for line_num, line in enumerate(lines, 1):
-            # Check for deprecated patterns
-            issues.extend(self._check_deprecated_patterns(line, line_num))
-            
-            # Check for version-specific features
-            issues.extend(self._check_version_features(line, line_num))
-            
-            # Check for performance issues
-            issues.extend(self._check_performance_issues(line, line_num))
-            
-            # Check for modernization opportunities
-            issues.extend(self._check_modernization_opportunities(line, line_num))
+        parsed = parse_cached(scad_code)
+        issues = self._analyze_statements(parsed)
         
         # Check for overall structure issues
-        issues.extend(self._check_structure_issues(scad_code))
+        issues.extend(self._check_structure_issues(parsed))
         
         return issues
     
-    def _check_deprecated_patterns(self, line: str, line_num: int) -> List[SyntaxIssue]:
-        """Check for deprecated syntax patterns."""
-        issues = []
-        
-        for pattern_info in self.deprecated_patterns:
-            pattern = pattern_info["pattern"]
-            matches = re.finditer(pattern, line, re.IGNORECASE)
-            
-            for match in matches:
-                issue = SyntaxIssue(
-                    issue_type=SyntaxIssueType.DEPRECATED_SYNTAX,
-                    line_number=line_num,
-                    column_start=match.start(),
-                    column_end=match.end(),
-                    original_text=match.group(),
-                    message=pattern_info["message"],
-                    severity=pattern_info["severity"],
-                    suggested_replacement=pattern_info["replacement"],
-                    migration_notes=f"Deprecated in {pattern_info['deprecated_in']}"
-                )
-                issues.append(issue)
+    def _analyze_statements(self, parsed: ParseResult) -> List[SyntaxIssue]:
+        """Issues found by the AST visitors, sorted by line."""
+        deprecations = CallCollector(pattern["name"] for pattern in self.deprecated_patterns)
+        features = FeatureVisitor(FEATURE_MIN_VERSIONS)
+        performance = _PerformanceVisitor(parsed)
+        modernization = _ModernizationVisitor(parsed)
+        visit_regions(parsed, [deprecations, features, performance, modernization])
         
-        return issues
-    
-    def _check_version_features(self, line: str, line_num: int) -> List[SyntaxIssue]:
-        """Check for version-specific features."""
         issues = []
-        
-        # Check for exponent operator (2023.06+)
-        if "**" in line:
-            matches = re.finditer(r'\*\*', line)
-            for match in matches:
-                issue = SyntaxIssue(
-                    issue_type=SyntaxIssueType.VERSION_INCOMPATIBLE,
-                    line_number=line_num,
-                    column_start=match.start(),
-                    column_end=match.end(),
-                    original_text="**",
-                    message="Exponent operator requires OpenSCAD 2023.06 or later",
-                    severity="error",
-                    min_version_required="2023.06",
-                    suggested_replacement="pow(base, exponent)",
-                    migration_notes="Use pow() function for older versions"
-                )
-                issues.append(issue)
-        
-        # Check for assert function (2019.05+)
-        if "assert(" in line:
-            matches = re.finditer(r'assert\s*\(', line)
-            for match in matches:
-                issue = SyntaxIssue(
-                    issue_type=SyntaxIssueType.VERSION_INCOMPATIBLE,
-                    line_number=line_num,
-                    column_start=match.start(),
-                    column_end=match.end(),
-                    original_text=match.group(),
-                    message="assert() function requires OpenSCAD 2019.05 or later",
-                    severity="warning",
-                    min_version_required="2019.05",
-                    migration_notes="Remove assert() calls for older versions"
-                )
-                issues.append(issue)
-        
-        # Check for text primitive (2019.05+)
-        if "text(" in line:
-            matches = re.finditer(r'text\s*\(', line)
-            for match in matches:
-                issue = SyntaxIssue(
-                    issue_type=SyntaxIssueType.VERSION_INCOMPATIBLE,
-                    line_number=line_num,
-                    column_start=match.start(),
-                    column_end=match.end(),
-                    original_text=match.group(),
-                    message="text() primitive requires OpenSCAD 2019.05 or later",
-                    severity="warning",
-                    min_version_required="2019.05",
-                    migration_notes="Use external text generation for older versions"
-                )
-                issues.append(issue)
-        
+        issues.extend(self._deprecation_issues(parsed, deprecations.calls))
+        issues.extend(self._version_feature_issues(parsed, features.features))
+        issues.extend(performance.finish())
+        issues.extend(modernization.issues)
+        issues.sort(key=lambda issue: issue.line_number)
         return issues
     
-    def _check_performance_issues(self, line: str, line_num: int) -> List[SyntaxIssue]:
-        """Check for potential performance issues."""
+    def _deprecation_issues(self, parsed: ParseResult, calls: List[Node]) -> List[SyntaxIssue]:
+        """Issues for calls of deprecated modules and functions."""
+        patterns = {pattern["name"]: pattern for pattern in self.deprecated_patterns}
         issues = []
         
-        # Check for excessive union operations
-        union_count = line.count("union(")
-        if union_count > 10:
-            issue = SyntaxIssue(
-                issue_type=SyntaxIssueType.PERFORMANCE_WARNING,
-                line_number=line_num,
-                column_start=0,
-                column_end=len(line),
-                original_text=line.strip(),
-                message=f"Line contains {union_count} union operations, consider optimization",
-                severity="info",
-                suggested_replacement="Consider grouping operations or using hull()",
-                migration_notes="Large numbers of union operations can be slow"
-            )
-            issues.append(issue)
-        
-        # Check for nested for loops
-        if "for" in line and line.count("for") > 1:
-            issue = SyntaxIssue(
-                issue_type=SyntaxIssueType.PERFORMANCE_WARNING,
-                line_number=line_num,
-                column_start=0,
-                column_end=len(line),
-                original_text=line.strip(),
-                message="Nested for loops detected, may impact performance",
-                severity="info",
-                migration_notes="Consider alternative approaches for complex iterations"
-            )
-            issues.append(issue)
+        for call in calls:
+            pattern_info = patterns[call.name]
+            issues.append(_span_issue(
+                parsed, call.token.offset, _call_head_end(parsed, call, pattern_info["pattern"]),
+                issue_type=SyntaxIssueType.DEPRECATED_SYNTAX,
+                message=pattern_info["message"],
+                severity=pattern_info["severity"],
+                suggested_replacement=pattern_info["replacement"],
+                migration_notes=f"Deprecated in {pattern_info['deprecated_in']}"
+            ))
         
         return issues
     
-    def _check_modernization_opportunities(self, line: str, line_num: int) -> List[SyntaxIssue]:
-        """Check for modernization opportunities."""
+    def _version_feature_issues(self, parsed: ParseResult,
+                                features: Dict[str, List[Node]]) -> List[SyntaxIssue]:
+        """Issues for features newer than the oldest supported version."""
         issues = []
         
-        # Suggest list comprehensions where appropriate
-        if re.search(r'for\s*\([^)]+\)\s*\{[^}]*\}', line):
-            issue = SyntaxIssue(
-                issue_type=SyntaxIssueType.MODERNIZATION_OPPORTUNITY,
-                line_number=line_num,
-                column_start=0,
-                column_end=len(line),
-                original_text=line.strip(),
-                message="Consider using list comprehension for better readability",
-                severity="info",
-                suggested_replacement="[for (item = list) expression]",
-                migration_notes="List comprehensions are more concise and readable"
-            )
-            issues.append(issue)
-        
-        # Suggest pow() instead of repeated multiplication
-        if re.search(r'\w+\s*\*\s*\w+\s*\*\s*\w+', line):
-            issue = SyntaxIssue(
-                issue_type=SyntaxIssueType.MODERNIZATION_OPPORTUNITY,
-                line_number=line_num,
-                column_start=0,
-                column_end=len(line),
-                original_text=line.strip(),
-                message="Consider using pow() function for exponentiation",
-                severity="info",
+        # Exponent operator (2023.06+)
+        for node in features.get("exponent_operator", []):
+            issues.append(_span_issue(
+                parsed, node.token.offset, node.token.offset + 2,
+                issue_type=SyntaxIssueType.VERSION_INCOMPATIBLE,
+                message="Exponent operator requires OpenSCAD 2023.06 or later",
+                severity="error",
+                min_version_required=FEATURE_MIN_VERSIONS["exponent_operator"],
                 suggested_replacement="pow(base, exponent)",
-                migration_notes="pow() is clearer for exponentiation operations"
-            )
-            issues.append(issue)
+                migration_notes="Use pow() function for older versions"
+            ))
+        
+        # assert() module and expression (2019.05+)
+        for node in features.get("assert", []):
+            issues.append(_span_issue(
+                parsed, node.token.offset, _call_head_end(parsed, node),
+                issue_type=SyntaxIssueType.VERSION_INCOMPATIBLE,
+                message="assert() function requires OpenSCAD 2019.05 or later",
+                severity="warning",
+                min_version_required=FEATURE_MIN_VERSIONS["assert"],
+                migration_notes="Remove assert() calls for older versions"
+            ))
+        
+        # text() primitive (2019.05+)
+        for node in features.get("text", []):
+            issues.append(_span_issue(
+                parsed, node.token.offset, _call_head_end(parsed, node),
+                issue_type=SyntaxIssueType.VERSION_INCOMPATIBLE,
+                message="text() primitive requires OpenSCAD 2019.05 or later",
+                severity="warning",
+                min_version_required=FEATURE_MIN_VERSIONS["text"],
+                migration_notes="Use external text generation for older versions"
+            ))
         
         return issues
     
-    def _check_structure_issues(self, scad_code: str) -> List[SyntaxIssue]:
+    def _check_structure_issues(self, parsed: ParseResult) -> List[SyntaxIssue]:
         """Check for overall structure issues."""
         issues = []
         
         # Check for very long lines
-        lines = scad_code.split('\n')
-        for line_num, line in enumerate(lines, 1):
-            if len(line) > 120:
-                issue = SyntaxIssue(
-                    issue_type=SyntaxIssueType.MODERNIZATION_OPPORTUNITY,
-                    line_number=line_num,
-                    column_start=0,
-                    column_end=len(line),
-                    original_text=line[:50] + "..." if len(line) > 50 else line,
-                    message=f"Long line ({len(line)} characters), consider breaking up",
-                    severity="info",
-                    migration_notes="Break long lines for better readability"
-                )
-                issues.append(issue)
+        source = parsed.source
+        first_line_long = len(source) > 120 and source.find('\n', 0, 121) < 0
+        if first_line_long or _LONG_LINE.search(source):
+            for line_num, line in enumerate(source.split('\n'), 1):
+                if len(line) > 120:
+                    issue = SyntaxIssue(
+                        issue_type=SyntaxIssueType.MODERNIZATION_OPPORTUNITY,
+                        line_number=line_num,
+                        column_start=0,
+                        column_end=len(line),
+                        original_text=line[:50] + "..." if len(line) > 50 else line,
+                        message=f"Long line ({len(line)} characters), consider breaking up",
+                        severity="info",
+                        migration_notes="Break long lines for better readability"
+                    )
+                    issues.append(issue)
         
         # Check for missing module documentation
-        if "module " in scad_code and "/*" not in scad_code and "//" not in scad_code:
+        if "module" in parsed.source and not parsed.has_comments and any(
+            statement.type == "ModuleDef"
+            for index in range(len(parsed.regions)) if "module" in parsed.region_text(index)
+            for statement in parsed.statements(index)
+        ):
             issue = SyntaxIssue(
                 issue_type=SyntaxIssueType.MODERNIZATION_OPPORTUNITY,
                 line_number=1,
@@ -447,33 +393,352 @@ class OpenSCADSyntaxAnalyzer:
         Returns:
             Minimum version string required
         """
-        issues = self.analyze_scad_code(scad_code)
+        return _latest_required_version(self.analyze_scad_code(scad_code))
+
+    def get_feature_manifest(self, scad_code: str) -> Dict[str, any]:
+        """
+        Determine which optional runtime libraries the code needs.
         
-        # Find the highest minimum version requirement
-        min_versions = []
-        for issue in issues:
-            if issue.min_version_required:
-                min_versions.append(issue.min_version_required)
+        The WASM frontend uses this to fetch and mount the MCAD and font
+        payloads only for models that actually reference them.
         
-        if not min_versions:
-            return "2015.03"  # Default minimum supported version
+        Args:
+            scad_code: OpenSCAD code to analyze
         
-        # Sort versions and return the latest
-        version_list = []
-        for version_str in min_versions:
-            try:
-                parts = version_str.split(".")
-                major = int(parts[0])
-                minor = int(parts[1]) if len(parts) > 1 else 0
-                version_list.append((major, minor, version_str))
-            except (ValueError, IndexError):
-                continue
+        Returns:
+            Dictionary with 'mcad' and 'fonts' flags and the referenced
+            library paths under 'libraries'
+        """
+        includes = IncludeCollector()
+        # text() renders glyphs; fontmetrics()/textmetrics() query them
+        font_calls = CallCollector(('text', 'textmetrics', 'fontmetrics'))
+        visit_regions(parse_cached(scad_code), [includes, font_calls])
+        
+        libraries = [node.value for node in includes.includes]
+        uses_mcad = any(lib.startswith('MCAD/') for lib in libraries)
+        
+        return {
+            'mcad': uses_mcad,
+            'fonts': bool(font_calls.calls),
+            'libraries': sorted(set(libraries))
+        }
+
+
+def _latest_required_version(issues: List[SyntaxIssue]) -> str:
+    """Highest min_version_required among issues (2015.03 if none)."""
+    # Find the highest minimum version requirement
+    min_versions = []
+    for issue in issues:
+        if issue.min_version_required:
+            min_versions.append(issue.min_version_required)
+    
+    if not min_versions:
+        return "2015.03"  # Default minimum supported version
+    
+    # Sort versions and return the latest
+    version_list = []
+    for version_str in min_versions:
+        try:
+            parts = version_str.split(".")
+            major = int(parts[0])
+            minor = int(parts[1]) if len(parts) > 1 else 0
+            version_list.append((major, minor, version_str))
+        except (ValueError, IndexError):
+            continue
+    
+    if version_list:
+        version_list.sort(reverse=True)
+        return version_list[0][2]
+    
+    return "2015.03"
+
+
+def _call_head_end(parsed: ParseResult, call: Node, pattern: Optional[str] = None) -> int:
+    """
+    End of the head of a call, e.g. "assign(" or "child(0)": the text an
+    issue for the call reports. Falls back to the name and its "(".
+    """
+    for head in (pattern, re.escape(call.name) + r"\s*\("):
+        match = head and re.compile(head, re.IGNORECASE).match(parsed.source, call.token.offset)
+        if match:
+            return match.end()
+    return call.end
+    
+        
+def _span_issue(parsed: ParseResult, start: int, end: int, **fields) -> SyntaxIssue:
+    """SyntaxIssue located at a source span; columns cover its first line."""
+    line, column = parsed.position(start)
+    text = parsed.source[start:end]
+    return SyntaxIssue(
+        line_number=line,
+        column_start=column,
+        column_end=column + len(text.split('\n', 1)[0]),
+        original_text=text,
+        **fields
+    )
+
+
+class _PerformanceVisitor(NodeVisitor):
+    """Finds lines with many union() calls and nested for loops."""
+    
+    def __init__(self, parsed: ParseResult):
+        self.parsed = parsed
+        self.issues: List[SyntaxIssue] = []
+        self._unions_by_line: Dict[int, List[Node]] = {}
+        self._loop_depth = 0
+    
+    def wants(self, text: str) -> bool:
+        return text.count("for") > 1 or text.count("union") > 10
+    
+    def visit_ModuleCall(self, node: Node) -> None:
+        if node.name == "union":
+            self._unions_by_line.setdefault(node.line, []).append(node)
+        if node.name == "for":
+            self.visit_ListFor(node)
+        else:
+            self.generic_visit(node)
+    
+    def visit_ListFor(self, node: Node) -> None:
+        if self._loop_depth:
+            line_text = self.parsed.line_at(node.token.offset)
+            self.issues.append(SyntaxIssue(
+                issue_type=SyntaxIssueType.PERFORMANCE_WARNING,
+                line_number=node.line,
+                column_start=0,
+                column_end=len(line_text),
+                original_text=line_text.strip(),
+                message="Nested for loops detected, may impact performance",
+                severity="info",
+                migration_notes="Consider alternative approaches for complex iterations"
+            ))
+        self._loop_depth += 1
+        self.generic_visit(node)
+        self._loop_depth -= 1
+    
+    def finish(self) -> List[SyntaxIssue]:
+        """Issues found so far plus the per-line union counts."""
+        for line_num, unions in self._unions_by_line.items():
+            union_count = len(unions)
+            if union_count > 10:
+                line_text = self.parsed.line_at(unions[0].token.offset)
+                self.issues.append(SyntaxIssue(
+                    issue_type=SyntaxIssueType.PERFORMANCE_WARNING,
+                    line_number=line_num,
+                    column_start=0,
+                    column_end=len(line_text),
+                    original_text=line_text.strip(),
+                    message=f"Line contains {union_count} union operations, consider optimization",
+                    severity="info",
+                    suggested_replacement="Consider grouping operations or using hull()",
+                    migration_notes="Large numbers of union operations can be slow"
+                ))
+        return self.issues
+
+
+# A line after the first longer than 120 characters; anchoring on the
+# newline lets the regex engine skip ahead between lines
+_LONG_LINE = re.compile(r'\n.{121}')
+
+# Necessary conditions for the modernization checks: a for loop with its
+# block on one line, and a name between two multiplications (x*x*x). Both
+# start with a literal so the regex engine can skip ahead quickly. Most
+# code has no block on one line at all, which _ONE_LINE_BLOCK rules out
+# faster still, as its scan past each '{' stops at the end of the line.
+_ONE_LINE_BLOCK = re.compile(r'\{.*\}')
+_ONE_LINE_FOR_BLOCK = re.compile(r'for\b[^\n{]*\{[^\n]*\}')
+_REPEATED_FACTOR = re.compile(r'\*\s*[A-Za-z_$][\w$]*\s*\*')
+
+
+class _ModernizationVisitor(NodeVisitor):
+    """Suggests list comprehensions for one-line loops and pow() for x*x*x."""
+    
+    def __init__(self, parsed: ParseResult):
+        self.parsed = parsed
+        self.issues: List[SyntaxIssue] = []
+    
+    def wants(self, text: str) -> bool:
+        return (_ONE_LINE_BLOCK.search(text) is not None and _ONE_LINE_FOR_BLOCK.search(text) is not None
+                or _REPEATED_FACTOR.search(text) is not None)
+    
+    def visit_ModuleCall(self, node: Node) -> None:
+        if node.name == "for" and node.children and node.children[0].type == "Block":
+            block = node.children[0]
+            if "\n" not in self.parsed.source[node.start:block.end]:
+                self.issues.append(_span_issue(
+                    self.parsed, node.start, block.end,
+                    issue_type=SyntaxIssueType.MODERNIZATION_OPPORTUNITY,
+                    message="Consider using list comprehension for better readability",
+                    severity="info",
+                    suggested_replacement="[for (item = list) expression]",
+                    migration_notes="List comprehensions are more concise and readable"
+                ))
+        self.generic_visit(node)
+    
+    def visit_BinaryOp(self, node: Node) -> None:
+        left, right = node.children
+        if node.value == "*" and left.type == "BinaryOp" and left.value == "*":
+            factors = left.children + [right]
+            if all(factor.type == "Identifier" for factor in factors) and \
+                    len({factor.name for factor in factors}) == 1:
+                self.issues.append(_span_issue(
+                    self.parsed, node.start, node.end,
+                    issue_type=SyntaxIssueType.MODERNIZATION_OPPORTUNITY,
+                    message="Consider using pow() function for exponentiation",
+                    severity="info",
+                    suggested_replacement="pow(base, exponent)",
+                    migration_notes="pow() is clearer for exponentiation operations"
+                ))
+        self.generic_visit(node)
+
+
+@dataclass
+class IncrementalAnalysisStats:
+    """How much of the code the last incremental analysis looked at."""
+    regions_total: int = 0
+    regions_analyzed: int = 0
+
+
+class IncrementalSyntaxAnalyzer:
+    """
+    Syntax analysis for live editing that re-analyzes changed code only.
+    
+    The code is split into top-level regions (see scad_parser). Visitor
+    issues are cached per region under the digest of its text, with
+    positions relative to the region, so after an edit only the regions
+    whose text changed are analyzed again; all other issues come from the
+    cache, moved to where their region now starts. The region split and
+    the whole-file structure checks still scan the full code, but these
+    are plain text scans.
+    
+    Checks that look across statements on a shared line (the union count
+    per line) see each region on its own.
+    """
+    
+    def __init__(self, analyzer: Optional[OpenSCADSyntaxAnalyzer] = None,
+                 max_cache_entries: int = 4096):
+        """
+        Initialize the incremental analyzer.
+        
+        Args:
+            analyzer: Analyzer whose checks are run per region
+            max_cache_entries: Regions kept in the LRU cache
+        """
+        self.analyzer = analyzer or OpenSCADSyntaxAnalyzer()
+        self.max_cache_entries = max_cache_entries
+        self.last_stats = IncrementalAnalysisStats()
+        self._region_cache: "OrderedDict[str, List[SyntaxIssue]]" = OrderedDict()
+        self._last_result: Optional[Tuple[str, List[SyntaxIssue]]] = None
+    
+    def analyze_scad_code(self, scad_code: str) -> List[SyntaxIssue]:
+        """
+        Analyze OpenSCAD code, reusing the results of unchanged regions.
+        
+        Args:
+            scad_code: OpenSCAD code to analyze
+        
+        Returns:
+            List of detected syntax issues, as from OpenSCADSyntaxAnalyzer
+        """
+        if self._last_result is not None and self._last_result[0] == scad_code:
+            return list(self._last_result[1])
         
-        if version_list:
-            version_list.sort(reverse=True)
-            return version_list[0][2]
+        parsed = parse_cached(scad_code)
+        issues = []
+        analyzed = 0
+        for region in parsed.regions:
+            text = scad_code[region.start:region.end]
+            digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+            region_issues = self._region_cache.get(digest)
+            if region_issues is None:
+                region_issues = self.analyzer._analyze_statements(parse(text))
+                analyzed += 1
+                self._region_cache[digest] = region_issues
+                if len(self._region_cache) > self.max_cache_entries:
+                    self._region_cache.popitem(last=False)
+            else:
+                self._region_cache.move_to_end(digest)
+            if region_issues:
+                issues.extend(self._placed(region_issues, scad_code, region))
+        
+        issues.extend(self.analyzer._check_structure_issues(parsed))
         
-        return "2015.03"
+        self.last_stats = IncrementalAnalysisStats(len(parsed.regions), analyzed)
+        self._last_result = (scad_code, issues)
+        logger.debug(f"Incremental analysis: {analyzed} of {len(parsed.regions)} regions analyzed")
+        return list(issues)
+    
+    def get_minimum_version_required(self, scad_code: str) -> str:
+        """Minimum OpenSCAD version required for the code."""
+        return _latest_required_version(self.analyze_scad_code(scad_code))
+    
+    def clear_cache(self) -> None:
+        """Drop all cached region results."""
+        self._region_cache.clear()
+        self._last_result = None
+    
+    @staticmethod
+    def _placed(issues: List[SyntaxIssue], scad_code: str, region: Region) -> List[SyntaxIssue]:
+        """Copies of region-relative issues positioned in the whole code."""
+        # A region can start mid-line, after the previous statement
+        column = region.start - scad_code.rfind('\n', 0, region.start) - 1
+        placed = []
+        for issue in issues:
+            shift = column if issue.line_number == 1 else 0
+            placed.append(replace(
+                issue,
+                line_number=issue.line_number + region.line - 1,
+                column_start=issue.column_start + shift,
+                column_end=issue.column_end + shift
+            ))
+        return placed
+
+
+@lru_cache(maxsize=32)
+def _compile_rule_patterns(patterns: Tuple[str, ...]) -> List[re.Pattern]:
+    return [re.compile(pattern, re.MULTILINE | re.DOTALL) for pattern in patterns]
+
+
+def _line_starts(scad_code: str) -> List[int]:
+    """Offset of the first character of each line."""
+    return [0] + [match.end() for match in re.finditer('\n', scad_code)]
+
+
+def _literal_spans(scad_code: str) -> List[Tuple[int, int]]:
+    """Spans of the comments and strings in scad_code, in source order."""
+    if '"' not in scad_code and '/' not in scad_code:
+        return []
+    return [(token.offset, token.offset + len(token.value)) for token in tokenize(scad_code)
+            if token.kind in ('comment', 'string')]
+
+
+def _in_literal(spans: List[Tuple[int, int]], offset: int) -> bool:
+    """Whether offset lies inside one of the spans from _literal_spans()."""
+    index = bisect_right(spans, (offset, float('inf'))) - 1
+    return index >= 0 and offset < spans[index][1]
+
+
+def _scan_rules(rules: List[MigrationRule], scad_code: str) -> Iterator[Tuple[MigrationRule, "re.Match"]]:
+    """
+    Matches of all rules in one forward pass over the code, in source order.
+    
+    Each rule keeps a cursor that only moves forward and the cursors are
+    merged by offset, so every rule yields the matches re.finditer() would
+    give it alone.
+    """
+    patterns = _compile_rule_patterns(tuple(rule.pattern for rule in rules))
+    pending = []
+    for index, pattern in enumerate(patterns):
+        match = pattern.search(scad_code)
+        if match:
+            pending.append((match.start(), index, match))
+    heapq.heapify(pending)
+    
+    while pending:
+        _, index, match = heapq.heappop(pending)
+        yield rules[index], match
+        match = patterns[index].search(scad_code, max(match.end(), match.start() + 1))
+        if match:
+            heapq.heappush(pending, (match.start(), index, match))
 
 
 class MigrationEngine:
@@ -483,6 +748,7 @@ class MigrationEngine:
         """Initialize the migration engine."""
         self.migration_rules = self._load_migration_rules()
         self.syntax_analyzer = OpenSCADSyntaxAnalyzer()
+        self._last_analysis: Optional[Tuple[str, List[SyntaxIssue]]] = None
     
     def _load_migration_rules(self) -> List[MigrationRule]:
         """Load migration rules for different version transitions."""
@@ -599,44 +865,56 @@ class MigrationEngine:
         """
         suggestions = []
         
-        # Analyze current code for issues
-        issues = self.syntax_analyzer.analyze_scad_code(scad_code)
+        # Analyze current code for issues, indexed by line with their spans
+        line_starts = _line_starts(scad_code)
+        issues_by_line: Dict[int, List[Tuple[int, int, SyntaxIssue]]] = {}
+        for issue in self._analyze(scad_code):
+            if issue.line_number <= len(line_starts):
+                issue_start = line_starts[issue.line_number - 1] + issue.column_start
+                issue_end = issue_start + issue.column_end - issue.column_start
+                issues_by_line.setdefault(issue.line_number, []).append((issue_start, issue_end, issue))
         
         # Find applicable migration rules
         applicable_rules = self._find_applicable_rules(from_version, to_version)
+        literals = _literal_spans(scad_code)
         
-        # Generate suggestions for each applicable rule
-        for rule in applicable_rules:
-            matches = re.finditer(rule.pattern, scad_code, re.MULTILINE | re.DOTALL)
+        # One scan for all rules; matches arrive in source order
+        for rule, match in _scan_rules(applicable_rules, scad_code):
+            # Rules only rewrite code, never comments or strings
+            if _in_literal(literals, match.start()):
+                continue
             
-            for match in matches:
-                # Apply the rule to generate suggestion
-                try:
-                    suggested_code = re.sub(rule.pattern, rule.replacement, match.group())
-                    
-                    # Find corresponding issue if any
-                    corresponding_issue = None
-                    for issue in issues:
-                        if (issue.line_number == self._get_line_number(scad_code, match.start()) and
-                            issue.original_text in match.group()):
-                            corresponding_issue = issue
-                            break
+            # Apply the rule to generate suggestion
+            try:
+                suggested_code = match.expand(rule.replacement)
+            except (re.error, IndexError) as e:
+                logger.warning(f"Failed to apply rule {rule.rule_id}: {e}")
+                continue
                     
-                    # Create suggestion
-                    suggestion = MigrationSuggestion(
-                        rule=rule,
-                        issue=corresponding_issue,
-                        original_code=match.group(),
-                        suggested_code=suggested_code,
-                        confidence=rule.confidence,
-                        explanation=rule.description,
-                        requires_manual_review=(rule.confidence < 0.8)
-                    )
-                    suggestions.append(suggestion)
+            # Find corresponding issue if any: the narrowest one whose span
+            # overlaps the match (an empty span counts as its offset)
+            first_line = bisect_right(line_starts, match.start())
+            last_line = bisect_right(line_starts, max(match.start(), match.end() - 1))
+            overlapping = [
+                (issue_end - issue_start, issue_start, issue)
+                for line_number in range(first_line, last_line + 1)
+                for issue_start, issue_end, issue in issues_by_line.get(line_number, ())
+                if issue_start < match.end() and match.start() < max(issue_end, issue_start + 1)
+            ]
+            corresponding_issue = min(overlapping, key=lambda item: item[:2])[2] if overlapping else None
                     
-                except Exception as e:
-                    logger.warning(f"Failed to apply rule {rule.rule_id}: {e}")
-                    continue
+            # Create suggestion
+            suggestions.append(MigrationSuggestion(
+                rule=rule,
+                issue=corresponding_issue,
+                original_code=match.group(),
+                suggested_code=suggested_code,
+                confidence=rule.confidence,
+                explanation=rule.description,
+                requires_manual_review=(rule.confidence < 0.8),
+                start=match.start(),
+                end=match.end()
+            ))
         
         return suggestions
     
@@ -653,51 +931,77 @@ class MigrationEngine:
         Returns:
             Migration result with applied changes
         """
-        migrated_code = scad_code
         applied_rules = []
         manual_review_items = []
         migration_notes = []
+        edits: List[Tuple[int, int, str]] = []
+        edit_starts: List[int] = []
+        literals = _literal_spans(scad_code)
         
-        # Sort suggestions by confidence (highest first)
+        # Sort suggestions by confidence (highest first); a suggestion that
+        # overlaps one already accepted is left for manual review
         sorted_suggestions = sorted(suggestions, key=lambda s: s.confidence, reverse=True)
         
         for suggestion in sorted_suggestions:
             if suggestion.confidence >= auto_apply_threshold:
                 # Auto-apply high-confidence suggestions
                 try:
-                    migrated_code = re.sub(
-                        suggestion.rule.pattern,
-                        suggestion.rule.replacement,
-                        migrated_code,
-                        count=1  # Apply one at a time for better control
-                    )
-                    applied_rules.append(suggestion.rule)
-                    migration_notes.append(f"Applied: {suggestion.rule.name}")
-                    
-                except Exception as e:
+                    edit = self._locate_edit(scad_code, suggestion, literals)
+                except (re.error, IndexError) as e:
                     logger.error(f"Failed to apply suggestion {suggestion.rule.rule_id}: {e}")
                     manual_review_items.append(suggestion.issue)
+                    continue
+                if edit is None:
+                    continue
+                
+                index = bisect_right(edit_starts, edit[0])
+                if (index > 0 and edits[index - 1][1] > edit[0]) or \
+                        (index < len(edits) and edits[index][0] < edit[1]):
+                    if suggestion.issue:
+                        manual_review_items.append(suggestion.issue)
+                    migration_notes.append(f"Manual review needed (overlapping change): {suggestion.rule.name}")
+                    continue
+                
+                edits.insert(index, edit)
+                edit_starts.insert(index, edit[0])
+                applied_rules.append(suggestion.rule)
+                migration_notes.append(f"Applied: {suggestion.rule.name}")
             else:
                 # Flag low-confidence suggestions for manual review
                 if suggestion.issue:
                     manual_review_items.append(suggestion.issue)
                 migration_notes.append(f"Manual review needed: {suggestion.rule.name}")
         
-        # Analyze final code for remaining issues
-        final_issues = self.syntax_analyzer.analyze_scad_code(migrated_code)
-        original_issues = self.syntax_analyzer.analyze_scad_code(scad_code)
+        # Apply all edits in one pass by offset
+        pieces = []
+        position = 0
+        for start, end, replacement in edits:
+            pieces.append(scad_code[position:start])
+            pieces.append(replacement)
+            position = end
+        pieces.append(scad_code[position:])
+        migrated_code = ''.join(pieces)
         
-        # Determine resolved issues
+        # Resolved issues follow from the edits: deprecated and
+        # version-specific constructs are resolved when an edit rewrote
+        # their start, line-level issues when an edit replaced them whole
+        original_issues = self._analyze(scad_code)
         resolved_issues = []
-        for original_issue in original_issues:
-            is_resolved = True
-            for final_issue in final_issues:
-                if (original_issue.original_text == final_issue.original_text and
-                    original_issue.line_number == final_issue.line_number):
-                    is_resolved = False
-                    break
-            if is_resolved:
-                resolved_issues.append(original_issue)
+        if edits:
+            line_starts = _line_starts(scad_code)
+            for issue in original_issues:
+                if issue.line_number > len(line_starts):
+                    continue
+                issue_start = line_starts[issue.line_number - 1] + issue.column_start
+                index = bisect_right(edit_starts, issue_start) - 1
+                if index < 0:
+                    continue
+                if issue.issue_type in (SyntaxIssueType.DEPRECATED_SYNTAX, SyntaxIssueType.VERSION_INCOMPATIBLE):
+                    resolved = issue_start < edits[index][1]
+                else:
+                    resolved = issue_start + issue.column_end - issue.column_start <= edits[index][1]
+                if resolved:
+                    resolved_issues.append(issue)
         
         return MigrationResult(
             success=len(applied_rules) > 0 or len(manual_review_items) == 0,
@@ -714,6 +1018,30 @@ class MigrationEngine:
             ) else None
         )
     
+    def _locate_edit(self, scad_code: str, suggestion: MigrationSuggestion,
+                     literals: List[Tuple[int, int]]) -> Optional[Tuple[int, int, str]]:
+        """
+        Span and replacement text of a suggestion in scad_code; None when
+        it is not there or starts inside a comment or string.
+        """
+        start, end = suggestion.start, suggestion.end
+        if start is not None and end is not None and scad_code[start:end] == suggestion.original_code:
+            if _in_literal(literals, start):
+                return None
+            return start, end, suggestion.suggested_code
+        
+        # Suggestions made by hand or for other code: first match of the rule in code
+        for match in re.finditer(suggestion.rule.pattern, scad_code, re.MULTILINE | re.DOTALL):
+            if not _in_literal(literals, match.start()):
+                return match.start(), match.end(), match.expand(suggestion.rule.replacement)
+        return None
+    
+    def _analyze(self, scad_code: str) -> List[SyntaxIssue]:
+        """Syntax issues of scad_code; planning and applying share the result."""
+        if self._last_analysis is None or self._last_analysis[0] != scad_code:
+            self._last_analysis = (scad_code, self.syntax_analyzer.analyze_scad_code(scad_code))
+        return list(self._last_analysis[1])
+    
     def validate_migrated_code(self, original_code: str, migrated_code: str) -> Dict[str, any]:
         """
         Validate that migrated code maintains functional equivalence.
@@ -927,4 +1255,10 @@ def migrate_openscad_code(scad_code: str, from_version: str,
 def get_minimum_openscad_version(scad_code: str) -> str:
     """Get minimum OpenSCAD version required for code."""
     analyzer = OpenSCADSyntaxAnalyzer()
-    return analyzer.get_minimum_version_required(scad_code)
\ No newline at end of file
+    return analyzer.get_minimum_version_required(scad_code)
+
+
+def get_scad_feature_manifest(scad_code: str) -> Dict[str, any]:
+    """Get the optional runtime libraries (MCAD, fonts) code needs."""
+    analyzer = OpenSCADSyntaxAnalyzer()
+    return analyzer.get_feature_manifest(scad_code)
\ No newline at end of file
@@ -5,12 +5,26 @@ Handles execution of OpenSCAD command-line interface to generate STL files
 from SolidPython2 objects and OpenSCAD code.
 """
 
+import math
+import signal
 import subprocess
+import sys
 import tempfile
+import threading
+import time
 import os
 import logging
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Union, Optional
+from typing import Union, Optional, Tuple
+
+from .renderer_config import get_config
+from .tracing import span
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -19,6 +33,142 @@ class OpenSCADError(Exception):
     """Custom exception for OpenSCAD-related errors"""
     pass
 
+@dataclass
+class RenderStats:
+    """Resource usage of one OpenSCAD child process"""
+    wall_seconds: float
+    user_cpu_seconds: Optional[float] = None  # None without os.wait4 (Windows)
+    system_cpu_seconds: Optional[float] = None
+    peak_rss_bytes: Optional[int] = None
+    returncode: Optional[int] = None
+    limit_exceeded: Optional[str] = None  # "memory", "cpu" or "timeout"
+    
+    @property
+    def cpu_seconds(self) -> Optional[float]:
+        if self.user_cpu_seconds is None:
+            return None
+        return self.user_cpu_seconds + self.system_cpu_seconds
+
+class OpenSCADResourceLimitError(OpenSCADError):
+    """OpenSCAD was killed for exceeding a memory, CPU time or wall time limit"""
+    
+    def __init__(self, message: str, limit: str, stats: RenderStats):
+        super().__init__(message)
+        self.limit = limit
+        self.stats = stats
+
+def _run_child(cmd, timeout: float, memory_limit_bytes: Optional[int] = None,
+               cpu_limit_seconds: Optional[float] = None) -> Tuple[int, str, RenderStats]:
+    """
+    Run one OpenSCAD process and account for its resources
+    
+    The child is reaped with os.wait4, which returns its own CPU times and
+    peak RSS, so concurrent renders don't mix up their numbers. Memory
+    (RLIMIT_AS) and CPU time (RLIMIT_CPU) limits are set on the child
+    only. Without os.wait4 only wall time and the timeout apply.
+    
+    Returns:
+        (returncode, stderr, stats); a negative returncode is the signal
+        that killed the child
+    """
+    start = time.perf_counter()
+    if not hasattr(os, "wait4") or resource is None:
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            stderr = e.stderr.decode(errors="replace") if isinstance(e.stderr, bytes) else (e.stderr or "")
+            return -9, stderr, RenderStats(wall_seconds=time.perf_counter() - start, limit_exceeded="timeout")
+        stats = RenderStats(wall_seconds=time.perf_counter() - start, returncode=result.returncode)
+        return result.returncode, result.stderr, stats
+    
+    limits = []
+    cpu_soft_limit = None
+    if memory_limit_bytes:
+        limits.append((resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes)))
+    if cpu_limit_seconds:
+        cpu_soft_limit = max(1, math.ceil(cpu_limit_seconds))
+        # SIGXCPU at the soft limit, SIGKILL one second later if it is ignored
+        limits.append((resource.RLIMIT_CPU, (cpu_soft_limit, cpu_soft_limit + 1)))
+    
+    preexec_fn = None
+    if limits and not hasattr(resource, "prlimit"):
+        def preexec_fn():
+            for which, value in limits:
+                resource.setrlimit(which, value)
+    
+    with tempfile.TemporaryFile() as stderr_file:
+        # stderr goes to a file: nothing reads a pipe while we block in wait4
+        process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                   stderr=stderr_file, preexec_fn=preexec_fn)
+        lock = threading.Lock()
+        state = {"exited": False, "timed_out": False}
+        
+        def kill_on_timeout():
+            with lock:
+                if not state["exited"]:
+                    state["timed_out"] = True
+                    os.kill(process.pid, signal.SIGKILL)
+        
+        timer = threading.Timer(timeout, kill_on_timeout)
+        timer.daemon = True
+        try:
+            # Popen returns after exec, before OpenSCAD has allocated anything
+            for which, value in (limits if preexec_fn is None else []):
+                resource.prlimit(process.pid, which, value)
+            timer.start()
+            if hasattr(os, "waitid"):
+                # Wait without reaping, so the timer can never signal a recycled pid
+                os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+                with lock:
+                    state["exited"] = True
+                _, status, usage = os.wait4(process.pid, 0)
+            else:
+                # No waitid (macOS before Python 3.13): poll, reaping under the
+                # lock so the timer only ever signals a child that still exists
+                delay = 0.001
+                while True:
+                    with lock:
+                        pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+                        if pid:
+                            state["exited"] = True
+                            break
+                    time.sleep(delay)
+                    delay = min(delay * 2, 0.05)
+        except BaseException:
+            timer.cancel()
+            if process.returncode is None and not state["exited"]:
+                process.kill()
+                process.wait()
+            raise
+        timer.cancel()
+        
+        returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+        process.returncode = returncode  # Reaped here; keep Popen from waiting again
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode(errors="replace")
+    
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    stats = RenderStats(
+        wall_seconds=time.perf_counter() - start,
+        user_cpu_seconds=usage.ru_utime,
+        system_cpu_seconds=usage.ru_stime,
+        peak_rss_bytes=peak_rss,
+        returncode=returncode,
+    )
+    if state["timed_out"]:
+        stats.limit_exceeded = "timeout"
+    elif returncode != 0:
+        signum = -returncode if returncode < 0 else None
+        if cpu_soft_limit and (signum == signal.SIGXCPU or
+                               (signum == signal.SIGKILL and stats.cpu_seconds >= cpu_soft_limit)):
+            stats.limit_exceeded = "cpu"
+        elif memory_limit_bytes and (signum in (signal.SIGABRT, signal.SIGSEGV, signal.SIGKILL) or
+                                     "alloc" in stderr.lower() or "memory" in stderr.lower()):
+            # Allocation failures surface as std::bad_alloc aborts or error exits
+            stats.limit_exceeded = "memory"
+    return returncode, stderr, stats
+
 class OpenSCADRenderer:
     """
     Renderer for executing OpenSCAD and generating STL files
@@ -27,17 +177,39 @@ class OpenSCADRenderer:
     OpenSCAD command-line interface.
     """
     
-    def __init__(self, openscad_path: Optional[str] = None):
+    def __init__(self, openscad_path: Optional[str] = None, tree_shaker=None,
+                 memory_limit_bytes: Optional[int] = None, cpu_limit_seconds: Optional[float] = None,
+                 timeout: float = 60):
         """
         Initialize OpenSCAD renderer
         
         Args:
             openscad_path: Path to OpenSCAD executable. If None, searches common locations.
+            tree_shaker: Optional SCADTreeShaker that flattens include<> libraries
+                to the reachable definitions before each render
+            memory_limit_bytes: Address space limit (RLIMIT_AS) per render
+                (default: MARIMO_OPENSCAD_MEMORY_LIMIT_MB; 0 disables it)
+            cpu_limit_seconds: CPU time limit (RLIMIT_CPU) per render
+                (default: MARIMO_OPENSCAD_CPU_LIMIT; 0 disables it)
+            timeout: Wall time limit per render in seconds
         """
+        config = get_config()
+        if memory_limit_bytes is None:
+            memory_limit_bytes = config.local_memory_limit_mb * 2**20
+        if cpu_limit_seconds is None:
+            cpu_limit_seconds = config.local_cpu_limit_s
+        if memory_limit_bytes < 0 or cpu_limit_seconds < 0 or timeout <= 0:
+            raise ValueError("Render limits must be positive")
+        self.tree_shaker = tree_shaker
+        self.memory_limit_bytes = memory_limit_bytes or None
+        self.cpu_limit_seconds = cpu_limit_seconds or None
+        self.timeout = timeout
+        self._render_thread_state = threading.local()
         self.openscad_path = self._find_openscad(openscad_path)
         logger.info(f"Using OpenSCAD at: {self.openscad_path}")
         
         # Log OpenSCAD version
+        self.version: Optional[str] = None
         try:
             version_result = subprocess.run(
                 [self.openscad_path, "--version"],
@@ -49,10 +221,22 @@ class OpenSCADRenderer:
                 version = version_result.stdout.strip().split('\n')[0] if version_result.stdout else "Unknown"
             else:
                 version = "Unknown"
+            if version != "Unknown":
+                self.version = version
             logger.info(f"OpenSCAD version: {version}")
         except Exception as e:
             logger.warning(f"Could not determine OpenSCAD version: {e}")
     
+    @property
+    def last_render_stats(self) -> Optional[RenderStats]:
+        """Stats of the last render made from the calling thread"""
+        return getattr(self._render_thread_state, 'stats', None)
+    
+    @last_render_stats.setter
+    def last_render_stats(self, stats: Optional[RenderStats]) -> None:
+        # Per thread: renders running side by side must not read each other's stats
+        self._render_thread_state.stats = stats
+    
     def _find_openscad(self, openscad_path: Optional[str]) -> str:
         """Find OpenSCAD executable in common locations"""
         if openscad_path and os.path.exists(openscad_path):
@@ -101,8 +285,16 @@ class OpenSCADRenderer:
             STL file contents as bytes
             
         Raises:
+            OpenSCADResourceLimitError: If OpenSCAD exceeds a resource limit
             OpenSCADError: If rendering fails
         """
+        if self.tree_shaker is not None:
+            try:
+                with span("tree_shake"):
+                    scad_code = self.tree_shaker.flatten(scad_code)
+            except (OSError, UnicodeError) as e:
+                logger.warning(f"Tree-shaking skipped: {e}")
+        
         with tempfile.NamedTemporaryFile(mode='w', suffix='.scad', delete=False) as scad_file:
             scad_file.write(scad_code)
             scad_file_path = scad_file.name
@@ -121,35 +313,45 @@ class OpenSCADRenderer:
             
             logger.info(f"Running OpenSCAD to generate STL: {' '.join(cmd)}")
             
-            import time
-            start_time = time.time()
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60  # 60 second timeout
-            )
+            with span("openscad_subprocess") as process_span:
+                try:
+                    returncode, stderr, stats = _run_child(
+                        cmd, self.timeout, self.memory_limit_bytes, self.cpu_limit_seconds
+                    )
+                except OSError as e:
+                    raise OpenSCADError(f"Could not run OpenSCAD: {e}") from e
+                self.last_render_stats = stats
+                process_span.set_attribute("returncode", returncode)
+                process_span.set_attribute("cpu_seconds", stats.cpu_seconds)
+                process_span.set_attribute("peak_rss_bytes", stats.peak_rss_bytes)
+                if stats.limit_exceeded:
+                    process_span.set_attribute("limit_exceeded", stats.limit_exceeded)
             
-            end_time = time.time()
+            if stats.limit_exceeded:
+                raise OpenSCADResourceLimitError(self._limit_message(stats.limit_exceeded), stats.limit_exceeded, stats)
             
-            if result.returncode != 0:
-                error_msg = f"OpenSCAD failed with return code {result.returncode}"
-                if result.stderr:
-                    error_msg += f":\n{result.stderr}"
+            if returncode != 0:
+                error_msg = f"OpenSCAD failed with return code {returncode}"
+                if stderr:
+                    error_msg += f":\n{stderr}"
                 raise OpenSCADError(error_msg)
             
             # Read generated STL file
             if not os.path.exists(stl_file_path):
                 raise OpenSCADError("OpenSCAD did not generate STL file")
             
-            with open(stl_file_path, 'rb') as f:
-                stl_data = f.read()
+            with span("read_stl") as read_span:
+                with open(stl_file_path, 'rb') as f:
+                    stl_data = f.read()
+                read_span.set_attribute("bytes", len(stl_data))
             
             if len(stl_data) == 0:
                 raise OpenSCADError("Generated STL file is empty")
             
-            logger.info(f"OpenSCAD rendering completed in {end_time - start_time:.2f} seconds")
+            usage = ""
+            if stats.cpu_seconds is not None:
+                usage = f" (CPU {stats.cpu_seconds:.2f} s, peak RSS {stats.peak_rss_bytes / 2**20:.1f} MB)"
+            logger.info(f"OpenSCAD rendering completed in {stats.wall_seconds:.2f} seconds{usage}")
             
             return stl_data
             
@@ -162,6 +364,13 @@ class OpenSCADRenderer:
                 except Exception as e:
                     logger.warning(f"Failed to clean up temporary file {temp_path}: {e}")
     
+    def _limit_message(self, limit: str) -> str:
+        if limit == "memory":
+            return f"OpenSCAD exceeded the memory limit of {self.memory_limit_bytes / 2**20:.0f} MB"
+        if limit == "cpu":
+            return f"OpenSCAD exceeded the CPU time limit of {self.cpu_limit_seconds:g} s"
+        return f"OpenSCAD render timed out after {self.timeout:g} s"
+    
     def render_solidpython_to_stl(self, model) -> bytes:
         """
         Render SolidPython2 model to STL format
@@ -10,6 +10,8 @@ import os
 from pathlib import Path
 from typing import Optional, Dict, Any
 from .openscad_renderer import OpenSCADRenderer, OpenSCADError
+from .render_daemon import RenderDaemonClient
+from .renderer_config import get_config
 from .wasm_asset_server import get_wasm_asset_server
 
 logger = logging.getLogger(__name__)
@@ -119,19 +121,20 @@ class OpenSCADWASMRenderer:
             logger.warning("No base URL provided for WASM assets, using fallback")
             return '/wasm/'
     
-    def get_wasm_files(self, base_url: Optional[str] = None) -> Dict[str, str]:
+    def get_wasm_files(self, base_url: Optional[str] = None, hashed: bool = False) -> Dict[str, str]:
         """
         Get URLs for all WASM-related files
         
         Args:
             base_url: Base URL for asset serving (provided by anywidget)
+            hashed: Use content-hashed, immutably cacheable URLs
             
         Returns:
             Dictionary mapping filenames to web-accessible URLs
         """
         if base_url:
             # Use WASM asset server to get proper URLs
-            return self.wasm_server.get_asset_urls(base_url.rstrip('/') + '/wasm/')
+            return self.wasm_server.get_asset_urls(base_url.rstrip('/') + '/wasm/', hashed=hashed)
         else:
             # Fallback: return local file paths (for backward compatibility)
             files = {}
@@ -261,7 +264,12 @@ class HybridOpenSCADRenderer:
         # Initialize local renderer if fallback is enabled
         if self.fallback_to_local:
             try:
-                self.local_renderer = OpenSCADRenderer(openscad_path)
+                daemon_url = get_config().render_daemon_url
+                if daemon_url:
+                    # Local renders go to the shared daemon instead of a per-kernel OpenSCAD
+                    self.local_renderer = RenderDaemonClient(daemon_url)
+                else:
+                    self.local_renderer = OpenSCADRenderer(openscad_path)
                 logger.info("Local renderer initialized")
             except Exception as e:
                 logger.warning(f"Failed to initialize local renderer: {e}")
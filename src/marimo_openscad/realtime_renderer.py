@@ -8,12 +8,15 @@ for smooth real-time 3D model updates in marimo notebooks.
 import asyncio
 import hashlib
 import json
+import threading
 import time
 import weakref
 from collections import OrderedDict
 from typing import Dict, Any, Optional, Callable, Awaitable
 import logging
 
+from .render_history import RenderHistoryStore, RenderRecord, model_digest
+
 logger = logging.getLogger(__name__)
 
 
@@ -221,13 +224,16 @@ class STLCache:
             
             logger.debug(f"🗑️ Evicted LRU cache entry: {lru_key[:8]}... ({lru_entry['size']} bytes)")
             
-    async def get_or_render(self, cache_key: str, render_func: Callable[[], Awaitable[bytes]]) -> bytes:
+    async def get_or_render(self, cache_key: str, render_func: Callable[[], Awaitable[bytes]],
+                            cacheable: Optional[Callable[[], bool]] = None) -> bytes:
         """
         Get cached STL data or render and cache new data.
         
         Args:
             cache_key: Cache key to lookup
             render_func: Async function to render STL if not cached
+            cacheable: Asked after a render whether to store its result
+                (default: always stored)
             
         Returns:
             STL binary data
@@ -241,6 +247,8 @@ class STLCache:
         start_time = time.time()
         stl_data = await render_func()
         render_time = time.time() - start_time
+        if cacheable is not None and not cacheable():
+            return stl_data
         
         # Store in cache with render time metadata
         metadata = {
@@ -286,7 +294,8 @@ class RealTimeRenderer:
     performance optimization for interactive 3D modeling.
     """
     
-    def __init__(self, viewer, cache_size_mb: int = 256, debounce_ms: int = 100):
+    def __init__(self, viewer, cache_size_mb: int = 256, debounce_ms: int = 100,
+                 history: Optional[RenderHistoryStore] = None, quality: str = "default"):
         """
         Initialize real-time renderer.
         
@@ -294,6 +303,8 @@ class RealTimeRenderer:
             viewer: OpenSCADViewer instance
             cache_size_mb: STL cache size in megabytes
             debounce_ms: Parameter change debounce delay in milliseconds
+            history: Store that persists every render's timing (default: none)
+            quality: Quality tier recorded with each render
         """
         self.viewer = weakref.ref(viewer)  # Avoid circular reference
         self.cache = STLCache(max_size_mb=cache_size_mb)
@@ -309,6 +320,13 @@ class RealTimeRenderer:
         self.total_render_time = 0.0
         self.last_render_time = 0.0
         
+        # Persistent render history
+        self.history = history
+        self.quality = quality
+        self.last_regression = None
+        # Tier of the render in progress per thread, as record_render() reports it
+        self._render_state = threading.local()
+        
     async def update_parameter(self, name: str, value: Any, force_render: bool = False) -> None:
         """
         Update a parameter and trigger debounced rendering.
@@ -343,11 +361,13 @@ class RealTimeRenderer:
         if not use_cache:
             return await self._render_direct(scad_code)
             
-        # Use cache
+        # Use cache; the key stands for the full-tier output, so a preview
+        # render is returned but not stored
         cache_key = self.cache.get_cache_key(scad_code, parameters)
         return await self.cache.get_or_render(
             cache_key,
-            lambda: self._render_direct(scad_code)
+            lambda: self._render_direct(scad_code),
+            cacheable=lambda: getattr(self._render_state, 'tier', None) != "preview"
         )
         
     async def _debounced_render(self) -> None:
@@ -413,10 +433,67 @@ class RealTimeRenderer:
             
         # Use viewer's render method
         if hasattr(viewer, '_render_stl'):
+            self._render_state.tier = None
             return viewer._render_stl(scad_code, force_render=True)
         else:
             raise RuntimeError("Viewer does not support direct STL rendering")
             
+    def record_render(self, scad_code: str, stl_data: bytes, wall_seconds: float,
+                      quality: Optional[str] = None) -> None:
+        """
+        Persist one render's timing and check the model for a slowdown.
+        
+        CPU time, peak memory and renderer version come from the viewer's
+        renderer when it reports them (the local OpenSCAD renderer does).
+        Renderers keep their stats per thread, so call this from the
+        thread that made the render.
+        
+        Args:
+            scad_code: Rendered OpenSCAD code
+            stl_data: Rendered STL data
+            wall_seconds: Wall time of the render
+            quality: Quality tier (default: self.quality)
+        """
+        self._render_state.tier = quality or self.quality
+        if self.history is None:
+            return
+        backend, renderer = self._active_backend()
+        stats = getattr(renderer, 'last_render_stats', None)
+        record = RenderRecord(
+            model_digest=model_digest(scad_code),
+            backend=backend,
+            quality=quality or self.quality,
+            renderer_version=getattr(renderer, 'version', None),
+            wall_seconds=wall_seconds,
+            cpu_seconds=stats.cpu_seconds if stats is not None else None,
+            peak_rss_bytes=stats.peak_rss_bytes if stats is not None else None,
+            output_bytes=len(stl_data),
+        )
+        try:
+            self.history.record(record)
+            regression = self.history.detect_regression(record.model_digest, record.backend, record.quality)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not record render history: {e}")
+            return
+        if regression is not None:
+            self.last_regression = regression
+            logger.warning(f"🐢 Render slowdown for model {regression.key}: {regression.message}")
+    
+    def predict_render_time(self, scad_code: str, quality: Optional[str] = None) -> Optional[float]:
+        """Median wall time of this model's past renders, or None if unseen."""
+        if self.history is None:
+            return None
+        backend, _ = self._active_backend()
+        return self.history.predict(model_digest(scad_code), backend, quality or self.quality)
+    
+    def _active_backend(self):
+        """Name and object of the renderer that actually renders."""
+        viewer = self.viewer()
+        renderer = getattr(viewer, 'renderer', None)
+        # HybridOpenSCADRenderer delegates to one of its renderers
+        renderer = getattr(renderer, 'active_renderer', None) or renderer
+        return type(renderer).__name__, renderer
+    
     async def _apply_parameter(self, name: str, value: Any) -> None:
         """Apply parameter change to current model."""
         # This would typically update the SCAD code with new parameter values
@@ -442,6 +519,10 @@ class RealTimeRenderer:
                 'queue_size': self.render_queue_size
             },
             'cache': cache_stats,
+            'history': {
+                'enabled': self.history is not None,
+                'last_regression': self.last_regression.message if self.last_regression else None
+            },
             'debouncing': {
                 'delay_ms': self.debouncer.delay_ms,
                 'pending_changes': len(self.debouncer.pending_changes),
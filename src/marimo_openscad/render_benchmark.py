@@ -0,0 +1,396 @@
+"""
+Golden Model Render Benchmark
+
+Renders a fixed set of representative SCAD and SolidPython2 models through
+every available backend and records wall time, peak RSS of the OpenSCAD
+processes, triangle count and a mesh digest. Results are compared against
+a stored baseline: a slowdown is flagged when the median wall time rises
+beyond the baseline's noise (median absolute deviation) and a relative
+tolerance, and geometry drift when the mesh itself changes. Triangle
+counts and mesh digests do not depend on the machine, only on the
+OpenSCAD release, so the baseline records which release produced them.
+
+The WASM backend renders in the browser; its Python side returns no mesh,
+so it is not benchmarked here.
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .csg_planner import ParallelCSGRenderer, read_stl_triangles
+from .openscad_renderer import OpenSCADError, OpenSCADRenderer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+BASELINE_FORMAT_VERSION = 1
+
+# Coordinates are rounded before hashing so float noise in the STL writer
+# does not count as drift
+DIGEST_DECIMALS = 4
+
+
+@dataclass(frozen=True)
+class GoldenModel:
+    """A benchmark model: SCAD source or a function building a SolidPython2 model"""
+    name: str
+    source: Union[str, Callable[[], Any]]
+    description: str = ""
+    
+    @property
+    def kind(self) -> str:
+        return "scad" if isinstance(self.source, str) else "solidpython"
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements of one golden model on one backend"""
+    model: str
+    backend: str
+    wall_times: List[float] = field(default_factory=list)
+    peak_rss_bytes: Optional[int] = None
+    triangle_count: int = 0
+    mesh_digest: str = ""
+    error: Optional[str] = None
+    
+    @property
+    def key(self) -> str:
+        return f"{self.model}/{self.backend}"
+    
+    @property
+    def median_time(self) -> float:
+        return statistics.median(self.wall_times) if self.wall_times else 0.0
+
+
+@dataclass
+class Regression:
+    """A difference from the baseline"""
+    key: str
+    kind: str  # 'slowdown', 'memory', 'geometry_drift', 'error'
+    message: str
+    baseline: Any = None
+    current: Any = None
+
+
+def _basic_shapes():
+    from solid2 import cube, cylinder, sphere, translate
+    base = cube(15, center=True)
+    ball = translate([0, 0, 15 / 2 + 8])(sphere(8))
+    hole = cylinder(r=5, h=20, center=True)
+    return base + ball - hole
+
+
+def _castle():
+    from solid2 import cube, cylinder
+    size, height, t_height, t_radius = 400, 50, 100, 50
+    model = cube(0)
+    model += cube(size, size, height, center=True)
+    model -= cube(size - 20, size - 20, height, center=True)
+    for i in range(4):
+        x_pos = (size / 2 - t_radius) if i % 2 == 0 else -(size / 2 - t_radius)
+        y_pos = (size / 2 - t_radius) if i < 2 else -(size / 2 - t_radius)
+        model += cylinder(r=t_radius, h=t_height, center=True).translate([x_pos, y_pos, t_height / 2 - height / 2])
+    return model
+
+
+def _mechanical_bracket():
+    from solid2 import cube, cylinder, difference, union
+    w, h, t, hole_d = 40, 25, 5, 6
+    bracket_base = union()(cube([w, t, h]), cube([t, w, h]))
+    bracket_with_support = union()(bracket_base, cube([w - t, 2, h]).translate([t, t, 0]))
+    return difference()(
+        bracket_with_support,
+        cylinder(d=hole_d, h=h + 2).translate([w / 2, t / 2, -1]),
+        cylinder(d=hole_d, h=h + 2).translate([t / 2, w / 2, -1]),
+        cylinder(d=hole_d, h=h + 2).translate([w - hole_d * 1.5, t / 2, -1]),
+    )
+
+
+def _bolt_plate():
+    from solid2 import cube, cylinder, union
+    # Disjoint parts: the parallel CSG backend splits this union
+    return union()(*[
+        union()(cube([8, 8, 2]), cylinder(r=2, h=10, _fn=24).translate([4, 4, 0])).translate([12 * i, 12 * j, 0])
+        for i in range(4) for j in range(3)
+    ])
+
+
+_SPUR_GEAR = """
+teeth = 24;
+module tooth() { linear_extrude(height = 6) polygon([[-1.2, 0], [1.2, 0], [0.6, 3], [-0.6, 3]]); }
+difference() {
+    union() {
+        cylinder(r = 20, h = 6, $fn = 96);
+        for (i = [0 : teeth - 1]) rotate([0, 0, i * 360 / teeth]) translate([0, 19.5, 0]) tooth();
+    }
+    translate([0, 0, -1]) cylinder(r = 4, h = 8, $fn = 32);
+}
+"""
+
+_ROUNDED_BOX = """
+minkowski() {
+    difference() {
+        cube([40, 30, 20], center = true);
+        translate([0, 0, 3]) cube([36, 26, 20], center = true);
+    }
+    sphere(r = 1.5, $fn = 16);
+}
+"""
+
+_TWISTED_VASE = """
+difference() {
+    linear_extrude(height = 60, twist = 90, slices = 60, scale = 1.4) circle(r = 15, $fn = 6);
+    translate([0, 0, 2]) linear_extrude(height = 60, twist = 90, slices = 60, scale = 1.4) circle(r = 13, $fn = 6);
+}
+"""
+
+GOLDEN_MODELS = [
+    GoldenModel("basic_shapes", _basic_shapes, "Cube, sphere and cylinder hole (examples/basic_shapes.py)"),
+    GoldenModel("castle", _castle, "Walls and corner towers (examples/castle_demo.py)"),
+    GoldenModel("mechanical_bracket", _mechanical_bracket, "L-bracket with holes (examples/mechanical_parts.py)"),
+    GoldenModel("bolt_plate", _bolt_plate, "Grid of disjoint bolts"),
+    GoldenModel("spur_gear", _SPUR_GEAR, "Extruded teeth around a hub"),
+    GoldenModel("rounded_box", _ROUNDED_BOX, "Minkowski-rounded open box"),
+    GoldenModel("twisted_vase", _TWISTED_VASE, "Twisted, scaled linear_extrude shell"),
+]
+
+
+def mesh_digest(stl_data: bytes) -> str:
+    """
+    Digest of the mesh geometry, independent of the STL encoding
+    
+    Normals are dropped, coordinates rounded, each triangle rotated to
+    start at its smallest vertex (keeping the winding) and the triangles
+    sorted, so binary and ASCII STL or a reordered mesh hash the same.
+    """
+    triangles = []
+    for triangle in read_stl_triangles(stl_data):
+        vertices = [tuple(round(c, DIGEST_DECIMALS) + 0.0 for c in triangle[i:i + 3]) for i in (3, 6, 9)]
+        first = vertices.index(min(vertices))
+        triangles.append(tuple(vertices[first:] + vertices[:first]))
+    triangles.sort()
+    
+    digest = hashlib.sha256()
+    for triangle in triangles:
+        digest.update(repr(triangle).encode('ascii'))
+    return digest.hexdigest()
+
+
+def available_backends(openscad_path: Optional[str] = None) -> Dict[str, Any]:
+    """Backends that render in this environment, by name"""
+    try:
+        renderer = OpenSCADRenderer(openscad_path=openscad_path)
+    except OpenSCADError as e:
+        logger.info(f"No local OpenSCAD, render benchmark has no backends: {e}")
+        return {}
+    return {
+        "local": renderer,
+        "parallel_csg": ParallelCSGRenderer(renderer=renderer),
+    }
+
+
+def _peak_child_rss() -> Optional[int]:
+    """Largest RSS of any waited-for child process, in bytes"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _render(model: GoldenModel, renderer) -> bytes:
+    if model.kind == "scad":
+        return renderer.render_scad_to_stl(model.source)
+    return renderer.render_solidpython_to_stl(model.source())
+
+
+def _measure(model: GoldenModel, backend: str, renderer, repeats: int, warmup: int,
+             isolated: bool) -> BenchmarkResult:
+    """Render a model repeatedly and measure it"""
+    result = BenchmarkResult(model=model.name, backend=backend)
+    try:
+        for _ in range(warmup):
+            _render(model, renderer)
+        for _ in range(repeats):
+            start = time.perf_counter()
+            stl_data = _render(model, renderer)
+            result.wall_times.append(time.perf_counter() - start)
+    except Exception as e:
+        result.error = str(e)
+        return result
+    
+    # Only a fresh process limits the children's peak to this model
+    result.peak_rss_bytes = _peak_child_rss() if isolated else None
+    result.triangle_count = len(read_stl_triangles(stl_data))
+    result.mesh_digest = mesh_digest(stl_data)
+    return result
+
+
+def _process_context():
+    # fork keeps the backends' state (and test doubles) without pickling them twice
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("fork" if "fork" in methods else None)
+
+
+class RenderBenchmark:
+    """
+    Render the golden models through every backend and compare with a baseline
+    """
+    
+    def __init__(self, models: Optional[List[GoldenModel]] = None,
+                 backends: Optional[Dict[str, Any]] = None,
+                 openscad_path: Optional[str] = None,
+                 repeats: int = 5, warmup: int = 1, isolate: bool = True,
+                 slowdown_tolerance: float = 0.10, noise_factor: float = 3.0,
+                 memory_tolerance: float = 0.20):
+        """
+        Initialize the benchmark
+        
+        Args:
+            models: Models to render (default: GOLDEN_MODELS)
+            backends: Renderers by name (default: available_backends())
+            openscad_path: Path to OpenSCAD executable for the default backends
+            repeats: Timed renders per model and backend
+            warmup: Untimed renders before timing
+            isolate: Measure each model and backend in a fresh process, so
+                the peak RSS of its OpenSCAD processes can be attributed
+            slowdown_tolerance: Relative median slowdown always tolerated
+            noise_factor: Baseline MADs a median may move before it counts
+            memory_tolerance: Relative peak RSS growth tolerated
+        """
+        self.models = models if models is not None else list(GOLDEN_MODELS)
+        self.backends = backends if backends is not None else available_backends(openscad_path)
+        self.repeats = repeats
+        self.warmup = warmup
+        self.isolate = isolate
+        self.slowdown_tolerance = slowdown_tolerance
+        self.noise_factor = noise_factor
+        self.memory_tolerance = memory_tolerance
+    
+    @property
+    def openscad_version(self) -> Optional[str]:
+        """Version of the OpenSCAD the backends run, if known"""
+        for renderer in self.backends.values():
+            version = getattr(renderer, 'version', None) or getattr(getattr(renderer, 'renderer', None), 'version', None)
+            if isinstance(version, str):
+                return version
+        return None
+    
+    def run(self) -> List[BenchmarkResult]:
+        """Measure every model on every backend"""
+        results = []
+        for backend, renderer in self.backends.items():
+            for model in self.models:
+                if self.isolate:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=_process_context()) as executor:
+                        result = executor.submit(_measure, model, backend, renderer,
+                                                 self.repeats, self.warmup, True).result()
+                else:
+                    result = _measure(model, backend, renderer, self.repeats, self.warmup, False)
+                
+                if result.error:
+                    logger.warning(f"Benchmark {result.key} failed: {result.error}")
+                else:
+                    logger.info(f"Benchmark {result.key}: {result.median_time:.3f}s, "
+                                f"{result.triangle_count} triangles")
+                results.append(result)
+        return results
+    
+    def compare(self, results: List[BenchmarkResult], baseline: Dict[str, Any],
+                timing: bool = True) -> List[Regression]:
+        """
+        Compare results with a baseline
+        
+        Args:
+            results: Results of run()
+            baseline: Baseline loaded with load_baseline()
+            timing: Also compare wall time and peak RSS, which only mean
+                something against a baseline from the same machine
+        
+        Returns:
+            Slowdowns, memory growth, geometry drift and new errors; cases
+            missing from the baseline are not compared
+        """
+        regressions = []
+        stored = baseline.get("results", {})
+        
+        for result in results:
+            reference = stored.get(result.key)
+            if reference is None:
+                continue
+            if result.error:
+                if not reference.get("error"):
+                    regressions.append(Regression(result.key, "error", f"Render failed: {result.error}",
+                                                  current=result.error))
+                continue
+            if reference.get("error"):
+                continue
+            
+            if (result.triangle_count != reference["triangle_count"] or
+                    result.mesh_digest != reference["mesh_digest"]):
+                regressions.append(Regression(
+                    result.key, "geometry_drift",
+                    f"Mesh changed: {reference['triangle_count']} -> {result.triangle_count} triangles",
+                    baseline=reference["mesh_digest"], current=result.mesh_digest
+                ))
+            if not timing:
+                continue
+            
+            reference_times = reference["wall_times"]
+            reference_median = statistics.median(reference_times)
+            # Median absolute deviation, scaled to estimate a standard deviation
+            mad = 1.4826 * statistics.median(abs(t - reference_median) for t in reference_times)
+            allowed = max(self.noise_factor * mad, self.slowdown_tolerance * reference_median)
+            if result.median_time > reference_median + allowed:
+                regressions.append(Regression(
+                    result.key, "slowdown",
+                    f"Median render time {reference_median:.3f}s -> {result.median_time:.3f}s "
+                    f"(allowed +{allowed:.3f}s)",
+                    baseline=reference_median, current=result.median_time
+                ))
+            
+            reference_rss = reference.get("peak_rss_bytes")
+            if (reference_rss and result.peak_rss_bytes and
+                    result.peak_rss_bytes > reference_rss * (1 + self.memory_tolerance)):
+                regressions.append(Regression(
+                    result.key, "memory",
+                    f"Peak RSS {reference_rss / 2**20:.1f} MB -> {result.peak_rss_bytes / 2**20:.1f} MB",
+                    baseline=reference_rss, current=result.peak_rss_bytes
+                ))
+        
+        return regressions
+    
+    @staticmethod
+    def save_baseline(results: List[BenchmarkResult], path: Path,
+                      openscad_version: Optional[str] = None) -> None:
+        """Store results as the baseline"""
+        data = {
+            "format_version": BASELINE_FORMAT_VERSION,
+            "timestamp": time.time(),
+            "platform": platform.platform(),
+            "openscad_version": openscad_version,
+            "results": {result.key: asdict(result) for result in results},
+        }
+        Path(path).write_text(json.dumps(data, indent=2), encoding="utf-8")
+    
+    @staticmethod
+    def load_baseline(path: Path) -> Dict[str, Any]:
+        """Load a baseline written by save_baseline()"""
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        if data.get("format_version") != BASELINE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported render baseline format: {data.get('format_version')}")
+        return data
@@ -0,0 +1,731 @@
+"""
+Static Render Cost Estimator
+
+Estimates how expensive a model is to render without running OpenSCAD.
+The parsed AST (scad_parser) is evaluated like a CSG tree: constant
+expressions, $fn/$fa/$fs and loop ranges are resolved where possible,
+user modules are expanded with their arguments, and every node gets a
+polygon count (triangles for 3D, edges for 2D) from OpenSCAD's own
+fragment rule.
+
+From the tree come the features the render time depends on: output
+polygons, boolean work (n log n per union/difference/intersection),
+hull work and minkowski work (the product of the operands). A linear
+model turns them into seconds; its coefficients can be calibrated
+against measured render times from the render history. The estimate
+also flags minkowski()/hull() over high-poly children and deeply nested
+booleans.
+
+SolidPython2 models are estimated through their as_scad() output.
+"""
+
+import logging
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .render_history import RenderHistoryStore, model_digest
+from .scad_parser import Node, parse_cached, walk
+
+logger = logging.getLogger(__name__)
+
+# OpenSCAD's defaults for the special resolution variables
+DEFAULT_SPECIALS = {'$fn': 0.0, '$fa': 12.0, '$fs': 2.0}
+
+# Smallest radius OpenSCAD gives more than three fragments (GRID_FINE)
+_GRID_FINE = 0.00000095367431640625
+
+# Appended to a model for the preview tier; top-level assignments are
+# resolved last-wins, so these override the model's own top-level values.
+# Per-call arguments and nested assignments are rewritten by preview_scad()
+PREVIEW_OVERRIDES = "\n// marimo-openscad preview tier\n$fn = 0;\n$fa = 12;\n$fs = 2;\n"
+
+# Placeholder sizes for geometry the estimator cannot see
+IMPORT_POLYGONS = 5000
+UNKNOWN_LOOP_ITERATIONS = 10
+
+# Loops longer than this are estimated from evenly spaced samples; each
+# level of loop nesting takes an eighth as many, and module expansion
+# stops after MAX_MODULE_CALLS, so estimating stays fast
+MAX_LOOP_SAMPLES = 64
+MAX_MODULE_CALLS = 20000
+
+# Warning thresholds
+HIGH_POLY_CHILDREN = 2000  # hull() input polygons
+MINKOWSKI_WORK = 1e6  # product of minkowski() operand polygons
+BOOLEAN_DEPTH = 8
+MAX_MODULE_DEPTH = 64
+
+FEATURES = ('polygons', 'boolean_work', 'hull_work', 'minkowski_work')
+
+# Seconds per unit of each feature plus a fixed start-up cost, measured
+# roughly on CGAL renders; calibrate() replaces them with local numbers
+DEFAULT_COEFFICIENTS = {
+    'polygons': 2e-6,
+    'boolean_work': 5e-6,
+    'hull_work': 1e-6,
+    'minkowski_work': 1e-5,
+}
+DEFAULT_INTERCEPT = 0.2
+
+TRANSFORMS = frozenset({
+    'translate', 'rotate', 'scale', 'mirror', 'multmatrix', 'color', 'resize', 'offset',
+    'render', 'group', 'projection', 'assert', 'echo', 'let',
+})
+BOOLEANS = frozenset({'union', 'difference', 'intersection'})
+
+_BUILTINS = {
+    'sqrt': math.sqrt, 'abs': abs, 'floor': math.floor, 'ceil': math.ceil, 'round': round,
+    'sin': lambda a: math.sin(math.radians(a)), 'cos': lambda a: math.cos(math.radians(a)),
+    'tan': lambda a: math.tan(math.radians(a)), 'pow': math.pow, 'exp': math.exp,
+    'ln': math.log, 'log': math.log10,
+}
+
+
+def fragments(r: float, fn: float, fa: float, fs: float) -> int:
+    """Number of fragments OpenSCAD uses for a circle of radius r"""
+    if r < _GRID_FINE or fa <= 0 or fs <= 0:
+        return 3
+    if fn > 0:
+        return max(int(fn), 3)
+    return int(math.ceil(max(min(360.0 / fa, r * 2 * math.pi / fs), 5)))
+
+
+def preview_scad(scad_code: str) -> str:
+    """
+    The model at OpenSCAD's default resolution, for the preview tier
+    
+    $fn/$fa/$fs passed to a call (sphere(r, $fn = 128)), given as a
+    parameter default or assigned inside a block shadow the top-level
+    overrides, so their values are replaced with the defaults in place.
+    """
+    edits = []
+    if '$f' in scad_code:
+        parsed = parse_cached(scad_code)
+        for index in range(len(parsed.regions)):
+            for statement in parsed.statements(index):
+                for node in walk(statement):
+                    if (node is statement or node.name not in DEFAULT_SPECIALS or not node.children
+                            or node.type not in ('Argument', 'Parameter', 'Assignment')):
+                        continue
+                    value = node.children[0]
+                    edits.append((value.start, value.end, f"{DEFAULT_SPECIALS[node.name]:g}"))
+    
+    for start, end, text in sorted(edits, reverse=True):
+        scad_code = scad_code[:start] + text + scad_code[end:]
+    return scad_code + PREVIEW_OVERRIDES
+
+
+@dataclass
+class CostWarning:
+    """A construct that makes the render expensive"""
+    kind: str  # 'minkowski', 'hull', 'boolean_depth', 'recursion', 'long_render'
+    message: str
+    line: int = 0
+
+
+@dataclass
+class CostEstimate:
+    """Static cost of one model"""
+    polygons: float = 0.0
+    boolean_work: float = 0.0
+    hull_work: float = 0.0
+    minkowski_work: float = 0.0
+    max_boolean_depth: int = 0
+    seconds: float = 0.0
+    warnings: List[CostWarning] = field(default_factory=list)
+    unknown_modules: List[str] = field(default_factory=list)
+    
+    @property
+    def features(self) -> List[float]:
+        return [getattr(self, name) for name in FEATURES]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class _Geometry:
+    polygons: float = 0.0
+    dims: int = 0  # 0 empty, 2 or 3
+    depth: int = 0  # Nesting depth of boolean operations
+    
+    @staticmethod
+    def combine(parts: Sequence['_Geometry']) -> '_Geometry':
+        return _Geometry(sum(p.polygons for p in parts), max((p.dims for p in parts), default=0),
+                         max((p.depth for p in parts), default=0))
+
+
+class _Range:
+    def __init__(self, start: float, step: float, end: float):
+        self.start, self.step, self.end = start, step, end
+    
+    def __len__(self) -> int:
+        if self.step == 0 or (self.end - self.start) / self.step < 0:
+            return 0
+        return int(math.floor((self.end - self.start) / self.step + 1e-9)) + 1
+    
+    def sample(self, count: int) -> List[float]:
+        length = len(self)
+        indices = range(length) if length <= count else (round(i * (length - 1) / (count - 1)) for i in range(count))
+        return [self.start + i * self.step for i in indices]
+
+
+class _Scope:
+    """Variables of one scope; $-variables are looked up through callers"""
+    
+    def __init__(self, parent: Optional['_Scope'] = None, caller: Optional['_Scope'] = None,
+                 children: Optional[Tuple[List[Node], '_Scope']] = None):
+        self.values: Dict[str, Any] = {}
+        self.parent = parent
+        self.caller = caller if caller is not None else parent
+        self.children = children if children is not None else (parent.children if parent else None)
+    
+    def lookup(self, name: str) -> Any:
+        scope = self
+        while scope is not None:
+            if name in scope.values:
+                return scope.values[name]
+            scope = scope.caller if name.startswith('$') else scope.parent
+        return DEFAULT_SPECIALS.get(name)
+    
+    def special(self, name: str) -> float:
+        value = self.lookup(name)
+        return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else DEFAULT_SPECIALS[name]
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+class _Evaluator:
+    """Evaluates an AST into polygon counts and cost features"""
+    
+    def __init__(self):
+        self.estimate = CostEstimate()
+        self.modules: Dict[str, Node] = {}
+        self._weight = 1.0  # Repetitions of the code being evaluated (sampled loops)
+        self._module_depth = 0
+        self._module_calls = 0
+        self._loop_depth = 0
+        self._warned = set()
+    
+    # -- expressions ---------------------------------------------------
+    
+    def value(self, node: Node, scope: _Scope) -> Any:
+        kind = node.type
+        if kind in ('Number', 'String', 'Boolean'):
+            return node.value
+        if kind == 'Identifier':
+            return math.pi if node.name == 'PI' else scope.lookup(node.name)
+        if kind == 'Vector':
+            if any(child.type in ('ListFor', 'ListIf', 'Each') for child in node.children):
+                return None
+            return [self.value(child, scope) for child in node.children]
+        if kind == 'Range':
+            parts = [_number(self.value(child, scope)) for child in node.children]
+            if None in parts:
+                return None
+            return _Range(parts[0], parts[1], parts[2]) if len(parts) == 3 else _Range(parts[0], 1.0, parts[1])
+        if kind == 'UnaryOp':
+            operand = self.value(node.children[0], scope)
+            if node.value == '!':
+                return None if operand is None else not operand
+            number = _number(operand)
+            return None if number is None else (-number if node.value == '-' else number)
+        if kind == 'BinaryOp':
+            return self._binary(node, scope)
+        if kind == 'Ternary':
+            condition = self.value(node.children[0], scope)
+            return None if condition is None else self.value(node.children[1 if condition else 2], scope)
+        if kind == 'Index':
+            target, index = self.value(node.children[0], scope), _number(self.value(node.children[1], scope))
+            if isinstance(target, list) and index is not None and 0 <= int(index) < len(target):
+                return target[int(index)]
+            return None
+        if kind == 'Call':
+            return self._call(node, scope)
+        return None
+    
+    def _binary(self, node: Node, scope: _Scope) -> Any:
+        operator = node.value
+        left = self.value(node.children[0], scope)
+        right = self.value(node.children[1], scope)
+        if operator in ('&&', '||'):
+            if left is None or right is None:
+                return None
+            return (left and right) if operator == '&&' else (left or right)
+        if operator in ('==', '!='):
+            if left is None or right is None:
+                return None
+            return (left == right) == (operator == '==')
+        a, b = _number(left), _number(right)
+        if a is None or b is None:
+            return None
+        try:
+            if operator == '+':
+                return a + b
+            if operator == '-':
+                return a - b
+            if operator == '*':
+                return a * b
+            if operator == '/':
+                return a / b
+            if operator == '%':
+                return math.fmod(a, b)
+            if operator in ('^', '**'):
+                return a ** b
+            return {'<': a < b, '<=': a <= b, '>': a > b, '>=': a >= b}.get(operator)
+        except (ArithmeticError, ValueError):
+            return None
+    
+    def _call(self, node: Node, scope: _Scope) -> Any:
+        arguments = [self.value(arg.children[0], scope) for arg in node.args if arg.children]
+        if node.name == 'len' and arguments and isinstance(arguments[0], (list, str)):
+            return len(arguments[0])
+        if node.name in ('max', 'min'):
+            values = arguments[0] if len(arguments) == 1 and isinstance(arguments[0], list) else arguments
+            numbers = [_number(v) for v in values]
+            if not numbers or None in numbers:
+                return None
+            return max(numbers) if node.name == 'max' else min(numbers)
+        function = _BUILTINS.get(node.name)
+        numbers = [_number(v) for v in arguments]
+        if function is None or not numbers or None in numbers:
+            return None
+        try:
+            return function(*numbers)
+        except (ArithmeticError, ValueError, TypeError):
+            return None
+    
+    # -- statements ----------------------------------------------------
+    
+    def statements(self, nodes: Sequence[Node], scope: _Scope) -> List[_Geometry]:
+        """Geometry of each statement; assignments apply to the whole scope"""
+        for node in nodes:
+            if node.type == 'Assignment' and node.children:
+                scope.values[node.name] = self.value(node.children[0], scope)
+            elif node.type == 'ModuleDef':
+                self.modules[node.name] = node
+        parts = []
+        for node in nodes:
+            geometry = self.statement(node, scope)
+            if geometry.dims:
+                parts.append(geometry)
+        return parts
+    
+    def statement(self, node: Node, scope: _Scope) -> _Geometry:
+        if node.type == 'Block':
+            return self.union(node, self.statements(node.children, _Scope(scope)))
+        if node.type == 'If':
+            condition = self.value(node.children[0], scope)
+            branches = node.children[1:]
+            if condition is not None:
+                index = 0 if condition else 1
+                return self.statement(branches[index], scope) if index < len(branches) else _Geometry()
+            # Unknown condition: assume the more expensive branch
+            return max((self.statement(branch, scope) for branch in branches), key=lambda g: g.polygons)
+        if node.type == 'ModuleCall':
+            if node.value and ('*' in node.value or '%' in node.value):
+                return _Geometry()  # Disabled and background objects are not rendered
+            return self.module_call(node, scope)
+        return _Geometry()
+    
+    def children_of(self, node: Node, scope: _Scope) -> List[_Geometry]:
+        if not node.children:
+            return []
+        child = node.children[0]
+        if child.type == 'Block':
+            return self.statements(child.children, _Scope(scope))
+        geometry = self.statement(child, scope)
+        return [geometry] if geometry.dims else []
+    
+    def module_call(self, node: Node, scope: _Scope) -> _Geometry:
+        name = node.name
+        call_scope = _Scope(scope)
+        positional, named = [], {}
+        for arg in node.args:
+            if not arg.children:
+                continue
+            value = self.value(arg.children[0], scope)
+            if arg.name is None:
+                positional.append(value)
+            elif arg.name.startswith('$'):
+                call_scope.values[arg.name] = value
+            else:
+                named[arg.name] = value
+        
+        if name in ('for', 'intersection_for'):
+            return self.loop(node, call_scope, name == 'intersection_for')
+        if name == 'let':
+            for arg in node.args:
+                if arg.name is not None and arg.children:
+                    call_scope.values[arg.name] = self.value(arg.children[0], call_scope)
+            return _Geometry.combine(self.children_of(node, call_scope))
+        if name == 'children':
+            return self.caller_children(scope)
+        if name in TRANSFORMS:
+            return _Geometry.combine(self.children_of(node, call_scope))
+        if name in BOOLEANS:
+            return self.boolean(node, self.children_of(node, call_scope))
+        if name == 'hull':
+            return self.hull(node, self.children_of(node, call_scope))
+        if name == 'minkowski':
+            return self.minkowski(node, self.children_of(node, call_scope))
+        if name == 'linear_extrude':
+            return self.linear_extrude(named, positional, self.children_of(node, call_scope))
+        if name == 'rotate_extrude':
+            child = _Geometry.combine(self.children_of(node, call_scope))
+            steps = fragments(10.0, call_scope.special('$fn'), call_scope.special('$fa'), call_scope.special('$fs'))
+            return _Geometry(2 * child.polygons * steps, 3, child.depth)
+        primitive = self.primitive(name, positional, named, call_scope)
+        if primitive is not None:
+            return primitive
+        
+        module = self.modules.get(name)
+        if module is None:
+            if name not in self.estimate.unknown_modules:
+                self.estimate.unknown_modules.append(name)
+            return _Geometry.combine(self.children_of(node, call_scope))
+        return self.user_module(node, module, positional, named, call_scope, scope)
+    
+    def user_module(self, node: Node, module: Node, positional: List[Any], named: Dict[str, Any],
+                    call_scope: _Scope, scope: _Scope) -> _Geometry:
+        if self._module_depth >= MAX_MODULE_DEPTH:
+            self.warn('recursion', f"Module {module.name}() nests deeper than {MAX_MODULE_DEPTH} levels; "
+                      "its cost is cut off", node.line)
+            return _Geometry()
+        self._module_calls += 1
+        if self._module_calls > MAX_MODULE_CALLS:
+            self.warn('recursion', f"Stopped expanding modules after {MAX_MODULE_CALLS} calls; "
+                      "the estimate is a lower bound", 0)
+            return _Geometry()
+        # Lexically scoped to the top level; $-variables come from the call
+        body_scope = _Scope(self.globals, caller=call_scope, children=(node.children, scope))
+        for index, param in enumerate(module.args):
+            if param.name in named:
+                body_scope.values[param.name] = named[param.name]
+            elif index < len(positional):
+                body_scope.values[param.name] = positional[index]
+            elif param.children:
+                body_scope.values[param.name] = self.value(param.children[0], body_scope)
+            else:
+                body_scope.values[param.name] = None
+        self._module_depth += 1
+        try:
+            body = module.children[0]
+            nodes = body.children if body.type == 'Block' else [body]
+            return self.union(node, self.statements(nodes, body_scope))
+        finally:
+            self._module_depth -= 1
+    
+    def caller_children(self, scope: _Scope) -> _Geometry:
+        if scope.children is None:
+            return _Geometry()
+        nodes, caller_scope = scope.children
+        parts = []
+        for child in nodes:
+            if child.type == 'Block':
+                parts.extend(self.statements(child.children, _Scope(caller_scope)))
+            else:
+                geometry = self.statement(child, caller_scope)
+                if geometry.dims:
+                    parts.append(geometry)
+        return _Geometry.combine(parts)
+    
+    def loop(self, node: Node, scope: _Scope, intersect: bool) -> _Geometry:
+        variables = []
+        for arg in node.args:
+            if arg.name is None or not arg.children:
+                continue
+            values = self.value(arg.children[0], scope)
+            if isinstance(values, _Range):
+                variables.append((arg.name, values, len(values)))
+            elif isinstance(values, list):
+                variables.append((arg.name, values, len(values)))
+            else:
+                variables.append((arg.name, None, UNKNOWN_LOOP_ITERATIONS))
+        
+        iterations = math.prod(count for _, _, count in variables) if variables else 1
+        if iterations == 0:
+            return _Geometry()
+        budget = max(2, MAX_LOOP_SAMPLES >> (3 * self._loop_depth))
+        samples = self._loop_samples(variables, min(iterations, budget))
+        weight = iterations / len(samples)
+        parts = []
+        self._weight *= weight
+        self._loop_depth += 1
+        try:
+            for bindings in samples:
+                iteration_scope = _Scope(scope)
+                iteration_scope.values.update(bindings)
+                parts.extend(self.children_of(node, iteration_scope))
+        finally:
+            self._weight /= weight
+            self._loop_depth -= 1
+        geometry = _Geometry.combine(parts)
+        geometry.polygons *= weight
+        if intersect:
+            return self.boolean(node, [geometry, geometry] if iterations > 1 else [geometry])
+        return self.union(node, [geometry, geometry] if iterations > 1 else [geometry], combined=geometry)
+    
+    @staticmethod
+    def _loop_samples(variables, count: int) -> List[Dict[str, Any]]:
+        combinations: List[Dict[str, Any]] = [{}]
+        for name, values, length in variables:
+            if values is None:
+                values = [None] * length
+            elif isinstance(values, _Range):
+                values = values.sample(length)
+            combinations = [dict(c, **{name: v}) for c in combinations for v in values]
+            if len(combinations) > count * 4:
+                combinations = combinations[::len(combinations) // (count * 4)]
+        if len(combinations) > count:
+            step = len(combinations) / count
+            combinations = [combinations[int(i * step)] for i in range(count)]
+        return combinations
+    
+    # -- geometry --------------------------------------------------------
+    
+    def primitive(self, name: str, positional: List[Any], named: Dict[str, Any],
+                  scope: _Scope) -> Optional[_Geometry]:
+        def argument(key, index=None, default=None):
+            value = named.get(key)
+            if value is None and index is not None and index < len(positional):
+                value = positional[index]
+            return value if value is not None else default
+        
+        def radius(r_key, d_key, index=None, default=1.0):
+            r = _number(argument(r_key, index))
+            if r is None:
+                d = _number(argument(d_key))
+                r = d / 2 if d is not None else default
+            return abs(r) if r is not None else None
+        
+        def steps(r):
+            return fragments(r, scope.special('$fn'), scope.special('$fa'), scope.special('$fs'))
+        
+        if name == 'cube':
+            return _Geometry(12, 3)
+        if name == 'sphere':
+            count = steps(radius('r', 'd', 0))
+            return _Geometry(2 * count * ((count + 1) // 2), 3)
+        if name == 'cylinder':
+            r = max(radius('r1', 'd1', 1, default=None) or 0, radius('r2', 'd2', 2, default=None) or 0)
+            if not r:
+                r = radius('r', 'd')
+            return _Geometry(4 * steps(r), 3)
+        if name == 'polyhedron':
+            faces = argument('faces', 1)
+            if isinstance(faces, list):
+                return _Geometry(len(faces), 3)
+            points = argument('points', 0)
+            return _Geometry(2 * len(points) if isinstance(points, list) else 100, 3)
+        if name in ('import', 'surface'):
+            return _Geometry(IMPORT_POLYGONS, 3)
+        if name == 'square':
+            return _Geometry(4, 2)
+        if name == 'circle':
+            return _Geometry(steps(radius('r', 'd', 0)), 2)
+        if name == 'polygon':
+            points = argument('points', 0)
+            return _Geometry(len(points) if isinstance(points, list) else 32, 2)
+        if name == 'text':
+            text = argument('text', 0, '')
+            return _Geometry(60 * max(len(text) if isinstance(text, str) else 8, 1), 2)
+        return None
+    
+    def linear_extrude(self, named: Dict[str, Any], positional: List[Any],
+                       children: List[_Geometry]) -> _Geometry:
+        child = _Geometry.combine(children)
+        twist = _number(named.get('twist')) or 0.0
+        slices = _number(named.get('slices'))
+        if slices is None:
+            slices = max(1.0, math.ceil(abs(twist) / 5)) if twist else 1.0
+        return _Geometry(2 * child.polygons * slices + 2 * child.polygons, 3, child.depth)
+    
+    def union(self, node: Node, parts: List[_Geometry], combined: Optional[_Geometry] = None) -> _Geometry:
+        """Implicit or explicit union: only costs a boolean with several 3D parts"""
+        if len(parts) < 2:
+            return parts[0] if parts else _Geometry()
+        return self.boolean(node, parts, combined)
+    
+    def boolean(self, node: Node, parts: List[_Geometry], combined: Optional[_Geometry] = None) -> _Geometry:
+        geometry = combined if combined is not None else _Geometry.combine(parts)
+        if len(parts) < 2:
+            return geometry
+        n = max(geometry.polygons, 2.0)
+        self.estimate.boolean_work += self._weight * n * math.log2(n)
+        depth = geometry.depth + 1
+        if depth > BOOLEAN_DEPTH:
+            self.warn('boolean_depth', f"Boolean operations nest {depth} levels deep; "
+                      "flatten them or wrap subtrees in render()", node.line)
+        self.estimate.max_boolean_depth = max(self.estimate.max_boolean_depth, depth)
+        return _Geometry(geometry.polygons, geometry.dims, depth)
+    
+    def hull(self, node: Node, parts: List[_Geometry]) -> _Geometry:
+        geometry = _Geometry.combine(parts)
+        n = max(geometry.polygons, 2.0)
+        self.estimate.hull_work += self._weight * n * math.log2(n)
+        if geometry.polygons > HIGH_POLY_CHILDREN:
+            self.warn('hull', f"hull() over {geometry.polygons:.0f} polygons; "
+                      "lower $fn on its children", node.line)
+        return geometry
+    
+    def minkowski(self, node: Node, parts: List[_Geometry]) -> _Geometry:
+        if not parts:
+            return _Geometry()
+        work = math.prod(max(part.polygons, 1.0) for part in parts)
+        self.estimate.minkowski_work += self._weight * work
+        if len(parts) > 1 and work > MINKOWSKI_WORK:
+            sizes = " x ".join(f"{part.polygons:.0f}" for part in parts)
+            self.warn('minkowski', f"minkowski() over {sizes} polygons; "
+                      "lower $fn on its children or use offset() in 2D", node.line)
+        combined = _Geometry.combine(parts)
+        # The sum of convex parts has at most the sum of their faces; keep it simple
+        return _Geometry(combined.polygons * max(len(parts) - 1, 1), combined.dims, combined.depth)
+    
+    def warn(self, kind: str, message: str, line: int) -> None:
+        if (kind, line) not in self._warned:
+            self._warned.add((kind, line))
+            self.estimate.warnings.append(CostWarning(kind, message, line))
+    
+    def run(self, tree: Node) -> CostEstimate:
+        self.globals = _Scope()
+        geometry = self.union(tree, self.statements(tree.children, self.globals))
+        self.estimate.polygons = geometry.polygons
+        return self.estimate
+
+
+class RenderCostModel:
+    """
+    Linear render time model over static cost features
+    
+    seconds = intercept + sum(coefficient * feature). The defaults are
+    rough; calibrate() fits them to measured render times.
+    """
+    
+    def __init__(self, coefficients: Optional[Dict[str, float]] = None,
+                 intercept: float = DEFAULT_INTERCEPT, preview_threshold_s: float = 10.0,
+                 warn_threshold_s: float = 60.0):
+        """
+        Args:
+            coefficients: Seconds per unit of each feature in FEATURES
+            intercept: Fixed cost of a render (process start-up)
+            preview_threshold_s: Estimates above this render at the preview tier
+            warn_threshold_s: Estimates above this are announced before rendering
+        """
+        self.coefficients = dict(DEFAULT_COEFFICIENTS, **(coefficients or {}))
+        self.intercept = intercept
+        self.preview_threshold_s = preview_threshold_s
+        self.warn_threshold_s = warn_threshold_s
+    
+    def estimate(self, model) -> CostEstimate:
+        """
+        Estimate the cost of SCAD code or a SolidPython2 model
+        
+        The predicted seconds include a 'long_render' warning when they
+        exceed warn_threshold_s.
+        """
+        scad_code = model.as_scad() if hasattr(model, 'as_scad') else model
+        estimate = _Evaluator().run(parse_cached(scad_code).tree)
+        estimate.seconds = self.predict(estimate)
+        if estimate.seconds > self.warn_threshold_s:
+            estimate.warnings.append(CostWarning(
+                'long_render', f"Estimated render time {estimate.seconds:.0f}s"
+            ))
+        return estimate
+    
+    def predict(self, estimate: CostEstimate) -> float:
+        return self.intercept + sum(self.coefficients[name] * value
+                                    for name, value in zip(FEATURES, estimate.features))
+    
+    def choose_tier(self, estimate: CostEstimate) -> str:
+        """'preview' when the full render is predicted to be slow, else 'full'"""
+        return "preview" if estimate.seconds > self.preview_threshold_s else "full"
+    
+    def calibrate(self, samples: Iterable[Tuple[Any, float]]) -> 'RenderCostModel':
+        """
+        Fit the coefficients to measured render times
+        
+        Non-negative least squares over the features: features whose
+        coefficient comes out negative are dropped and the rest refitted.
+        Features absent from every sample keep their current coefficient.
+        
+        Args:
+            samples: (SCAD code, SolidPython2 model or CostEstimate, seconds)
+        
+        Returns:
+            self
+        """
+        rows, targets = [], []
+        for model, seconds in samples:
+            estimate = model if isinstance(model, CostEstimate) else self.estimate(model)
+            rows.append(estimate.features)
+            targets.append(seconds)
+        if len(rows) < 2:
+            return self
+        
+        active = [i for i in range(len(FEATURES)) if any(row[i] for row in rows)]
+        while True:
+            solution = _least_squares([[1.0] + [row[i] for i in active] for row in rows], targets)
+            if solution is None:
+                return self
+            negative = [i for i, value in zip(active, solution[1:]) if value < 0]
+            if not negative:
+                break
+            active = [i for i in active if i not in negative]
+        
+        self.intercept = max(solution[0], 0.0)
+        for i, value in zip(active, solution[1:]):
+            self.coefficients[FEATURES[i]] = value
+        for i in set(range(len(FEATURES))) - set(active):
+            if any(row[i] for row in rows):
+                self.coefficients[FEATURES[i]] = 0.0
+        return self
+    
+    def calibrate_from_history(self, store: RenderHistoryStore, models: Iterable[Any],
+                               backend: Optional[str] = None, quality: str = "full") -> 'RenderCostModel':
+        """
+        Calibrate against the median render times in a RenderHistoryStore
+        
+        Args:
+            store: Render history
+            models: SCAD code or SolidPython2 models to look up
+            backend: Only renders on this backend
+            quality: Quality tier of the renders to use
+        """
+        samples = []
+        for model in models:
+            scad_code = model.as_scad() if hasattr(model, 'as_scad') else model
+            seconds = store.predict(model_digest(scad_code), backend, quality)
+            if seconds is not None:
+                samples.append((scad_code, seconds))
+        return self.calibrate(samples)
+
+
+def _least_squares(rows: List[List[float]], targets: List[float]) -> Optional[List[float]]:
+    """Solve the normal equations with Gaussian elimination; None if singular"""
+    size = len(rows[0])
+    # Features span many orders of magnitude; scale columns to unit maximum
+    scales = [max(abs(row[j]) for row in rows) or 1.0 for j in range(size)]
+    scaled = [[row[j] / scales[j] for j in range(size)] for row in rows]
+    matrix = [[sum(r[i] * r[j] for r in scaled) for j in range(size)] +
+              [sum(r[i] * t for r, t in zip(scaled, targets))] for i in range(size)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda r: abs(matrix[r][column]))
+        if abs(matrix[pivot][column]) < 1e-12:
+            return None
+        matrix[column], matrix[pivot] = matrix[pivot], matrix[column]
+        for r in range(size):
+            if r != column:
+                factor = matrix[r][column] / matrix[column][column]
+                matrix[r] = [a - factor * b for a, b in zip(matrix[r], matrix[column])]
+    return [matrix[i][size] / matrix[i][i] / scales[i] for i in range(size)]
+
+
+def estimate_render_cost(model, cost_model: Optional[RenderCostModel] = None) -> CostEstimate:
+    """Estimate SCAD code or a SolidPython2 model with the default cost model"""
+    return (cost_model or RenderCostModel()).estimate(model)
@@ -0,0 +1,612 @@
+"""
+Render Daemon
+
+A standalone local render service shared by every marimo kernel on a
+workstation. Instead of each kernel running its own OpenSCAD processes
+and STL cache, kernels send SCAD code to one daemon over localhost HTTP.
+The daemon owns a fixed pool of render workers, one STL cache and a
+fair-share queue that serves clients round-robin, so one kernel queueing
+a parameter sweep cannot starve the others.
+
+Start it with
+
+    python -m marimo_openscad.render_daemon --port 8765
+
+and point kernels at it with MARIMO_OPENSCAD_RENDER_DAEMON=http://localhost:8765;
+viewers then render through RenderDaemonClient, which is a drop-in
+replacement for OpenSCADRenderer.
+
+Endpoints:
+    POST /render   SCAD code in the body, client id in X-Client-Id; STL bytes back
+    GET  /health   Pool, queue and cache status as JSON
+    POST /drain    Stop accepting renders, finish queued ones, then shut down
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+from .openscad_renderer import OpenSCADError, OpenSCADRenderer, OpenSCADResourceLimitError, RenderStats
+from .realtime_renderer import STLCache
+from .renderer_config import get_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+MAX_REQUEST_BYTES = 16 * 2**20
+ANONYMOUS_CLIENT = "anonymous"
+
+
+class RenderDaemonDraining(OpenSCADError):
+    """The daemon is draining and accepts no new renders"""
+
+
+@dataclass
+class RenderResult:
+    """Outcome of one render request"""
+    stl_data: bytes
+    stats: Optional[RenderStats] = None
+    cache_hit: bool = False
+    queue_seconds: float = 0.0
+
+
+@dataclass
+class _RenderJob:
+    client_id: str
+    scad_code: str
+    cache_key: str
+    future: Future
+    enqueued: float
+
+
+class FairShareQueue:
+    """
+    Per-client FIFO queues served round-robin
+    
+    Each get() takes the oldest job of the next client in turn, so a
+    client with a hundred queued renders delays another client's single
+    render by at most one job per worker.
+    """
+    
+    def __init__(self):
+        self._queues: "OrderedDict[str, Deque[Any]]" = OrderedDict()
+        self._condition = threading.Condition()
+        self._closed = False
+    
+    def put(self, client_id: str, item: Any) -> None:
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Queue is closed")
+            self._queues.setdefault(client_id, deque()).append(item)
+            self._condition.notify()
+    
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Next item in round-robin order
+        
+        Returns:
+            The item, or None once the queue is closed and empty or the
+            timeout expires
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._queues or self._closed, timeout):
+                return None
+            if not self._queues:
+                return None
+            client_id, pending = next(iter(self._queues.items()))
+            item = pending.popleft()
+            # Rotate the client to the back; drop it once it has nothing queued
+            del self._queues[client_id]
+            if pending:
+                self._queues[client_id] = pending
+            return item
+    
+    def close(self) -> None:
+        """Wake all waiting consumers; items already queued are still handed out"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+    
+    def depths(self) -> Dict[str, int]:
+        """Queued items per client"""
+        with self._condition:
+            return {client_id: len(pending) for client_id, pending in self._queues.items()}
+    
+    def __len__(self) -> int:
+        with self._condition:
+            return sum(len(pending) for pending in self._queues.values())
+
+
+class RenderDaemonHandler(BaseHTTPRequestHandler):
+    """HTTP handler for the render, health and drain endpoints"""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def __init__(self, *args, daemon=None, **kwargs):
+        self.daemon = daemon
+        super().__init__(*args, **kwargs)
+    
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._send_json(200, self.daemon.get_health())
+        else:
+            self._send_json(404, {'error': f"Unknown endpoint {self.path}"})
+    
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path == "/render":
+            with self.daemon.serving_request():
+                self._handle_render()
+        elif path == "/drain":
+            self._discard_body()
+            self.daemon.drain_async()
+            self._send_json(202, self.daemon.get_health())
+        else:
+            self._discard_body()
+            self._send_json(404, {'error': f"Unknown endpoint {self.path}"})
+    
+    def _handle_render(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_REQUEST_BYTES:
+            self.close_connection = True
+            self._send_json(413, {'error': f"SCAD code exceeds {MAX_REQUEST_BYTES} bytes"})
+            return
+        
+        try:
+            scad_code = self.rfile.read(length).decode('utf-8')
+        except UnicodeDecodeError:
+            self._send_json(400, {'error': "SCAD code must be UTF-8"})
+            return
+        client_id = self.headers.get('X-Client-Id') or ANONYMOUS_CLIENT
+        
+        try:
+            result = self.daemon.submit(scad_code, client_id).result()
+        except RenderDaemonDraining as e:
+            self._send_json(503, {'error': str(e), 'type': type(e).__name__})
+            return
+        except OpenSCADError as e:
+            body = {'error': str(e), 'type': type(e).__name__}
+            if isinstance(e, OpenSCADResourceLimitError):
+                body['limit'] = e.limit
+                body['stats'] = asdict(e.stats)
+            self._send_json(422, body)
+            return
+        except Exception as e:
+            logger.error(f"Render daemon request failed: {e}")
+            self._send_json(500, {'error': str(e), 'type': type(e).__name__})
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(result.stl_data)))
+        self.send_header('X-Render-Cache', 'hit' if result.cache_hit else 'miss')
+        self.send_header('X-Render-Queue-Seconds', f"{result.queue_seconds:.6f}")
+        if result.stats is not None:
+            self.send_header('X-Render-Stats', json.dumps(asdict(result.stats)))
+        if self.daemon.renderer_version:
+            self.send_header('X-Renderer-Version', self.daemon.renderer_version)
+        self.end_headers()
+        self.wfile.write(result.stl_data)
+    
+    def _discard_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(min(length, MAX_REQUEST_BYTES))
+    
+    def _send_json(self, status_code: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        """Override to use Python logging instead of stderr"""
+        logger.debug(f"HTTP: {format % args}")
+
+
+class ThreadingRenderDaemonServer(ThreadingHTTPServer):
+    """Thread-per-connection server; requests block only on their own render"""
+    
+    daemon_threads = True
+    request_queue_size = 64
+
+
+class RenderDaemon:
+    """
+    Local render service with a worker pool, a shared cache and a
+    fair-share queue
+    
+    Identical SCAD code submitted while a render of it is queued or
+    running shares that render instead of starting another.
+    """
+    
+    def __init__(self, host: str = 'localhost', port: int = 0, workers: Optional[int] = None,
+                 renderer_factory: Optional[Callable[[], Any]] = None, cache_size_mb: int = 256,
+                 cache_entries: int = 500):
+        """
+        Initialize the daemon
+        
+        Args:
+            host: Host to bind to (default: localhost)
+            port: Port to bind to (0 for auto-select)
+            workers: Concurrent renders (default: CPU count)
+            renderer_factory: Creates one renderer per worker (default: OpenSCADRenderer)
+            cache_size_mb: Shared STL cache size
+            cache_entries: Shared STL cache entry limit
+        """
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.renderer_factory = renderer_factory or OpenSCADRenderer
+        self.renderer_version: Optional[str] = None
+        self.cache = STLCache(max_size_mb=cache_size_mb, max_entries=cache_entries)
+        self.server = None
+        self.thread = None
+        self.running = False
+        self.draining = False
+        self._queue = FairShareQueue()
+        self._threads = []
+        self._inflight: Dict[str, Future] = {}
+        self._active = 0
+        self._requests = 0
+        self._completed = 0
+        self._failed = 0
+        self._started_at: Optional[float] = None
+        self._lock = threading.Condition()
+        self._stopped = threading.Event()
+    
+    def start(self) -> str:
+        """
+        Start the workers and the HTTP server
+        
+        Returns:
+            Base URL of the daemon
+        """
+        if self.running:
+            return self.get_base_url()
+        
+        def handler_factory(*args, **kwargs):
+            return RenderDaemonHandler(*args, daemon=self, **kwargs)
+        
+        self.server = ThreadingRenderDaemonServer((self.host, self.port), handler_factory)
+        if self.port == 0:
+            self.port = self.server.server_port
+        
+        for index in range(self.workers):
+            worker = threading.Thread(target=self._work, name=f"render-daemon-worker-{index}", daemon=True)
+            worker.start()
+            self._threads.append(worker)
+        
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.running = True
+        self._started_at = time.time()
+        self._stopped.clear()
+        
+        base_url = self.get_base_url()
+        logger.info(f"Render daemon started at {base_url} with {self.workers} workers")
+        return base_url
+    
+    def submit(self, scad_code: str, client_id: str = ANONYMOUS_CLIENT) -> "Future[RenderResult]":
+        """
+        Queue a render
+        
+        Raises:
+            RenderDaemonDraining: If the daemon is draining or stopped
+        """
+        cache_key = self.cache.get_cache_key(scad_code)
+        with self._lock:
+            if self.draining or not self.running:
+                raise RenderDaemonDraining("Render daemon is draining and accepts no new renders")
+            
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                future: Future = Future()
+                future.set_result(RenderResult(cached, cache_hit=True))
+                return future
+            
+            if cache_key in self._inflight:
+                return self._inflight[cache_key]
+            
+            future = Future()
+            self._inflight[cache_key] = future
+            self._queue.put(client_id, _RenderJob(client_id, scad_code, cache_key, future, time.perf_counter()))
+            return future
+    
+    def _work(self):
+        renderer = None
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            
+            with self._lock:
+                self._active += 1
+            queue_seconds = time.perf_counter() - job.enqueued
+            try:
+                if renderer is None:
+                    renderer = self.renderer_factory()
+                    self.renderer_version = self.renderer_version or getattr(renderer, 'version', None)
+                stl_data = renderer.render_scad_to_stl(job.scad_code)
+                stats = getattr(renderer, 'last_render_stats', None)
+            except Exception as e:
+                logger.warning(f"Render for client {job.client_id} failed: {e}")
+                # Resolve the future before drain() can see the job as finished
+                job.future.set_exception(e)
+                with self._lock:
+                    self._failed += 1
+                    self._finish(job)
+                continue
+            
+            with self._lock:
+                self.cache.store(job.cache_key, stl_data, {'client_id': job.client_id})
+            job.future.set_result(RenderResult(stl_data, stats, queue_seconds=queue_seconds))
+            with self._lock:
+                self._completed += 1
+                self._finish(job)
+    
+    def _finish(self, job: _RenderJob):
+        """Bookkeeping after a job's future is resolved; the caller holds the lock"""
+        self._inflight.pop(job.cache_key, None)
+        self._active -= 1
+        self._lock.notify_all()
+    
+    @contextmanager
+    def serving_request(self) -> Iterator[None]:
+        """Count a render request while its handler runs, so drain() waits for its response"""
+        with self._lock:
+            self._requests += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._requests -= 1
+                self._lock.notify_all()
+    
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stop accepting renders, wait for queued and running ones and for
+        their responses to be written, then stop
+        
+        Args:
+            timeout: Seconds to wait for outstanding renders (default: no limit)
+        
+        Returns:
+            True if every outstanding render finished before the daemon stopped
+        """
+        with self._lock:
+            self.draining = True
+            finished = self._lock.wait_for(
+                lambda: not self._inflight and self._active == 0 and self._requests == 0, timeout
+            )
+        if not finished:
+            logger.warning(f"Render daemon drain timed out with {len(self._inflight)} renders and "
+                           f"{self._requests} requests outstanding")
+        self.stop()
+        return finished
+    
+    def drain_async(self) -> threading.Thread:
+        """Start draining in the background (used by POST /drain and signals)"""
+        with self._lock:
+            self.draining = True
+        thread = threading.Thread(target=self.drain, name="render-daemon-drain", daemon=True)
+        thread.start()
+        return thread
+    
+    def stop(self):
+        """Stop the HTTP server and the workers; queued renders are not waited for"""
+        with self._lock:
+            self.draining = True
+        self._queue.close()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=5)
+        
+        # Fail renders still queued so their requests do not hang
+        while True:
+            job = self._queue.get(timeout=0)
+            if job is None:
+                break
+            with self._lock:
+                self._inflight.pop(job.cache_key, None)
+                self._lock.notify_all()
+            job.future.set_exception(RenderDaemonDraining("Render daemon stopped before the render started"))
+        
+        self.running = False
+        self._stopped.set()
+        logger.info("Render daemon stopped")
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the daemon has stopped"""
+        return self._stopped.wait(timeout)
+    
+    def get_base_url(self) -> str:
+        """Get the base URL of the daemon"""
+        if not self.running:
+            raise RuntimeError("Render daemon not running")
+        return f"http://{self.host}:{self.port}"
+    
+    def is_running(self) -> bool:
+        """Check if the daemon is running"""
+        return self.running
+    
+    def get_health(self) -> Dict[str, Any]:
+        """Pool, queue and cache status"""
+        with self._lock:
+            status = "draining" if self.draining and self.running else ("ok" if self.running else "stopped")
+            return {
+                'status': status,
+                'workers': self.workers,
+                'busy_workers': self._active,
+                'open_requests': self._requests,
+                'queue_depth': len(self._queue),
+                'queued_by_client': self._queue.depths(),
+                'completed': self._completed,
+                'failed': self._failed,
+                'cache': self.cache.get_stats(),
+                'renderer_version': self.renderer_version,
+                'uptime_seconds': time.time() - self._started_at if self._started_at else 0.0
+            }
+
+
+class RenderDaemonClient:
+    """
+    OpenSCADRenderer-compatible renderer that renders through a RenderDaemon
+    
+    Raises the same OpenSCADError / OpenSCADResourceLimitError as a local
+    render, and fills in last_render_stats and version from the daemon.
+    """
+    
+    def __init__(self, url: Optional[str] = None, client_id: Optional[str] = None, timeout: float = 600):
+        """
+        Initialize the client
+        
+        Args:
+            url: Base URL of the daemon (default: MARIMO_OPENSCAD_RENDER_DAEMON)
+            client_id: Fair-share identity (default: one per process, i.e. per kernel)
+            timeout: Seconds to wait for a render, queueing included
+        """
+        url = url or get_config().render_daemon_url
+        if not url:
+            raise OpenSCADError("No render daemon URL given and MARIMO_OPENSCAD_RENDER_DAEMON is not set")
+        self.url = url.rstrip('/')
+        self.client_id = client_id or f"pid-{os.getpid()}"
+        self.timeout = timeout
+        self.version: Optional[str] = None
+        self._render_thread_state = threading.local()
+        self.last_cache_hit = False
+        self.last_queue_seconds = 0.0
+    
+    @property
+    def last_render_stats(self) -> Optional[RenderStats]:
+        """Stats of the last render made from the calling thread"""
+        return getattr(self._render_thread_state, 'stats', None)
+    
+    @last_render_stats.setter
+    def last_render_stats(self, stats: Optional[RenderStats]) -> None:
+        # Per thread: renders running side by side must not read each other's stats
+        self._render_thread_state.stats = stats
+    
+    def render_scad_to_stl(self, scad_code: str) -> bytes:
+        """
+        Render OpenSCAD code to STL format on the daemon
+        
+        Raises:
+            OpenSCADResourceLimitError: If the render exceeded a daemon-side limit
+            OpenSCADError: If rendering fails or the daemon is unreachable
+        """
+        request = urllib.request.Request(
+            f"{self.url}/render", data=scad_code.encode('utf-8'), method='POST',
+            headers={'Content-Type': 'text/plain; charset=utf-8', 'X-Client-Id': self.client_id}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                stl_data = response.read()
+                headers = response.headers
+        except urllib.error.HTTPError as e:
+            raise self._error_from_response(e) from None
+        except (urllib.error.URLError, OSError) as e:
+            raise OpenSCADError(f"Render daemon at {self.url} unreachable: {e}") from e
+        
+        stats = headers.get('X-Render-Stats')
+        self.last_render_stats = RenderStats(**json.loads(stats)) if stats else None
+        self.last_cache_hit = headers.get('X-Render-Cache') == 'hit'
+        self.last_queue_seconds = float(headers.get('X-Render-Queue-Seconds') or 0.0)
+        self.version = headers.get('X-Renderer-Version') or self.version
+        return stl_data
+    
+    def _error_from_response(self, error: urllib.error.HTTPError) -> OpenSCADError:
+        try:
+            payload = json.loads(error.read().decode('utf-8'))
+        except (ValueError, OSError):
+            payload = {}
+        message = payload.get('error') or f"Render daemon returned HTTP {error.code}"
+        if payload.get('limit'):
+            stats = RenderStats(**payload['stats'])
+            self.last_render_stats = stats
+            return OpenSCADResourceLimitError(message, payload['limit'], stats)
+        if error.code == 503:
+            return RenderDaemonDraining(message)
+        return OpenSCADError(message)
+    
+    def render_solidpython_to_stl(self, model) -> bytes:
+        """
+        Render SolidPython2 model to STL format on the daemon
+        
+        Raises:
+            OpenSCADError: If model is invalid or rendering fails
+        """
+        if not hasattr(model, 'as_scad'):
+            raise OpenSCADError(
+                "Model must be a SolidPython2 object with as_scad() method"
+            )
+        
+        try:
+            scad_code = model.as_scad()
+        except Exception as e:
+            raise OpenSCADError(f"Failed to generate OpenSCAD code: {e}")
+        
+        return self.render_scad_to_stl(scad_code)
+    
+    def health(self) -> Dict[str, Any]:
+        """The daemon's /health report"""
+        try:
+            with urllib.request.urlopen(f"{self.url}/health", timeout=10) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            raise OpenSCADError(f"Render daemon at {self.url} unreachable: {e}") from e
+    
+    def is_available(self) -> bool:
+        """Check that the daemon is up and accepting renders"""
+        try:
+            return self.health().get('status') == 'ok'
+        except OpenSCADError:
+            return False
+
+
+def main(argv=None) -> int:
+    """Run a render daemon until it is drained by POST /drain, SIGTERM or Ctrl-C"""
+    parser = argparse.ArgumentParser(description="Shared OpenSCAD render service for marimo kernels")
+    parser.add_argument("--host", default="localhost", help="Host to bind to")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to bind to (0 for auto-select)")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent renders (default: CPU count)")
+    parser.add_argument("--openscad-path", default=None, help="OpenSCAD executable")
+    parser.add_argument("--cache-size-mb", type=int, default=256, help="Shared STL cache size")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    daemon = RenderDaemon(
+        host=args.host, port=args.port, workers=args.workers, cache_size_mb=args.cache_size_mb,
+        renderer_factory=lambda: OpenSCADRenderer(args.openscad_path)
+    )
+    url = daemon.start()
+    print(f"Render daemon listening on {url}")
+    print(f"Point kernels at it with MARIMO_OPENSCAD_RENDER_DAEMON={url}")
+    
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: daemon.drain_async())
+    while not daemon.wait(timeout=0.5):
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,247 @@
+"""
+Render History Store
+
+Persists the timing of every render in a local SQLite database: model
+digest, backend, quality tier, renderer version, wall and CPU time, peak
+memory and output size. The history answers percentile queries per
+model, predicts how long the next render will take, and flags a model
+whose recent renders are much slower than its history, e.g. after an
+OpenSCAD upgrade.
+
+The database uses WAL journaling, so several notebook kernels can share
+one file.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+from .render_benchmark import Regression
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS renders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    model_digest TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    quality TEXT NOT NULL,
+    renderer_version TEXT,
+    wall_seconds REAL NOT NULL,
+    cpu_seconds REAL,
+    peak_rss_bytes INTEGER,
+    output_bytes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS renders_series ON renders (model_digest, backend, quality, id);
+"""
+
+_COLUMNS = ("timestamp", "model_digest", "backend", "quality", "renderer_version",
+            "wall_seconds", "cpu_seconds", "peak_rss_bytes", "output_bytes")
+
+METRICS = ("wall_seconds", "cpu_seconds", "peak_rss_bytes", "output_bytes")
+
+
+def default_history_path() -> Path:
+    """MARIMO_OPENSCAD_RENDER_HISTORY, or a file in the user's cache directory"""
+    configured = os.environ.get("MARIMO_OPENSCAD_RENDER_HISTORY")
+    if configured:
+        return Path(configured)
+    return Path.home() / ".cache" / "marimo_openscad" / "render_history.sqlite3"
+
+
+def model_digest(scad_code: str) -> str:
+    """Stable identity of a model: the SHA-256 of its SCAD code"""
+    return hashlib.sha256(scad_code.encode()).hexdigest()
+
+
+@dataclass
+class RenderRecord:
+    """Timing of one render"""
+    model_digest: str
+    backend: str
+    wall_seconds: float
+    output_bytes: int
+    quality: str = "default"
+    renderer_version: Optional[str] = None
+    cpu_seconds: Optional[float] = None
+    peak_rss_bytes: Optional[int] = None
+    timestamp: float = field(default_factory=time.time)
+
+
+def _percentile(ordered: Sequence[float], percent: float) -> float:
+    """Linearly interpolated percentile of sorted values"""
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class RenderHistoryStore:
+    """
+    SQLite store of render timings
+    
+    Safe to share between threads; every query filters one series, a
+    model digest optionally narrowed to a backend and quality tier.
+    """
+    
+    def __init__(self, path: Union[str, os.PathLike, None] = None):
+        """
+        Open (and create) the store
+        
+        Args:
+            path: Database file, or ":memory:" (default: default_history_path())
+        """
+        self.path = str(path) if path is not None else str(default_history_path())
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, timeout=10, isolation_level=None,
+                                           check_same_thread=False)
+        with self._lock:
+            if self.path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+            self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+    
+    def record(self, record: RenderRecord) -> None:
+        """Append one render"""
+        values = tuple(getattr(record, column) for column in _COLUMNS)
+        with self._lock:
+            self._connection.execute(
+                f"INSERT INTO renders ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                values
+            )
+    
+    def history(self, model_digest: str, backend: Optional[str] = None, quality: Optional[str] = None,
+                limit: Optional[int] = None) -> List[RenderRecord]:
+        """
+        Renders of one model, oldest first
+        
+        Args:
+            model_digest: Digest from model_digest()
+            backend: Only renders on this backend
+            quality: Only renders at this quality tier
+            limit: Only the most recent renders
+        """
+        where, params = self._series(model_digest, backend, quality)
+        query = f"SELECT {', '.join(_COLUMNS)} FROM renders WHERE {where} ORDER BY id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [RenderRecord(**dict(zip(_COLUMNS, row))) for row in reversed(rows)]
+    
+    def percentiles(self, model_digest: str, backend: Optional[str] = None, quality: Optional[str] = None,
+                    metric: str = "wall_seconds", percents: Sequence[float] = (50, 90, 99),
+                    window: int = 200) -> Dict[float, float]:
+        """
+        Percentiles of a metric over a model's recent renders
+        
+        Args:
+            metric: One of METRICS
+            percents: Percentiles to compute
+            window: Number of most recent renders considered
+        
+        Returns:
+            Percentile -> value; empty without history
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}', expected one of {', '.join(METRICS)}")
+        values = sorted(value for value in (getattr(r, metric) for r in
+                                            self.history(model_digest, backend, quality, limit=window))
+                        if value is not None)
+        if not values:
+            return {}
+        return {percent: _percentile(values, percent) for percent in percents}
+    
+    def predict(self, model_digest: str, backend: Optional[str] = None, quality: Optional[str] = None,
+                percent: float = 50) -> Optional[float]:
+        """Expected wall time of the next render, or None for an unseen model"""
+        return self.percentiles(model_digest, backend, quality, percents=(percent,)).get(percent)
+    
+    def detect_regression(self, model_digest: str, backend: Optional[str] = None,
+                          quality: Optional[str] = None, recent: int = 3, window: int = 50,
+                          min_history: int = 5, slowdown_tolerance: float = 0.5,
+                          noise_factor: float = 3.0) -> Optional[Regression]:
+        """
+        Flag a model whose latest renders are all much slower than before
+        
+        The latest `recent` renders are compared with up to `window` renders
+        before them. Each must exceed the earlier median by the larger of
+        `noise_factor` median absolute deviations and `slowdown_tolerance`
+        of the median, so one slow render on a busy machine is not enough.
+        
+        Returns:
+            A 'slowdown' Regression, or None (also with too little history)
+        """
+        rows = self.history(model_digest, backend, quality, limit=recent + window)
+        earlier, latest = rows[:-recent], rows[-recent:]
+        if len(earlier) < min_history or len(latest) < recent:
+            return None
+        
+        times = [r.wall_seconds for r in earlier]
+        median = statistics.median(times)
+        # Median absolute deviation, scaled to estimate a standard deviation
+        mad = 1.4826 * statistics.median(abs(t - median) for t in times)
+        allowed = max(noise_factor * mad, slowdown_tolerance * median)
+        if not all(r.wall_seconds > median + allowed for r in latest):
+            return None
+        
+        current = statistics.median(r.wall_seconds for r in latest)
+        message = f"Render time {median:.3f}s -> {current:.3f}s over the last {recent} renders"
+        before = {r.renderer_version for r in earlier[-recent:]} - {None}
+        after = {r.renderer_version for r in latest} - {None}
+        if before and after and before != after:
+            message += f" (renderer {', '.join(sorted(before))} -> {', '.join(sorted(after))})"
+        key = "/".join(part for part in (model_digest[:12], backend, quality) if part)
+        return Regression(key, "slowdown", message, baseline=median, current=current)
+    
+    def prune(self, keep: int = 1000) -> int:
+        """
+        Keep only the most recent renders of every series
+        
+        Returns:
+            Number of renders deleted
+        """
+        with self._lock:
+            cursor = self._connection.execute(
+                "DELETE FROM renders WHERE id IN ("
+                " SELECT id FROM (SELECT id, ROW_NUMBER() OVER ("
+                "  PARTITION BY model_digest, backend, quality ORDER BY id DESC) AS position FROM renders)"
+                " WHERE position > ?)",
+                (keep,)
+            )
+        return cursor.rowcount
+    
+    @staticmethod
+    def _series(model_digest: str, backend: Optional[str], quality: Optional[str]):
+        where, params = ["model_digest = ?"], [model_digest]
+        if backend is not None:
+            where.append("backend = ?")
+            params.append(backend)
+        if quality is not None:
+            where.append("quality = ?")
+            params.append(quality)
+        return " AND ".join(where), params
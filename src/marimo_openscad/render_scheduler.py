@@ -0,0 +1,302 @@
+"""
+Render Scheduler
+
+Central admission control for the renders of one process. Every viewer
+(or every session, when viewers share a session id) and every batch job
+is a client; renders wait for a slot here before they start, so one
+heavy model or parameter sweep cannot take every slot while interactive
+viewers wait.
+
+Waiting renders are ordered by weighted fair queuing: each render gets a
+virtual finish time of its client's previous finish plus its estimated
+cost divided by the client's weight, and the smallest finish time goes
+next. Interactive renders always go before batch renders, and batch
+renders may only use batch_slots of the max_concurrent slots, leaving
+room for an interactive render to start at once. With a single slot
+there is no such reserve: a running batch render holds the only slot,
+and interactive renders still go first once it is free. Per-client
+quotas cap a client's running and waiting renders.
+"""
+
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from .openscad_renderer import OpenSCADError
+from .renderer_config import get_config
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = ("interactive", "batch")
+
+
+class RenderQuotaExceeded(OpenSCADError):
+    """A client already has as many renders waiting as its quota allows"""
+
+
+@dataclass
+class RenderTicket:
+    """One render's place in the scheduler"""
+    client_id: str
+    priority: str
+    cost: float
+    finish_tag: float
+    sequence: int
+    enqueued: float
+    admitted: bool = False
+    wait_seconds: float = 0.0
+    start_tag: float = 0.0
+
+
+@dataclass
+class _ClientState:
+    weight: float = 1.0
+    max_concurrent: Optional[int] = None
+    max_queued: Optional[int] = None
+    running: int = 0
+    queued: int = 0
+    renders: int = 0
+    rejected: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    last_wait_seconds: Optional[float] = None
+    finish_tags: Dict[str, float] = field(default_factory=dict)
+
+
+class RenderScheduler:
+    """
+    Weighted fair queuing of renders across clients with priority classes,
+    concurrency caps and per-client quotas
+    
+    Renders run in the caller's thread; the scheduler only decides when
+    each may start:
+    
+        with scheduler.slot("viewer-1", cost=estimated_seconds) as ticket:
+            stl = renderer.render_scad_to_stl(code)
+    """
+    
+    def __init__(self, max_concurrent: Optional[int] = None, batch_slots: Optional[int] = None):
+        """
+        Initialize the scheduler
+        
+        Args:
+            max_concurrent: Renders running at once (default: CPU count)
+            batch_slots: Of those, slots batch renders may use
+                (default: all but one, at least one). With max_concurrent
+                1 batch renders share the only slot, so nothing is
+                reserved for interactive renders.
+        """
+        self.max_concurrent = max_concurrent or os.cpu_count() or 1
+        self.batch_slots = batch_slots or max(1, self.max_concurrent - 1)
+        if self.max_concurrent < 1 or not 1 <= self.batch_slots <= self.max_concurrent:
+            raise ValueError("Need 1 <= batch_slots <= max_concurrent")
+        self._clients: Dict[str, _ClientState] = {}
+        self._waiting: List[RenderTicket] = []
+        self._running = {priority: 0 for priority in PRIORITIES}
+        # Self-clocked virtual time per class: the finish tag of the last admitted render
+        self._virtual_time = {priority: 0.0 for priority in PRIORITIES}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+    
+    def configure_client(self, client_id: str, weight: Optional[float] = None,
+                         max_concurrent: Optional[int] = None, max_queued: Optional[int] = None) -> None:
+        """
+        Set a client's share and quotas
+        
+        Args:
+            weight: Relative share of render time (default 1.0)
+            max_concurrent: Renders of this client running at once
+            max_queued: Renders of this client waiting at once; more are
+                rejected with RenderQuotaExceeded
+        """
+        if weight is not None and weight <= 0:
+            raise ValueError("Client weight must be positive")
+        with self._condition:
+            client = self._client(client_id)
+            if weight is not None:
+                client.weight = weight
+            if max_concurrent is not None:
+                client.max_concurrent = max_concurrent
+            if max_queued is not None:
+                client.max_queued = max_queued
+            self._dispatch()
+    
+    def acquire(self, client_id: str, priority: str = "interactive", cost: float = 1.0,
+                timeout: Optional[float] = None) -> RenderTicket:
+        """
+        Wait for a render slot
+        
+        Args:
+            client_id: Viewer, session or job the render belongs to
+            priority: "interactive" or "batch"
+            cost: Estimated render seconds, the render's size for fair queuing
+            timeout: Seconds to wait for a slot (default: no limit)
+        
+        Returns:
+            The admitted ticket; pass it to release() when the render ends
+        
+        Raises:
+            RenderQuotaExceeded: If the client's waiting renders are at its quota
+            TimeoutError: If no slot became free in time
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown render priority '{priority}', expected one of {', '.join(PRIORITIES)}")
+        with self._condition:
+            client = self._client(client_id)
+            if client.max_queued is not None and client.queued >= client.max_queued:
+                client.rejected += 1
+                raise RenderQuotaExceeded(
+                    f"Render client '{client_id}' already has {client.queued} renders waiting"
+                )
+            start = max(self._virtual_time[priority], client.finish_tags.get(priority, 0.0))
+            finish = start + max(cost, 1e-3) / client.weight
+            client.finish_tags[priority] = finish
+            ticket = RenderTicket(client_id, priority, cost, finish, next(self._sequence), time.perf_counter(),
+                                  start_tag=start)
+            self._waiting.append(ticket)
+            client.queued += 1
+            self._dispatch()
+            
+            if not self._condition.wait_for(lambda: ticket.admitted, timeout):
+                self._withdraw(ticket)
+                raise TimeoutError(f"No render slot for '{client_id}' within {timeout:g} s")
+            return ticket
+    
+    def release(self, ticket: RenderTicket) -> None:
+        """Free the slot of a finished render"""
+        with self._condition:
+            self._running[ticket.priority] -= 1
+            self._clients[ticket.client_id].running -= 1
+            self._dispatch()
+    
+    def forget_client(self, client_id: str) -> None:
+        """Drop an idle client's state; a client with renders running or waiting is kept"""
+        with self._condition:
+            client = self._clients.get(client_id)
+            if client is not None and client.running == 0 and client.queued == 0:
+                del self._clients[client_id]
+    
+    @contextmanager
+    def slot(self, client_id: str, priority: str = "interactive", cost: float = 1.0,
+             timeout: Optional[float] = None) -> Iterator[RenderTicket]:
+        """acquire() and release() around a render"""
+        ticket = self.acquire(client_id, priority, cost, timeout)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+    
+    def _client(self, client_id: str) -> _ClientState:
+        if client_id not in self._clients:
+            self._clients[client_id] = _ClientState()
+        return self._clients[client_id]
+    
+    def _withdraw(self, ticket: RenderTicket) -> None:
+        """
+        Take a waiting ticket out of the queue and give back its virtual
+        time, moving the client's later renders of the class up; the
+        caller holds the lock
+        """
+        self._waiting.remove(ticket)
+        client = self._clients[ticket.client_id]
+        client.queued -= 1
+        share = ticket.finish_tag - ticket.start_tag
+        later = [other for other in self._waiting if other.client_id == ticket.client_id
+                 and other.priority == ticket.priority and other.sequence > ticket.sequence]
+        for other in later:
+            other.start_tag -= share
+            other.finish_tag -= share
+        client.finish_tags[ticket.priority] -= share
+    
+    def _dispatch(self) -> None:
+        """Admit waiting renders while slots are free; the caller holds the lock"""
+        admitted = False
+        while self._waiting and sum(self._running.values()) < self.max_concurrent:
+            ticket = self._next_eligible()
+            if ticket is None:
+                break
+            self._waiting.remove(ticket)
+            client = self._clients[ticket.client_id]
+            client.queued -= 1
+            client.running += 1
+            self._running[ticket.priority] += 1
+            self._virtual_time[ticket.priority] = ticket.finish_tag
+            
+            ticket.admitted = True
+            ticket.wait_seconds = time.perf_counter() - ticket.enqueued
+            client.renders += 1
+            client.total_wait_seconds += ticket.wait_seconds
+            client.max_wait_seconds = max(client.max_wait_seconds, ticket.wait_seconds)
+            client.last_wait_seconds = ticket.wait_seconds
+            admitted = True
+        if admitted:
+            self._condition.notify_all()
+    
+    def _next_eligible(self) -> Optional[RenderTicket]:
+        for priority in PRIORITIES:
+            if priority == "batch" and self._running["batch"] >= self.batch_slots:
+                continue
+            candidates = [ticket for ticket in self._waiting if ticket.priority == priority
+                          and self._under_quota(self._clients[ticket.client_id])]
+            if candidates:
+                return min(candidates, key=lambda ticket: (ticket.finish_tag, ticket.sequence))
+        return None
+    
+    @staticmethod
+    def _under_quota(client: _ClientState) -> bool:
+        return client.max_concurrent is None or client.running < client.max_concurrent
+    
+    def get_client_stats(self, client_id: str) -> Dict[str, Any]:
+        """Share, quotas, load and queue-wait times of one client"""
+        with self._condition:
+            client = self._clients.get(client_id) or _ClientState()
+            return {
+                'weight': client.weight,
+                'max_concurrent': client.max_concurrent,
+                'max_queued': client.max_queued,
+                'running': client.running,
+                'queued': client.queued,
+                'renders': client.renders,
+                'rejected': client.rejected,
+                'last_wait_seconds': client.last_wait_seconds,
+                'mean_wait_seconds': client.total_wait_seconds / client.renders if client.renders else None,
+                'max_wait_seconds': client.max_wait_seconds,
+            }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Slots, load per priority class and clients"""
+        with self._condition:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'batch_slots': self.batch_slots,
+                'running': dict(self._running),
+                'queued': {priority: sum(1 for ticket in self._waiting if ticket.priority == priority)
+                           for priority in PRIORITIES},
+                'clients': len(self._clients),
+            }
+
+
+# Global scheduler shared by all viewers of the process
+_global_scheduler = None
+_global_lock = threading.Lock()
+
+
+def get_render_scheduler() -> RenderScheduler:
+    """
+    Get or create the process-wide scheduler, sized from
+    MARIMO_OPENSCAD_MAX_CONCURRENT_RENDERS and MARIMO_OPENSCAD_BATCH_RENDER_SLOTS
+    """
+    global _global_scheduler
+    
+    with _global_lock:
+        if _global_scheduler is None:
+            config = get_config()
+            max_concurrent = config.max_concurrent_renders or os.cpu_count() or 1
+            batch_slots = min(config.batch_render_slots, max_concurrent) or None
+            _global_scheduler = RenderScheduler(max_concurrent, batch_slots)
+        return _global_scheduler
@@ -44,6 +44,17 @@ class RendererConfig:
         self.wasm_timeout_ms = self._get_env_int("MARIMO_OPENSCAD_WASM_TIMEOUT", 30000)
         self.max_model_complexity = self._get_env_int("MARIMO_OPENSCAD_MAX_COMPLEXITY", 10000)
         
+        # Local render limits (0 disables the limit)
+        self.local_memory_limit_mb = self._get_env_int("MARIMO_OPENSCAD_MEMORY_LIMIT_MB", 0)
+        self.local_cpu_limit_s = self._get_env_int("MARIMO_OPENSCAD_CPU_LIMIT", 0)
+        
+        # Shared render daemon (render_daemon.py); local renders go through it when set
+        self.render_daemon_url = os.getenv("MARIMO_OPENSCAD_RENDER_DAEMON") or None
+        
+        # Render scheduler slots (0: CPU count, and all but one of them for batch renders)
+        self.max_concurrent_renders = self._get_env_int("MARIMO_OPENSCAD_MAX_CONCURRENT_RENDERS", 0)
+        self.batch_render_slots = self._get_env_int("MARIMO_OPENSCAD_BATCH_RENDER_SLOTS", 0)
+        
         # Development flags
         self.debug_renderer = self._get_env_bool("MARIMO_OPENSCAD_DEBUG_RENDERER", False)
         self.log_performance = self._get_env_bool("MARIMO_OPENSCAD_LOG_PERFORMANCE", False)
@@ -101,6 +112,11 @@ class RendererConfig:
             'force_local': self.force_local,
             'wasm_timeout_ms': self.wasm_timeout_ms,
             'max_model_complexity': self.max_model_complexity,
+            'local_memory_limit_mb': self.local_memory_limit_mb,
+            'local_cpu_limit_s': self.local_cpu_limit_s,
+            'render_daemon_url': self.render_daemon_url,
+            'max_concurrent_renders': self.max_concurrent_renders,
+            'batch_render_slots': self.batch_render_slots,
             'debug_renderer': self.debug_renderer,
             'log_performance': self.log_performance
         }
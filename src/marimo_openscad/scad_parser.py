@@ -0,0 +1,991 @@
+"""
+OpenSCAD Tokenizer and Parser
+
+A single-pass tokenizer and a recursive-descent parser that turn OpenSCAD
+source into an AST. The syntax analyzer of the migration engine and the
+WASM version selector walk this tree with NodeVisitor subclasses instead
+of running regexes line by line, so strings, comments and multi-line
+constructs are seen the way OpenSCAD sees them.
+
+Large libraries are parsed lazily: one scan splits the source into
+top-level regions, and a region is only tokenized and parsed when a
+visitor's wants() pre-check says it could contain something the visitor
+reports. A library full of plain geometry is therefore scanned once and
+never parsed.
+
+The parser is tolerant: a syntax error becomes an Error node and parsing
+resumes at the next argument or statement, so analysis still covers the
+rest of the file.
+"""
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import accumulate, compress
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# One alternation per token kind; whitespace is matched so the scanner
+# never has to search, and '.' catches anything OpenSCAD would reject
+_TOKEN = re.compile(r'''
+    (?P<space>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<include>(?:include|use)\b\s*<[^>\n]*>)
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<string>"(?:\\.|[^"\\])*"?)
+  | (?P<identifier>\$?[A-Za-z_][\w]*)
+  | (?P<operator>\*\*|==|!=|<=|>=|&&|\|\||[-+*/%^<>=!?:;,.()\[\]{}\#])
+  | (?P<error>.)
+''', re.VERBOSE | re.DOTALL)
+
+# Region scanner: _STATEMENT matches one top-level statement, up to a ';'
+# or '}' or the end of a brace block, stepping over strings and comments,
+# so findall() splits a whole library in one call. Blocks are matched
+# _GROUP_DEPTH levels deep, and so are the parentheses of a for loop
+# header, where ';' does not end the statement; a group nested deeper
+# takes the rest of the source, merging it into one statement. The
+# character classes spell "anything but the characters that matter" as
+# ASCII ranges, which sre matches several times faster than a negated
+# set; other characters have their own branch.
+_OTHER = r'''[^\x00-\x7f]+ | //[^\n]* | /\*.*?(?:\*/|\Z) | "(?:\\.|[^"\\])*"? | /'''
+_GROUP_DEPTH = 8
+
+
+def _group_pattern(brackets: str, text: str, depth: int) -> str:
+    """Regex of a bracketed group of text, holding groups up to depth levels deep"""
+    opening, closing = re.escape(brackets[0]), re.escape(brackets[1])
+    inner = _group_pattern(brackets, text, depth - 1) if depth else opening + '.*'
+    # A parenthesis left open ends at the next brace
+    stop = r' | (?=[{}])' if brackets == '()' else ''
+    return r'%s (?: %s+ | %s | %s )* (?: %s | \Z%s )' % (opening, text, _OTHER, inner, closing, stop)
+
+
+_STATEMENT = re.compile(r'(?: [<-eg-z\x00-!#-.0-:|~-\x7f]+ | %s | for\s* %s | f )* (?: ; | \} | %s | \Z )' % (
+    _OTHER,
+    _group_pattern('()', r"[<-z\x00-!#-'*-.0-;|~-\x7f]", _GROUP_DEPTH),
+    _group_pattern('{}', r'[<-z\x00-!#-.0-;|~-\x7f]', _GROUP_DEPTH),
+), re.VERBOSE | re.DOTALL)
+
+_COMMENT = re.compile(r'''[^"/]* (?: (//|/\*) | "(?:\\.|[^"\\])*"? | / | \Z )''', re.VERBOSE)
+# Quicker than two 'in' tests, as the regex engine skips ahead to each '/'
+_COMMENT_START = re.compile(r'/[/*]')
+
+# Whitespace and comments before an else; the lookahead and backreference
+# make each step atomic, so a failed match never backtracks into a comment
+_ELSE = re.compile(r'(?:(?=(\s+|//[^\n]*|/\*.*?\*/))\1)*else\b', re.DOTALL)
+_INCLUDE_PARTS = re.compile(r'(include|use)\s*<\s*([^>]*?)\s*>')
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', '\\': '\\'}
+
+MODIFIERS = frozenset('!#%*')
+
+# Binary operator precedence, loosest first; exponentiation and unary
+# operators bind tighter and are handled separately
+_BINARY_PRECEDENCE = {
+    '||': 1, '&&': 2,
+    '==': 3, '!=': 3,
+    '<': 4, '<=': 4, '>': 4, '>=': 4,
+    '+': 5, '-': 5,
+    '*': 6, '/': 6, '%': 6,
+}
+
+# First release with each version-dependent feature
+FEATURE_MIN_VERSIONS = {
+    'exponent_operator': '2023.06',
+    'assert': '2019.05',
+    'text': '2019.05',
+}
+
+# Text that must appear in a region for FeatureVisitor to find a feature
+_FEATURE_LEXEMES = {
+    'exponent_operator': '**',
+    'assert': 'assert',
+    'text': 'text',
+    'list_comprehension': 'for',
+    'function_literal': 'function',
+}
+
+
+class Token(NamedTuple):
+    """One lexical token; line is 1-based, column 0-based"""
+    kind: str  # 'number', 'string', 'identifier', 'operator', 'include', 'comment', 'error' or 'eof'
+    value: str
+    offset: int
+    line: int
+    column: int
+
+
+# NamedTuple construction without the Python-level __new__, for hot loops
+_new_tuple = tuple.__new__
+
+
+class Region(NamedTuple):
+    """Source span holding one or more complete top-level statements"""
+    start: int
+    end: int
+    line: int
+
+
+@dataclass(eq=False)
+class Node:
+    """
+    AST node
+    
+    start/end span the node's source text; for module calls and
+    let/assert/echo the span ends at the closing parenthesis of the
+    arguments, and the body carries its own span. token is the token that
+    identifies the node (the operator of an expression, the name of a
+    call or definition), which is where diagnostics point.
+    
+    Node types and how they use name/value/args/children:
+        Program          children: statements
+        Include          name: 'include' or 'use', value: path
+        Assignment       name, children: [expression]
+        ModuleDef        name, args: Parameters, children: [body statement]
+        FunctionDef      name, args: Parameters, children: [expression]
+        ModuleCall       name, value: modifier characters, args: Arguments,
+                         children: [child statement] (a Block for '{...}';
+                         for, let, assert, echo and intersection_for are
+                         module calls too)
+        If               children: [condition, then statement, else statement?]
+        Block            children: statements
+        Empty            a lone ';'
+        Parameter        name, children: [default?]
+        Argument         name (None if positional), children: [expression]
+        Number/String/Boolean/Undef  value
+        Identifier       name
+        BinaryOp         value: operator, children: [left, right]
+        UnaryOp          value: operator, children: [operand]
+        Ternary          children: [condition, then, else]
+        Call             name (if the callee is an identifier), args,
+                         children: [callee]
+        Index            children: [object, index]
+        Member           name, children: [object]
+        Vector           children: elements
+        Range            children: [start, step?, end]
+        ListFor          args: loop assignments, children: [body]; a
+                         C-style loop has value 'c' and children
+                         [condition, update Arguments..., body]
+        ListIf           children: [condition, then, else?]
+        Each             children: [element]
+        Let/Assert/Echo  args, children: [body?]
+        FunctionLiteral  args: Parameters, children: [expression]
+        Error            value: message
+    """
+    type: str
+    token: Optional[Token]
+    start: int
+    end: int
+    name: Optional[str] = None
+    value: Any = None
+    args: List['Node'] = field(default_factory=list)
+    children: List['Node'] = field(default_factory=list)
+    
+    @property
+    def line(self) -> int:
+        return self.token.line if self.token else 1
+    
+    @property
+    def column(self) -> int:
+        return self.token.column if self.token else 0
+    
+    def __repr__(self) -> str:
+        label = self.name if self.name is not None else self.value
+        if label is None:
+            return f"Node({self.type}, line={self.line})"
+        return f"Node({self.type}, {label!r}, line={self.line})"
+
+
+class ParseError(Exception):
+    """Raised internally when the parser cannot continue an expression"""
+    
+    def __init__(self, message: str, token: Token):
+        super().__init__(f"{message} at line {token.line}, column {token.column}")
+        self.token = token
+
+
+def tokenize(source: str, start: int = 0, end: Optional[int] = None, line: int = 1) -> List[Token]:
+    """
+    Split OpenSCAD source into tokens in one regex pass
+    
+    Whitespace is dropped; comments are kept as 'comment' tokens. The list
+    ends with an 'eof' token. start/end/line tokenize a slice while
+    keeping offsets and line numbers relative to the whole source.
+    """
+    end = len(source) if end is None else end
+    tokens = []
+    append = tokens.append
+    line_start = source.rfind('\n', 0, start) + 1
+    for match in _TOKEN.finditer(source, start, end):
+        kind = match.lastgroup
+        value = match.group()
+        offset = match.start()
+        if kind != 'space':
+            append(_new_tuple(Token, (kind, value, offset, line, offset - line_start)))
+        if kind in ('space', 'comment', 'string') and '\n' in value:
+            line += value.count('\n')
+            line_start = offset + value.rindex('\n') + 1
+    append(Token('eof', '', end, line, end - line_start))
+    return tokens
+
+
+def split_regions(source: str) -> List[Region]:
+    """
+    Split source into regions of complete top-level statements
+    
+    Only brackets, semicolons, strings and comments are looked at. A ';'
+    inside the parentheses of a for only ends a region once they are
+    closed, so a C-style for loop or list comprehension stays whole; when
+    in doubt statements are merged, which is always safe to parse.
+    """
+    texts = _statement_texts(source)
+    ends = list(accumulate(map(len, texts)))
+    lines = accumulate((text.count('\n') for text in texts), initial=1)
+    return list(map(Region, [0] + ends, ends, lines))
+
+
+def _statement_texts(source: str) -> List[str]:
+    """Source text of each region, as split by split_regions()"""
+    texts = _STATEMENT.findall(source)
+    while texts and not texts[-1].strip():
+        texts.pop()
+    position = source.find('else')
+    if position < 0:
+        return texts
+    # Join each statement starting with 'else' to the one before
+    ends = list(accumulate(map(len, texts)))
+    follows = set()
+    while position >= 0:
+        index = bisect_right(ends, position)
+        if index and _ELSE.match(source, ends[index - 1]):
+            follows.add(index)
+        position = source.find('else', position + 4)
+    if not follows:
+        return texts
+    merged = []
+    for index, text in enumerate(texts):
+        if index in follows:
+            merged[-1] += text
+        else:
+            merged.append(text)
+    return merged
+
+
+class _Regions(Sequence[Region]):
+    """
+    Regions of the given statement texts, each built when it is looked up
+    
+    Most regions of a large library are never parsed, so only their ends
+    are computed up front, and line numbers as far as they are needed.
+    """
+    
+    def __init__(self, texts: List[str]):
+        self._texts = texts
+        self.ends = list(accumulate(map(len, texts)))
+        self._lines = [1]
+    
+    def __len__(self) -> int:
+        return len(self.ends)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = range(len(self))[index]
+        lines = self._lines
+        for text in self._texts[len(lines) - 1:index]:
+            lines.append(lines[-1] + text.count('\n'))
+        return Region(self.ends[index - 1] if index else 0, self.ends[index], lines[index])
+
+
+def _unescape(literal: str) -> str:
+    body = literal[1:-1] if len(literal) > 1 and literal.endswith('"') else literal[1:]
+    if '\\' not in body:
+        return body
+    return re.sub(r'\\(.)', lambda m: _ESCAPES.get(m.group(1), m.group(1)), body)
+
+
+class Parser:
+    """Recursive-descent parser over the tokens of a source slice"""
+    
+    def __init__(self, source: str, start: int = 0, end: Optional[int] = None, line: int = 1):
+        self.source = source
+        all_tokens = tokenize(source, start, end, line)
+        self.comments = [token for token in all_tokens if token.kind == 'comment']
+        self.tokens = [token for token in all_tokens if token.kind != 'comment']
+        self.errors: List[Node] = []
+        self._pos = 0
+    
+    # -- token helpers --------------------------------------------------
+    
+    def _peek(self, ahead: int = 0) -> Token:
+        index = self._pos + ahead
+        return self.tokens[index] if index < len(self.tokens) else self.tokens[-1]
+    
+    def _advance(self) -> Token:
+        token = self.tokens[self._pos]
+        if token.kind != 'eof':
+            self._pos += 1
+        return token
+    
+    def _at(self, value: str) -> bool:
+        token = self.tokens[self._pos]
+        return token.value == value and token.kind in ('operator', 'identifier')
+    
+    def _accept(self, value: str) -> Optional[Token]:
+        if self._at(value):
+            return self._advance()
+        return None
+    
+    def _expect(self, value: str) -> Token:
+        if not self._at(value):
+            token = self.tokens[self._pos]
+            raise ParseError(f"Expected '{value}' but found {token.value or 'end of file'!r}", token)
+        return self._advance()
+    
+    def _previous_end(self) -> int:
+        token = self.tokens[self._pos - 1]
+        return token.offset + len(token.value)
+    
+    def _error(self, error: ParseError, start: int) -> Node:
+        node = Node('Error', error.token, start, max(start, self._previous_end()), value=str(error))
+        self.errors.append(node)
+        return node
+    
+    def _synchronize(self, stop: str) -> None:
+        """
+        Skip to where parsing can resume
+        
+        stop is ';' for statements (the ';' or a block's closing brace is
+        consumed) or ',' for arguments (nothing is consumed). Never
+        consumes a bracket that closes an enclosing construct.
+        """
+        depth = 0
+        while True:
+            token = self.tokens[self._pos]
+            if token.kind == 'eof':
+                return
+            value = token.value if token.kind == 'operator' else None
+            if value in ('(', '[', '{'):
+                depth += 1
+            elif value in (')', ']', '}'):
+                if depth == 0:
+                    return
+                depth -= 1
+                if depth == 0 and value == '}' and stop == ';':
+                    self._advance()
+                    return
+            elif depth == 0 and value == stop:
+                if stop == ';':
+                    self._advance()
+                return
+            self._advance()
+    
+    # -- statements -----------------------------------------------------
+    
+    def parse_statements(self) -> List[Node]:
+        """Parse every statement of the slice"""
+        return self._statements(top_level=True)
+    
+    def _statements(self, top_level: bool = False) -> List[Node]:
+        statements = []
+        while True:
+            token = self.tokens[self._pos]
+            if token.kind == 'eof':
+                return statements
+            if token.kind == 'operator' and token.value == '}':
+                if not top_level:
+                    return statements
+                self._advance()
+                self.errors.append(Node('Error', token, token.offset, token.offset + 1, value="Unmatched '}'"))
+                continue
+            statements.append(self._statement())
+    
+    def _statement(self) -> Node:
+        start = self.tokens[self._pos].offset
+        position = self._pos
+        try:
+            return self._statement_body()
+        except ParseError as error:
+            # Always make progress, but leave a closing brace to the enclosing block
+            if self._pos == position and self.tokens[self._pos].value != '}':
+                self._advance()
+            self._synchronize(';')
+            return self._error(error, start)
+    
+    def _statement_body(self) -> Node:
+        token = self.tokens[self._pos]
+        kind, value = token.kind, token.value
+        
+        if kind == 'operator':
+            if value == ';':
+                self._advance()
+                return Node('Empty', token, token.offset, token.offset + 1)
+            if value == '{':
+                return self._block()
+            if value in MODIFIERS:
+                return self._module_call()
+        elif kind == 'include':
+            self._advance()
+            match = _INCLUDE_PARTS.match(value)
+            return Node('Include', token, token.offset, token.offset + len(value),
+                        name=match.group(1), value=match.group(2))
+        elif kind == 'identifier':
+            if value == 'module':
+                return self._module_definition()
+            if value == 'function':
+                return self._function_definition()
+            if value == 'if':
+                return self._if_statement()
+            following = self._peek(1)
+            if following.value == '=' and following.kind == 'operator':
+                self._advance()
+                self._advance()
+                expression = self._expression()
+                self._expect(';')
+                return Node('Assignment', token, token.offset, self._previous_end(),
+                            name=value, children=[expression])
+            return self._module_call()
+        raise ParseError(f"Unexpected {value!r}", token)
+    
+    def _block(self) -> Node:
+        token = self._advance()
+        children = self._statements()
+        self._expect('}')
+        return Node('Block', token, token.offset, self._previous_end(), children=children)
+    
+    def _module_call(self) -> Node:
+        first = self.tokens[self._pos]
+        modifiers = ''
+        while self.tokens[self._pos].kind == 'operator' and self.tokens[self._pos].value in MODIFIERS:
+            modifiers += self._advance().value
+        
+        token = self.tokens[self._pos]
+        if token.kind != 'identifier':
+            raise ParseError(f"Expected module name but found {token.value!r}", token)
+        if token.value == 'if':
+            node = self._if_statement()
+            node.value = modifiers or None
+            return node
+        self._advance()
+        self._expect('(')
+        args = self._arguments()
+        node = Node('ModuleCall', token, first.offset, self._previous_end(),
+                    name=token.value, value=modifiers, args=args)
+        if not self._accept(';'):
+            node.children = [self._statement()]
+        return node
+    
+    def _if_statement(self) -> Node:
+        token = self._advance()
+        self._expect('(')
+        condition = self._expression()
+        self._expect(')')
+        children = [condition, self._statement()]
+        if self._accept('else'):
+            children.append(self._statement())
+        return Node('If', token, token.offset, self._previous_end(), children=children)
+    
+    def _module_definition(self) -> Node:
+        keyword = self._advance()
+        name = self._identifier()
+        self._expect('(')
+        params = self._parameters()
+        body = self._statement()
+        return Node('ModuleDef', name, keyword.offset, self._previous_end(),
+                    name=name.value, args=params, children=[body])
+    
+    def _function_definition(self) -> Node:
+        keyword = self._advance()
+        name = self._identifier()
+        self._expect('(')
+        params = self._parameters()
+        self._expect('=')
+        expression = self._expression()
+        self._expect(';')
+        return Node('FunctionDef', name, keyword.offset, self._previous_end(),
+                    name=name.value, args=params, children=[expression])
+    
+    def _identifier(self) -> Token:
+        token = self.tokens[self._pos]
+        if token.kind != 'identifier':
+            raise ParseError(f"Expected name but found {token.value!r}", token)
+        return self._advance()
+    
+    def _parameters(self) -> List[Node]:
+        """Parameter list after '(' up to and including ')'"""
+        params = []
+        while not self._accept(')'):
+            name = self._identifier()
+            children = [self._expression()] if self._accept('=') else []
+            params.append(Node('Parameter', name, name.offset, self._previous_end(),
+                               name=name.value, children=children))
+            if not self._accept(','):
+                self._expect(')')
+                break
+        return params
+    
+    def _arguments(self) -> List[Node]:
+        """Argument list after '(' up to and including ')', recovering per argument"""
+        args = []
+        while not self._accept(')'):
+            token = self.tokens[self._pos]
+            if token.kind == 'eof':
+                raise ParseError("Unclosed argument list", token)
+            position = self._pos
+            try:
+                following = self._peek(1)
+                name = None
+                if token.kind == 'identifier' and following.value == '=' and following.kind == 'operator':
+                    self._advance()
+                    self._advance()
+                    name = token.value
+                expression = self._expression()
+                args.append(Node('Argument', token, token.offset, self._previous_end(),
+                                 name=name, children=[expression]))
+            except ParseError as error:
+                if self._pos == position and token.value not in (')', ']', '}'):
+                    self._advance()
+                self._synchronize(',')
+                args.append(self._error(error, token.offset))
+            if not self._accept(','):
+                self._expect(')')
+                break
+        return args
+    
+    # -- expressions ----------------------------------------------------
+    
+    def _expression(self) -> Node:
+        token = self.tokens[self._pos]
+        if token.kind == 'identifier' and token.value in ('let', 'assert', 'echo', 'function'):
+            if self._peek(1).value == '(':
+                return self._prefix_expression(self._expression)
+        
+        condition = self._binary(1)
+        question = self._accept('?')
+        if not question:
+            return condition
+        then = self._expression()
+        self._expect(':')
+        otherwise = self._expression()
+        return Node('Ternary', question, condition.start, otherwise.end,
+                    children=[condition, then, otherwise])
+    
+    def _prefix_expression(self, body) -> Node:
+        """let(...) / assert(...) / echo(...) / function(...) followed by a body"""
+        token = self._advance()
+        self._advance()
+        if token.value == 'function':
+            params = self._parameters()
+            expression = self._expression()
+            return Node('FunctionLiteral', token, token.offset, expression.end,
+                        args=params, children=[expression])
+        
+        args = self._arguments()
+        node = Node(token.value.capitalize(), token, token.offset, self._previous_end(), args=args)
+        if node.type == 'Let' or not self._at_expression_end():
+            node.children = [body()]
+        return node
+    
+    def _at_expression_end(self) -> bool:
+        token = self.tokens[self._pos]
+        return token.kind == 'eof' or (token.kind == 'operator' and token.value in (';', ',', ')', ']', '}', ':'))
+    
+    def _binary(self, min_precedence: int) -> Node:
+        left = self._unary()
+        while True:
+            token = self.tokens[self._pos]
+            if token.kind != 'operator':
+                return left
+            precedence = _BINARY_PRECEDENCE.get(token.value)
+            if precedence is None or precedence < min_precedence:
+                return left
+            self._advance()
+            right = self._binary(precedence + 1)
+            left = Node('BinaryOp', token, left.start, right.end, value=token.value, children=[left, right])
+    
+    def _unary(self) -> Node:
+        token = self.tokens[self._pos]
+        if token.kind == 'operator' and token.value in ('!', '-', '+'):
+            self._advance()
+            operand = self._unary()
+            return Node('UnaryOp', token, token.offset, operand.end, value=token.value, children=[operand])
+        return self._power()
+    
+    def _power(self) -> Node:
+        base = self._postfix()
+        token = self.tokens[self._pos]
+        if token.kind == 'operator' and token.value in ('^', '**'):
+            self._advance()
+            exponent = self._unary()
+            return Node('BinaryOp', token, base.start, exponent.end, value=token.value, children=[base, exponent])
+        return base
+    
+    def _postfix(self) -> Node:
+        node = self._primary()
+        while True:
+            token = self.tokens[self._pos]
+            if token.kind != 'operator':
+                return node
+            if token.value == '(':
+                self._advance()
+                args = self._arguments()
+                name = node.name if node.type == 'Identifier' else None
+                node = Node('Call', node.token if name else token, node.start, self._previous_end(),
+                            name=name, args=args, children=[node])
+            elif token.value == '[':
+                self._advance()
+                index = self._expression()
+                self._expect(']')
+                node = Node('Index', token, node.start, self._previous_end(), children=[node, index])
+            elif token.value == '.':
+                self._advance()
+                member = self._identifier()
+                node = Node('Member', member, node.start, self._previous_end(), name=member.value, children=[node])
+            else:
+                return node
+    
+    def _primary(self) -> Node:
+        token = self.tokens[self._pos]
+        kind, value = token.kind, token.value
+        end = token.offset + len(value)
+        
+        if kind == 'number':
+            self._advance()
+            return Node('Number', token, token.offset, end, value=float(value))
+        if kind == 'string':
+            self._advance()
+            return Node('String', token, token.offset, end, value=_unescape(value))
+        if kind == 'identifier':
+            self._advance()
+            if value in ('true', 'false'):
+                return Node('Boolean', token, token.offset, end, value=value == 'true')
+            if value == 'undef':
+                return Node('Undef', token, token.offset, end)
+            return Node('Identifier', token, token.offset, end, name=value)
+        if kind == 'operator':
+            if value == '(':
+                self._advance()
+                inner = self._expression()
+                self._expect(')')
+                # Widen the span so rewrites of the enclosing expression keep the parentheses
+                inner.start, inner.end = token.offset, self._previous_end()
+                return inner
+            if value == '[':
+                return self._vector()
+        raise ParseError(f"Unexpected {value or 'end of file'!r} in expression", token)
+    
+    def _vector(self) -> Node:
+        token = self._advance()
+        if self._accept(']'):
+            return Node('Vector', token, token.offset, self._previous_end())
+        
+        first = self._list_element()
+        if first.type not in ('ListFor', 'ListIf', 'Each', 'Let') and self._accept(':'):
+            parts = [first, self._expression()]
+            if self._accept(':'):
+                parts.append(self._expression())
+            self._expect(']')
+            return Node('Range', token, token.offset, self._previous_end(), children=parts)
+        
+        elements = [first]
+        while self._accept(','):
+            if self._at(']'):
+                break
+            elements.append(self._list_element())
+        self._expect(']')
+        return Node('Vector', token, token.offset, self._previous_end(), children=elements)
+    
+    def _list_element(self) -> Node:
+        token = self.tokens[self._pos]
+        if token.kind != 'identifier':
+            return self._expression()
+        
+        value = token.value
+        if value == 'each':
+            self._advance()
+            element = self._list_element()
+            return Node('Each', token, token.offset, element.end, children=[element])
+        if self._peek(1).value != '(':
+            return self._expression()
+        if value == 'let':
+            return self._prefix_expression(self._list_element)
+        if value == 'for':
+            return self._list_for()
+        if value == 'if':
+            self._advance()
+            self._advance()
+            condition = self._expression()
+            self._expect(')')
+            children = [condition, self._list_element()]
+            if self._accept('else'):
+                children.append(self._list_element())
+            return Node('ListIf', token, token.offset, self._previous_end(), children=children)
+        return self._expression()
+    
+    def _list_for(self) -> Node:
+        token = self._advance()
+        self._expect('(')
+        assignments = []
+        while not self._at(';') and not self._at(')'):
+            name = self._identifier()
+            self._expect('=')
+            expression = self._expression()
+            assignments.append(Node('Argument', name, name.offset, expression.end,
+                                    name=name.value, children=[expression]))
+            if not self._accept(','):
+                break
+        
+        if self._accept(';'):
+            condition = self._expression()
+            self._expect(';')
+            updates = self._arguments()
+            body = self._list_element()
+            return Node('ListFor', token, token.offset, body.end, value='c', args=assignments,
+                        children=[condition] + updates + [body])
+        
+        self._expect(')')
+        body = self._list_element()
+        return Node('ListFor', token, token.offset, body.end, args=assignments, children=[body])
+
+
+@dataclass
+class _ParsedRegion:
+    statements: List[Node]
+    comments: List[Token]
+    errors: List[Node]
+
+
+class ParseResult:
+    """
+    Lazily parsed OpenSCAD source
+    
+    regions are found up front; each region is parsed the first time its
+    statements are requested. tree, comments and errors parse everything.
+    """
+    
+    def __init__(self, source: str):
+        self.source = source
+        self._texts = _statement_texts(source)
+        self.regions = _Regions(self._texts)
+        self._parsed: Dict[int, _ParsedRegion] = {}
+    
+    def _region(self, index: int) -> _ParsedRegion:
+        parsed = self._parsed.get(index)
+        if parsed is None:
+            region = self.regions[index]
+            parser = Parser(self.source, region.start, region.end, region.line)
+            parsed = _ParsedRegion(parser.parse_statements(), parser.comments, parser.errors)
+            self._parsed[index] = parsed
+        return parsed
+    
+    def region_text(self, index: int) -> str:
+        return self._texts[index]
+    
+    def statements(self, index: int) -> List[Node]:
+        """Statements of one region"""
+        return self._region(index).statements
+    
+    @property
+    def tree(self) -> Node:
+        """Program node of the whole source"""
+        statements = [node for index in range(len(self.regions)) for node in self.statements(index)]
+        return Node('Program', None, 0, len(self.source), children=statements)
+    
+    @property
+    def comments(self) -> List[Token]:
+        return [token for index in range(len(self.regions)) for token in self._region(index).comments]
+    
+    @property
+    def errors(self) -> List[Node]:
+        return [node for index in range(len(self.regions)) for node in self._region(index).errors]
+    
+    @property
+    def has_comments(self) -> bool:
+        """Whether the source contains a comment, found without parsing"""
+        if not _COMMENT_START.search(self.source):
+            return False
+        return any(match.lastindex == 1 for match in _COMMENT.finditer(self.source))
+    
+    def text(self, node: Node) -> str:
+        """Source text spanned by a node"""
+        return self.source[node.start:node.end]
+    
+    def position(self, offset: int) -> Tuple[int, int]:
+        """1-based line and 0-based column of a source offset"""
+        index = min(bisect_right(self.regions.ends, offset), len(self.regions) - 1)
+        start, line = (self.regions[index].start, self.regions[index].line) if index >= 0 else (0, 1)
+        line += self.source.count('\n', start, offset)
+        return line, offset - self.source.rfind('\n', 0, offset) - 1
+    
+    def line_at(self, offset: int) -> str:
+        """Text of the source line containing offset"""
+        start = self.source.rfind('\n', 0, offset) + 1
+        end = self.source.find('\n', offset)
+        return self.source[start:end if end >= 0 else len(self.source)]
+
+
+def parse(source: str) -> ParseResult:
+    """Split OpenSCAD source into regions for lazy parsing"""
+    return ParseResult(source)
+
+
+@lru_cache(maxsize=16)
+def parse_cached(source: str) -> ParseResult:
+    """
+    parse() with an LRU cache keyed by the source text
+    
+    The analyzer, the migration engine and the version selector look at
+    the same source several times per migration or render, and share the
+    regions parsed so far. Callers must treat the result as read-only.
+    """
+    return parse(source)
+
+
+def walk(node: Node) -> Iterator[Node]:
+    """Yield a node and all its descendants, depth first"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(current.children))
+        stack.extend(reversed(current.args))
+
+
+class NodeVisitor:
+    """
+    Walks an AST calling visit_<Type>(node) where defined
+    
+    Like ast.NodeVisitor, a visit_ method must call generic_visit() to
+    descend into the node's arguments and children.
+    """
+    
+    def wants(self, text: str) -> bool:
+        """
+        Pre-check on the raw text of a region before it is parsed
+        
+        Return False only when the visitor cannot report anything in that
+        text; strings and comments may cause false positives, which just
+        cost a parse. It is also asked about the whole source first, so it
+        must hold for any text that contains a wanted region.
+        """
+        return True
+    
+    def visit(self, node: Node) -> Any:
+        method = getattr(self, 'visit_' + node.type, None)
+        if method is not None:
+            return method(node)
+        return self.generic_visit(node)
+    
+    def generic_visit(self, node: Node) -> None:
+        for arg in node.args:
+            self.visit(arg)
+        for child in node.children:
+            self.visit(child)
+
+
+def visit_regions(parsed: ParseResult, visitors: Sequence[NodeVisitor]) -> None:
+    """Run visitors over the regions their wants() pre-check selects"""
+    source = parsed.source
+    visitors = [visitor for visitor in visitors if visitor.wants(source)]
+    if not visitors:
+        return
+    texts = parsed._texts
+    active: Dict[int, List[NodeVisitor]] = {}
+    for visitor in visitors:
+        # Filter with map() and compress() so only wants() runs per region
+        for index in compress(range(len(texts)), map(visitor.wants, texts)):
+            active.setdefault(index, []).append(visitor)
+    for index in sorted(active):
+        for statement in parsed.statements(index):
+            for visitor in active[index]:
+                visitor.visit(statement)
+
+
+class CallCollector(NodeVisitor):
+    """Collect module instantiations and function calls by name"""
+    
+    def __init__(self, names: Iterable[str]):
+        self.names = frozenset(names)
+        self.calls: List[Node] = []
+    
+    def wants(self, text: str) -> bool:
+        return any(name in text for name in self.names)
+    
+    def visit_ModuleCall(self, node: Node) -> None:
+        if node.name in self.names:
+            self.calls.append(node)
+        self.generic_visit(node)
+    
+    visit_Call = visit_ModuleCall
+
+
+class IncludeCollector(NodeVisitor):
+    """Collect include<> and use<> statements"""
+    
+    def __init__(self):
+        self.includes: List[Node] = []
+    
+    def wants(self, text: str) -> bool:
+        return '<' in text and ('include' in text or 'use' in text)
+    
+    def visit_Include(self, node: Node) -> None:
+        self.includes.append(node)
+    
+    def generic_visit(self, node: Node) -> None:
+        # include<> and use<> only appear at the top level
+        pass
+
+
+class FeatureVisitor(NodeVisitor):
+    """
+    Collect uses of version-dependent language features
+    
+    features maps 'exponent_operator', 'assert', 'text',
+    'list_comprehension' and 'function_literal' to the nodes using them;
+    pass a subset to look for fewer features (and parse fewer regions).
+    """
+    
+    def __init__(self, features: Optional[Iterable[str]] = None):
+        self.enabled = frozenset(features) if features is not None else frozenset(_FEATURE_LEXEMES)
+        self._lexemes = tuple(_FEATURE_LEXEMES[name] for name in self.enabled)
+        self.features: Dict[str, List[Node]] = {}
+    
+    def wants(self, text: str) -> bool:
+        return any(lexeme in text for lexeme in self._lexemes)
+    
+    def _record(self, feature: str, node: Node) -> None:
+        if feature in self.enabled:
+            self.features.setdefault(feature, []).append(node)
+    
+    def visit_BinaryOp(self, node: Node) -> None:
+        if node.value == '**':
+            self._record('exponent_operator', node)
+        self.generic_visit(node)
+    
+    def visit_ModuleCall(self, node: Node) -> None:
+        if node.name in ('assert', 'text'):
+            self._record(node.name, node)
+        self.generic_visit(node)
+    
+    def visit_Call(self, node: Node) -> None:
+        if node.name == 'text':
+            self._record('text', node)
+        self.generic_visit(node)
+    
+    def visit_Assert(self, node: Node) -> None:
+        self._record('assert', node)
+        self.generic_visit(node)
+    
+    def visit_ListFor(self, node: Node) -> None:
+        self._record('list_comprehension', node)
+        self.generic_visit(node)
+    
+    def visit_FunctionLiteral(self, node: Node) -> None:
+        self._record('function_literal', node)
+        self.generic_visit(node)
+
+
+def find_features(source: str, features: Optional[Iterable[str]] = None) -> Dict[str, List[Node]]:
+    """Run FeatureVisitor over the (cached) parse of source"""
+    visitor = FeatureVisitor(features)
+    visit_regions(parse_cached(source), [visitor])
+    return visitor.features
@@ -0,0 +1,324 @@
+"""
+SCAD Library Tree-Shaker
+
+Models that include <BOSL2/std.scad> or similar libraries make OpenSCAD
+parse thousands of modules and functions they never call. This pass
+resolves include<> statements, builds the reference graph between the
+included definitions and emits one flattened SCAD program containing only
+the definitions reachable from the model code.
+
+use<> statements are kept (pinned to the resolved file): a used file only
+exports modules and functions, and its variables stay private to it, so
+flattening it could change name resolution.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+KEYWORDS = frozenset({
+    'module', 'function', 'if', 'else', 'for', 'intersection_for', 'let', 'each',
+    'assert', 'echo', 'true', 'false', 'undef', 'include', 'use',
+})
+
+# Calls that read files relative to the library that contains them
+FILE_READING_CALLS = frozenset({'import', 'surface'})
+
+_IDENTIFIER = re.compile(r'[A-Za-z_$][\w$]*')
+_STRING_OR_COMMENT = re.compile(r'"(?:\\.|[^"\\])*"|/\*.*?\*/|//[^\n]*', re.DOTALL)
+_INCLUDE = re.compile(r'(include|use)\s*<\s*([^>]+?)\s*>')
+_DEFINITION = re.compile(r'(module|function)\s+([A-Za-z_$][\w$]*)\s*\(')
+_ASSIGNMENT = re.compile(r'([A-Za-z_$][\w$]*)\s*=(?!=)')
+_ELSE = re.compile(r'(?:\s|//[^\n]*|/\*.*?\*/)*else\b', re.DOTALL)
+
+
+@dataclass(frozen=True)
+class ScadStatement:
+    """One top-level SCAD statement"""
+    kind: str  # 'module', 'function', 'assignment', 'include', 'use' or 'statement'
+    name: Optional[str]
+    text: str
+    references: FrozenSet[str]
+
+
+@dataclass
+class TreeShakeResult:
+    """Flattened SCAD code and what was removed"""
+    scad_code: str
+    libraries: List[Path] = field(default_factory=list)
+    definitions_total: int = 0
+    definitions_kept: int = 0
+    cached: bool = False
+    
+    @property
+    def definitions_removed(self) -> int:
+        return self.definitions_total - self.definitions_kept
+
+
+def _references(text: str) -> FrozenSet[str]:
+    code = _STRING_OR_COMMENT.sub(' ', text)
+    return frozenset(name for name in _IDENTIFIER.findall(code) if name not in KEYWORDS)
+
+
+def _classify(text: str) -> ScadStatement:
+    match = _INCLUDE.match(text)
+    if match:
+        return ScadStatement(match.group(1), match.group(2), text, frozenset())
+    
+    references = _references(text)
+    match = _DEFINITION.match(text)
+    if match:
+        return ScadStatement(match.group(1), match.group(2), text, references)
+    match = _ASSIGNMENT.match(text)
+    if match:
+        return ScadStatement('assignment', match.group(1), text, references)
+    return ScadStatement('statement', None, text, references)
+
+
+def split_statements(scad_code: str) -> List[ScadStatement]:
+    """
+    Split SCAD code into top-level statements
+    
+    Strings, comments and nested brackets are respected; an if-block
+    followed by else stays one statement. Comments between statements are
+    dropped.
+    """
+    statements = []
+    length = len(scad_code)
+    i = 0
+    start = None
+    depth = 0
+    in_include = False
+    
+    def finish(end):
+        text = scad_code[start:end].strip()
+        if text and text != ';':
+            statements.append(_classify(text))
+    
+    while i < length:
+        char = scad_code[i]
+        
+        if start is None:
+            if char.isspace() or char == ';':
+                i += 1
+                continue
+            if scad_code.startswith('//', i):
+                newline = scad_code.find('\n', i)
+                i = length if newline < 0 else newline + 1
+                continue
+            if scad_code.startswith('/*', i):
+                close = scad_code.find('*/', i + 2)
+                i = length if close < 0 else close + 2
+                continue
+            start = i
+            in_include = bool(re.match(r'(?:include|use)\s*<', scad_code[i:i + 16]))
+        
+        if in_include:
+            if char == '>':
+                finish(i + 1)
+                start, in_include = None, False
+            i += 1
+            continue
+        
+        if char == '"':
+            i += 1
+            while i < length and scad_code[i] != '"':
+                i += 2 if scad_code[i] == '\\' else 1
+        elif scad_code.startswith('//', i):
+            newline = scad_code.find('\n', i)
+            i = length if newline < 0 else newline
+            continue
+        elif scad_code.startswith('/*', i):
+            close = scad_code.find('*/', i + 2)
+            i = length if close < 0 else close + 1
+        elif char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+            if char == '}' and depth == 0 and not _ELSE.match(scad_code, i + 1):
+                finish(i + 1)
+                start = None
+        elif char == ';' and depth == 0:
+            finish(i + 1)
+            start = None
+        i += 1
+    
+    if start is not None:
+        finish(length)
+    return statements
+
+
+def default_library_paths() -> List[Path]:
+    """OpenSCAD library search path: OPENSCADPATH, then the user library folder"""
+    paths = [Path(p) for p in os.environ.get('OPENSCADPATH', '').split(os.pathsep) if p]
+    if sys.platform.startswith('linux'):
+        paths.append(Path.home() / '.local' / 'share' / 'OpenSCAD' / 'libraries')
+    else:
+        paths.append(Path.home() / 'Documents' / 'OpenSCAD' / 'libraries')
+    paths.extend([Path('/usr/share/openscad/libraries'), Path('/usr/local/share/openscad/libraries')])
+    return paths
+
+
+class SCADTreeShaker:
+    """
+    Flatten include<> dependencies down to the reachable definitions
+    
+    Parsed libraries are cached by content digest, and flattened programs
+    by the digest of the model code plus every included library, so a
+    library edit invalidates exactly the programs that include it.
+    """
+    
+    def __init__(self, library_paths: Optional[Sequence[os.PathLike]] = None,
+                 max_cache_entries: int = 64, max_library_entries: int = 32):
+        """
+        Initialize the tree-shaker
+        
+        Args:
+            library_paths: Directories searched for include<> files after the
+                including file's directory (default: OpenSCAD's library path)
+            max_cache_entries: Flattened programs kept in the LRU cache
+            max_library_entries: Parsed library files kept in the LRU cache
+        """
+        self.library_paths = [Path(p) for p in library_paths] if library_paths is not None else default_library_paths()
+        self.max_cache_entries = max_cache_entries
+        self.max_library_entries = max_library_entries
+        self._library_cache: "OrderedDict[str, List[ScadStatement]]" = OrderedDict()
+        self._result_cache: "OrderedDict[str, TreeShakeResult]" = OrderedDict()
+    
+    def resolve(self, include_path: str, base_dir: Path) -> Optional[Path]:
+        """Find an include<> file the way OpenSCAD does"""
+        for directory in [base_dir] + self.library_paths:
+            candidate = directory / include_path
+            if candidate.is_file():
+                return candidate.resolve()
+        return None
+    
+    def _load_library(self, path: Path) -> Tuple[str, List[ScadStatement]]:
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self._library_cache:
+            self._library_cache.move_to_end(digest)
+        else:
+            self._library_cache[digest] = split_statements(data.decode('utf-8', errors='replace'))
+            if len(self._library_cache) > self.max_library_entries:
+                self._library_cache.popitem(last=False)
+        return digest, self._library_cache[digest]
+    
+    def _expand(self, statements, base_dir, origin, stack, expanded, digests, libraries):
+        """Inline include<> statements recursively, tagging each statement with its origin"""
+        for statement in statements:
+            if statement.kind == 'use':
+                # The flattened program lives elsewhere; pin the used file by absolute path
+                path = self.resolve(statement.name, base_dir)
+                if path is not None:
+                    statement = ScadStatement('use', str(path), f"use <{path.as_posix()}>", frozenset())
+                expanded.append((statement, origin))
+                continue
+            if statement.kind != 'include':
+                expanded.append((statement, origin))
+                continue
+            
+            path = self.resolve(statement.name, base_dir)
+            if path is None or path in stack:
+                # Unresolvable (or recursive) includes are left for OpenSCAD
+                expanded.append((statement, origin))
+                continue
+            
+            digest, library = self._load_library(path)
+            digests.append(digest)
+            libraries.append(path)
+            self._expand(library, path.parent, path, stack | {path}, expanded, digests, libraries)
+    
+    def shake(self, scad_code: str, base_dir: Optional[os.PathLike] = None) -> TreeShakeResult:
+        """
+        Flatten the includes of SCAD code, keeping reachable definitions only
+        
+        Args:
+            scad_code: Model SCAD code
+            base_dir: Directory relative include<> paths start from (default: cwd)
+        
+        Returns:
+            TreeShakeResult; code without resolvable includes is returned unchanged
+        """
+        if not _INCLUDE.search(scad_code):
+            return TreeShakeResult(scad_code=scad_code)
+        
+        base_dir = Path(base_dir) if base_dir is not None else Path.cwd()
+        expanded: List[Tuple[ScadStatement, Optional[Path]]] = []
+        digests: List[str] = []
+        libraries: List[Path] = []
+        self._expand(split_statements(scad_code), base_dir, None, frozenset(), expanded, digests, libraries)
+        
+        if not libraries:
+            return TreeShakeResult(scad_code=scad_code)
+        
+        cache_key = hashlib.sha256('\0'.join([scad_code, str(base_dir)] + digests).encode('utf-8')).hexdigest()
+        if cache_key in self._result_cache:
+            self._result_cache.move_to_end(cache_key)
+            cached = self._result_cache[cache_key]
+            return TreeShakeResult(cached.scad_code, cached.libraries, cached.definitions_total,
+                                   cached.definitions_kept, cached=True)
+        
+        result = self._shake_expanded(scad_code, expanded, libraries)
+        self._result_cache[cache_key] = result
+        if len(self._result_cache) > self.max_cache_entries:
+            self._result_cache.popitem(last=False)
+        return result
+    
+    def _shake_expanded(self, scad_code, expanded, libraries) -> TreeShakeResult:
+        definitions: Dict[str, List[int]] = {}
+        keep = [False] * len(expanded)
+        pending = []
+        
+        for index, (statement, origin) in enumerate(expanded):
+            is_definition = statement.kind in ('module', 'function', 'assignment')
+            if origin is not None and is_definition and not statement.name.startswith('$'):
+                definitions.setdefault(statement.name, []).append(index)
+            else:
+                # Model code, geometry statements and special variables always run
+                keep[index] = True
+                pending.extend(statement.references)
+        
+        # Reachability over names; modules, functions and variables share the
+        # lookup, which can only keep more than needed
+        seen = set()
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            for index in definitions.get(name, ()):
+                if not keep[index]:
+                    keep[index] = True
+                    pending.extend(expanded[index][0].references)
+        
+        kept = [(statement, origin) for (statement, origin), flag in zip(expanded, keep) if flag]
+        if any(origin is not None and statement.references & FILE_READING_CALLS for statement, origin in kept):
+            logger.info("Library reads files relative to itself, keeping includes unflattened")
+            return TreeShakeResult(scad_code=scad_code, libraries=libraries)
+        
+        total = sum(len(indices) for indices in definitions.values())
+        kept_count = sum(1 for indices in definitions.values() for index in indices if keep[index])
+        header = f"// Tree-shaken: {kept_count} of {total} library definitions from {len(libraries)} files"
+        flattened = '\n'.join([header] + [statement.text for statement, _ in kept]) + '\n'
+        
+        logger.info(f"Tree-shaken SCAD: kept {kept_count}/{total} library definitions")
+        return TreeShakeResult(scad_code=flattened, libraries=libraries,
+                               definitions_total=total, definitions_kept=kept_count)
+    
+    def flatten(self, scad_code: str, base_dir: Optional[os.PathLike] = None) -> str:
+        """Flattened SCAD code (see shake())"""
+        return self.shake(scad_code, base_dir).scad_code
+    
+    def clear_cache(self) -> None:
+        """Drop parsed libraries and flattened programs"""
+        self._library_cache.clear()
+        self._result_cache.clear()
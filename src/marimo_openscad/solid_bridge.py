@@ -5,19 +5,390 @@ Provides enhanced integration between SolidPython2 objects and OpenSCAD renderin
 with automatic parameter extraction and model caching.
 """
 
+import copy
 import hashlib
 import logging
-from typing import Dict, Any, Optional
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
 
 from .openscad_renderer import OpenSCADRenderer, OpenSCADError
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Nodes that only move their children, and nodes that only group them
+TRANSFORM_NODES = {'translate', 'rotate', 'scale', 'mirror', 'multmatrix'}
+GROUP_NODES = {'union'}
+
+IDENTITY_MATRIX = [[1.0, 0.0, 0.0, 0.0],
+                   [0.0, 1.0, 0.0, 0.0],
+                   [0.0, 0.0, 1.0, 0.0],
+                   [0.0, 0.0, 0.0, 1.0]]
+
 class SolidPythonError(Exception):
     """Custom exception for SolidPython2 errors"""
     pass
 
+
+@dataclass
+class InstanceGroup:
+    """A subtree that occurs several times, differing only by transform"""
+    body: Any
+    scad_code: str
+    matrices: List[List[List[float]]] = field(default_factory=list)
+    
+    @property
+    def transforms(self) -> List[List[float]]:
+        """Instance matrices flattened column-major (THREE.Matrix4.fromArray order)"""
+        return [[row[col] for col in range(4) for row in matrix] for matrix in self.matrices]
+
+
+@dataclass
+class InstancingPlan:
+    """Split of a model into instanced groups and the remaining geometry"""
+    groups: List[InstanceGroup]
+    remainder: List[Tuple[List[List[float]], Any]]
+    
+    @property
+    def instance_count(self) -> int:
+        return sum(len(group.matrices) for group in self.groups)
+
+
+@dataclass
+class InstancedPart:
+    """Rendered geometry of one instance group"""
+    stl_data: bytes
+    transforms: List[List[float]]
+    scad_code: str
+
+
+@dataclass
+class InstancedRenderResult:
+    """Result of rendering a model with instancing"""
+    parts: List[InstancedPart]
+    remainder_stl: Optional[bytes]
+
+
+def _matmul(a: List[List[float]], b: List[List[float]]) -> List[List[float]]:
+    return [[sum(a[i][k] * b[k][j] for k in range(4)) for j in range(4)] for i in range(4)]
+
+
+def _vector3(value, default: float = 0.0) -> List[float]:
+    """Coerce an OpenSCAD scalar or 2/3-vector parameter into three floats"""
+    if isinstance(value, (int, float)):
+        return [float(value)] * 3
+    values = [float(v) for v in value]
+    if not 1 <= len(values) <= 3:
+        raise ValueError(f"Expected a vector of up to 3 components, got {value!r}")
+    return values + [default] * (3 - len(values))
+
+
+def _rotation_matrix(axis: List[float], degrees: float) -> List[List[float]]:
+    x, y, z = axis
+    length = math.sqrt(x * x + y * y + z * z)
+    if length == 0:
+        return [row[:] for row in IDENTITY_MATRIX]
+    x, y, z = x / length, y / length, z / length
+    c = math.cos(math.radians(degrees))
+    s = math.sin(math.radians(degrees))
+    t = 1 - c
+    return [[t * x * x + c, t * x * y - s * z, t * x * z + s * y, 0.0],
+            [t * x * y + s * z, t * y * y + c, t * y * z - s * x, 0.0],
+            [t * x * z - s * y, t * y * z + s * x, t * z * z + c, 0.0],
+            [0.0, 0.0, 0.0, 1.0]]
+
+
+def transform_matrix(node) -> List[List[float]]:
+    """
+    4x4 row-major matrix of a SolidPython2 transform node
+    
+    Raises:
+        ValueError: If the parameters are not plain numbers (e.g. OpenSCAD
+            variables), so the transform cannot be evaluated in Python
+    """
+    name = getattr(node, '_name', None)
+    params = getattr(node, '_params', {}) or {}
+    
+    if name == 'translate':
+        dx, dy, dz = _vector3(params.get('v', [0, 0, 0]))
+        matrix = [row[:] for row in IDENTITY_MATRIX]
+        matrix[0][3], matrix[1][3], matrix[2][3] = dx, dy, dz
+        return matrix
+    
+    if name == 'scale':
+        sx, sy, sz = _vector3(params.get('v', [1, 1, 1]), default=1.0)
+        return [[sx, 0.0, 0.0, 0.0], [0.0, sy, 0.0, 0.0], [0.0, 0.0, sz, 0.0], [0.0, 0.0, 0.0, 1.0]]
+    
+    if name == 'rotate':
+        angle = params.get('a', 0)
+        axis = params.get('v')
+        if isinstance(angle, (int, float)):
+            # rotate(a) turns about z; rotate(a, v) about an arbitrary axis
+            return _rotation_matrix(_vector3(axis) if axis is not None else [0.0, 0.0, 1.0], float(angle))
+        # rotate([x, y, z]) applies x, then y, then z
+        ax, ay, az = _vector3(angle)
+        matrix = _rotation_matrix([1.0, 0.0, 0.0], ax)
+        matrix = _matmul(_rotation_matrix([0.0, 1.0, 0.0], ay), matrix)
+        return _matmul(_rotation_matrix([0.0, 0.0, 1.0], az), matrix)
+    
+    if name == 'mirror':
+        nx, ny, nz = _vector3(params.get('v', [1, 0, 0]))
+        length_sq = nx * nx + ny * ny + nz * nz
+        if length_sq == 0:
+            return [row[:] for row in IDENTITY_MATRIX]
+        n = [nx, ny, nz]
+        matrix = [row[:] for row in IDENTITY_MATRIX]
+        for i in range(3):
+            for j in range(3):
+                matrix[i][j] -= 2 * n[i] * n[j] / length_sq
+        return matrix
+    
+    if name == 'multmatrix':
+        rows = [[float(v) for v in row] for row in params.get('m', IDENTITY_MATRIX)]
+        if len(rows) == 3:
+            rows.append([0.0, 0.0, 0.0, 1.0])
+        if len(rows) != 4 or any(len(row) != 4 for row in rows):
+            raise ValueError(f"Unsupported multmatrix shape: {params.get('m')!r}")
+        return rows
+    
+    raise ValueError(f"Not a transform node: {name}")
+
+
+def _flatten_union(node, matrix, leaves) -> None:
+    """Collect (matrix, body) leaves below unions and transforms"""
+    name = getattr(node, '_name', None)
+    children = getattr(node, '_children', None) or []
+    
+    if name in GROUP_NODES:
+        for child in children:
+            _flatten_union(child, matrix, leaves)
+        return
+    
+    if name in TRANSFORM_NODES and children:
+        try:
+            node_matrix = transform_matrix(node)
+        except (TypeError, ValueError):
+            leaves.append((matrix, node))  # Symbolic parameters: keep as opaque geometry
+            return
+        combined = _matmul(matrix, node_matrix)
+        for child in children:
+            _flatten_union(child, combined, leaves)
+        return
+    
+    leaves.append((matrix, node))
+
+
+def find_instanced_subtrees(model, min_instances: int = 2) -> InstancingPlan:
+    """
+    Find subtrees of a SolidPython2 model that repeat with different transforms
+    
+    Only geometry combined by union (explicitly or through transforms) can be
+    split out; anything below difference/intersection stays in the remainder.
+    Subtrees are identical when their generated SCAD code is identical.
+    
+    Args:
+        model: SolidPython2 object
+        min_instances: Minimum number of occurrences to instance a subtree
+    
+    Returns:
+        InstancingPlan with instance groups and the remaining (matrix, node) leaves
+    """
+    leaves = []
+    _flatten_union(model, [row[:] for row in IDENTITY_MATRIX], leaves)
+    
+    groups: Dict[str, InstanceGroup] = {}
+    order = []
+    for matrix, body in leaves:
+        scad_code = body.as_scad() if hasattr(body, 'as_scad') else str(body)
+        if scad_code not in groups:
+            groups[scad_code] = InstanceGroup(body=body, scad_code=scad_code)
+            order.append(scad_code)
+        groups[scad_code].matrices.append(matrix)
+    
+    instanced = [groups[code] for code in order if len(groups[code].matrices) >= min_instances]
+    instanced_codes = {group.scad_code for group in instanced}
+    remainder = [
+        (matrix, groups[code].body)
+        for code in order if code not in instanced_codes
+        for matrix in groups[code].matrices
+    ]
+    return InstancingPlan(groups=instanced, remainder=remainder)
+
+
+def split_assembly(model) -> Dict[str, Any]:
+    """
+    Split a model into named parts for per-part rendering
+    
+    A dict of named parts is returned as is. The top-level children of a
+    union become part_0, part_1, ... in order; any other model is one part.
+    
+    Args:
+        model: SolidPython2 object, SCAD code string or dict of named parts
+    
+    Returns:
+        Dict mapping part names to models
+    """
+    if isinstance(model, dict):
+        return dict(model)
+    
+    if getattr(model, '_name', None) in GROUP_NODES:
+        return {f"part_{index}": child for index, child in enumerate(model._children)}
+    
+    return {"part_0": model}
+
+
+@dataclass
+class SimplificationStats:
+    """Node counts before and after simplify_csg()"""
+    nodes_before: int
+    nodes_after: int
+    
+    @property
+    def nodes_removed(self) -> int:
+        return self.nodes_before - self.nodes_after
+    
+    @property
+    def reduction(self) -> float:
+        """Fraction of nodes removed"""
+        return self.nodes_removed / self.nodes_before if self.nodes_before else 0.0
+
+
+def count_nodes(node) -> int:
+    """Number of nodes in a SolidPython2 tree"""
+    return 1 + sum(count_nodes(child) for child in getattr(node, '_children', None) or [])
+
+
+def _is_empty(node) -> bool:
+    """Groups and transforms without children produce no geometry"""
+    name = getattr(node, '_name', None)
+    return (name in GROUP_NODES or name in TRANSFORM_NODES) and not getattr(node, '_children', None)
+
+
+def _with_children(node, children):
+    simplified = copy.copy(node)
+    simplified._children = children
+    return simplified
+
+
+def _dedupe(children) -> list:
+    seen = set()
+    unique = []
+    for child in children:
+        scad_code = child.as_scad() if hasattr(child, 'as_scad') else str(child)
+        if scad_code not in seen:
+            seen.add(scad_code)
+            unique.append(child)
+    return unique
+
+
+def _transform_node(matrix):
+    """translate() for pure translations, multmatrix() otherwise"""
+    from solid2 import translate, multmatrix
+    rounded = [[round(v, 12) + 0.0 for v in row] for row in matrix]
+    if all(rounded[i][j] == IDENTITY_MATRIX[i][j] for i in range(3) for j in range(3)):
+        return translate([rounded[0][3], rounded[1][3], rounded[2][3]])
+    return multmatrix(m=rounded)
+
+
+def _is_identity(matrix) -> bool:
+    return all(abs(matrix[i][j] - IDENTITY_MATRIX[i][j]) < 1e-12 for i in range(4) for j in range(4))
+
+
+def _simplify_union(node, children):
+    """Union of already simplified children"""
+    flat = []
+    for child in children:
+        if getattr(child, '_name', None) in GROUP_NODES:
+            flat.extend(child._children)  # Nested union()
+        elif not _is_empty(child):
+            flat.append(child)
+    flat = _dedupe(flat)
+    return flat[0] if len(flat) == 1 else _with_children(node, flat)
+
+
+def _simplify_transform(node, children):
+    children = [child for child in children if not _is_empty(child)]
+    if not children:
+        return _with_children(node, [])
+    try:
+        matrix = transform_matrix(node)
+    except (TypeError, ValueError):
+        return _with_children(node, children)  # Symbolic parameters
+    
+    # Children are simplified first, so a whole chain folds bottom-up
+    folded = False
+    if len(children) == 1 and getattr(children[0], '_name', None) in TRANSFORM_NODES:
+        try:
+            matrix = _matmul(matrix, transform_matrix(children[0]))
+            children = list(children[0]._children)
+            folded = True
+        except (TypeError, ValueError):
+            pass
+    
+    if _is_identity(matrix):
+        from solid2 import union
+        return _simplify_union(union(), children)
+    if folded:
+        return _transform_node(matrix)(*children)
+    return _with_children(node, children)
+
+
+def _simplify(node):
+    children = getattr(node, '_children', None)
+    if not children:
+        return node
+    
+    name = getattr(node, '_name', None)
+    children = [_simplify(child) for child in children]
+    
+    if name in GROUP_NODES:
+        return _simplify_union(node, children)
+    if name in TRANSFORM_NODES:
+        return _simplify_transform(node, children)
+    
+    if name == 'difference':
+        if _is_empty(children[0]):
+            return _with_children(node, children[:1])
+        rest = _dedupe([child for child in children[1:] if not _is_empty(child)])
+        return children[0] if not rest else _with_children(node, [children[0]] + rest)
+    
+    if name == 'intersection':
+        children = _dedupe(children)
+        return children[0] if len(children) == 1 else _with_children(node, children)
+    
+    return _with_children(node, children)
+
+
+def simplify_csg(model) -> Tuple[Any, SimplificationStats]:
+    """
+    Simplify a SolidPython2 tree before SCAD emission
+    
+    Flattens nested unions, folds consecutive numeric transforms into one
+    translate()/multmatrix(), removes identity transforms and empty groups,
+    and drops identical siblings where that cannot change the geometry
+    (union and intersection children, subtracted parts of a difference).
+    The input tree is not modified.
+    
+    Args:
+        model: SolidPython2 object
+    
+    Returns:
+        Tuple of the simplified model and its node-count statistics
+    """
+    nodes_before = count_nodes(model)
+    simplified = _simplify(model)
+    stats = SimplificationStats(nodes_before=nodes_before, nodes_after=count_nodes(simplified))
+    return simplified, stats
+
+
+def _placed(matrix, body):
+    """Wrap a body in multmatrix unless the matrix is the identity"""
+    if matrix == IDENTITY_MATRIX:
+        return body
+    from solid2 import multmatrix
+    return multmatrix(m=matrix)(body)
+
 class SolidPythonBridge:
     """
     Enhanced bridge between SolidPython2 objects and OpenSCAD rendering
@@ -28,13 +399,14 @@ class SolidPythonBridge:
     - Intelligent re-rendering detection
     """
     
-    def __init__(self, openscad_path: Optional[str] = None, renderer=None):
+    def __init__(self, openscad_path: Optional[str] = None, renderer=None, simplify: bool = True):
         """
         Initialize SolidPython2 bridge
         
         Args:
             openscad_path: Path to OpenSCAD executable (auto-detected if None)
             renderer: Custom renderer instance (overrides openscad_path if provided)
+            simplify: Run simplify_csg() on models before generating SCAD code
         """
         if renderer is not None:
             self.renderer = renderer
@@ -45,6 +417,9 @@ class SolidPythonBridge:
         
         # Cache for model rendering results
         self.model_cache = {}
+        
+        self.simplify = simplify
+        self.last_simplification: Optional[SimplificationStats] = None
     
     def render_to_stl(self, model, use_cache: bool = True) -> bytes:
         """
@@ -68,7 +443,7 @@ class SolidPythonBridge:
         
         try:
             # Generate SCAD code
-            scad_code = model.as_scad()
+            scad_code = self._generate_scad(model)
             
             # Create comprehensive hash including model identity and SCAD code
             model_hash = self._hash_model(model, scad_code)
@@ -100,6 +475,84 @@ class SolidPythonBridge:
         except Exception as e:
             raise SolidPythonError(f"Failed to render model: {e}")
     
+    def _generate_scad(self, model) -> str:
+        """SCAD code of a model, simplified first if enabled"""
+        if not self.simplify:
+            return model.as_scad()
+        
+        simplified, stats = simplify_csg(model)
+        self.last_simplification = stats
+        if stats.nodes_removed:
+            logger.info(f"CSG simplified: {stats.nodes_before} → {stats.nodes_after} nodes "
+                        f"({stats.reduction:.0%} fewer)")
+        return simplified.as_scad()
+    
+    def render_instanced(self, model, min_instances: int = 2, use_cache: bool = True,
+                         plan: Optional[InstancingPlan] = None) -> InstancedRenderResult:
+        """
+        Render a model so repeated subtrees are rendered once each
+        
+        Every unique repeated subtree is rendered once and returned with its
+        list of instance transforms; everything else is rendered as a single
+        remainder mesh. Payload and render time then scale with unique
+        geometry rather than with the number of copies.
+        
+        Args:
+            model: SolidPython2 object with as_scad() method
+            min_instances: Minimum occurrences before a subtree is instanced
+            use_cache: Whether to use the render cache for the unique parts
+            plan: Precomputed result of find_instanced_subtrees(model)
+        
+        Returns:
+            InstancedRenderResult with parts and remainder STL (None if empty)
+        
+        Raises:
+            SolidPythonError: If model is invalid or rendering fails
+        """
+        if not hasattr(model, 'as_scad'):
+            raise SolidPythonError(
+                "Model must be a SolidPython2 object with as_scad() method"
+            )
+        
+        try:
+            if plan is None:
+                plan = find_instanced_subtrees(model, min_instances=min_instances)
+            
+            parts = [
+                InstancedPart(
+                    stl_data=self._render_scad_cached(group.scad_code, use_cache),
+                    transforms=group.transforms,
+                    scad_code=group.scad_code,
+                )
+                for group in plan.groups
+            ]
+            
+            remainder_stl = None
+            if plan.remainder:
+                from solid2 import union
+                remainder = union()(*[_placed(matrix, body) for matrix, body in plan.remainder])
+                remainder_stl = self._render_scad_cached(remainder.as_scad(), use_cache)
+            
+            logger.info(f"Instanced render: {len(parts)} unique parts, "
+                        f"{plan.instance_count} instances, {len(plan.remainder)} remaining nodes")
+            return InstancedRenderResult(parts=parts, remainder_stl=remainder_stl)
+        
+        except OpenSCADError:
+            raise
+        except Exception as e:
+            raise SolidPythonError(f"Failed to render model: {e}")
+    
+    def _render_scad_cached(self, scad_code: str, use_cache: bool) -> bytes:
+        """Render SCAD code, caching by code hash"""
+        code_hash = self._hash_scad_code(scad_code)
+        if use_cache and code_hash in self.model_cache:
+            return self.model_cache[code_hash]
+        
+        stl_data = self.renderer.render_scad_to_stl(scad_code)
+        if use_cache:
+            self.model_cache[code_hash] = stl_data
+        return stl_data
+    
     def save_model_to_stl(self, model, file_path: str) -> None:
         """
         Render a model and save it to an STL file
@@ -0,0 +1,247 @@
+"""
+Pipeline Tracing
+
+Lightweight spans for the viewer's update pipeline. A Tracer opens the
+root span of a trace (one update_model() or update_scad_code() call);
+code running inside it opens child spans with span(), which finds the
+active trace through a context variable, so the renderer and analyzers
+need no tracer passed in. Spans carry nanosecond timings and attributes
+such as byte counts.
+
+When a trace finishes its spans go to an exporter: an in-memory ring
+buffer, a JSONL file or an OpenTelemetry tracer. With tracing off, or
+outside a trace, span() returns a shared no-op span.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    """One timed stage of a trace"""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int  # Wall clock (epoch nanoseconds)
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"  # "ok" or "error"
+    error: Optional[str] = None
+    
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ns": self.duration_ns,
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span when nothing is traced"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional["_SpanContext"]] = ContextVar("marimo_openscad_span", default=None)
+
+
+class _Trace:
+    def __init__(self, tracer: "Tracer"):
+        self.tracer = tracer
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+
+
+class _SpanContext:
+    """Context manager that times one span"""
+    
+    __slots__ = ("trace", "span", "parent", "_start_counter", "_token")
+    
+    def __init__(self, trace: _Trace, name: str, parent: Optional["_SpanContext"], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.parent = parent
+        self.span = Span(
+            name=name,
+            trace_id=trace.trace_id,
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span.span_id if parent is not None else None,
+            start_ns=0,
+            attributes=attributes,
+        )
+    
+    def __enter__(self) -> Span:
+        self.span.start_ns = time.time_ns()
+        # Durations come from the monotonic clock
+        self._start_counter = time.perf_counter_ns()
+        self._token = _current_span.set(self)
+        # Recorded on entry, so a trace lists its spans in start order
+        self.trace.spans.append(self.span)
+        return self.span
+    
+    def __exit__(self, exc_type, exc, tb):
+        span = self.span
+        span.end_ns = span.start_ns + (time.perf_counter_ns() - self._start_counter)
+        if exc is not None:
+            span.status = "error"
+            span.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        if self.parent is None:
+            self.trace.tracer._finish(self.trace)
+        return False
+
+
+def span(name: str, **attributes):
+    """
+    Child span of the active trace
+    
+    Returns a no-op span outside a trace, so instrumented code costs one
+    context variable lookup when tracing is off.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return _SpanContext(parent.trace, name, parent, attributes)
+
+
+def current_span():
+    """The innermost open span, or the no-op span outside a trace"""
+    context = _current_span.get()
+    return context.span if context is not None else NOOP_SPAN
+
+
+class SpanExporter:
+    """Receives the spans of every finished trace"""
+    
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+
+class RingBufferExporter(SpanExporter):
+    """Keep the most recent traces in memory"""
+    
+    def __init__(self, capacity: int = 100):
+        self._traces: deque = deque(maxlen=capacity)
+    
+    def export(self, spans: List[Span]) -> None:
+        self._traces.append(spans)
+    
+    def traces(self) -> List[List[Span]]:
+        """Stored traces, oldest first"""
+        return list(self._traces)
+
+
+class JsonlExporter(SpanExporter):
+    """Append every span as one JSON line"""
+    
+    def __init__(self, path: os.PathLike):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+    
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as output:
+            output.write(lines)
+
+
+class OpenTelemetryExporter(SpanExporter):
+    """
+    Replay finished spans into an OpenTelemetry tracer
+    
+    Needs the opentelemetry-api package; spans keep their original
+    timestamps and parent links.
+    """
+    
+    def __init__(self, otel_tracer=None):
+        """
+        Args:
+            otel_tracer: OpenTelemetry tracer (default: the global provider's
+                tracer for this package)
+        """
+        try:
+            from opentelemetry import trace as otel_trace
+        except ImportError as e:
+            raise ImportError("OpenTelemetryExporter requires the opentelemetry-api package") from e
+        self._otel_trace = otel_trace
+        self.otel_tracer = otel_tracer if otel_tracer is not None else otel_trace.get_tracer("marimo_openscad")
+    
+    def export(self, spans: List[Span]) -> None:
+        started = {}
+        for span in spans:
+            parent = started.get(span.parent_id)
+            context = self._otel_trace.set_span_in_context(parent) if parent is not None else None
+            attributes = {key: value for key, value in span.attributes.items()
+                          if isinstance(value, (str, bool, int, float))}
+            otel_span = self.otel_tracer.start_span(span.name, context=context,
+                                                    start_time=span.start_ns, attributes=attributes)
+            if span.status == "error":
+                otel_span.set_status(self._otel_trace.Status(self._otel_trace.StatusCode.ERROR, span.error))
+            started[span.span_id] = otel_span
+        for span in spans:
+            started[span.span_id].end(end_time=span.end_ns)
+
+
+class Tracer:
+    """
+    Opens traces and hands their spans to an exporter
+    """
+    
+    def __init__(self, exporter: Optional[SpanExporter] = None, enabled: bool = True):
+        """
+        Initialize the tracer
+        
+        Args:
+            exporter: Where finished traces go (default: RingBufferExporter)
+            enabled: Record spans; a disabled tracer only returns no-op spans
+        """
+        self.exporter = exporter if exporter is not None else RingBufferExporter()
+        self.enabled = enabled
+        self.last_trace: List[Span] = []
+    
+    def trace(self, name: str, **attributes):
+        """Root span of a new trace (a no-op span when disabled)"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return _SpanContext(_Trace(self), name, None, attributes)
+    
+    def _finish(self, trace: _Trace) -> None:
+        spans = trace.spans
+        self.last_trace = spans
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            logger.warning(f"Trace export failed: {e}")
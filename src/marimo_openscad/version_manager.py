@@ -366,6 +366,7 @@ class OpenSCADVersionManager:
         self.local_detector = LocalOpenSCADDetector()
         self.wasm_detector = WASMVersionDetector()
         self._detected_installations: Optional[List[OpenSCADInstallation]] = None
+        self._syntax_analyzer = None
     
     def detect_all_installations(self) -> List[OpenSCADInstallation]:
         """
@@ -550,6 +551,52 @@ class OpenSCADVersionManager:
         return summary
 
 
+    def analyze_scad_code(self, scad_code: str) -> Dict[str, any]:
+        """
+        Analyze SCAD code for the OpenSCAD version it requires.
+        
+        The analyzer is incremental: during live editing each call only
+        re-analyzes the top-level statements that changed.
+        
+        Args:
+            scad_code: OpenSCAD code to analyze
+        
+        Returns:
+            Dictionary with 'required_version' and the syntax 'issues'
+        """
+        if self._syntax_analyzer is None:
+            # Imported here because the migration engine imports this module
+            from .migration_engine import IncrementalSyntaxAnalyzer
+            self._syntax_analyzer = IncrementalSyntaxAnalyzer()
+        
+        issues = self._syntax_analyzer.analyze_scad_code(scad_code)
+        return {
+            "required_version": self._syntax_analyzer.get_minimum_version_required(scad_code),
+            "issues": issues
+        }
+    
+    def check_compatibility(self, current_version: str, required_version: str) -> Dict[str, any]:
+        """
+        Check whether an OpenSCAD version can run code needing another.
+        
+        Args:
+            current_version: Version in use, e.g. "2021.01"
+            required_version: Minimum version the code requires
+        
+        Returns:
+            Dictionary with 'compatible' and a list of 'issues'
+        """
+        current = self.local_detector.parse_version_info(f"OpenSCAD version {current_version}")
+        required = self.local_detector.parse_version_info(f"OpenSCAD version {required_version}")
+        if current is None or required is None or not current < required:
+            return {"compatible": True, "issues": []}
+        
+        return {
+            "compatible": False,
+            "issues": [f"Code requires OpenSCAD {required_version}, {current_version} is selected"]
+        }
+
+
 # Convenience functions for easy access
 def detect_openscad_version() -> Optional[str]:
     """Quick version detection - returns version string of preferred installation."""
@@ -12,21 +12,48 @@ import tempfile
 import subprocess
 import base64
 import asyncio
+import contextlib
 import time
+import hashlib
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import logging
-from typing import Optional, Literal, Union, Dict
+from typing import Optional, Literal, Union, Dict, List
 from .openscad_renderer import OpenSCADRenderer
 from .openscad_wasm_renderer import OpenSCADWASMRenderer, HybridOpenSCADRenderer
 from .renderer_config import get_config
 from .realtime_renderer import RealTimeRenderer
+from .render_daemon import RenderDaemonClient
+from .render_scheduler import RenderScheduler, get_render_scheduler
+from .render_history import RenderHistoryStore
+from .render_cost import RenderCostModel, preview_scad
 from .wasm_version_manager import WASMVersionManager
 from .version_manager import OpenSCADVersionManager
-from .migration_engine import MigrationEngine
+from .migration_engine import MigrationEngine, get_scad_feature_manifest
+from .solid_bridge import SolidPythonBridge, find_instanced_subtrees, split_assembly
 from .wasm_http_server import start_wasm_server, stop_wasm_server
+from .tracing import Tracer, Span, current_span, span
 
 logger = logging.getLogger(__name__)
 
+
+class _ViewerRenderPath:
+    """
+    Renderer facade for the instancing bridge: every part and remainder
+    render goes through the viewer's _render_stl, so it gets a scheduler
+    slot, a cost tier, a render span and a history record like any other
+    STL render
+    """
+    
+    def __init__(self, viewer):
+        self.viewer = viewer
+    
+    def render_scad_to_stl(self, scad_code: str) -> bytes:
+        return self.viewer._render_stl(scad_code)
+
+
 class OpenSCADViewer(anywidget.AnyWidget):
     """
     3D-Viewer für SolidPython2-Objekte mit WASM/Local OpenSCAD support
@@ -40,8 +67,11 @@ class OpenSCADViewer(anywidget.AnyWidget):
     # Viewer state traits
     stl_data = traitlets.Unicode("").tag(sync=True)
     scad_code = traitlets.Unicode("").tag(sync=True)  # Raw SCAD code for WASM rendering
+    scad_features = traitlets.Dict({}).tag(sync=True)  # Optional libraries (MCAD, fonts) scad_code needs
     error_message = traitlets.Unicode("").tag(sync=True)
     is_loading = traitlets.Bool(False).tag(sync=True)
+    instanced_parts = traitlets.List([]).tag(sync=True)  # Repeated subtrees: [{stl_data, transforms}] drawn instanced
+    assembly_manifest = traitlets.Dict({}).tag(sync=True)  # Assembly mode: part name -> content hash
     
     # Renderer configuration traits
     renderer_type = traitlets.Unicode("auto").tag(sync=True)  # "local", "wasm", "auto"
@@ -49,12 +79,17 @@ class OpenSCADViewer(anywidget.AnyWidget):
     wasm_supported = traitlets.Bool(True).tag(sync=True)  # Whether WASM is supported
     wasm_enabled = traitlets.Bool(False).tag(sync=True)  # Whether WASM is actively enabled
     wasm_base_url = traitlets.Unicode("").tag(sync=True)  # Base URL for WASM assets
+    wasm_asset_urls = traitlets.Dict({}).tag(sync=True)  # Content-hashed URL per WASM asset
+    render_mode = traitlets.Unicode("on-demand").tag(sync=True)  # "on-demand" or "continuous" redraws
+    shared_renderer = traitlets.Bool(False).tag(sync=True)  # Render through one page-wide WebGL context
     
     # Real-time rendering traits (Phase 3.3b)
     real_time_enabled = traitlets.Bool(False).tag(sync=True)  # Whether real-time rendering is active
     debounce_delay_ms = traitlets.Int(100).tag(sync=True)  # Parameter change debounce delay
     cache_hit_rate = traitlets.Float(0.0).tag(sync=True)  # Current cache hit rate
     render_time_ms = traitlets.Float(0.0).tag(sync=True)  # Last render time in milliseconds
+    render_tier = traitlets.Unicode("full").tag(sync=True)  # "full", "preview" or "auto" (cost-based) STL renders
+    render_estimate = traitlets.Dict({}).tag(sync=True)  # Static cost estimate and tier of the last STL render
     
     # Version management traits (Phase 4.2)
     openscad_version = traitlets.Unicode("auto").tag(sync=True)  # OpenSCAD version to use
@@ -251,6 +286,120 @@ class OpenSCADViewer(anywidget.AnyWidget):
             // PHASE 5.1.2: INTELLIGENT WASM LOADING & CACHING SYSTEM
             // ====================================================================
             
+            /**
+             * Persistent store for compiled WebAssembly modules
+             *
+             * Keeps compiled `WebAssembly.Module`s in IndexedDB keyed by asset digest so
+             * repeat visits skip compilation and go straight to instantiation. Browsers
+             * that refuse to structured-clone modules get the raw bytes stored instead,
+             * which still saves the download.
+             */
+            class CompiledModuleStore {
+                constructor(dbName = 'openscad-wasm-modules', storeName = 'modules') {
+                    this.dbName = dbName;
+                    this.storeName = storeName;
+                    this.enabled = typeof indexedDB !== 'undefined';
+                    this.dbPromise = null;
+                }
+                
+                /**
+                 * Open (and create on first use) the IndexedDB database
+                 * @private
+                 */
+                _open() {
+                    if (!this.enabled) {
+                        return Promise.resolve(null);
+                    }
+                    if (!this.dbPromise) {
+                        this.dbPromise = new Promise((resolve) => {
+                            const request = indexedDB.open(this.dbName, 1);
+                            request.onupgradeneeded = () => {
+                                request.result.createObjectStore(this.storeName);
+                            };
+                            request.onsuccess = () => resolve(request.result);
+                            request.onerror = () => {
+                                console.warn('WASM Module Store: IndexedDB unavailable:', request.error);
+                                this.enabled = false;
+                                resolve(null);
+                            };
+                        });
+                    }
+                    return this.dbPromise;
+                }
+                
+                /**
+                 * Run a single request inside a transaction
+                 * @private
+                 */
+                async _request(mode, operation) {
+                    const db = await this._open();
+                    if (!db) {
+                        return null;
+                    }
+                    return new Promise((resolve, reject) => {
+                        const transaction = db.transaction(this.storeName, mode);
+                        const request = operation(transaction.objectStore(this.storeName));
+                        request.onsuccess = () => resolve(request.result);
+                        request.onerror = () => reject(request.error);
+                    });
+                }
+                
+                /**
+                 * Get a stored entry ({ module } or { bytes })
+                 * @param {string} key - Asset digest
+                 * @returns {Promise<Object|null>} Stored entry or null
+                 */
+                async get(key) {
+                    try {
+                        return (await this._request('readonly', store => store.get(key))) || null;
+                    } catch (error) {
+                        console.warn(`WASM Module Store: Failed to read ${key}:`, error);
+                        return null;
+                    }
+                }
+                
+                /**
+                 * Persist a compiled module, falling back to its bytes if the browser
+                 * cannot serialize WebAssembly.Module
+                 * @param {string} key - Asset digest
+                 * @param {WebAssembly.Module} module - Compiled module
+                 * @param {Function} getBytes - Lazily provides the module bytes
+                 * @returns {Promise<string|null>} 'module', 'bytes' or null
+                 */
+                async put(key, module, getBytes) {
+                    const entry = { timestamp: Date.now() };
+                    try {
+                        await this._request('readwrite', store => store.put({ ...entry, module }, key));
+                        return 'module';
+                    } catch (error) {
+                        if (error && error.name !== 'DataCloneError') {
+                            console.warn(`WASM Module Store: Failed to store ${key}:`, error);
+                            return null;
+                        }
+                    }
+                    try {
+                        const bytes = await getBytes();
+                        await this._request('readwrite', store => store.put({ ...entry, bytes }, key));
+                        return 'bytes';
+                    } catch (error) {
+                        console.warn(`WASM Module Store: Failed to store bytes for ${key}:`, error);
+                        return null;
+                    }
+                }
+                
+                /**
+                 * Remove all stored modules
+                 * @returns {Promise<void>}
+                 */
+                async clear() {
+                    try {
+                        await this._request('readwrite', store => store.clear());
+                    } catch (error) {
+                        console.warn('WASM Module Store: Failed to clear:', error);
+                    }
+                }
+            }
+            
             class WASMCache {
                 constructor() {
                     this.cache = new Map();
@@ -259,8 +408,14 @@ class OpenSCADViewer(anywidget.AnyWidget):
                         hits: 0,
                         misses: 0,
                         loads: 0,
-                        errors: 0
+                        errors: 0,
+                        compiledHits: 0,
+                        compiled: 0
                     };
+                    
+                    // Compiled modules persist across page loads, keyed by digest
+                    this.moduleStore = new CompiledModuleStore();
+                    this.compiledModules = new Map();
                     this.maxCacheSize = 50 * 1024 * 1024; // 50MB cache limit
                     this.maxCacheAge = 7 * 24 * 60 * 60 * 1000; // 7 days
                     
@@ -329,16 +484,10 @@ class OpenSCADViewer(anywidget.AnyWidget):
                             type: response.headers.get('content-type')
                         });
                         
-                        // Use streaming instantiation for better performance
-                        let module;
-                        if (typeof WebAssembly.instantiateStreaming === 'function') {
-                            console.log('🚀 Using WebAssembly.instantiateStreaming');
-                            module = await WebAssembly.instantiateStreaming(response, options.imports || {});
-                        } else {
-                            console.log('🚀 Fallback to WebAssembly.instantiate');
-                            const arrayBuffer = await response.arrayBuffer();
-                            module = await WebAssembly.instantiate(arrayBuffer, options.imports || {});
-                        }
+                        // Compile (streaming, or from IndexedDB) then instantiate
+                        const compiledModule = await this.getCompiledModule(url, { ...options, response });
+                        const instance = await WebAssembly.instantiate(compiledModule, options.imports || {});
+                        const module = { module: compiledModule, instance };
                         
                         const loadTime = performance.now() - startTime;
                         console.log(`🚀 WASM loaded in ${loadTime.toFixed(2)}ms: ${cacheKey}`);
@@ -373,6 +522,92 @@ class OpenSCADViewer(anywidget.AnyWidget):
                     }
                 }
                 
+                moduleKey(url, digest = null, response = null) {
+                    if (digest) {
+                        return `sha256:${digest}`;
+                    }
+                    // Content-hashed asset URL, e.g. openscad.<digest>.wasm
+                    const match = /\\.([0-9a-f]{16})\\.wasm(?:[?#]|$)/.exec(url);
+                    if (match) {
+                        return `sha256:${match[1]}`;
+                    }
+                    const etag = response && response.headers.get('etag');
+                    return etag ? `${url}#${etag}` : null;
+                }
+                
+                async getCompiledModule(url, options = {}) {
+                    const key = this.moduleKey(url, options.digest);
+                    const memoKey = key || url;
+                    if (this.compiledModules.has(memoKey)) {
+                        this.cacheStats.compiledHits++;
+                        return this.compiledModules.get(memoKey);
+                    }
+                    
+                    const module = await this._loadCompiledModule(url, key, options.response);
+                    this.compiledModules.set(memoKey, module);
+                    return module;
+                }
+                
+                async _getStoredModule(key) {
+                    const entry = await this.moduleStore.get(key);
+                    if (entry && entry.module instanceof WebAssembly.Module) {
+                        this.cacheStats.compiledHits++;
+                        console.log(`🚀 WASM compiled module restored from IndexedDB: ${key}`);
+                        return entry.module;
+                    }
+                    if (entry && entry.bytes) {
+                        return WebAssembly.compile(entry.bytes);
+                    }
+                    return null;
+                }
+                
+                async _loadCompiledModule(url, key, response = null) {
+                    const stored = key ? await this._getStoredModule(key) : null;
+                    if (stored) {
+                        if (response && response.body) {
+                            response.body.cancel().catch(() => {});
+                        }
+                        return stored;
+                    }
+                    
+                    if (!response) {
+                        response = await fetch(url);
+                        if (!response.ok) {
+                            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                        }
+                    }
+                    
+                    // Without a digest in the URL, the server ETag identifies the content
+                    const storeKey = key || this.moduleKey(url, null, response);
+                    if (!key && storeKey) {
+                        const storedByEtag = await this._getStoredModule(storeKey);
+                        if (storedByEtag) {
+                            response.body && response.body.cancel().catch(() => {});
+                            return storedByEtag;
+                        }
+                    }
+                    
+                    const copy = storeKey ? response.clone() : null;
+                    const contentType = response.headers.get('content-type') || '';
+                    let compiledModule;
+                    if (typeof WebAssembly.compileStreaming === 'function' && contentType.includes('application/wasm')) {
+                        console.log('🚀 Using WebAssembly.compileStreaming');
+                        compiledModule = await WebAssembly.compileStreaming(response);
+                    } else {
+                        console.log('🚀 Fallback to WebAssembly.compile');
+                        compiledModule = await WebAssembly.compile(await response.arrayBuffer());
+                    }
+                    this.cacheStats.compiled++;
+                    
+                    if (storeKey) {
+                        const storedAs = await this.moduleStore.put(storeKey, compiledModule, () => copy.arrayBuffer());
+                        if (storedAs !== 'bytes' && copy.body) {
+                            copy.body.cancel().catch(() => {});
+                        }
+                    }
+                    return compiledModule;
+                }
+                
                 enforceMemoryLimits() {
                     const entries = Array.from(this.cache.entries());
                     const totalSize = entries.reduce((sum, [, entry]) => sum + (entry.size || 0), 0);
@@ -485,7 +720,8 @@ class OpenSCADViewer(anywidget.AnyWidget):
                         return geometry;
                     }
                     
-                    const currentTriangles = geometry.attributes.position.count / 3;
+                    // Pooled geometries only draw part of their buffers
+                    const currentTriangles = Math.min(geometry.attributes.position.count, geometry.drawRange.count) / 3;
                     console.log(`🎨 Optimizing geometry: ${currentTriangles} → target: ${targetTriangles} triangles`);
                     
                     if (currentTriangles <= targetTriangles) {
@@ -503,8 +739,9 @@ class OpenSCADViewer(anywidget.AnyWidget):
                 
                 simplifyGeometry(geometry, targetTriangles) {
                     // Create a simplified version using vertex reduction
-                    const positions = geometry.attributes.position.array;
-                    const normals = geometry.attributes.normal ? geometry.attributes.normal.array : null;
+                    const usedLength = Math.min(geometry.attributes.position.count, geometry.drawRange.count) * 3;
+                    const positions = geometry.attributes.position.array.subarray(0, usedLength);
+                    const normals = geometry.attributes.normal ? geometry.attributes.normal.array.subarray(0, usedLength) : null;
                     
                     const currentTriangles = positions.length / 9; // 3 vertices * 3 coordinates
                     const reductionRatio = Math.min(targetTriangles / currentTriangles, 1.0);
@@ -535,10 +772,10 @@ class OpenSCADViewer(anywidget.AnyWidget):
                     }
                     
                     const simplifiedGeometry = new THREE.BufferGeometry();
-                    simplifiedGeometry.setAttribute('position', new THREE.Float32Array(newPositions));
+                    simplifiedGeometry.setAttribute('position', new THREE.BufferAttribute(new Float32Array(newPositions), 3));
                     
                     if (newNormals) {
-                        simplifiedGeometry.setAttribute('normal', new THREE.Float32Array(newNormals));
+                        simplifiedGeometry.setAttribute('normal', new THREE.BufferAttribute(new Float32Array(newNormals), 3));
                     } else {
                         simplifiedGeometry.computeVertexNormals();
                     }
@@ -577,8 +814,8 @@ class OpenSCADViewer(anywidget.AnyWidget):
                     // Register LOD with memory manager
                     memoryManager.register(lod, (lodMesh) => {
                         lodMesh.levels.forEach(level => {
-                            if (level.object.geometry) level.object.geometry.dispose();
-                            if (level.object.material) level.object.material.dispose();
+                            if (level.object.geometry) releaseMeshGeometry(level.object.geometry);
+                            if (level.object.material) releaseMeshMaterial(level.object.material);
                         });
                         console.log('🎨 LOD mesh disposed');
                     }, 'lod-mesh');
@@ -608,32 +845,36 @@ class OpenSCADViewer(anywidget.AnyWidget):
                 }
                 
                 startPerformanceMonitoring() {
-                    let lastTime = performance.now();
-                    let frameCount = 0;
+                    // Fed by recordFrame() from the render loop, so an idle
+                    // viewer schedules no frames of its own
+                    this.lastFrameAt = 0;
+                    this.sampleFrames = 0;
+                    this.sampleTime = 0;
+                    console.log('🎨 Performance monitoring started');
+                }
                     
-                    const monitor = () => {
-                        const now = performance.now();
-                        const deltaTime = now - lastTime;
+                recordFrame(now = performance.now()) {
+                    const deltaTime = now - this.lastFrameAt;
+                    this.lastFrameAt = now;
                         
-                        if (deltaTime >= 1000) { // Update every second
-                            this.performanceMonitor.frameRate = (frameCount * 1000) / deltaTime;
-                            this.performanceMonitor.frameTime = deltaTime / frameCount;
+                    // Gaps between on-demand frames are idle time, not slow frames
+                    if (deltaTime > 100) return;
                             
-                            // Log performance if it's concerning
-                            if (this.performanceMonitor.frameRate < 30) {
-                                console.warn(`🎨 Low framerate: ${this.performanceMonitor.frameRate.toFixed(1)} FPS`);
-                            }
+                    this.sampleFrames++;
+                    this.sampleTime += deltaTime;
                             
-                            frameCount = 0;
-                            lastTime = now;
+                    if (this.sampleTime >= 1000) { // Update every second of continuous rendering
+                        this.performanceMonitor.frameRate = (this.sampleFrames * 1000) / this.sampleTime;
+                        this.performanceMonitor.frameTime = this.sampleTime / this.sampleFrames;
+                        
+                        // Log performance if it's concerning
+                        if (this.performanceMonitor.frameRate < 30) {
+                            console.warn(`🎨 Low framerate: ${this.performanceMonitor.frameRate.toFixed(1)} FPS`);
                         }
                         
-                        frameCount++;
-                        requestAnimationFrame(monitor);
-                    };
-                    
-                    requestAnimationFrame(monitor);
-                    console.log('🎨 Performance monitoring started');
+                        this.sampleFrames = 0;
+                        this.sampleTime = 0;
+                    }
                 }
                 
                 getPerformanceStats() {
@@ -674,6 +915,14 @@ class OpenSCADViewer(anywidget.AnyWidget):
             
             // Will be initialized after scene creation
             let renderingOptimizer = null;
+            let renderLoop = null;
+            
+            // Ask for a redraw; every view change goes through here
+            function requestRender() {
+                if (renderLoop) {
+                    renderLoop.requestRender();
+                }
+            }
             
             // ====================================================================
             // PHASE 5.2.2: ENHANCED ERROR HANDLING & RECOVERY SUGGESTIONS
@@ -1586,6 +1835,11 @@ ${this.errorHistory.map((err, i) =>
                     this.frameTimes = [];
                     this.frameTimeWindow = 60; // Track last 60 frames
                     
+                    // Rendered frame tracking (on-demand loop reports each draw)
+                    this.renderedFrames = 0;
+                    this.recentRenders = [];
+                    this.idleGap = 100; // ms between frames that counts as idle, not slow
+                    
                     // Memory tracking
                     this.memoryUsage = { used: 0, total: 0 };
                     this.memoryHistory = [];
@@ -1607,6 +1861,11 @@ ${this.errorHistory.map((err, i) =>
                         textures: 0
                     };
                     
+                    // STL parse tracking (latest parse plus running totals)
+                    this.parseStats = null;
+                    this.parseHistory = [];
+                    this.maxParseHistory = 20;
+                    
                     // Performance HUD
                     this.hudVisible = false;
                     this.performanceLevel = 'excellent';
@@ -1682,41 +1941,61 @@ ${this.errorHistory.map((err, i) =>
                 startMonitoring() {
                     if (!this.enabled) return;
                     
-                    // FPS monitoring using requestAnimationFrame
-                    const monitorFrame = (currentTime) => {
-                        if (this.lastFrameTime) {
-                            this.frameTime = currentTime - this.lastFrameTime;
-                            this.fps = 1000 / this.frameTime;
+                    // Frame timing comes from recordFrame(); polling with
+                    // requestAnimationFrame would keep idle viewers busy
                             
-                            // Store frame time history
-                            this.frameTimes.push(this.frameTime);
-                            if (this.frameTimes.length > this.frameTimeWindow) {
-                                this.frameTimes.shift();
-                            }
-                        }
-                        
-                        this.lastFrameTime = currentTime;
-                        
-                        // Update HUD if visible
+                    // Memory monitoring (every 2 seconds)
+                    this.memoryInterval = setInterval(() => {
+                        this.updateMemoryStats();
                         if (this.hudVisible) {
                             this.updateHUD();
                         }
+                    }, 2000);
+                }
+                
+                recordFrame(currentTime = performance.now()) {
+                    if (!this.enabled) return;
+                    
+                    const interval = currentTime - this.lastFrameTime;
+                    this.lastFrameTime = currentTime;
+                    this.renderedFrames++;
+                    
+                    this.recentRenders.push(currentTime);
+                    while (this.recentRenders.length > 0 && currentTime - this.recentRenders[0] > 1000) {
+                        this.recentRenders.shift();
+                    }
+                    
+                    // Only back-to-back frames say something about frame time
+                    if (interval <= this.idleGap) {
+                        this.frameTime = interval;
+                        this.fps = 1000 / this.frameTime;
+                        
+                        // Store frame time history
+                        this.frameTimes.push(this.frameTime);
+                        if (this.frameTimes.length > this.frameTimeWindow) {
+                            this.frameTimes.shift();
+                        }
                         
                         // Check performance thresholds
                         this.checkPerformanceThresholds();
+                    }
                         
-                        // Continue monitoring
-                        if (this.enabled) {
-                            requestAnimationFrame(monitorFrame);
-                        }
+                    // Update HUD if visible
+                    if (this.hudVisible) {
+                        this.updateHUD();
+                    }
+                }
+                
+                getRenderLoopStats(currentTime = performance.now()) {
+                    const rendersPerSecond = this.recentRenders.filter(t => currentTime - t <= 1000).length;
+                    return {
+                        mode: renderLoop ? renderLoop.mode : 'unknown',
+                        paused: renderLoop ? !renderLoop.visible : false,
+                        renderedFrames: this.renderedFrames,
+                        rendersPerSecond: rendersPerSecond,
+                        idle: rendersPerSecond === 0,
+                        idleFor: this.renderedFrames > 0 ? currentTime - this.lastFrameTime : 0
                     };
-                    
-                    requestAnimationFrame(monitorFrame);
-                    
-                    // Memory monitoring (every 2 seconds)
-                    setInterval(() => {
-                        this.updateMemoryStats();
-                    }, 2000);
                 }
                 
                 updateMemoryStats() {
@@ -1863,6 +2142,8 @@ ${this.errorHistory.map((err, i) =>
                     };
                     
                     const perfColor = getPerformanceColor(this.performanceLevel);
+                    const loopStats = this.getRenderLoopStats();
+                    const loopState = loopStats.paused ? 'paused' : (loopStats.idle ? 'idle' : loopStats.mode);
                     
                     this.performanceHUD.innerHTML = `
                         <div style="color: ${perfColor}; font-weight: bold; margin-bottom: 4px;">
@@ -1871,6 +2152,9 @@ ${this.errorHistory.map((err, i) =>
                         <div>FPS: <span style="color: ${perfColor}">${Math.round(avgFPS)}</span></div>
                         <div>Frame: <span style="color: ${perfColor}">${avgFrameTime.toFixed(1)}ms</span></div>
                         <div>Memory: <span style="color: #60a5fa">${this.memoryUsage.used}MB</span></div>
+                        <div>Renders: <span style="color: #60a5fa">${loopStats.rendersPerSecond}/s</span> (${loopState})</div>
+                        ${this.parseStats ? `<div>Parse: <span style="color: #60a5fa">${this.parseStats.parseTime.toFixed(1)}ms</span> (${this.parseStats.mode})</div>
+                        <div style="font-size: 9px; color: #9ca3af;">${Math.round(this.parseStats.trianglesPerSecond / 1000)}k tri/s</div>` : ''}
                         <div style="font-size: 9px; margin-top: 4px; color: #9ca3af;">
                             Level: ${this.performanceLevel.toUpperCase()}
                         </div>
@@ -1897,7 +2181,10 @@ ${this.errorHistory.map((err, i) =>
                         memory: this.memoryUsage,
                         memoryHistory: this.memoryHistory.slice(-10), // Last 10 entries
                         level: this.performanceLevel,
-                        renderStats: this.renderStats
+                        renderStats: this.renderStats,
+                        renderLoop: this.getRenderLoopStats(),
+                        parse: this.parseStats,
+                        parseHistory: this.parseHistory.slice()
                     };
                 }
                 
@@ -1905,9 +2192,32 @@ ${this.errorHistory.map((err, i) =>
                     this.renderStats = { drawCalls, triangles, vertices, textures };
                 }
                 
+                recordParse(stats) {
+                    this.parseStats = {
+                        ...stats,
+                        trianglesPerSecond: stats.parseTime > 0 ? stats.triangles / (stats.parseTime / 1000) : 0,
+                        timestamp: Date.now()
+                    };
+                    
+                    this.parseHistory.push(this.parseStats);
+                    if (this.parseHistory.length > this.maxParseHistory) {
+                        this.parseHistory.shift();
+                    }
+                    
+                    console.log(`📊 STL parsed: ${stats.triangles} triangles in ${stats.parseTime.toFixed(1)}ms (${stats.mode})`);
+                    if (this.hudVisible) {
+                        this.updateHUD();
+                    }
+                }
+                
                 dispose() {
                     this.enabled = false;
                     
+                    if (this.memoryInterval) {
+                        clearInterval(this.memoryInterval);
+                        this.memoryInterval = null;
+                    }
+                    
                     if (this.performanceHUD && this.performanceHUD.parentNode) {
                         this.performanceHUD.parentNode.removeChild(this.performanceHUD);
                     }
@@ -2113,6 +2423,7 @@ ${this.errorHistory.map((err, i) =>
                     // Apply to renderer if available
                     if (window.renderer && renderer.setPixelRatio) {
                         renderer.setPixelRatio(window.devicePixelRatio * quality.renderScale);
+                        requestRender();
                     }
                     
                     // Apply antialiasing if supported
@@ -2618,6 +2929,47 @@ ${this.errorHistory.map((err, i) =>
                     console.log(`🛠️ Cached geometry: ${key} (cache size: ${this.geometryPool.size})`);
                 }
                 
+                acquireGeometry(vertexCount) {
+                    // Smallest retired STL buffer that fits without wasting more than 4x
+                    let bestKey = null;
+                    let bestCapacity = Infinity;
+                    
+                    for (const [key, geometry] of this.geometryPool) {
+                        if (!key.startsWith('stl-buffer:')) continue;
+                        const capacity = geometry.userData.capacity;
+                        if (capacity >= vertexCount && capacity <= vertexCount * 4 && capacity < bestCapacity) {
+                            bestKey = key;
+                            bestCapacity = capacity;
+                        }
+                    }
+                    
+                    if (!bestKey) return null;
+                    
+                    const geometry = this.geometryPool.get(bestKey);
+                    this.geometryPool.delete(bestKey);
+                    this.cacheAccessTimes.delete(bestKey);
+                    console.log(`🛠️ Reusing pooled geometry: capacity ${bestCapacity} vertices`);
+                    return geometry;
+                }
+                
+                releaseGeometry(geometry) {
+                    // Keep the GPU buffers alive so the next model can reuse them
+                    const key = `stl-buffer:${geometry.uuid}`;
+                    if (!this.geometryPool.has(key)) {
+                        this.cacheGeometry(key, geometry);
+                    }
+                }
+                
+                removeCachedGeometry(key) {
+                    const geometry = this.geometryPool.get(key);
+                    // Pooled buffers are owned by the pool once released
+                    if (geometry && geometry.userData && geometry.userData.pooledBuffer) {
+                        geometry.dispose();
+                    }
+                    this.geometryPool.delete(key);
+                    this.cacheAccessTimes.delete(key);
+                }
+                
                 evictLRUCache() {
                     // Remove least recently used items
                     const sortedEntries = Array.from(this.cacheAccessTimes.entries())
@@ -2626,8 +2978,7 @@ ${this.errorHistory.map((err, i) =>
                     const toRemove = sortedEntries.slice(0, Math.floor(this.maxCacheSize * 0.25)); // Remove 25%
                     
                     toRemove.forEach(([key]) => {
-                        this.geometryPool.delete(key);
-                        this.cacheAccessTimes.delete(key);
+                        this.removeCachedGeometry(key);
                     });
                     
                     console.log(`🛠️ Cache eviction: removed ${toRemove.length} items`);
@@ -2701,8 +3052,7 @@ ${this.errorHistory.map((err, i) =>
                         });
                         
                         expiredKeys.forEach(key => {
-                            this.geometryPool.delete(key);
-                            this.cacheAccessTimes.delete(key);
+                            this.removeCachedGeometry(key);
                         });
                         
                         if (expiredKeys.length > 0) {
@@ -2721,7 +3071,7 @@ ${this.errorHistory.map((err, i) =>
                 
                 performAggressiveCleanup() {
                     // Clear all caches
-                    this.geometryPool.clear();
+                    Array.from(this.geometryPool.keys()).forEach(key => this.removeCachedGeometry(key));
                     this.materialPool.clear();
                     this.texturePool.clear();
                     this.cacheAccessTimes.clear();
@@ -4025,18 +4375,170 @@ ${this.errorHistory.map((err, i) =>
             const rect = container.getBoundingClientRect();
             const camera = new THREE.PerspectiveCamera(45, rect.width / rect.height, 0.1, 1000);
             
+            // ===== Shared WebGL renderer =====
+            // One offscreen context for every viewer on the page: each viewer
+            // renders into a scissored region and copies it to its own canvas.
+            // Avoids the per-page context limit and shares shader programs.
+            class SharedWebGLRenderer {
+                constructor(options) {
+                    this.canvas = document.createElement('canvas');
+                    this.renderer = new THREE.WebGLRenderer({ ...options, canvas: this.canvas });
+                    this.renderer.setPixelRatio(1);  // Views size regions in device pixels
+                    this.renderer.shadowMap.enabled = false;
+                    this.views = new Set();
+                    this.width = 0;
+                    this.height = 0;
+                    this.contextLost = false;
+                    
+                    this.canvas.addEventListener('webglcontextlost', (event) => {
+                        event.preventDefault();  // Allow the browser to restore the context
+                        this.contextLost = true;
+                        console.warn(`⚠️ Shared WebGL context lost (${this.views.size} viewers paused)`);
+                    });
+                    this.canvas.addEventListener('webglcontextrestored', () => {
+                        this.contextLost = false;
+                        console.log('✅ Shared WebGL context restored');
+                        this.views.forEach(view => view.onContextRestored());
+                    });
+                }
+                
+                static acquire(options) {
+                    // Kept on window so every widget instance finds the same context
+                    let shared = window.__openscadSharedRenderer;
+                    if (!shared || shared.disposed) {
+                        shared = new SharedWebGLRenderer(options);
+                        window.__openscadSharedRenderer = shared;
+                    }
+                    return shared;
+                }
+                
+                createView(onContextRestored) {
+                    const view = new SharedRendererView(this, onContextRestored);
+                    this.views.add(view);
+                    return view;
+                }
+                
+                releaseView(view) {
+                    this.views.delete(view);
+                    if (this.views.size === 0) {
+                        this.dispose();
+                    }
+                }
+                
+                ensureSize(width, height) {
+                    // Only grow, so viewers of different sizes do not thrash the drawing buffer
+                    if (width <= this.width && height <= this.height) return;
+                    this.width = Math.max(width, this.width);
+                    this.height = Math.max(height, this.height);
+                    this.renderer.setSize(this.width, this.height, false);
+                }
+                
+                renderView(view, scene, camera) {
+                    if (this.contextLost || this.disposed) return false;
+                    
+                    const width = view.domElement.width;
+                    const height = view.domElement.height;
+                    if (width === 0 || height === 0) return false;
+                    
+                    this.ensureSize(width, height);
+                    
+                    const renderer = this.renderer;
+                    renderer.toneMapping = view.toneMapping;
+                    renderer.sortObjects = view.sortObjects;
+                    renderer.setViewport(0, 0, width, height);
+                    renderer.setScissor(0, 0, width, height);
+                    renderer.setScissorTest(true);
+                    renderer.render(scene, camera);
+                    
+                    // The WebGL origin is bottom-left; copy in the same task, before
+                    // the drawing buffer is presented and cleared
+                    view.context.drawImage(this.canvas,
+                        0, this.height - height, width, height,
+                        0, 0, width, height);
+                    return true;
+                }
+                
+                dispose() {
+                    this.disposed = true;
+                    this.renderer.dispose();
+                    if (window.__openscadSharedRenderer === this) {
+                        window.__openscadSharedRenderer = null;
+                    }
+                    console.log('🧠 Shared WebGL renderer disposed');
+                }
+            }
+            
+            // Per-viewer stand-in for THREE.WebGLRenderer backed by the shared context
+            class SharedRendererView {
+                constructor(shared, onContextRestored) {
+                    this.shared = shared;
+                    this.onContextRestored = onContextRestored || (() => {});
+                    this.domElement = document.createElement('canvas');
+                    this.context = this.domElement.getContext('2d');
+                    this.context.globalCompositeOperation = 'copy';
+                    this.width = 0;
+                    this.height = 0;
+                    this.pixelRatio = 1;
+                    this.shadowMap = { enabled: false };
+                    this.sortObjects = true;
+                    this.toneMapping = THREE.NoToneMapping;
+                }
+                
+                get info() {
+                    return this.shared.renderer.info;
+                }
+                
+                setSize(width, height) {
+                    this.width = width;
+                    this.height = height;
+                    this.domElement.style.width = `${width}px`;
+                    this.domElement.style.height = `${height}px`;
+                    this.updateCanvasSize();
+                }
+                
+                setPixelRatio(pixelRatio) {
+                    this.pixelRatio = pixelRatio;
+                    this.updateCanvasSize();
+                }
+                
+                getPixelRatio() {
+                    return this.pixelRatio;
+                }
+                
+                updateCanvasSize() {
+                    this.domElement.width = Math.floor(this.width * this.pixelRatio);
+                    this.domElement.height = Math.floor(this.height * this.pixelRatio);
+                    // Resizing resets the 2D context state
+                    this.context.globalCompositeOperation = 'copy';
+                }
+                
+                render(scene, camera) {
+                    return this.shared.renderView(this, scene, camera);
+                }
+                
+                dispose() {
+                    this.shared.releaseView(this);
+                }
+            }
+            
             // Renderer - optimiert gegen Z-Fighting und Color-Artefakte
+            const rendererOptions = {
+                antialias: true,
+                alpha: true,
+                powerPreference: "high-performance",
+                precision: "highp",
+                stencil: false,
+                depth: true,
+                logarithmicDepthBuffer: true  // Better depth precision
+            };
             let renderer;
             try {
-                renderer = new THREE.WebGLRenderer({ 
-                    antialias: true,
-                    alpha: true,
-                    powerPreference: "high-performance",
-                    precision: "highp",
-                    stencil: false,
-                    depth: true,
-                    logarithmicDepthBuffer: true  // Better depth precision
-                });
+                if (model.get("shared_renderer")) {
+                    renderer = SharedWebGLRenderer.acquire(rendererOptions).createView(() => requestRender());
+                    console.log('🎨 Using shared WebGL context');
+                } else {
+                    renderer = new THREE.WebGLRenderer(rendererOptions);
+                }
             } catch (webglError) {
                 errorHandler.handleError(webglError, 'webgl', () => {
                     // Retry with fallback options
@@ -4134,6 +4636,7 @@ ${this.errorHistory.map((err, i) =>
                 camera.position.y = cameraDistance * Math.cos(cameraPhi);
                 camera.position.z = cameraDistance * Math.sin(cameraPhi) * Math.sin(cameraTheta);
                 camera.lookAt(0, 0, 0);
+                requestRender();
             }
             
             renderer.domElement.addEventListener('mousedown', (e) => {
@@ -4172,16 +4675,32 @@ ${this.errorHistory.map((err, i) =>
             let currentMesh = null;
             let currentMeshResourceId = null;
             
+            // Pooled STL geometries go back to the resource pool instead of
+            // being disposed; the shared STL material is never disposed here
+            function releaseMeshGeometry(geometry) {
+                if (geometry.userData && geometry.userData.pooledBuffer && resourceOptimizer) {
+                    resourceOptimizer.releaseGeometry(geometry);
+                } else {
+                    geometry.dispose();
+                }
+            }
+            
+            function releaseMeshMaterial(material) {
+                if (!material.userData || !material.userData.shared) {
+                    material.dispose();
+                }
+            }
+            
             // Helper function to register mesh with memory manager
             function registerMesh(mesh, category = 'mesh') {
                 const resourceId = memoryManager.register(mesh, (m) => {
                     // Clean up the main mesh
-                    if (m.geometry) m.geometry.dispose();
+                    if (m.geometry) releaseMeshGeometry(m.geometry);
                     if (m.material) {
                         if (Array.isArray(m.material)) {
-                            m.material.forEach(mat => mat.dispose());
+                            m.material.forEach(mat => releaseMeshMaterial(mat));
                         } else {
-                            m.material.dispose();
+                            releaseMeshMaterial(m.material);
                         }
                     }
                     
@@ -4215,8 +4734,8 @@ ${this.errorHistory.map((err, i) =>
                 // Clean up manually if memory manager didn't handle it
                 if (currentMesh) {
                     scene.remove(currentMesh);
-                    if (currentMesh.geometry) currentMesh.geometry.dispose();
-                    if (currentMesh.material) currentMesh.material.dispose();
+                    if (currentMesh.geometry) releaseMeshGeometry(currentMesh.geometry);
+                    if (currentMesh.material) releaseMeshMaterial(currentMesh.material);
                 }
                 
                 // Set new mesh and apply optimizations
@@ -4224,7 +4743,8 @@ ${this.errorHistory.map((err, i) =>
                 if (newMesh) {
                     // Apply LOD optimization if rendering optimizer is available and mesh is complex
                     if (renderingOptimizer && newMesh.geometry && newMesh.geometry.attributes.position) {
-                        const triangleCount = newMesh.geometry.attributes.position.count / 3;
+                        const geometry = newMesh.geometry;
+                        const triangleCount = Math.min(geometry.attributes.position.count, geometry.drawRange.count) / 3;
                         console.log(`🎨 Mesh has ${triangleCount} triangles`);
                         
                         if (triangleCount > 10000) { // Only apply LOD for complex meshes
@@ -4244,9 +4764,13 @@ ${this.errorHistory.map((err, i) =>
                         currentMeshResourceId = registerMesh(newMesh, category);
                     }
                 }
+                
+                requestRender();
             }
             
             // STL Parser (nach Three.js STLLoader)
+            // Fills preallocated typed arrays so results can be transferred
+            // out of the parse worker without copying
             class STLParser {
                 static parseSTL(data) {
                     if (data instanceof ArrayBuffer) {
@@ -4256,34 +4780,58 @@ ${this.errorHistory.map((err, i) =>
                     }
                 }
                 
+                static decodeBase64(base64STL) {
+                    const binaryString = atob(base64STL);
+                    const bytes = new Uint8Array(binaryString.length);
+                    for (let i = 0; i < binaryString.length; i++) {
+                        bytes[i] = binaryString.charCodeAt(i);
+                    }
+                    return bytes;
+                }
+                
+                static parse(bytes) {
+                    if (bytes.length >= 84) {
+                        try {
+                            return this.parseBinary(bytes.buffer);
+                        } catch (e) {
+                            // Not a binary STL, fall through to ASCII
+                        }
+                    }
+                    return this.parseASCII(new TextDecoder('utf-8').decode(bytes));
+                }
+                
                 static parseBinary(data) {
                     const reader = new DataView(data);
                     const faces = reader.getUint32(80, true);
                     
+                    // Check the declared size before allocating: ASCII files
+                    // read as binary declare absurd face counts
+                    if (84 + faces * 50 > data.byteLength) {
+                        throw new Error(`Binary STL truncated: ${faces} faces declared`);
+                    }
+                    
                     console.log(`📦 Parsing binary STL: ${faces} faces`);
                     
-                    const vertices = [];
-                    const normals = [];
+                    const vertices = new Float32Array(faces * 9);
+                    const normals = new Float32Array(faces * 9);
+                    let offset = 84;
+                    let index = 0;
                     
-                    for (let face = 0; face < faces; face++) {
-                        const start = 84 + face * 50;
-                        
+                    for (let face = 0; face < faces; face++, offset += 50) {
                         // Normal vector
-                        const normalX = reader.getFloat32(start, true);
-                        const normalY = reader.getFloat32(start + 4, true);
-                        const normalZ = reader.getFloat32(start + 8, true);
+                        const normalX = reader.getFloat32(offset, true);
+                        const normalY = reader.getFloat32(offset + 4, true);
+                        const normalZ = reader.getFloat32(offset + 8, true);
                         
                         // 3 vertices
-                        for (let i = 0; i < 3; i++) {
-                            const vertexstart = start + 12 + i * 12;
+                        for (let i = 0, vertexStart = offset + 12; i < 3; i++, vertexStart += 12, index += 3) {
+                            vertices[index] = reader.getFloat32(vertexStart, true);
+                            vertices[index + 1] = reader.getFloat32(vertexStart + 4, true);
+                            vertices[index + 2] = reader.getFloat32(vertexStart + 8, true);
                             
-                            vertices.push(
-                                reader.getFloat32(vertexstart, true),
-                                reader.getFloat32(vertexstart + 4, true),
-                                reader.getFloat32(vertexstart + 8, true)
-                            );
-                            
-                            normals.push(normalX, normalY, normalZ);
+                            normals[index] = normalX;
+                            normals[index + 1] = normalY;
+                            normals[index + 2] = normalZ;
                         }
                     }
                     
@@ -4293,55 +4841,69 @@ ${this.errorHistory.map((err, i) =>
                 static parseASCII(data) {
                     console.log("📄 Parsing ASCII STL");
                     
-                    const vertices = [];
-                    const normals = [];
-                    const lines = data.split('\\n');
-                    let currentNormal = [0, 0, 1];
-                    let currentVertices = [];
-                    
-                    for (let line of lines) {
-                        line = line.trim();
-                        
-                        if (line.startsWith('facet normal')) {
-                            const parts = line.split(/\\s+/);
-                            currentNormal = [
-                                parseFloat(parts[2]) || 0,
-                                parseFloat(parts[3]) || 0, 
-                                parseFloat(parts[4]) || 0
-                            ];
-                            currentVertices = [];
-                        }
-                        else if (line.startsWith('vertex')) {
-                            const parts = line.split(/\\s+/);
-                            const vertex = [
-                                parseFloat(parts[1]) || 0,
-                                parseFloat(parts[2]) || 0,
-                                parseFloat(parts[3]) || 0
-                            ];
-                            currentVertices.push(vertex);
-                        }
-                        else if (line.startsWith('endloop')) {
-                            if (currentVertices.length === 3) {
-                                for (let i = 0; i < 3; i++) {
-                                    vertices.push(currentVertices[i][0], currentVertices[i][1], currentVertices[i][2]);
-                                    normals.push(currentNormal[0], currentNormal[1], currentNormal[2]);
-                                }
+                    // Grow-by-doubling typed arrays instead of per-value pushes
+                    let vertices = new Float32Array(9 * 1024);
+                    let normals = new Float32Array(9 * 1024);
+                    let length = 0;
+                    const facet = [0, 0, 0, 0, 0, 0, 0, 0, 0];
+                    let normalX = 0, normalY = 0, normalZ = 1;
+                    let facetVertices = 0;
+                    
+                    const pattern = /(facet normal|vertex)\\s+(\\S+)\\s+(\\S+)\\s+(\\S+)|endloop/g;
+                    let match;
+                    while ((match = pattern.exec(data)) !== null) {
+                        if (match[1] === 'facet normal') {
+                            normalX = parseFloat(match[2]) || 0;
+                            normalY = parseFloat(match[3]) || 0;
+                            normalZ = parseFloat(match[4]) || 0;
+                            facetVertices = 0;
+                        } else if (match[1] === 'vertex') {
+                            if (facetVertices < 3) {
+                                facet[facetVertices * 3] = parseFloat(match[2]) || 0;
+                                facet[facetVertices * 3 + 1] = parseFloat(match[3]) || 0;
+                                facet[facetVertices * 3 + 2] = parseFloat(match[4]) || 0;
+                            }
+                            facetVertices++;
+                        } else if (match[0] === 'endloop' && facetVertices === 3) {
+                            if (length + 9 > vertices.length) {
+                                const grownVertices = new Float32Array(vertices.length * 2);
+                                const grownNormals = new Float32Array(normals.length * 2);
+                                grownVertices.set(vertices);
+                                grownNormals.set(normals);
+                                vertices = grownVertices;
+                                normals = grownNormals;
                             }
+                            for (let i = 0; i < 9; i += 3) {
+                                vertices[length + i] = facet[i];
+                                vertices[length + i + 1] = facet[i + 1];
+                                vertices[length + i + 2] = facet[i + 2];
+                                normals[length + i] = normalX;
+                                normals[length + i + 1] = normalY;
+                                normals[length + i + 2] = normalZ;
+                            }
+                            length += 9;
                         }
                     }
                     
-                    console.log(`📄 ASCII STL parsed: ${vertices.length/3} vertices`);
-                    return { vertices, normals };
+                    console.log(`📄 ASCII STL parsed: ${length/3} vertices`);
+                    // Copy into exact-size buffers so transfers stay minimal
+                    return { vertices: vertices.slice(0, length), normals: normals.slice(0, length) };
                 }
                 
                 static createBufferGeometry(parsed) {
                     const geometry = new THREE.BufferGeometry();
                     
-                    geometry.setAttribute('position', 
-                        new THREE.BufferAttribute(new Float32Array(parsed.vertices), 3));
+                    // Typed arrays are used as-is, without another copy
+                    const positions = parsed.vertices instanceof Float32Array
+                        ? parsed.vertices
+                        : new Float32Array(parsed.vertices);
+                    geometry.setAttribute('position', new THREE.BufferAttribute(positions, 3));
                     
-                    // Compute vertex normals for proper shading
-                    geometry.computeVertexNormals();
+                    // Facet normals as parsed, no recomputation
+                    const facetNormals = parsed.normals instanceof Float32Array
+                        ? parsed.normals
+                        : new Float32Array(parsed.normals);
+                    geometry.setAttribute('normal', new THREE.BufferAttribute(facetNormals, 3));
                     
                     geometry.computeBoundingBox();
                     geometry.computeBoundingSphere();
@@ -4350,57 +4912,130 @@ ${this.errorHistory.map((err, i) =>
                 }
             }
             
-            // STL-Daten verarbeiten
-            function processSTLData(base64STL) {
+            // Entry point of the parse worker; serialized into its Blob source
+            function stlParseWorkerMain(event) {
+                const { id, base64STL } = event.data;
                 try {
-                    progressiveLoader.showState('parsing-stl', 0, 'Decoding STL data...');
-                    
-                    if (!base64STL || base64STL.length < 100) {
-                        throw new Error("No valid STL data received");
-                    }
-                    
-                    // Base64 → Binary
-                    progressiveLoader.showState('parsing-stl', 25, 'Converting to binary...');
-                    const binaryString = atob(base64STL);
-                    const bytes = new Uint8Array(binaryString.length);
-                    for (let i = 0; i < binaryString.length; i++) {
-                        bytes[i] = binaryString.charCodeAt(i);
+                    const start = performance.now();
+                    const parsed = STLParser.parse(STLParser.decodeBase64(base64STL));
+                    self.postMessage({
+                        id: id,
+                        vertices: parsed.vertices,
+                        normals: parsed.normals,
+                        parseTime: performance.now() - start
+                    }, [parsed.vertices.buffer, parsed.normals.buffer]);
+                } catch (error) {
+                    self.postMessage({ id: id, error: error.message });
+                }
+            }
+            
+            // Runs STLParser off the main thread; positions and normals come
+            // back as transferred ArrayBuffers
+            class STLParseWorker {
+                constructor() {
+                    this.worker = null;
+                    this.pending = new Map();
+                    this.nextId = 0;
+                    this.disabled = typeof Worker === 'undefined' || typeof Blob === 'undefined';
+                }
+                
+                ensureWorker() {
+                    if (this.worker || this.disabled) {
+                        return this.worker;
                     }
                     
-                    // STL parsen
-                    progressiveLoader.showState('parsing-stl', 50, 'Parsing STL format...');
-                    let parsed;
-                    if (bytes.length >= 84) {
-                        try {
-                            parsed = STLParser.parseBinary(bytes.buffer);
-                        } catch (e) {
-                            const textDecoder = new TextDecoder('utf-8');
-                            const asciiData = textDecoder.decode(bytes);
-                            parsed = STLParser.parseASCII(asciiData);
-                        }
-                    } else {
-                        const textDecoder = new TextDecoder('utf-8');
-                        const asciiData = textDecoder.decode(bytes);
-                        parsed = STLParser.parseASCII(asciiData);
+                    try {
+                        const source = [
+                            'const STLParser = ' + STLParser.toString() + ';',
+                            'self.onmessage = ' + stlParseWorkerMain.toString() + ';'
+                        ].join('\\n');
+                        const url = URL.createObjectURL(new Blob([source], { type: 'text/javascript' }));
+                        this.worker = new Worker(url);
+                        URL.revokeObjectURL(url);
+                        
+                        this.worker.onmessage = (event) => this.handleMessage(event.data);
+                        this.worker.onerror = (error) => {
+                            console.warn('⚠️ STL parse worker failed, parsing on main thread:', error.message);
+                            this.disable();
+                        };
+                    } catch (error) {
+                        console.warn('⚠️ STL parse worker unavailable:', error);
+                        this.disabled = true;
+                        this.worker = null;
                     }
-                    
-                    if (!parsed.vertices || parsed.vertices.length === 0) {
-                        throw new Error("STL contains no valid geometry");
+                    return this.worker;
+                }
+                
+                parse(base64STL) {
+                    const worker = this.ensureWorker();
+                    if (!worker) {
+                        return Promise.resolve(this.parseOnMainThread(base64STL));
                     }
                     
-                    progressiveLoader.showState('optimizing', 0, 'Creating geometry...');
-                    const geometry = STLParser.createBufferGeometry(parsed);
+                    return new Promise((resolve, reject) => {
+                        const id = ++this.nextId;
+                        this.pending.set(id, { base64STL, resolve, reject, start: performance.now() });
+                        worker.postMessage({ id, base64STL });
+                    });
+                }
+                
+                handleMessage(data) {
+                    const job = this.pending.get(data.id);
+                    if (!job) return;
+                    this.pending.delete(data.id);
                     
-                    progressiveLoader.showState('optimizing', 50, 'Removing old mesh...');
-                    // Alte Mesh entfernen
-                    if (currentMesh) {
-                        scene.remove(currentMesh);
-                        if (currentMesh.geometry) currentMesh.geometry.dispose();
-                        if (currentMesh.material) currentMesh.material.dispose();
+                    if (data.error) {
+                        job.reject(new Error(data.error));
+                        return;
                     }
                     
+                    job.resolve({
+                        vertices: data.vertices,
+                        normals: data.normals,
+                        parseTime: data.parseTime,
+                        totalTime: performance.now() - job.start,
+                        mode: 'worker'
+                    });
+                }
+                
+                parseOnMainThread(base64STL) {
+                    const start = performance.now();
+                    const parsed = STLParser.parse(STLParser.decodeBase64(base64STL));
+                    const parseTime = performance.now() - start;
+                    return { ...parsed, parseTime, totalTime: parseTime, mode: 'main-thread' };
+                }
+                
+                disable() {
+                    this.disabled = true;
+                    if (this.worker) {
+                        this.worker.terminate();
+                        this.worker = null;
+                    }
+                    // Finish outstanding jobs on the main thread
+                    for (const job of this.pending.values()) {
+                        try {
+                            job.resolve(this.parseOnMainThread(job.base64STL));
+                        } catch (error) {
+                            job.reject(error);
+                        }
+                    }
+                    this.pending.clear();
+                }
+            }
+            
+            const stlParseWorker = new STLParseWorker();
+            let stlParseSequence = 0;
+            
+            // Reusable STL mesh: attributes are allocated with headroom and
+            // overwritten in place while the model still fits
+            const STL_CAPACITY_HEADROOM = 1.25;
+            let stlMesh = null;
+            let sharedSTLMaterial = null;
+            
+            function getSharedSTLMaterial() {
+                if (!sharedSTLMaterial) {
                     // Material - subtle lighting for edge definition without harsh variations
-                    const material = new THREE.MeshLambertMaterial({ 
+                    sharedSTLMaterial = new THREE.MeshLambertMaterial({ 
                         color: 0x3b82f6,
                         side: THREE.DoubleSide,  // Render both sides to handle internal faces properly
                         wireframe: false,
@@ -4410,18 +5045,145 @@ ${this.errorHistory.map((err, i) =>
                         depthTest: true,
                         depthWrite: true
                     });
+                    sharedSTLMaterial.userData.shared = true;
+                }
+                return sharedSTLMaterial;
+            }
+            
+            function createSTLGeometry(vertexCount) {
+                const pooled = resourceOptimizer ? resourceOptimizer.acquireGeometry(vertexCount) : null;
+                if (pooled) {
+                    return pooled;
+                }
+                
+                const capacity = Math.ceil(vertexCount * STL_CAPACITY_HEADROOM / 3) * 3;
+                const geometry = new THREE.BufferGeometry();
+                geometry.setAttribute('position',
+                    new THREE.BufferAttribute(new Float32Array(capacity * 3), 3).setUsage(THREE.DynamicDrawUsage));
+                geometry.setAttribute('normal',
+                    new THREE.BufferAttribute(new Float32Array(capacity * 3), 3).setUsage(THREE.DynamicDrawUsage));
+                geometry.userData.pooledBuffer = true;
+                geometry.userData.capacity = capacity;
+                geometry.userData.usedVertices = 0;
+                return geometry;
+            }
+            
+            function canUpdateSTLInPlace(vertexCount) {
+                if (!stlMesh || currentMesh !== stlMesh) {
+                    return false;  // Replaced by another mesh or wrapped in an LOD
+                }
+                const capacity = stlMesh.geometry.userData.capacity;
+                return vertexCount <= capacity && vertexCount * 4 >= capacity;
+            }
+            
+            function writeSTLGeometry(geometry, vertices, normals) {
+                const vertexCount = vertices.length / 3;
+                const position = geometry.attributes.position;
+                const normal = geometry.attributes.normal;
+                const positions = position.array;
+                
+                // Facet normals come from the parse worker
+                positions.set(vertices);
+                normal.array.set(normals);
+                
+                // Bounds over the used range only; stale data past the draw
+                // range is never read
+                let minX = Infinity, minY = Infinity, minZ = Infinity;
+                let maxX = -Infinity, maxY = -Infinity, maxZ = -Infinity;
+                for (let i = 0; i < vertexCount * 3; i += 3) {
+                    const x = positions[i], y = positions[i + 1], z = positions[i + 2];
+                    if (x < minX) minX = x; if (x > maxX) maxX = x;
+                    if (y < minY) minY = y; if (y > maxY) maxY = y;
+                    if (z < minZ) minZ = z; if (z > maxZ) maxZ = z;
+                }
+                
+                // Upload only the used range
+                position.updateRange.offset = 0;
+                position.updateRange.count = vertexCount * 3;
+                position.needsUpdate = true;
+                normal.updateRange.offset = 0;
+                normal.updateRange.count = vertexCount * 3;
+                normal.needsUpdate = true;
+                
+                geometry.setDrawRange(0, vertexCount);
+                geometry.userData.usedVertices = vertexCount;
+                
+                geometry.boundingBox = geometry.boundingBox || new THREE.Box3();
+                geometry.boundingBox.min.set(minX, minY, minZ);
+                geometry.boundingBox.max.set(maxX, maxY, maxZ);
+                geometry.boundingSphere = geometry.boundingSphere || new THREE.Sphere();
+                geometry.boundingBox.getBoundingSphere(geometry.boundingSphere);
+            }
+            
+            // STL-Daten verarbeiten
+            async function processSTLData(base64STL) {
+                const parseId = ++stlParseSequence;
+                try {
+                    progressiveLoader.showState('parsing-stl', 0, 'Decoding STL data...');
                     
-                    const mesh = new THREE.Mesh(geometry, material);
-                    mesh.castShadow = true;
-                    mesh.receiveShadow = true;
+                    if (!base64STL || base64STL.length < 100) {
+                        throw new Error("No valid STL data received");
+                    }
+                    
+                    // Base64 decoding and parsing run in the parse worker
+                    progressiveLoader.showState('parsing-stl', 50, 'Parsing STL format...');
+                    const parsed = await stlParseWorker.parse(base64STL);
                     
-                    // Auto-Center
-                    const box = geometry.boundingBox;
-                    const center = box.getCenter(new THREE.Vector3());
-                    mesh.position.sub(center);
+                    // A newer STL arrived while this one was parsing
+                    if (parseId !== stlParseSequence) {
+                        return;
+                    }
                     
-                    progressiveLoader.showState('rendering', 0, 'Adding to scene...');
-                    replaceCurrentMesh(mesh, 'stl-mesh');
+                    if (performanceMonitor) {
+                        performanceMonitor.recordParse({
+                            triangles: parsed.vertices.length / 9,
+                            bytes: Math.floor(base64STL.length * 3 / 4),
+                            parseTime: parsed.parseTime,
+                            totalTime: parsed.totalTime,
+                            mode: parsed.mode
+                        });
+                    }
+                    
+                    if (!parsed.vertices || parsed.vertices.length === 0) {
+                        throw new Error("STL contains no valid geometry");
+                    }
+                    
+                    const vertexCount = parsed.vertices.length / 3;
+                    let box;
+                    
+                    if (canUpdateSTLInPlace(vertexCount)) {
+                        // Same buffers, material and program: only new data is uploaded
+                        progressiveLoader.showState('optimizing', 0, 'Updating geometry...');
+                        writeSTLGeometry(stlMesh.geometry, parsed.vertices, parsed.normals);
+                        box = stlMesh.geometry.boundingBox;
+                        
+                        // Auto-Center
+                        stlMesh.position.copy(box.getCenter(new THREE.Vector3())).negate();
+                        requestRender();
+                    } else {
+                        // An LOD wrapper does not hand its buffers back on removal
+                        if (stlMesh && currentMesh !== stlMesh) {
+                            releaseMeshGeometry(stlMesh.geometry);
+                        }
+                        stlMesh = null;
+                        
+                        progressiveLoader.showState('optimizing', 0, 'Creating geometry...');
+                        const geometry = createSTLGeometry(vertexCount);
+                        writeSTLGeometry(geometry, parsed.vertices, parsed.normals);
+                        
+                        const mesh = new THREE.Mesh(geometry, getSharedSTLMaterial());
+                        mesh.castShadow = true;
+                        mesh.receiveShadow = true;
+                        
+                        // Auto-Center
+                        box = geometry.boundingBox;
+                        const center = box.getCenter(new THREE.Vector3());
+                        mesh.position.sub(center);
+                        
+                        progressiveLoader.showState('rendering', 0, 'Adding to scene...');
+                        replaceCurrentMesh(mesh, 'stl-mesh');
+                        stlMesh = mesh;
+                    }
                     
                     // Kamera optimal positionieren
                     progressiveLoader.showState('rendering', 50, 'Positioning camera...');
@@ -4442,6 +5204,9 @@ ${this.errorHistory.map((err, i) =>
                     status.textContent = `✅ STL loaded: ${triangleCount} triangles`;
                     status.style.background = "rgba(34,197,94,0.9)";
                     
+                    // Remainder of an instanced model: recenter together with the instances
+                    alignInstancedParts();
+                
                 } catch (error) {
                     console.error("STL Processing Error:", error);
                     errorHandler.handleError(error, 'parsing', () => {
@@ -4454,11 +5219,209 @@ ${this.errorHistory.map((err, i) =>
                 }
             }
             
+            // Repeated subtrees arrive once per unique body plus one matrix per placement
+            let instancedGroup = null;
+            let instancedSequence = 0;
+            
+            function disposeInstancedParts() {
+                if (!instancedGroup) return;
+                scene.remove(instancedGroup);
+                instancedGroup.children.forEach(mesh => mesh.geometry.dispose());
+                instancedGroup = null;
+            }
+            
+            async function updateInstancedParts() {
+                const parts = model.get("instanced_parts") || [];
+                const updateId = ++instancedSequence;
+                
+                try {
+                    const meshes = [];
+                    for (const part of parts) {
+                        if (!part.stl_data || !part.transforms || part.transforms.length === 0) continue;
+                        
+                        const parsed = await stlParseWorker.parse(part.stl_data);
+                        if (updateId !== instancedSequence) {
+                            meshes.forEach(mesh => mesh.geometry.dispose());
+                            return;
+                        }
+                        if (!parsed.vertices || parsed.vertices.length === 0) continue;
+                        
+                        const geometry = new THREE.BufferGeometry();
+                        geometry.setAttribute('position', new THREE.BufferAttribute(parsed.vertices, 3));
+                        geometry.setAttribute('normal', new THREE.BufferAttribute(parsed.normals, 3));
+                        geometry.computeBoundingBox();
+                        
+                        // One draw call for every placement of this body
+                        const mesh = new THREE.InstancedMesh(geometry, getSharedSTLMaterial(), part.transforms.length);
+                        const matrix = new THREE.Matrix4();
+                        part.transforms.forEach((transform, index) => {
+                            mesh.setMatrixAt(index, matrix.fromArray(transform));
+                        });
+                        mesh.instanceMatrix.needsUpdate = true;
+                        mesh.castShadow = true;
+                        mesh.receiveShadow = true;
+                        meshes.push(mesh);
+                    }
+                    
+                    disposeInstancedParts();
+                    if (meshes.length > 0) {
+                        instancedGroup = new THREE.Group();
+                        meshes.forEach(mesh => instancedGroup.add(mesh));
+                        scene.add(instancedGroup);
+                        
+                        const instances = meshes.reduce((sum, mesh) => sum + mesh.count, 0);
+                        status.textContent = `✅ Instanced: ${meshes.length} parts, ${instances} instances`;
+                        status.style.background = "rgba(34,197,94,0.9)";
+                    }
+                    alignInstancedParts();
+                    requestRender();
+                } catch (error) {
+                    console.error("Instanced part error:", error);
+                    status.textContent = `❌ Instancing Error: ${error.message}`;
+                    status.style.background = "rgba(220,20,60,0.9)";
+                }
+            }
+            
+            // Center the remainder mesh and all instances as one model
+            function alignInstancedParts() {
+                if (!instancedGroup) return;
+                
+                const box = new THREE.Box3();
+                const matrix = new THREE.Matrix4();
+                instancedGroup.children.forEach(mesh => {
+                    for (let i = 0; i < mesh.count; i++) {
+                        mesh.getMatrixAt(i, matrix);
+                        box.union(mesh.geometry.boundingBox.clone().applyMatrix4(matrix));
+                    }
+                });
+                if (stlMesh && currentMesh && stlMesh.geometry.boundingBox) {
+                    box.union(stlMesh.geometry.boundingBox);
+                }
+                if (box.isEmpty()) return;
+                
+                const center = box.getCenter(new THREE.Vector3());
+                instancedGroup.position.copy(center).negate();
+                if (stlMesh && currentMesh) {
+                    currentMesh.position.copy(center).negate();
+                }
+                
+                const size = box.getSize(new THREE.Vector3());
+                cameraDistance = Math.max(Math.max(size.x, size.y, size.z) * 2.5, 20);
+                updateCameraPosition();
+            }
+            
+            // Assembly mode: one mesh per named part, fetched only when its hash changes
+            const assemblyMeshes = new Map();  // name -> { hash, mesh }
+            const assemblyRequested = new Map();  // name -> requested hash
+            let assemblyGroup = null;
+            
+            function removeAssemblyPart(name) {
+                const entry = assemblyMeshes.get(name);
+                if (entry) {
+                    assemblyGroup.remove(entry.mesh);
+                    releaseMeshGeometry(entry.mesh.geometry);
+                    assemblyMeshes.delete(name);
+                }
+                assemblyRequested.delete(name);
+            }
+            
+            function syncAssembly() {
+                const manifest = model.get("assembly_manifest") || {};
+                const names = Object.keys(manifest);
+                
+                Array.from(assemblyMeshes.keys()).forEach(name => {
+                    if (!(name in manifest)) removeAssemblyPart(name);
+                });
+                
+                if (names.length === 0) {
+                    if (assemblyGroup) {
+                        scene.remove(assemblyGroup);
+                        assemblyGroup = null;
+                        requestRender();
+                    }
+                    return;
+                }
+                
+                if (!assemblyGroup) {
+                    assemblyGroup = new THREE.Group();
+                    scene.add(assemblyGroup);
+                }
+                
+                const missing = names.filter(name => {
+                    const entry = assemblyMeshes.get(name);
+                    return (!entry || entry.hash !== manifest[name]) && assemblyRequested.get(name) !== manifest[name];
+                });
+                if (missing.length > 0) {
+                    missing.forEach(name => assemblyRequested.set(name, manifest[name]));
+                    model.send({ type: "request_assembly_parts", names: missing });
+                    status.textContent = `🔄 Loading ${missing.length} of ${names.length} parts...`;
+                    status.style.background = "rgba(59,130,246,0.9)";
+                }
+                alignAssembly();
+                requestRender();
+            }
+            
+            async function receiveAssemblyPart(message) {
+                const isCurrent = () => (model.get("assembly_manifest") || {})[message.name] === message.hash;
+                if (!isCurrent() || !assemblyGroup) return;
+                
+                try {
+                    const parsed = await stlParseWorker.parse(message.stl_data);
+                    if (!isCurrent() || !assemblyGroup) return;
+                    assemblyRequested.delete(message.name);
+                    
+                    const vertexCount = parsed.vertices.length / 3;
+                    const entry = assemblyMeshes.get(message.name);
+                    if (entry && vertexCount <= entry.mesh.geometry.userData.capacity) {
+                        // Same buffers for the edited part, the other parts stay untouched
+                        writeSTLGeometry(entry.mesh.geometry, parsed.vertices, parsed.normals);
+                        entry.hash = message.hash;
+                    } else {
+                        if (entry) removeAssemblyPart(message.name);
+                        const geometry = createSTLGeometry(vertexCount);
+                        writeSTLGeometry(geometry, parsed.vertices, parsed.normals);
+                        const mesh = new THREE.Mesh(geometry, getSharedSTLMaterial());
+                        mesh.castShadow = true;
+                        mesh.receiveShadow = true;
+                        mesh.name = message.name;
+                        assemblyGroup.add(mesh);
+                        assemblyMeshes.set(message.name, { hash: message.hash, mesh });
+                    }
+                    
+                    alignAssembly();
+                    requestRender();
+                    
+                    const total = Object.keys(model.get("assembly_manifest") || {}).length;
+                    if (assemblyMeshes.size === total && assemblyRequested.size === 0) {
+                        status.textContent = `✅ Assembly loaded: ${total} parts`;
+                        status.style.background = "rgba(34,197,94,0.9)";
+                    }
+                } catch (error) {
+                    assemblyRequested.delete(message.name);
+                    console.error("Assembly part error:", error);
+                    status.textContent = `❌ Part ${message.name}: ${error.message}`;
+                    status.style.background = "rgba(220,20,60,0.9)";
+                }
+            }
+            
+            // Parts keep their relative placement; the assembly is centered as a whole
+            function alignAssembly() {
+                if (!assemblyGroup || assemblyMeshes.size === 0) return;
+                
+                const box = new THREE.Box3();
+                assemblyMeshes.forEach(({ mesh }) => box.union(mesh.geometry.boundingBox));
+                assemblyGroup.position.copy(box.getCenter(new THREE.Vector3())).negate();
+                
+                const size = box.getSize(new THREE.Vector3());
+                cameraDistance = Math.max(Math.max(size.x, size.y, size.z) * 2.5, 20);
+                updateCameraPosition();
+            }
+            
             function createFallbackGeometry() {
                 if (currentMesh) {
                     scene.remove(currentMesh);
-                    if (currentMesh.geometry) currentMesh.geometry.dispose();
-                    if (currentMesh.material) currentMesh.material.dispose();
+                    if (currentMesh.geometry) releaseMeshGeometry(currentMesh.geometry);
+                    if (currentMesh.material) releaseMeshMaterial(currentMesh.material);
                 }
                 
                 const geometry = new THREE.BoxGeometry(10, 10, 10);
@@ -5055,8 +6018,8 @@ ${this.errorHistory.map((err, i) =>
                             
                             if (currentMesh) {
                                 scene.remove(currentMesh);
-                                if (currentMesh.geometry) currentMesh.geometry.dispose();
-                                if (currentMesh.material) currentMesh.material.dispose();
+                                if (currentMesh.geometry) releaseMeshGeometry(currentMesh.geometry);
+                                if (currentMesh.material) releaseMeshMaterial(currentMesh.material);
                             }
                             
                             const mesh = new THREE.Mesh(fallbackGeometry, fallbackMaterial);
@@ -5112,7 +6075,9 @@ ${this.errorHistory.map((err, i) =>
                     const stlResult = await window.OpenSCADWASM.render(scadCode, {
                         outputFormat: 'binstl',
                         enableManifold: true,
-                        timeout: 15000
+                        timeout: 15000,
+                        // Optional libraries (MCAD, fonts) this model needs
+                        features: model.get("scad_features") || {}
                     });
                     
                     const endTime = performance.now();
@@ -5136,20 +6101,16 @@ ${this.errorHistory.map((err, i) =>
                     const basePath = baseUrl.replace('file://', '');
                     
                     // Try to load WASM module directly using WebAssembly.instantiateStreaming
-                    const wasmPath = `${basePath}/openscad.wasm`;
+                    // Prefer content-hashed URLs: they are cached immutably
+                    const assetUrls = model.get("wasm_asset_urls") || {};
+                    const wasmPath = assetUrls["openscad.wasm"] || `${basePath}/openscad.wasm`;
                     console.log('📦 Loading WASM from:', wasmPath);
                     
-                    // Use fetch + WebAssembly.instantiate for broader compatibility
-                    const wasmResponse = await fetch(wasmPath);
-                    if (!wasmResponse.ok) {
-                        throw new Error(`Failed to fetch WASM: ${wasmResponse.status} ${wasmResponse.statusText}`);
-                    }
-                    
-                    const wasmBytes = await wasmResponse.arrayBuffer();
-                    console.log('📦 WASM bytes loaded:', wasmBytes.byteLength);
+                    // Compiled once per digest; repeat viewers only instantiate
+                    const compiledModule = await wasmCache.getCompiledModule(wasmPath);
                     
                     // Create simple WASM wrapper that provides OpenSCAD functionality
-                    const wasmModule = await WebAssembly.instantiate(wasmBytes, {
+                    const wasmInstance = await WebAssembly.instantiate(compiledModule, {
                         // Import object for WASM module
                         env: {
                             memory: new WebAssembly.Memory({ initial: 256, maximum: 512 }),
@@ -5165,7 +6126,7 @@ ${this.errorHistory.map((err, i) =>
                     
                     // Create wrapper for easier usage
                     window.OpenSCADWASM = {
-                        module: wasmModule,
+                        module: { module: compiledModule, instance: wasmInstance },
                         initialized: true,
                         
                         async render(scadCode, options = {}) {
@@ -5996,6 +6957,13 @@ ${this.errorHistory.map((err, i) =>
                         status.textContent = "❌ WASM auto-render failed";
                         status.style.background = "rgba(220,20,60,0.9)";
                     }
+                } else if ((model.get("instanced_parts") || []).length > 0 ||
+                           Object.keys(model.get("assembly_manifest") || {}).length > 0) {
+                    // Instanced model without remainder geometry, or an assembly
+                    stlParseSequence++;
+                    stlMesh = null;
+                    replaceCurrentMesh(null);
+                    requestRender();
                 } else {
                     status.textContent = "⏳ Waiting for data...";
                     status.style.background = "rgba(107,114,128,0.9)";
@@ -6036,27 +7004,142 @@ ${this.errorHistory.map((err, i) =>
             model.on("change:renderer_type", updateModel);
             model.on("change:renderer_status", updateModel);
             model.on("change:wasm_supported", updateModel);
+            model.on("change:instanced_parts", updateInstancedParts);
+            model.on("change:assembly_manifest", syncAssembly);
+            model.on("msg:custom", (message) => {
+                if (message && message.type === "assembly_part") {
+                    receiveAssemblyPart(message);
+                }
+            });
             
             // Initialize WASM renderer if needed
             if (wasmSupported && rendererType !== 'local') {
                 initializeWASMRenderer();
             }
             
-            // Animation Loop with LOD optimization
-            function animate() {
-                requestAnimationFrame(animate);
+            // ===== On-demand render loop =====
+            // Draws only when something changed (camera input, mesh change,
+            // resize, running animations) and pauses while off screen
+            class OnDemandRenderLoop {
+                constructor(renderFrame, container, mode = 'on-demand') {
+                    this.renderFrame = renderFrame;
+                    this.container = container;
+                    this.mode = mode;
+                    this.visible = true;
+                    this.frameId = null;
+                    this.dirty = false;
+                    this.disposed = false;
+                
+                    // Per-frame callbacks (e.g. control damping) that return
+                    // true while they still move the view
+                    this.animations = new Set();
+                    
+                    this.frame = this.frame.bind(this);
+                    this.setupVisibilityObserver();
+                    console.log(`🎬 Render loop started (${mode})`);
+                }
+                
+                setupVisibilityObserver() {
+                    if (typeof IntersectionObserver === 'undefined') return;
+                    
+                    this.observer = new IntersectionObserver((entries) => {
+                        const entry = entries[entries.length - 1];
+                        this.setVisible(entry.isIntersecting);
+                    });
+                    this.observer.observe(this.container);
+                }
+                
+                requestRender() {
+                    if (this.disposed) return;
+                    
+                    if (!this.visible) {
+                        this.dirty = true; // Redraw once scrolled back into view
+                        return;
+                    }
+                    
+                    if (this.frameId === null) {
+                        this.frameId = requestAnimationFrame(this.frame);
+                    }
+                }
+                
+                addAnimation(step) {
+                    this.animations.add(step);
+                    this.requestRender();
+                    return () => this.animations.delete(step);
+                }
+                
+                setMode(mode) {
+                    this.mode = mode;
+                    this.requestRender();
+                }
+                
+                setVisible(visible) {
+                    if (visible === this.visible) return;
+                    this.visible = visible;
+                    
+                    if (!visible && this.frameId !== null) {
+                        cancelAnimationFrame(this.frameId);
+                        this.frameId = null;
+                        this.dirty = true;
+                    } else if (visible && (this.dirty || this.mode === 'continuous')) {
+                        this.dirty = false;
+                        this.requestRender();
+                    }
+                }
+                
+                frame(now) {
+                    this.frameId = null;
+                    
+                    this.animations.forEach(step => {
+                        if (!step(now)) {
+                            this.animations.delete(step);
+                        }
+                    });
+                    
+                    this.renderFrame(now);
+                    
+                    if (this.mode === 'continuous' || this.animations.size > 0) {
+                        this.requestRender();
+                    }
+                }
                 
+                dispose() {
+                    this.disposed = true;
+                    if (this.frameId !== null) {
+                        cancelAnimationFrame(this.frameId);
+                        this.frameId = null;
+                    }
+                    if (this.observer) {
+                        this.observer.disconnect();
+                        this.observer = null;
+                    }
+                    this.animations.clear();
+                }
+            }
+            
+            // Draw one frame with LOD optimization; scheduled by the render loop
+            let framesSinceQualityCheck = 0;
+            function animate(now) {
                 // Update LOD based on camera distance
                 if (renderingOptimizer) {
                     renderingOptimizer.updateLOD(camera);
+                    renderingOptimizer.recordFrame(now);
                     
                     // Adaptive quality adjustment (every 30 frames to avoid overhead)
-                    if (Math.random() < 0.033) { // ~1/30 chance per frame
-                        renderingOptimizer.adaptiveQuality(camera);
+                    if (++framesSinceQualityCheck >= 30) {
+                        framesSinceQualityCheck = 0;
+                        // A new pixel ratio resizes (and clears) the canvas
+                        if (renderingOptimizer.adaptiveQuality(camera) !== 'stable') {
+                            requestRender();
+                        }
                     }
                 }
                 
                 renderer.render(scene, camera);
+                
+                if (performanceMonitor) {
+                    performanceMonitor.recordFrame(now);
+                }
             }
             
             // Window Resize
@@ -6065,17 +7148,24 @@ ${this.errorHistory.map((err, i) =>
                 camera.aspect = rect.width / rect.height;
                 camera.updateProjectionMatrix();
                 renderer.setSize(rect.width, rect.height);
+                requestRender();
             }
             window.addEventListener('resize', onWindowResize);
             
             // Complete initialization - show final progress state
             progressiveLoader.showState('complete', 100, 'All systems ready');
             
-            // Start animation loop  
-            animate();
+            // Start render loop
+            renderLoop = new OnDemandRenderLoop(animate, container, model.get("render_mode") || 'on-demand');
+            model.on("change:render_mode", () => renderLoop.setMode(model.get("render_mode") || 'on-demand'));
+            requestRender();
             
             // Initialize model display
             updateModel();
+            if ((model.get("instanced_parts") || []).length > 0) {
+                updateInstancedParts();
+            }
+            syncAssembly();
             
             // Show completion with performance stats
             setTimeout(() => {
@@ -6097,6 +7187,12 @@ ${this.errorHistory.map((err, i) =>
                 // Dispose memory manager (cleans up all registered resources)
                 memoryManager.dispose();
                 
+                // Stop drawing and release the visibility observer
+                if (renderLoop) {
+                    renderLoop.dispose();
+                    renderLoop = null;
+                }
+                
                 // Remove event listeners
                 window.removeEventListener('resize', onWindowResize);
                 
@@ -6143,6 +7239,13 @@ ${this.errorHistory.map((err, i) =>
                  openscad_path: Optional[str] = None,
                  wasm_options: Optional[dict] = None,
                  enable_real_time_wasm: bool = True,
+                 enable_instancing: bool = False,
+                 tracer: Optional[Tracer] = None,
+                 render_history: Optional[RenderHistoryStore] = None,
+                 cost_model: Optional[RenderCostModel] = None,
+                 render_scheduler: Optional[RenderScheduler] = None,
+                 render_session: Optional[str] = None,
+                 render_priority: Literal["interactive", "batch"] = "interactive",
                  **kwargs):
         """
         Initialize OpenSCAD Viewer with renderer selection
@@ -6153,15 +7256,44 @@ ${this.errorHistory.map((err, i) =>
             openscad_path: Path to local OpenSCAD executable (for local/auto)
             wasm_options: Options for WASM renderer initialization
             enable_real_time_wasm: Whether to enable real-time WASM rendering (default: True)
+            enable_instancing: Render repeated subtrees once and draw them instanced
+                (STL pipeline only, default: False)
+            tracer: Records per-stage spans of update_model() and
+                update_scad_code() (default: tracing off)
+            render_history: Store that persists the timing of every render
+                (default: not recorded)
+            cost_model: Static render cost model that picks the preview or full
+                tier for STL renders when render_tier is "auto"
+            render_scheduler: Scheduler STL renders wait in for a slot
+                (default: the process-wide scheduler)
+            render_session: Fair-share client shared by several viewers
+                (default: each viewer is its own client)
+            render_priority: "interactive", or "batch" for sweeps that should
+                yield to interactive viewers
             **kwargs: Additional anywidget arguments
         """
         # Set renderer type before calling super().__init__
         self.renderer_type = renderer_type
         self.renderer_status = "initializing"
         self.enable_real_time_wasm = enable_real_time_wasm
+        self.enable_instancing = enable_instancing
+        self._instancing_bridge = None
+        self._assembly_parts: Dict[str, tuple] = {}  # name -> (hash, base64 STL)
+        self.tracer = tracer if tracer is not None else Tracer(enabled=False)
+        self.cost_model = cost_model if cost_model is not None else RenderCostModel()
+        self.render_scheduler = render_scheduler if render_scheduler is not None else get_render_scheduler()
+        self.render_client_id = render_session or f"viewer-{id(self):x}"
+        self.render_priority = render_priority
+        if render_session is None:
+            # The viewer's own scheduler client goes away with the viewer
+            # (widgets are collected once closed)
+            weakref.finalize(self, self.render_scheduler.forget_client, self.render_client_id)
         
         super().__init__(**kwargs)
         
+        # Assembly parts are fetched by the frontend when their hash changes
+        self.on_msg(self._handle_custom_msg)
+        
         # Initialize renderer based on type
         self.renderer = self._create_renderer(renderer_type, openscad_path, wasm_options)
         
@@ -6172,7 +7304,8 @@ ${this.errorHistory.map((err, i) =>
         self.realtime_renderer = RealTimeRenderer(
             viewer=self, 
             cache_size_mb=256,  # Default 256MB cache
-            debounce_ms=self.debounce_delay_ms
+            debounce_ms=self.debounce_delay_ms,
+            history=render_history
         )
         self.real_time_enabled = True
         
@@ -6195,8 +7328,13 @@ ${this.errorHistory.map((err, i) =>
                 return renderer
             
             elif renderer_type == "local":
-                logger.info("Initializing local renderer")
-                renderer = OpenSCADRenderer(openscad_path)
+                daemon_url = get_config().render_daemon_url
+                if daemon_url:
+                    logger.info(f"Initializing render daemon client for {daemon_url}")
+                    renderer = RenderDaemonClient(daemon_url)
+                else:
+                    logger.info("Initializing local renderer")
+                    renderer = OpenSCADRenderer(openscad_path)
                 self.renderer_status = "ready"
                 return renderer
             
@@ -6252,6 +7390,7 @@ ${this.errorHistory.map((err, i) =>
                 try:
                     base_url = start_wasm_server()
                     self.wasm_base_url = base_url
+                    self.wasm_asset_urls = wasm_renderer.get_wasm_files(base_url, hashed=True)
                     self.wasm_enabled = True
                     logger.info(f"WASM HTTP server started: {base_url}")
                     
@@ -6278,23 +7417,34 @@ ${this.errorHistory.map((err, i) =>
     
     def update_model(self, model, force_render: bool = False):
         """Update with SolidPython2 object - enhanced STL/WASM pipeline"""
+        with self.tracer.trace("update_model", force_render=force_render):
+            self._update_model(model, force_render)
+    
+    def _update_model(self, model, force_render: bool = False):
         try:
             self.is_loading = True
             self.error_message = ""
             
+            # A single model replaces any assembly
+            if self.assembly_manifest:
+                self.assembly_manifest = {}
+                self._assembly_parts = {}
+            
             # Store previous data for comparison
             previous_stl = self.stl_data
             previous_scad = self.scad_code
             
             # SolidPython2 → SCAD Code
-            if hasattr(model, 'as_scad'):
-                scad_code = model.as_scad()
-            elif hasattr(model, '__scad__'):
-                scad_code = model.__scad__()
-            elif isinstance(model, str):
-                scad_code = model
-            else:
-                raise ValueError("Model muss SolidPython2-Objekt mit .as_scad() Methode oder SCAD-String sein")
+            with span("as_scad") as scad_span:
+                if hasattr(model, 'as_scad'):
+                    scad_code = model.as_scad()
+                elif hasattr(model, '__scad__'):
+                    scad_code = model.__scad__()
+                elif isinstance(model, str):
+                    scad_code = model
+                else:
+                    raise ValueError("Model muss SolidPython2-Objekt mit .as_scad() Methode oder SCAD-String sein")
+                scad_span.set_attribute("scad_chars", len(scad_code))
             
             # For WASM-enabled viewers, send SCAD code directly to frontend
             if self.wasm_enabled and self.enable_real_time_wasm:
@@ -6303,42 +7453,185 @@ ${this.errorHistory.map((err, i) =>
                     logger.info("SCAD code unchanged, skipping WASM update")
                     return
                 
-                self.scad_code = scad_code
+                # Feature manifest first, so the frontend mounts only what the model needs
+                with span("feature_manifest"):
+                    scad_features = get_scad_feature_manifest(scad_code)
+                with span("trait_sync", chars=len(scad_code)):
+                    self.scad_features = scad_features
+                    self.scad_code = scad_code
+                    
+                    # Clear STL data to prioritize WASM rendering
+                    if self.stl_data:
+                        self.stl_data = ""
+                    if self.instanced_parts:
+                        self.instanced_parts = []
                 logger.info(f"✅ SCAD code sent to WASM renderer: {len(scad_code)} chars")
                 logger.info(f"SCAD code changed: {scad_code != previous_scad}")
                 
-                # Clear STL data to prioritize WASM rendering
-                if self.stl_data:
-                    self.stl_data = ""
-                
                 return
             
+            # Repeated subtrees: render each once and draw with InstancedMesh
+            if self.enable_instancing:
+                with span("instancing"):
+                    instanced = self._update_instanced_model(model, force_render)
+                if instanced:
+                    return
+            
             # Fallback: SCAD → STL (traditional pipeline)
             stl_data = self._render_stl(scad_code, force_render)
             
             # STL → Base64 for browser
-            new_stl_base64 = base64.b64encode(stl_data).decode('utf-8')
+            new_stl_base64 = self._encode_stl(stl_data)
             
             # Check if STL actually changed
             if new_stl_base64 == previous_stl and not force_render:
                 logger.info("STL unchanged, skipping update")
                 return
             
-            self.stl_data = new_stl_base64
+            with span("trait_sync", chars=len(new_stl_base64)):
+                self.stl_data = new_stl_base64
             
-            # Clear SCAD code when using STL mode
-            if self.scad_code:
-                self.scad_code = ""
+                # Clear SCAD code when using STL mode
+                if self.scad_code:
+                    self.scad_code = ""
             
             logger.info(f"✅ STL rendered: {len(stl_data)} bytes")
             logger.info(f"STL data changed: {new_stl_base64 != previous_stl}")
             
         except Exception as e:
             self.error_message = str(e)
+            current_span().set_attribute("error", str(e))
             logger.error(f"❌ Model update error: {e}")
         finally:
             self.is_loading = False
     
+    def _encode_stl(self, stl_data: bytes) -> str:
+        """STL → Base64 for the browser"""
+        with span("base64_encode", bytes_in=len(stl_data)) as encode_span:
+            encoded = base64.b64encode(stl_data).decode('utf-8')
+            encode_span.set_attribute("bytes_out", len(encoded))
+        return encoded
+    
+    def _renders_in_browser(self) -> bool:
+        """Whether renders only return a WASM placeholder (directly or through the hybrid renderer)"""
+        return isinstance(getattr(self.renderer, 'active_renderer', self.renderer), OpenSCADWASMRenderer)
+    
+    def _update_instanced_model(self, model, force_render: bool = False) -> bool:
+        """
+        Send repeated subtrees as instanced parts plus a remainder STL
+        
+        Returns:
+            bool: False if the model has no repeated subtrees (or cannot be
+            instanced), in which case the regular STL pipeline should run
+        """
+        plan = None
+        if hasattr(model, 'as_scad') and not self._renders_in_browser():
+            plan = find_instanced_subtrees(model)
+        
+        if plan is None or not plan.groups:
+            if self.instanced_parts:
+                self.instanced_parts = []
+            return False
+        
+        if self._instancing_bridge is None:
+            self._instancing_bridge = SolidPythonBridge(renderer=_ViewerRenderPath(self))
+        result = self._instancing_bridge.render_instanced(model, use_cache=not force_render, plan=plan)
+        
+        # Parts first, so the remainder is centered together with them
+        self.instanced_parts = [
+            {
+                'stl_data': base64.b64encode(part.stl_data).decode('utf-8'),
+                'transforms': part.transforms,
+            }
+            for part in result.parts
+        ]
+        self.stl_data = (base64.b64encode(result.remainder_stl).decode('utf-8')
+                         if result.remainder_stl else "")
+        
+        if self.scad_code:
+            self.scad_code = ""
+        
+        logger.info(f"✅ Instanced model: {len(result.parts)} unique parts, "
+                    f"{plan.instance_count} instances")
+        return True
+    
+    def update_assembly(self, assembly, force_render: bool = False,
+                        max_workers: Optional[int] = None) -> List[str]:
+        """
+        Render an assembly as separate, cached meshes - one per part
+        
+        Parts whose SCAD code is unchanged since the last call are neither
+        re-rendered nor re-sent; changed parts render in parallel. The viewer
+        keeps one mesh per part and only fetches parts whose hash changed.
+        
+        Args:
+            assembly: Dict of named parts (SolidPython2 objects or SCAD strings),
+                or a SolidPython2 model whose top-level union children are the parts
+            force_render: Re-render every part, ignoring the part cache
+            max_workers: Maximum parallel renders (default: CPU count)
+        
+        Returns:
+            List[str]: Names of the parts that were rendered
+        """
+        try:
+            self.is_loading = True
+            self.error_message = ""
+            
+            if self._renders_in_browser():
+                raise ValueError("Assembly mode needs a local OpenSCAD renderer")
+            
+            part_codes = {}
+            for name, part in split_assembly(assembly).items():
+                part_codes[name] = part.as_scad() if hasattr(part, 'as_scad') else str(part)
+            
+            part_hashes = {name: hashlib.sha256(code.encode('utf-8')).hexdigest()[:16]
+                           for name, code in part_codes.items()}
+            changed = [name for name in part_codes
+                       if force_render or name not in self._assembly_parts
+                       or self._assembly_parts[name][0] != part_hashes[name]]
+            
+            if changed:
+                workers = max(1, min(len(changed), max_workers or os.cpu_count() or 1))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    rendered = list(executor.map(
+                        lambda name: self._render_stl(part_codes[name], force_render), changed))
+                for name, stl_data in zip(changed, rendered):
+                    self._assembly_parts[name] = (part_hashes[name],
+                                                  base64.b64encode(stl_data).decode('utf-8'))
+            
+            for name in list(self._assembly_parts):
+                if name not in part_codes:
+                    del self._assembly_parts[name]
+            
+            # Single-model state is replaced by the per-part meshes
+            if self.instanced_parts:
+                self.instanced_parts = []
+            if self.scad_code:
+                self.scad_code = ""
+            if self.stl_data:
+                self.stl_data = ""
+            self.assembly_manifest = part_hashes
+            
+            logger.info(f"✅ Assembly updated: {len(changed)}/{len(part_codes)} parts rendered")
+            return changed
+        
+        except Exception as e:
+            self.error_message = str(e)
+            logger.error(f"❌ Assembly update error: {e}")
+            return []
+        finally:
+            self.is_loading = False
+    
+    def _handle_custom_msg(self, _widget, content, buffers) -> None:
+        """Answer frontend requests for assembly parts"""
+        if not isinstance(content, dict) or content.get('type') != 'request_assembly_parts':
+            return
+        
+        for name in content.get('names', []):
+            part = self._assembly_parts.get(name)
+            if part is not None:
+                self.send({'type': 'assembly_part', 'name': name, 'hash': part[0], 'stl_data': part[1]})
+    
     def update_scad_code(self, scad_code: str, use_wasm: bool = None) -> None:
         """
         Update viewer with new SCAD code directly (Phase 4.4: Enhanced with version management)
@@ -6347,6 +7640,10 @@ ${this.errorHistory.map((err, i) =>
             scad_code: Raw OpenSCAD code as string
             use_wasm: Whether to use WASM rendering (None = auto-detect)
         """
+        with self.tracer.trace("update_scad_code", chars=len(scad_code)):
+            self._update_scad_code(scad_code, use_wasm)
+    
+    def _update_scad_code(self, scad_code: str, use_wasm: bool = None) -> None:
         try:
             self.is_loading = True
             self.error_message = ""
@@ -6361,11 +7658,15 @@ ${this.errorHistory.map((err, i) =>
             if use_wasm:
                 # For WASM: send SCAD code directly to frontend
                 previous_scad = self.scad_code
-                self.scad_code = enhanced_scad_code
+                with span("feature_manifest"):
+                    scad_features = get_scad_feature_manifest(enhanced_scad_code)
+                with span("trait_sync", chars=len(enhanced_scad_code)):
+                    self.scad_features = scad_features
+                    self.scad_code = enhanced_scad_code
                 
-                # Clear STL data to prioritize WASM rendering
-                if self.stl_data:
-                    self.stl_data = ""
+                    # Clear STL data to prioritize WASM rendering
+                    if self.stl_data:
+                        self.stl_data = ""
                 
                 logger.info(f"✅ SCAD code sent to WASM: {len(enhanced_scad_code)} chars")
                 logger.info(f"SCAD code changed: {enhanced_scad_code != previous_scad}")
@@ -6377,18 +7678,20 @@ ${this.errorHistory.map((err, i) =>
                 stl_data = self._render_stl(enhanced_scad_code, force_render=True)
                 
                 # STL → Base64 for browser
-                new_stl_base64 = base64.b64encode(stl_data).decode('utf-8')
-                self.stl_data = new_stl_base64
+                new_stl_base64 = self._encode_stl(stl_data)
+                with span("trait_sync", chars=len(new_stl_base64)):
+                    self.stl_data = new_stl_base64
                 
-                # Clear SCAD code when using STL mode
-                if self.scad_code:
-                    self.scad_code = ""
+                    # Clear SCAD code when using STL mode
+                    if self.scad_code:
+                        self.scad_code = ""
                 
                 logger.info(f"✅ SCAD code rendered to STL: {len(stl_data)} bytes from {len(enhanced_scad_code)} chars")
                 logger.info(f"STL data changed: {new_stl_base64 != previous_stl}")
             
         except Exception as e:
             self.error_message = str(e)
+            current_span().set_attribute("error", str(e))
             logger.error(f"❌ SCAD code update error: {e}")
         finally:
             self.is_loading = False
@@ -6409,31 +7712,37 @@ ${this.errorHistory.map((err, i) =>
             if code_hash in self.version_detection_cache:
                 cached_result = self.version_detection_cache[code_hash]
                 logger.debug(f"Using cached analysis for SCAD code (hash: {code_hash})")
+                current_span().set_attribute("version_cache_hit", True)
                 self.version_compatibility_status = cached_result.get('compatibility_status', 'unknown')
                 self.migration_suggestions = cached_result.get('migration_suggestions', [])
                 return cached_result.get('enhanced_code', scad_code)
             
-            # 2. Version Detection Phase
-            required_version = self._detect_scad_version_requirements(scad_code)
+            # 2. Version Detection Phase (incremental: only edited statements are re-analyzed)
+            with span("version_detection") as detection_span:
+                required_version = self._detect_scad_version_requirements(scad_code)
+                detection_span.set_attribute("required_version", required_version or "")
             current_config = self._get_current_version_config()
             
             # 3. Compatibility Check Phase
-            compatibility = self._check_version_compatibility(scad_code, current_config, required_version)
+            with span("compatibility_check"):
+                compatibility = self._check_version_compatibility(scad_code, current_config, required_version)
             
             # 4. Migration Phase (if needed)
             enhanced_code = scad_code
             migration_suggestions = []
             
             if not compatibility.get('is_compatible', True) and self.migration_engine:
-                migration_result = self._handle_version_migration(scad_code, compatibility)
+                with span("migration"):
+                    migration_result = self._handle_version_migration(scad_code, compatibility)
                 if migration_result.get('success', False):
                     enhanced_code = migration_result.get('migrated_code', scad_code)
                     migration_suggestions = migration_result.get('suggestions', [])
                     logger.info(f"✅ Applied {len(migration_suggestions)} migrations")
                 
             # 5. Version Selection Phase
-            optimal_version = self._select_optimal_rendering_version(enhanced_code, required_version)
-            self._switch_to_version_if_needed(optimal_version)
+            with span("version_selection"):
+                optimal_version = self._select_optimal_rendering_version(enhanced_code, required_version)
+                self._switch_to_version_if_needed(optimal_version)
             
             # 6. Update UI state
             self.version_compatibility_status = compatibility.get('status', 'compatible')
@@ -6478,8 +7787,22 @@ ${this.errorHistory.map((err, i) =>
             logger.info("Normal STL rendering")
         
         try:
-            # Use the configured renderer
-            stl_data = self.renderer.render_scad_to_stl(scad_code)
+            render_code, tier, estimated_seconds = self._plan_render_tier(scad_code)
+            
+            # Use the configured renderer once the scheduler admits the render;
+            # WASM only returns a placeholder, the render happens in the browser
+            with contextlib.ExitStack() as stack:
+                queue_wait = 0.0
+                if not isinstance(self.renderer, OpenSCADWASMRenderer):
+                    ticket = stack.enter_context(self.render_scheduler.slot(
+                        self.render_client_id, self.render_priority, cost=estimated_seconds or 1.0))
+                    queue_wait = ticket.wait_seconds
+                start_time = time.perf_counter()
+                with span("render", renderer=type(self.renderer).__name__, scad_chars=len(render_code),
+                          tier=tier, queue_wait_seconds=queue_wait) as render_span:
+                    stl_data = self.renderer.render_scad_to_stl(render_code)
+                    render_span.set_attribute("stl_bytes", len(stl_data) if stl_data else 0)
+                render_seconds = time.perf_counter() - start_time
             
             # For WASM renderer, we need to handle placeholder responses
             if isinstance(self.renderer, OpenSCADWASMRenderer):
@@ -6495,6 +7818,8 @@ ${this.errorHistory.map((err, i) =>
                 raise RuntimeError("Renderer produced empty STL data")
             
             logger.info(f"✅ STL rendered successfully: {len(stl_data)} bytes")
+            if hasattr(self, 'realtime_renderer'):
+                self.realtime_renderer.record_render(scad_code, stl_data, render_seconds, quality=tier)
             return stl_data
             
         except Exception as e:
@@ -6502,6 +7827,52 @@ ${this.errorHistory.map((err, i) =>
             self.error_message = f"Rendering error: {e}"
             raise
     
+    def _plan_render_tier(self, scad_code: str):
+        """
+        Pick the preview or full tier of an STL render from its static cost
+        
+        With render_tier "auto" a model predicted to take longer than the
+        cost model's preview threshold renders at OpenSCAD's default
+        resolution, unless that is not predicted to be any faster; renders
+        predicted to exceed the warning threshold are
+        announced before they start. WASM renders in the browser and is
+        always full.
+        
+        Returns:
+            (SCAD code to render, tier, estimated seconds or None)
+        """
+        if isinstance(self.renderer, OpenSCADWASMRenderer):
+            return scad_code, "full", None
+        
+        try:
+            with span("cost_estimate") as cost_span:
+                estimate = self.cost_model.estimate(scad_code)
+                tier = self.render_tier if self.render_tier in ("preview", "full") else self.cost_model.choose_tier(estimate)
+                render_code = scad_code
+                if tier == "preview":
+                    render_code = preview_scad(scad_code)
+                    preview_estimate = self.cost_model.estimate(render_code)
+                    if self.render_tier != "preview" and preview_estimate.seconds >= estimate.seconds:
+                        # Resolution is not what makes this model slow
+                        tier, render_code = "full", scad_code
+                    else:
+                        estimate = preview_estimate
+                cost_span.set_attribute("estimated_seconds", estimate.seconds)
+                cost_span.set_attribute("tier", tier)
+        except Exception as e:
+            logger.warning(f"Render cost estimate failed: {e}")
+            return scad_code, "full", None
+        
+        self.render_estimate = {
+            'tier': tier,
+            'estimated_seconds': round(estimate.seconds, 3),
+            'polygons': int(estimate.polygons),
+            'warnings': [warning.message for warning in estimate.warnings],
+        }
+        if estimate.seconds > self.cost_model.warn_threshold_s:
+            logger.warning(f"⏳ Starting {tier} render estimated at {estimate.seconds:.0f}s")
+        return render_code, tier, estimate.seconds
+    
     # ==========================================
     # Phase 3.3b: Real-time Rendering Methods
     # ==========================================
@@ -6604,6 +7975,14 @@ ${this.errorHistory.map((err, i) =>
             self.scad_code = ""
             
         logger.debug(f"🔄 STL data updated: {len(stl_data)} bytes")
+    
+    def last_trace(self) -> List[Span]:
+        """
+        Spans of the most recent update_model() or update_scad_code() call
+        
+        Empty unless the viewer was created with an enabled Tracer.
+        """
+        return list(self.tracer.last_trace)
 
     def get_renderer_info(self) -> dict:
         """Get information about the current renderer"""
@@ -6629,6 +8008,10 @@ ${this.errorHistory.map((err, i) =>
                 'performance': realtime_stats
             }
         
+        # Time STL renders spent waiting for a render slot
+        base_info['queue_wait'] = self.render_scheduler.get_client_stats(self.render_client_id)
+        base_info['queue_wait']['priority'] = self.render_priority
+        
         return base_info
     
     # ========================
@@ -3,36 +3,184 @@ WASM Asset Server for anywidget
 
 Provides HTTP serving capabilities for WASM files within the anywidget framework.
 This module enables browsers to access the bundled OpenSCAD WASM files via HTTP.
+
+Assets are read from disk once and kept in memory together with a strong
+ETag and any precompressed (brotli/gzip) variants, so repeated requests from
+several viewers never go back to the filesystem.
+
+Asset URLs can embed a content digest (``openscad.<digest>.wasm``) taken
+from the build-time optimization manifest while the file's size and mtime
+still match it, or hashed from the file. Such URLs never change meaning
+and are served as immutable, so warm reloads need no network round trip.
 """
 
 import os
+import re
+import gzip
+import json
+import hashlib
 import mimetypes
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import logging
 import base64
 import urllib.parse
 
 logger = logging.getLogger(__name__)
 
+# Content encodings in order of preference when a client accepts several
+PREFERRED_ENCODINGS = ("br", "gzip")
+
+# File suffix of each precompressed variant on disk
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Assets smaller than this are not worth compressing on the fly
+MIN_COMPRESS_SIZE = 1024
+
+# Hex characters of the sha256 digest embedded in content-hashed filenames
+HASHED_DIGEST_LENGTH = 16
+
+_HASHED_FILENAME_RE = re.compile(
+    r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{%d})(?P<ext>\.[^.]+)$" % HASHED_DIGEST_LENGTH
+)
+
+
+@dataclass
+class AssetRepresentation:
+    """One encoding (identity, gzip or br) of a WASM asset"""
+    encoding: str
+    data: bytes
+    etag: str
+    path: Optional[Path] = None  # Backing file for zero-copy sendfile, if any
+    st_size: int = 0
+    st_mtime_ns: int = 0
+    
+    def matches_file(self, stat_result: os.stat_result) -> bool:
+        """Check that the backing file still holds the bytes we loaded"""
+        return (stat_result.st_size == self.st_size and
+                stat_result.st_mtime_ns == self.st_mtime_ns)
+
+
+@dataclass
+class WASMAsset:
+    """A WASM asset held in memory with its validators and encoded variants"""
+    filename: str
+    path: Path
+    mime_type: str
+    digest: str  # sha256 hex digest of the identity bytes
+    representations: Dict[str, AssetRepresentation] = field(default_factory=dict)
+    
+    @property
+    def data(self) -> bytes:
+        return self.representations["identity"].data
+    
+    @property
+    def etag(self) -> str:
+        return self.representations["identity"].etag
+    
+    @property
+    def size(self) -> int:
+        return len(self.data)
+    
+    def etags(self) -> List[str]:
+        """All ETags this asset may have been served under"""
+        return [rep.etag for rep in self.representations.values()]
+
+
+def make_hashed_filename(filename: str, digest: str) -> str:
+    """Insert a content digest before the final extension of a filename"""
+    stem, dot, ext = filename.rpartition(".")
+    if not dot:
+        return f"{filename}.{digest[:HASHED_DIGEST_LENGTH]}"
+    return f"{stem}.{digest[:HASHED_DIGEST_LENGTH]}.{ext}"
+
+
+def parse_hashed_filename(name: str) -> Optional[Tuple[str, str]]:
+    """
+    Split a content-hashed filename into (filename, digest)
+    
+    Returns:
+        Tuple of original filename and digest prefix, or None if the name
+        does not carry a digest
+    """
+    match = _HASHED_FILENAME_RE.match(name)
+    if not match:
+        return None
+    return match.group("stem") + match.group("ext"), match.group("digest")
+
+
+def _make_etag(digest: str, encoding: str = "identity") -> str:
+    """Build a strong ETag; encoded variants get their own validator"""
+    if encoding == "identity":
+        return f'"{digest[:32]}"'
+    return f'"{digest[:32]}-{encoding}"'
+
 
 class WASMAssetServer:
     """
     Serves WASM assets through anywidget's HTTP serving capabilities.
     
     This class provides methods to serve WASM files via HTTP endpoints
-    that can be accessed by browsers in the anywidget context.
+    that can be accessed by browsers in the anywidget context. File contents
+    are loaded lazily on first access and then served from memory.
     """
     
-    def __init__(self):
-        self.wasm_dir = self._get_wasm_directory()
+    def __init__(self, wasm_dir: Optional[Path] = None):
+        """
+        Initialize the asset server
+        
+        Args:
+            wasm_dir: Directory containing WASM files (default: bundled wasm/)
+        """
+        self.wasm_dir = Path(wasm_dir) if wasm_dir else self._get_wasm_directory()
         self.asset_registry = {}
+        self._assets: Dict[str, WASMAsset] = {}
+        self._lock = threading.Lock()
+        self._manifest_digests = self._load_manifest_digests()
+        self._digest_cache: Dict[str, Tuple[int, int, str]] = {}
         self._register_assets()
     
     def _get_wasm_directory(self) -> Path:
         """Get the directory containing WASM files"""
         return Path(__file__).parent / "wasm"
     
+    def _get_precompressed_directories(self) -> List[Path]:
+        """Directories searched for precompressed .br/.gz variants"""
+        directories = [self.wasm_dir]
+        static_wasm = Path(__file__).parent / "static" / "wasm"
+        if static_wasm != self.wasm_dir:
+            directories.append(static_wasm)
+        return directories
+    
+    def _get_manifest_path(self) -> Path:
+        """Build-time manifest written by scripts/optimize-wasm-assets.js"""
+        return Path(__file__).parent / "static" / "optimization-manifest.json"
+    
+    def _load_manifest_digests(self) -> Dict[str, Tuple[int, Optional[int], str]]:
+        """Read (original_size, mtime_ns, sha256) per file from the optimization manifest"""
+        digests = {}
+        manifest_path = self._get_manifest_path()
+        try:
+            manifest = json.loads(manifest_path.read_text())
+        except FileNotFoundError:
+            return digests
+        except Exception as e:
+            logger.warning(f"Could not read optimization manifest {manifest_path}: {e}")
+            return digests
+        
+        for entries in manifest.get("files", {}).values():
+            for entry in entries:
+                if entry.get("name") and entry.get("sha256"):
+                    mtime_ns = entry.get("mtime_ns")
+                    digests[entry["name"]] = (
+                        entry.get("original_size", -1),
+                        int(mtime_ns) if mtime_ns is not None else None,
+                        entry["sha256"]
+                    )
+        return digests
+    
     def _register_assets(self):
         """Register all WASM assets for serving"""
         if not self.wasm_dir.exists():
@@ -42,7 +190,7 @@ class WASMAssetServer:
         wasm_files = [
             "openscad.wasm",
             "openscad.js",
-            "openscad.wasm.js", 
+            "openscad.wasm.js",
             "openscad.d.ts",
             "openscad.fonts.js",
             "openscad.fonts.d.ts",
@@ -56,35 +204,256 @@ class WASMAssetServer:
                 self.asset_registry[filename] = file_path
                 logger.debug(f"Registered WASM asset: {filename}")
     
-    def get_asset_data(self, filename: str) -> Optional[Tuple[bytes, str]]:
+    def get_asset(self, filename: str) -> Optional[WASMAsset]:
         """
-        Get asset data and MIME type for a given filename
+        Get the in-memory asset record for a filename, loading it on first use
         
         Args:
-            filename: Name of the WASM file to serve
-            
+            filename: Name of the WASM file
+        
         Returns:
-            Tuple of (file_data, mime_type) or None if file not found
+            WASMAsset or None if the file is not registered or unreadable
         """
+        asset = self._assets.get(filename)
+        if asset is not None:
+            return asset
+        
         if filename not in self.asset_registry:
             logger.warning(f"WASM asset not found: {filename}")
             return None
         
-        file_path = self.asset_registry[filename]
-        
+        with self._lock:
+            # Another thread may have loaded it while we waited
+            asset = self._assets.get(filename)
+            if asset is None:
+                asset = self._load_asset(filename, self.asset_registry[filename])
+                if asset is not None:
+                    self._assets[filename] = asset
+        return asset
+    
+    def _load_asset(self, filename: str, file_path: Path) -> Optional[WASMAsset]:
+        """Read an asset and its precompressed variants into memory"""
         try:
-            with open(file_path, 'rb') as f:
-                data = f.read()
+            stat_result = file_path.stat()
+            data = file_path.read_bytes()
+        except Exception as e:
+            logger.error(f"Error reading WASM asset {filename}: {e}")
+            return None
+        
+        digest = hashlib.sha256(data).hexdigest()
+        asset = WASMAsset(
+            filename=filename,
+            path=file_path,
+            mime_type=self._get_mime_type(filename),
+            digest=digest
+        )
+        asset.representations["identity"] = AssetRepresentation(
+            encoding="identity",
+            data=data,
+            etag=_make_etag(digest),
+            path=file_path,
+            st_size=stat_result.st_size,
+            st_mtime_ns=stat_result.st_mtime_ns
+        )
+        
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            representation = self._load_precompressed(asset, encoding, suffix, stat_result)
+            if representation is not None:
+                asset.representations[encoding] = representation
+        
+        logger.debug(f"Loaded WASM asset {filename} ({len(data)} bytes, "
+                     f"encodings: {sorted(asset.representations)})")
+        return asset
+    
+    def _load_precompressed(self, asset: WASMAsset, encoding: str, suffix: str,
+                            source_stat: os.stat_result) -> Optional[AssetRepresentation]:
+        """Load a precompressed variant from disk if it matches the source"""
+        for directory in self._get_precompressed_directories():
+            variant_path = directory / (asset.filename + suffix)
+            if not variant_path.exists():
+                continue
             
-            # Determine MIME type
-            mime_type = self._get_mime_type(filename)
+            try:
+                variant_stat = variant_path.stat()
+                variant_data = variant_path.read_bytes()
+            except Exception as e:
+                logger.warning(f"Could not read {variant_path}: {e}")
+                continue
             
-            logger.debug(f"Serving WASM asset: {filename} ({len(data)} bytes, {mime_type})")
-            return data, mime_type
+            # A stale variant would serve old code under the new ETag, so gzip
+            # variants are verified byte-for-byte. Brotli cannot be decoded
+            # without an extra dependency and is trusted if not older than
+            # the source, like nginx's gzip_static/brotli_static.
+            if encoding == "gzip":
+                try:
+                    if gzip.decompress(variant_data) != asset.data:
+                        logger.debug(f"Ignoring stale precompressed variant {variant_path}")
+                        continue
+                except Exception:
+                    continue
+            elif variant_stat.st_mtime_ns < source_stat.st_mtime_ns:
+                logger.debug(f"Ignoring outdated precompressed variant {variant_path}")
+                continue
             
-        except Exception as e:
+            return AssetRepresentation(
+                encoding=encoding,
+                data=variant_data,
+                etag=_make_etag(asset.digest, encoding),
+                path=variant_path,
+                st_size=variant_stat.st_size,
+                st_mtime_ns=variant_stat.st_mtime_ns
+            )
+        return None
+    
+    def get_asset_digest(self, filename: str) -> Optional[str]:
+        """
+        Get the sha256 content digest of an asset
+        
+        Uses the build-time manifest when its recorded size and mtime match
+        the file on disk; otherwise the file is hashed once and the digest
+        kept for that (size, mtime). Handing out URLs thus reads a large
+        asset at most once per change.
+        
+        Args:
+            filename: Name of the WASM file
+        
+        Returns:
+            Hex digest or None if the asset is not available
+        """
+        asset = self._assets.get(filename)
+        if asset is not None:
+            return asset.digest
+        
+        file_path = self.asset_registry.get(filename)
+        if file_path is None:
+            return None
+        
+        try:
+            stat_result = file_path.stat()
+        except OSError:
+            return None
+        
+        manifest_entry = self._manifest_digests.get(filename)
+        if manifest_entry is not None and manifest_entry[:2] == (stat_result.st_size, stat_result.st_mtime_ns):
+            return manifest_entry[2]
+        
+        cached = self._digest_cache.get(filename)
+        if cached is not None and cached[:2] == (stat_result.st_size, stat_result.st_mtime_ns):
+            return cached[2]
+        
+        digest = hashlib.sha256()
+        try:
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        except OSError as e:
             logger.error(f"Error reading WASM asset {filename}: {e}")
             return None
+        self._digest_cache[filename] = (stat_result.st_size, stat_result.st_mtime_ns, digest.hexdigest())
+        return digest.hexdigest()
+    
+    def get_hashed_filename(self, filename: str) -> Optional[str]:
+        """Get the content-hashed name of an asset, e.g. openscad.<digest>.js"""
+        digest = self.get_asset_digest(filename)
+        if digest is None:
+            return None
+        return make_hashed_filename(filename, digest)
+    
+    def resolve_hashed_filename(self, name: str) -> Optional[WASMAsset]:
+        """
+        Resolve a content-hashed filename to its asset
+        
+        Returns:
+            The asset if the embedded digest matches its current content,
+            None otherwise (unknown file or outdated digest)
+        """
+        parsed = parse_hashed_filename(name)
+        if parsed is None:
+            return None
+        
+        filename, digest = parsed
+        if filename not in self.asset_registry:
+            return None
+        
+        asset = self.get_asset(filename)
+        if asset is None or not asset.digest.startswith(digest):
+            logger.debug(f"Hashed asset URL does not match current content: {name}")
+            return None
+        return asset
+    
+    def get_representation(self, asset: WASMAsset, encoding: str) -> Optional[AssetRepresentation]:
+        """
+        Get an encoded representation of an asset
+        
+        Missing gzip variants of compressible assets are generated once and
+        cached in memory.
+        
+        Args:
+            asset: Asset record from get_asset()
+            encoding: "identity", "gzip" or "br"
+        
+        Returns:
+            AssetRepresentation or None if the encoding is not available
+        """
+        representation = asset.representations.get(encoding)
+        if representation is not None or encoding != "gzip":
+            return representation
+        
+        if asset.size < MIN_COMPRESS_SIZE or not self._is_compressible(asset.mime_type):
+            return None
+        
+        with self._lock:
+            representation = asset.representations.get("gzip")
+            if representation is None:
+                compressed = gzip.compress(asset.data, compresslevel=6, mtime=0)
+                if len(compressed) >= asset.size:
+                    return None
+                representation = AssetRepresentation(
+                    encoding="gzip",
+                    data=compressed,
+                    etag=_make_etag(asset.digest, "gzip")
+                )
+                asset.representations["gzip"] = representation
+                logger.debug(f"Compressed {asset.filename} in memory: "
+                             f"{asset.size} -> {len(compressed)} bytes")
+        return representation
+    
+    def available_encodings(self, asset: WASMAsset) -> List[str]:
+        """Encodings that can be served for an asset, most preferred first"""
+        encodings = [enc for enc in PREFERRED_ENCODINGS if enc in asset.representations]
+        if ("gzip" not in encodings and asset.size >= MIN_COMPRESS_SIZE and
+                self._is_compressible(asset.mime_type)):
+            encodings.append("gzip")
+        return encodings
+    
+    def _is_compressible(self, mime_type: str) -> bool:
+        """Whether on-the-fly compression pays off for a MIME type"""
+        return mime_type in ('application/wasm', 'application/javascript',
+                             'application/typescript', 'application/json') or \
+            mime_type.startswith('text/')
+    
+    def get_asset_data(self, filename: str) -> Optional[Tuple[bytes, str]]:
+        """
+        Get asset data and MIME type for a given filename
+        
+        Args:
+            filename: Name of the WASM file to serve
+        
+        Returns:
+            Tuple of (file_data, mime_type) or None if file not found
+        """
+        asset = self.get_asset(filename)
+        if asset is None:
+            return None
+        
+        logger.debug(f"Serving WASM asset: {filename} ({asset.size} bytes, {asset.mime_type})")
+        return asset.data, asset.mime_type
+    
+    def clear_memory_cache(self) -> None:
+        """Drop all in-memory asset data so it is re-read on next access"""
+        with self._lock:
+            self._assets.clear()
+        logger.debug("WASM asset memory cache cleared")
     
     def _get_mime_type(self, filename: str) -> str:
         """Get appropriate MIME type for WASM files"""
@@ -108,7 +477,8 @@ class WASMAssetServer:
                     'size': stat.st_size,
                     'mime_type': self._get_mime_type(filename),
                     'path': str(file_path),
-                    'available': True
+                    'available': True,
+                    'in_memory': filename in self._assets
                 }
             except Exception as e:
                 assets[filename] = {
@@ -127,7 +497,7 @@ class WASMAssetServer:
         
         Args:
             filename: Name of the WASM file
-            
+        
         Returns:
             Data URL string or None if file too large or not found
         """
@@ -146,13 +516,14 @@ class WASMAssetServer:
         b64_data = base64.b64encode(data).decode('utf-8')
         return f"data:{mime_type};base64,{b64_data}"
     
-    def get_asset_urls(self, base_url: str) -> Dict[str, str]:
+    def get_asset_urls(self, base_url: str, hashed: bool = False) -> Dict[str, str]:
         """
         Get URLs for all WASM assets using the provided base URL
         
         Args:
             base_url: Base URL for asset serving (e.g., from anywidget)
-            
+            hashed: Embed content digests in the filenames (immutable URLs)
+        
         Returns:
             Dictionary mapping filenames to URLs
         """
@@ -163,8 +534,12 @@ class WASMAssetServer:
             base_url += '/'
         
         for filename in self.asset_registry:
+            served_name = filename
+            if hashed:
+                served_name = self.get_hashed_filename(filename) or filename
+            
             # URL-encode the filename for safety
-            encoded_filename = urllib.parse.quote(filename)
+            encoded_filename = urllib.parse.quote(served_name)
             urls[filename] = base_url + encoded_filename
         
         return urls
@@ -209,8 +584,8 @@ def serve_wasm_asset(filename: str) -> Optional[Tuple[bytes, str]]:
     
     Args:
         filename: Name of the WASM file to serve
-        
+    
     Returns:
         Tuple of (file_data, mime_type) or None if file not found
     """
-    return wasm_asset_server.get_asset_data(filename)
\ No newline at end of file
+    return wasm_asset_server.get_asset_data(filename)
@@ -1,17 +1,18 @@
 """
 HTTP Server for WASM Assets
 
-Provides a simple HTTP server to serve WASM files to browsers.
+Provides a threaded HTTP/1.1 server to serve WASM files to browsers.
 This server integrates with anywidget to provide web-accessible WASM assets.
 """
 
 import asyncio
 import logging
+import os
 import threading
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, unquote
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import socket
 import time
 
@@ -19,9 +20,23 @@ from .wasm_asset_server import get_wasm_asset_server
 
 logger = logging.getLogger(__name__)
 
+# Stable filenames may change content, so browsers must revalidate them
+REVALIDATE_CACHE_CONTROL = 'public, max-age=3600'
+
+# Content-hashed filenames never change content and can be cached forever
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
 
 class WASMHTTPHandler(BaseHTTPRequestHandler):
-    """HTTP handler for serving WASM assets"""
+    """
+    HTTP handler for serving WASM assets
+    
+    Speaks HTTP/1.1 with keep-alive, answers conditional requests with 304,
+    negotiates precompressed brotli/gzip variants, honours single byte
+    ranges and sends file-backed bodies with zero-copy sendfile.
+    """
+    
+    protocol_version = "HTTP/1.1"
     
     def __init__(self, *args, wasm_server=None, **kwargs):
         self.wasm_server = wasm_server or get_wasm_asset_server()
@@ -29,6 +44,14 @@ class WASMHTTPHandler(BaseHTTPRequestHandler):
     
     def do_GET(self):
         """Handle GET requests for WASM files"""
+        self._handle_request(send_body=True)
+    
+    def do_HEAD(self):
+        """Handle HEAD requests for WASM files"""
+        self._handle_request(send_body=False)
+    
+    def _handle_request(self, send_body: bool):
+        """Route a GET/HEAD request to the matching asset"""
         try:
             # Parse the URL
             parsed_url = urlparse(self.path)
@@ -41,79 +64,237 @@ class WASMHTTPHandler(BaseHTTPRequestHandler):
             # Check if this is a WASM asset request
             if path.startswith('wasm/'):
                 filename = path[5:]  # Remove 'wasm/' prefix
-                self._serve_wasm_asset(filename)
+                self._serve_wasm_asset(filename, send_body)
             elif path in ['openscad.wasm', 'openscad.js', 'openscad.fonts.js', 'openscad.mcad.js']:
                 # Direct asset requests
-                self._serve_wasm_asset(path)
+                self._serve_wasm_asset(path, send_body)
             else:
                 self._send_not_found()
-                
+        
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away mid-transfer (e.g. cancelled page load)
+            self.close_connection = True
         except Exception as e:
             logger.error(f"Error handling request {self.path}: {e}")
             self._send_error(500, str(e))
     
-    def _serve_wasm_asset(self, filename: str):
-        """Serve a WASM asset file"""
-        asset_data = self.wasm_server.get_asset_data(filename)
+    def _serve_wasm_asset(self, filename: str, send_body: bool = True):
+        """Serve a WASM asset file by stable or content-hashed name"""
+        if filename in self.wasm_server.asset_registry:
+            asset = self.wasm_server.get_asset(filename)
+            cache_control = REVALIDATE_CACHE_CONTROL
+        else:
+            # openscad.<digest>.wasm - a digest that no longer matches the
+            # content is a 404 rather than stale bytes under a forever-URL
+            asset = self.wasm_server.resolve_hashed_filename(filename)
+            cache_control = IMMUTABLE_CACHE_CONTROL
         
-        if asset_data is None:
+        if asset is None:
             self._send_not_found()
             return
         
-        data, mime_type = asset_data
+        # Conditional request: the browser already holds this exact content
+        if self._etag_matches(self.headers.get('If-None-Match'), asset.etags()):
+            self.send_response(304)
+            self.send_header('ETag', asset.etag)
+            self.send_header('Cache-Control', cache_control)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            logger.debug(f"WASM asset not modified: {filename}")
+            return
+        
+        byte_range = self._parse_range(asset)
+        if byte_range == 'unsatisfiable':
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{asset.size}')
+            self.send_header('Content-Length', '0')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            return
+        
+        # Ranges address identity bytes, so only full responses are encoded
+        encoding = 'identity'
+        if byte_range is None:
+            encoding = self._negotiate_encoding(self.wasm_server.available_encodings(asset))
+        representation = self.wasm_server.get_representation(asset, encoding)
+        if representation is None:
+            representation = asset.representations['identity']
+        
+        total_size = len(representation.data)
+        start, length = (0, total_size) if byte_range is None else byte_range
         
         # Send response
-        self.send_response(200)
-        self.send_header('Content-Type', mime_type)
-        self.send_header('Content-Length', str(len(data)))
-        self.send_header('Cache-Control', 'public, max-age=3600')  # Cache for 1 hour
+        self.send_response(200 if byte_range is None else 206)
+        self.send_header('Content-Type', asset.mime_type)
+        self.send_header('Content-Length', str(length))
+        if byte_range is not None:
+            self.send_header('Content-Range', f'bytes {start}-{start + length - 1}/{total_size}')
+        if representation.encoding != 'identity':
+            self.send_header('Content-Encoding', representation.encoding)
+        self.send_header('ETag', representation.etag)
+        self.send_header('Cache-Control', cache_control)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Accept-Ranges', 'bytes')
         self.send_header('Access-Control-Allow-Origin', '*')  # Allow CORS
         self.end_headers()
         
-        self.wfile.write(data)
+        if send_body:
+            self._send_body(representation, start, length)
+        
+        logger.debug(f"Served WASM asset: {filename} ({length} bytes, {representation.encoding})")
+    
+    def _send_body(self, representation, start: int, length: int):
+        """Write a response body, using zero-copy sendfile when file-backed"""
+        if length <= 0:
+            return
+        
+        if representation.path is not None and hasattr(self.connection, 'sendfile'):
+            try:
+                with open(representation.path, 'rb') as f:
+                    # Only trust the file if it still holds the bytes we hashed
+                    if representation.matches_file(os.fstat(f.fileno())):
+                        self.wfile.flush()
+                        self.connection.sendfile(f, offset=start, count=length)
+                        return
+            except OSError as e:
+                logger.debug(f"sendfile unavailable for {representation.path}: {e}")
+        
+        self.wfile.write(memoryview(representation.data)[start:start + length])
+    
+    @staticmethod
+    def _etag_matches(if_none_match: Optional[str], etags: List[str]) -> bool:
+        """Evaluate an If-None-Match header (weak comparison, RFC 9110)"""
+        if not if_none_match:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(',')]
+        if '*' in candidates:
+            return True
+        candidates = [tag[2:] if tag.startswith('W/') else tag for tag in candidates]
+        return any(tag in etags for tag in candidates)
+    
+    def _negotiate_encoding(self, available: List[str]) -> str:
+        """Pick the preferred content encoding accepted by the client"""
+        header = self.headers.get('Accept-Encoding', '')
+        if not header or not available:
+            return 'identity'
+        
+        accepted = {}
+        for item in header.split(','):
+            parts = item.strip().split(';')
+            name = parts[0].strip().lower()
+            quality = 1.0
+            for param in parts[1:]:
+                param = param.strip()
+                if param.startswith('q='):
+                    try:
+                        quality = float(param[2:])
+                    except ValueError:
+                        quality = 0.0
+            if name:
+                accepted[name] = quality
         
-        logger.debug(f"Served WASM asset: {filename} ({len(data)} bytes)")
+        for encoding in available:
+            quality = accepted.get(encoding, accepted.get('*', 0.0))
+            if quality > 0:
+                return encoding
+        return 'identity'
+    
+    def _parse_range(self, asset):
+        """
+        Parse a single-range Range header against the identity representation
+        
+        Returns:
+            None for a full response, (start, length) for a partial one, or
+            'unsatisfiable' when the range lies outside the asset
+        """
+        header = self.headers.get('Range')
+        if not header or not header.startswith('bytes='):
+            return None
+        
+        # If-Range: only honour the range if the client's copy is current
+        if_range = self.headers.get('If-Range')
+        if if_range and if_range.strip() != asset.etag:
+            return None
+        
+        spec = header[len('bytes='):].strip()
+        if ',' in spec:
+            return None  # Multipart ranges are not supported; send everything
+        
+        size = asset.size
+        first, _, last = spec.partition('-')
+        try:
+            if first == '':
+                suffix_length = int(last)
+                if suffix_length <= 0:
+                    return 'unsatisfiable'
+                start = max(0, size - suffix_length)
+                end = size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else size - 1
+        except ValueError:
+            return None
+        
+        if start >= size or end < start:
+            return 'unsatisfiable'
+        end = min(end, size - 1)
+        return start, end - start + 1
     
     def _send_not_found(self):
         """Send 404 Not Found response"""
+        body = b'WASM asset not found'
         self.send_response(404)
         self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        self.wfile.write(b'WASM asset not found')
+        self.wfile.write(body)
     
     def _send_error(self, status_code: int, message: str):
         """Send error response"""
+        body = f'Error: {message}'.encode('utf-8')
         self.send_response(status_code)
         self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        self.wfile.write(f'Error: {message}'.encode('utf-8'))
+        self.wfile.write(body)
     
     def log_message(self, format, *args):
         """Override to use Python logging instead of stderr"""
         logger.debug(f"HTTP: {format % args}")
 
 
+class ThreadingWASMHTTPServer(ThreadingHTTPServer):
+    """Thread-per-connection server so concurrent viewers never queue"""
+    
+    daemon_threads = True
+    request_queue_size = 64
+
+
 class WASMHTTPServer:
     """
     HTTP server for serving WASM assets
     
     This server runs in a separate thread and provides HTTP access to WASM files.
+    Each connection is handled on its own thread, so several viewers loading
+    large assets at once are served concurrently.
     """
     
-    def __init__(self, host: str = 'localhost', port: int = 0):
+    def __init__(self, host: str = 'localhost', port: int = 0, wasm_server=None):
         """
         Initialize WASM HTTP server
         
         Args:
             host: Host to bind to (default: localhost)
             port: Port to bind to (0 for auto-select)
+            wasm_server: Asset server to serve from (default: global instance)
         """
         self.host = host
         self.port = port
         self.server = None
         self.thread = None
         self.running = False
-        self.wasm_server = get_wasm_asset_server()
+        self.wasm_server = wasm_server or get_wasm_asset_server()
     
     def start(self) -> str:
         """
@@ -130,7 +311,7 @@ class WASMHTTPServer:
             def handler_factory(*args, **kwargs):
                 return WASMHTTPHandler(*args, wasm_server=self.wasm_server, **kwargs)
             
-            self.server = HTTPServer((self.host, self.port), handler_factory)
+            self.server = ThreadingWASMHTTPServer((self.host, self.port), handler_factory)
             
             # Get the actual port if auto-selected
             if self.port == 0:
@@ -146,7 +327,7 @@ class WASMHTTPServer:
             logger.info(f"WASM HTTP server started at {base_url}")
             
             return base_url
-            
+        
         except Exception as e:
             logger.error(f"Failed to start WASM HTTP server: {e}")
             raise
@@ -186,7 +367,7 @@ class WASMHTTPServer:
         
         Args:
             filename: Name of the WASM file
-            
+        
         Returns:
             Full URL to the WASM asset
         """
@@ -228,7 +409,7 @@ def start_wasm_server(host: str = 'localhost', port: int = 0) -> str:
     Args:
         host: Host to bind to
         port: Port to bind to (0 for auto-select)
-        
+    
     Returns:
         Base URL for accessing WASM assets
     """
@@ -18,6 +18,7 @@ from datetime import datetime, timedelta
 import logging
 
 from .version_manager import VersionInfo, OpenSCADVersionType
+from .scad_parser import FEATURE_MIN_VERSIONS, find_features
 
 logger = logging.getLogger(__name__)
 
@@ -561,18 +562,18 @@ class WASMVersionSelector:
             "performance": "stable"
         }
         
-        # Simple pattern-based analysis
-        # This would be expanded with proper AST parsing
+        # Shares the cached parse with the migration engine's analyzer
+        features = find_features(scad_code, ("exponent_operator", "list_comprehension", "assert"))
         
         # Check for newer syntax features
-        if "**" in scad_code:  # Exponent operator (2023.06+)
-            requirements["min_version"] = "2023.06"
+        if "exponent_operator" in features:  # Exponent operator (2023.06+)
+            requirements["min_version"] = FEATURE_MIN_VERSIONS["exponent_operator"]
             requirements["features"].append("exponent_operator")
         
-        if "list(" in scad_code or "[for" in scad_code:
+        if "list_comprehension" in features:
             requirements["features"].append("list_comprehension")
         
-        if "assert(" in scad_code:
+        if "assert" in features:
             requirements["features"].append("assertions")
         
         # Prefer newer versions for complex models
@@ -0,0 +1,76 @@
+/**
+ * Helpers for running pieces of the JavaScript embedded in viewer.py
+ *
+ * The viewer ships its frontend as the `_esm` string of OpenSCADViewer, so
+ * there is no module to import. These helpers cut single top-level
+ * declarations out of that string and evaluate them with explicit globals.
+ */
+
+import { readFileSync } from 'fs';
+import { join } from 'path';
+
+const viewerPyPath = join(process.cwd(), 'src', 'marimo_openscad', 'viewer.py');
+const viewerPyContent = readFileSync(viewerPyPath, 'utf8');
+const esmMatch = viewerPyContent.match(/_esm = r?"""([\s\S]*?)"""/);
+
+if (!esmMatch) {
+    throw new Error('Could not extract embedded JavaScript from viewer.py');
+}
+
+// Undo the Python string escapes so the code matches what the browser runs
+export const embeddedJS = esmMatch[1].replace(/\\(\\|'|n)/g, (_, c) => (c === 'n' ? '\n' : c));
+
+/**
+ * Index just past the block that opens at `start`, skipping strings and
+ * comments (regex literals containing braces are not supported)
+ */
+function blockEnd(source, start) {
+    let depth = 0;
+    for (let i = start; i < source.length; i++) {
+        const c = source[i];
+        if (c === '/' && source[i + 1] === '/') {
+            i = source.indexOf('\n', i);
+        } else if (c === '/' && source[i + 1] === '*') {
+            i = source.indexOf('*/', i) + 1;
+        } else if (c === '"' || c === "'" || c === '`') {
+            for (i++; source[i] !== c; i++) {
+                if (source[i] === '\\') i++;
+            }
+        } else if (c === '{') {
+            depth++;
+        } else if (c === '}' && --depth === 0) {
+            return i + 1;
+        }
+    }
+    throw new Error('Unbalanced block in embedded JavaScript');
+}
+
+/**
+ * Source of one top-level class, function or const from the embedded JS
+ * @param {string} name - Declared name
+ * @returns {string} Declaration source
+ */
+export function extractDeclaration(name) {
+    const pattern = new RegExp(`^[ \\t]*(?:async\\s+)?(class ${name}\\b|function ${name}\\s*\\(|const ${name}\\s*=)`, 'm');
+    const match = pattern.exec(embeddedJS);
+    if (!match) {
+        throw new Error(`${name} not found in embedded JavaScript`);
+    }
+    const start = match.index;
+    if (match[1].startsWith('const')) {
+        return embeddedJS.slice(start, embeddedJS.indexOf(';\n', start) + 1);
+    }
+    return embeddedJS.slice(start, blockEnd(embeddedJS, embeddedJS.indexOf('{', start)));
+}
+
+/**
+ * Evaluate embedded declarations together
+ * @param {string[]} names - Declarations, in dependency order
+ * @param {Object} scope - Free variables the declarations refer to
+ * @returns {Object} The evaluated declarations by name
+ */
+export function loadEmbedded(names, scope = {}) {
+    const source = names.map(extractDeclaration).join('\n');
+    const factory = new Function(...Object.keys(scope), `${source}\nreturn { ${names.join(', ')} };`);
+    return factory(...Object.values(scope));
+}
@@ -0,0 +1,181 @@
+/**
+ * In-place STL geometry update tests for the embedded viewer
+ * Runs the buffer reuse helpers from viewer.py against a minimal Three.js
+ */
+
+import { describe, it, expect } from 'vitest';
+import { loadEmbedded } from './embedded-js.js';
+
+let nextUuid = 0;
+
+// Just enough of Three.js for the STL buffer helpers
+const THREE = {
+    DynamicDrawUsage: 35048,
+    BufferAttribute: class {
+        constructor(array, itemSize) {
+            this.array = array;
+            this.itemSize = itemSize;
+            this.updateRange = { offset: 0, count: -1 };
+            this.needsUpdate = false;
+        }
+        setUsage(usage) {
+            this.usage = usage;
+            return this;
+        }
+    },
+    BufferGeometry: class {
+        constructor() {
+            this.uuid = `geometry-${++nextUuid}`;
+            this.attributes = {};
+            this.userData = {};
+            this.drawRange = { start: 0, count: Infinity };
+            this.boundingBox = null;
+            this.boundingSphere = null;
+            this.disposed = false;
+        }
+        setAttribute(name, attribute) {
+            this.attributes[name] = attribute;
+        }
+        setDrawRange(start, count) {
+            this.drawRange = { start, count };
+        }
+        dispose() {
+            this.disposed = true;
+        }
+    },
+    Box3: class {
+        constructor() {
+            const vector = () => ({ set(x, y, z) { Object.assign(this, { x, y, z }); } });
+            this.min = vector();
+            this.max = vector();
+        }
+        getBoundingSphere(sphere) {
+            sphere.radius = Math.hypot(this.max.x - this.min.x, this.max.y - this.min.y, this.max.z - this.min.z) / 2;
+            return sphere;
+        }
+    },
+    Sphere: class {}
+};
+
+const STL_HELPERS = ['STL_CAPACITY_HEADROOM', 'createSTLGeometry', 'canUpdateSTLInPlace', 'writeSTLGeometry'];
+
+function loadHelpers(scope = {}) {
+    return loadEmbedded(STL_HELPERS, {
+        THREE,
+        resourceOptimizer: null,
+        stlMesh: null,
+        currentMesh: null,
+        ...scope
+    });
+}
+
+// Triangles along x with a distinct normal per facet
+function triangles(count) {
+    const vertices = new Float32Array(count * 9);
+    const normals = new Float32Array(count * 9);
+    for (let face = 0; face < count; face++) {
+        vertices.set([face, 0, 0, face + 1, 0, 0, face, 1, 2], face * 9);
+        normals.set([0, 0, face, 0, 0, face, 0, 0, face], face * 9);
+    }
+    return { vertices, normals };
+}
+
+describe('Embedded STL geometry reuse', () => {
+    it('should allocate attributes with headroom for dynamic updates', () => {
+        const { createSTLGeometry } = loadHelpers();
+
+        const geometry = createSTLGeometry(300);
+
+        expect(geometry.userData.capacity).toBe(375);
+        expect(geometry.attributes.position.array).toHaveLength(375 * 3);
+        expect(geometry.attributes.position.usage).toBe(THREE.DynamicDrawUsage);
+        expect(geometry.userData.pooledBuffer).toBe(true);
+    });
+
+    it('should copy positions and parsed normals without recomputing them', () => {
+        const { createSTLGeometry, writeSTLGeometry } = loadHelpers();
+        const geometry = createSTLGeometry(30);
+        const parsed = triangles(10);
+
+        writeSTLGeometry(geometry, parsed.vertices, parsed.normals);
+
+        expect(Array.from(geometry.attributes.position.array.subarray(0, 90))).toEqual(Array.from(parsed.vertices));
+        expect(Array.from(geometry.attributes.normal.array.subarray(0, 90))).toEqual(Array.from(parsed.normals));
+    });
+
+    it('should upload and draw only the used range', () => {
+        const { createSTLGeometry, writeSTLGeometry } = loadHelpers();
+        const geometry = createSTLGeometry(30);
+        const parsed = triangles(10);
+
+        writeSTLGeometry(geometry, parsed.vertices, parsed.normals);
+
+        expect(geometry.drawRange).toEqual({ start: 0, count: 30 });
+        expect(geometry.attributes.position.updateRange).toEqual({ offset: 0, count: 90 });
+        expect(geometry.attributes.normal.updateRange).toEqual({ offset: 0, count: 90 });
+        expect(geometry.attributes.position.needsUpdate).toBe(true);
+    });
+
+    it('should bound the used range and ignore stale data past it', () => {
+        const { createSTLGeometry, writeSTLGeometry } = loadHelpers();
+        const geometry = createSTLGeometry(30);
+        const large = triangles(10);
+        const small = triangles(2);
+
+        writeSTLGeometry(geometry, large.vertices, large.normals);
+        writeSTLGeometry(geometry, small.vertices, small.normals);
+
+        expect(geometry.drawRange.count).toBe(6);
+        expect(geometry.boundingBox.min).toMatchObject({ x: 0, y: 0, z: 0 });
+        expect(geometry.boundingBox.max).toMatchObject({ x: 2, y: 1, z: 2 });
+        expect(geometry.boundingSphere.radius).toBeCloseTo(1.5);
+    });
+
+    it('should update in place only while the model fits the buffers', () => {
+        const { createSTLGeometry } = loadHelpers();
+        const mesh = { geometry: createSTLGeometry(300) };
+        const { canUpdateSTLInPlace } = loadHelpers({ stlMesh: mesh, currentMesh: mesh });
+
+        expect(canUpdateSTLInPlace(300)).toBe(true);
+        expect(canUpdateSTLInPlace(375)).toBe(true);
+        expect(canUpdateSTLInPlace(376)).toBe(false);
+        // Far smaller models get fresh buffers instead of pinning large ones
+        expect(canUpdateSTLInPlace(90)).toBe(false);
+    });
+
+    it('should not update a mesh that was replaced in the scene', () => {
+        const { createSTLGeometry } = loadHelpers();
+        const mesh = { geometry: createSTLGeometry(300) };
+        const { canUpdateSTLInPlace } = loadHelpers({ stlMesh: mesh, currentMesh: { isLOD: true } });
+
+        expect(canUpdateSTLInPlace(300)).toBe(false);
+    });
+
+    it('should reuse released buffers from the resource optimizer pool', () => {
+        const { ResourceOptimizationEngine } = loadEmbedded(['ResourceOptimizationEngine'], { THREE });
+        const resourceOptimizer = new ResourceOptimizationEngine(null, null, null);
+        clearInterval(resourceOptimizer.cleanupInterval);
+        const { createSTLGeometry } = loadHelpers({ resourceOptimizer });
+
+        const retired = createSTLGeometry(300);
+        resourceOptimizer.releaseGeometry(retired);
+
+        expect(createSTLGeometry(200)).toBe(retired);
+        expect(createSTLGeometry(200)).not.toBe(retired);
+        expect(retired.disposed).toBe(false);
+    });
+
+    it('should dispose pooled buffers when they are evicted', () => {
+        const { ResourceOptimizationEngine } = loadEmbedded(['ResourceOptimizationEngine'], { THREE });
+        const resourceOptimizer = new ResourceOptimizationEngine(null, null, null);
+        clearInterval(resourceOptimizer.cleanupInterval);
+        const { createSTLGeometry } = loadHelpers({ resourceOptimizer });
+        const retired = createSTLGeometry(300);
+        resourceOptimizer.releaseGeometry(retired);
+
+        resourceOptimizer.removeCachedGeometry(`stl-buffer:${retired.uuid}`);
+
+        expect(retired.disposed).toBe(true);
+        expect(createSTLGeometry(300)).not.toBe(retired);
+    });
+});
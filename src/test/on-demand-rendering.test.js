@@ -0,0 +1,153 @@
+/**
+ * On-demand render loop tests for the embedded viewer
+ * Runs OnDemandRenderLoop from viewer.py with a manually stepped animation frame
+ */
+
+import { describe, it, expect, vi, beforeEach } from 'vitest';
+import { loadEmbedded } from './embedded-js.js';
+
+describe('Embedded OnDemandRenderLoop', () => {
+    let frames;
+    let observers;
+    let OnDemandRenderLoop;
+
+    // Run the frames that are currently scheduled
+    function step(now = 16) {
+        const pending = Array.from(frames.values());
+        frames.clear();
+        pending.forEach(callback => callback(now));
+        return pending.length;
+    }
+
+    function setIntersecting(isIntersecting) {
+        observers.forEach(observer => observer.callback([{ isIntersecting }]));
+    }
+
+    beforeEach(() => {
+        frames = new Map();
+        observers = [];
+        let nextFrame = 0;
+
+        ({ OnDemandRenderLoop } = loadEmbedded(['OnDemandRenderLoop'], {
+            requestAnimationFrame: callback => {
+                frames.set(++nextFrame, callback);
+                return nextFrame;
+            },
+            cancelAnimationFrame: id => frames.delete(id),
+            IntersectionObserver: class {
+                constructor(callback) {
+                    this.callback = callback;
+                    this.disconnected = false;
+                    observers.push(this);
+                }
+                observe() {}
+                disconnect() {
+                    this.disconnected = true;
+                }
+            }
+        }));
+    });
+
+    it('should coalesce redraw requests into one frame', () => {
+        const renderFrame = vi.fn();
+        const loop = new OnDemandRenderLoop(renderFrame, {});
+
+        loop.requestRender();
+        loop.requestRender();
+        loop.requestRender();
+
+        expect(step()).toBe(1);
+        expect(renderFrame).toHaveBeenCalledTimes(1);
+    });
+
+    it('should stay idle until something requests a redraw', () => {
+        const renderFrame = vi.fn();
+        const loop = new OnDemandRenderLoop(renderFrame, {});
+
+        loop.requestRender();
+        step();
+
+        expect(step()).toBe(0);
+        expect(renderFrame).toHaveBeenCalledTimes(1);
+    });
+
+    it('should keep drawing while animations are running', () => {
+        const renderFrame = vi.fn();
+        const loop = new OnDemandRenderLoop(renderFrame, {});
+        let remaining = 3;
+
+        loop.addAnimation(() => --remaining > 0);
+        while (step()) {}
+
+        expect(renderFrame).toHaveBeenCalledTimes(3);
+        expect(loop.animations.size).toBe(0);
+    });
+
+    it('should stop an animation when it is removed', () => {
+        const renderFrame = vi.fn();
+        const loop = new OnDemandRenderLoop(renderFrame, {});
+
+        const remove = loop.addAnimation(() => true);
+        step();
+        remove();
+        step();
+
+        expect(step()).toBe(0);
+        expect(renderFrame).toHaveBeenCalledTimes(2);
+    });
+
+    it('should draw every frame in continuous mode', () => {
+        const renderFrame = vi.fn();
+        const loop = new OnDemandRenderLoop(renderFrame, {}, 'continuous');
+
+        loop.requestRender();
+        for (let i = 0; i < 5; i++) step();
+
+        expect(renderFrame).toHaveBeenCalledTimes(5);
+
+        loop.setMode('on-demand');
+        step();
+        expect(step()).toBe(0);
+    });
+
+    it('should pause off screen and redraw once when visible again', () => {
+        const renderFrame = vi.fn();
+        const loop = new OnDemandRenderLoop(renderFrame, {});
+
+        loop.requestRender();
+        setIntersecting(false);
+        expect(step()).toBe(0);
+
+        loop.requestRender();
+        loop.requestRender();
+        expect(step()).toBe(0);
+
+        setIntersecting(true);
+        expect(step()).toBe(1);
+        expect(step()).toBe(0);
+        expect(renderFrame).toHaveBeenCalledTimes(1);
+    });
+
+    it('should not redraw on becoming visible when nothing changed', () => {
+        const renderFrame = vi.fn();
+        new OnDemandRenderLoop(renderFrame, {});
+
+        setIntersecting(false);
+        setIntersecting(true);
+
+        expect(step()).toBe(0);
+        expect(renderFrame).not.toHaveBeenCalled();
+    });
+
+    it('should stop drawing after dispose', () => {
+        const renderFrame = vi.fn();
+        const loop = new OnDemandRenderLoop(renderFrame, {}, 'continuous');
+
+        loop.requestRender();
+        loop.dispose();
+        loop.requestRender();
+
+        expect(step()).toBe(0);
+        expect(observers[0].disconnected).toBe(true);
+    });
+});
@@ -0,0 +1,162 @@
+/**
+ * Shared WebGL renderer tests for the embedded viewer
+ * Runs SharedWebGLRenderer and SharedRendererView from viewer.py with a fake WebGL renderer
+ */
+
+import { describe, it, expect, vi, beforeEach } from 'vitest';
+import { loadEmbedded } from './embedded-js.js';
+
+// Canvas stand-in that records listeners and 2D copies
+function createCanvas() {
+    const listeners = {};
+    const context = { globalCompositeOperation: 'source-over', drawImage: vi.fn() };
+    return {
+        width: 0,
+        height: 0,
+        style: {},
+        listeners,
+        addEventListener: (type, listener) => {
+            listeners[type] = listener;
+        },
+        getContext: () => context
+    };
+}
+
+class FakeWebGLRenderer {
+    constructor(options) {
+        this.options = options;
+        this.shadowMap = { enabled: true };
+        this.info = { render: { calls: 0 } };
+        this.calls = [];
+        this.disposed = false;
+    }
+    setPixelRatio(ratio) {
+        this.calls.push(['setPixelRatio', ratio]);
+    }
+    setSize(width, height, updateStyle) {
+        this.calls.push(['setSize', width, height, updateStyle]);
+    }
+    setViewport(...args) {
+        this.calls.push(['setViewport', ...args]);
+    }
+    setScissor(...args) {
+        this.calls.push(['setScissor', ...args]);
+    }
+    setScissorTest(enabled) {
+        this.calls.push(['setScissorTest', enabled]);
+    }
+    render(scene, camera) {
+        this.calls.push(['render', scene, camera]);
+    }
+    dispose() {
+        this.disposed = true;
+    }
+}
+
+describe('Embedded shared WebGL renderer', () => {
+    let window;
+    let load;
+
+    beforeEach(() => {
+        window = {};
+        // Every widget instance evaluates its own copy of the classes
+        load = () => loadEmbedded(['SharedWebGLRenderer', 'SharedRendererView'], {
+            THREE: { WebGLRenderer: FakeWebGLRenderer, NoToneMapping: 0 },
+            window,
+            document: { createElement: createCanvas }
+        });
+    });
+
+    it('should share one context between widget instances', () => {
+        const first = load().SharedWebGLRenderer.acquire({ antialias: true });
+        const second = load().SharedWebGLRenderer.acquire({ antialias: true });
+
+        expect(second).toBe(first);
+        expect(first.renderer.options.canvas).toBe(first.canvas);
+        expect(first.renderer.shadowMap.enabled).toBe(false);
+    });
+
+    it('should size view canvases like a WebGLRenderer', () => {
+        const view = load().SharedWebGLRenderer.acquire({}).createView();
+
+        view.setSize(300, 200);
+        view.setPixelRatio(2);
+
+        expect(view.domElement.width).toBe(600);
+        expect(view.domElement.height).toBe(400);
+        expect(view.domElement.style.width).toBe('300px');
+        expect(view.getPixelRatio()).toBe(2);
+        expect(view.context.globalCompositeOperation).toBe('copy');
+    });
+
+    it('should render each view into a scissored region and copy it out', () => {
+        const shared = load().SharedWebGLRenderer.acquire({});
+        const large = shared.createView();
+        const small = shared.createView();
+        large.setSize(400, 300);
+        small.setSize(200, 100);
+        const scene = {};
+        const camera = {};
+
+        expect(large.render(scene, camera)).toBe(true);
+        shared.renderer.calls = [];
+        expect(small.render(scene, camera)).toBe(true);
+
+        expect(shared.renderer.calls).toEqual([
+            ['setViewport', 0, 0, 200, 100],
+            ['setScissor', 0, 0, 200, 100],
+            ['setScissorTest', true],
+            ['render', scene, camera]
+        ]);
+        // WebGL rows start at the bottom of the 400x300 drawing buffer
+        expect(small.context.drawImage).toHaveBeenCalledWith(shared.canvas,
+            0, 200, 200, 100,
+            0, 0, 200, 100);
+    });
+
+    it('should only grow the drawing buffer', () => {
+        const shared = load().SharedWebGLRenderer.acquire({});
+        const view = shared.createView();
+
+        view.setSize(400, 300);
+        view.render({}, {});
+        view.setSize(100, 100);
+        view.render({}, {});
+
+        const resizes = shared.renderer.calls.filter(call => call[0] === 'setSize');
+        expect(resizes).toEqual([['setSize', 400, 300, false]]);
+    });
+
+    it('should skip rendering while the context is lost and notify views on restore', () => {
+        const shared = load().SharedWebGLRenderer.acquire({});
+        const restored = [vi.fn(), vi.fn()];
+        const views = restored.map(callback => shared.createView(callback));
+        views.forEach(view => view.setSize(100, 100));
+        const preventDefault = vi.fn();
+
+        shared.canvas.listeners.webglcontextlost({ preventDefault });
+
+        expect(preventDefault).toHaveBeenCalled();
+        expect(views[0].render({}, {})).toBe(false);
+
+        shared.canvas.listeners.webglcontextrestored();
+
+        restored.forEach(callback => expect(callback).toHaveBeenCalledTimes(1));
+        expect(views[0].render({}, {})).toBe(true);
+    });
+
+    it('should release the context with the last viewer', () => {
+        const { SharedWebGLRenderer } = load();
+        const shared = SharedWebGLRenderer.acquire({});
+        const first = shared.createView();
+        const second = shared.createView();
+
+        first.dispose();
+        expect(shared.renderer.disposed).toBe(false);
+
+        second.dispose();
+        expect(shared.renderer.disposed).toBe(true);
+        expect(window.__openscadSharedRenderer).toBeNull();
+        expect(SharedWebGLRenderer.acquire({})).not.toBe(shared);
+    });
+});
@@ -0,0 +1,166 @@
+/**
+ * STL parsing tests for the embedded viewer
+ * Runs STLParser and STLParseWorker from viewer.py on binary and ASCII fixtures
+ */
+
+import { describe, it, expect, vi } from 'vitest';
+import { loadEmbedded } from './embedded-js.js';
+
+const TRIANGLES = [
+    { normal: [0, 0, 1], vertices: [[0, 0, 0], [1, 0, 0], [0, 1, 0]] },
+    { normal: [0, 0, -1], vertices: [[0, 0, -2], [0, 1, -2], [1, 0, -2]] }
+];
+
+function binarySTL(triangles) {
+    const buffer = new ArrayBuffer(84 + triangles.length * 50);
+    const view = new DataView(buffer);
+    view.setUint32(80, triangles.length, true);
+    triangles.forEach((triangle, face) => {
+        const values = [triangle.normal, ...triangle.vertices].flat();
+        values.forEach((value, i) => view.setFloat32(84 + face * 50 + i * 4, value, true));
+    });
+    return new Uint8Array(buffer);
+}
+
+function asciiSTL(triangles) {
+    const facets = triangles.map(triangle => [
+        `  facet normal ${triangle.normal.join(' ')}`,
+        '    outer loop',
+        ...triangle.vertices.map(vertex => `      vertex ${vertex.join(' ')}`),
+        '    endloop',
+        '  endfacet'
+    ].join('\n'));
+    return new TextEncoder().encode(['solid fixture', ...facets, 'endsolid fixture'].join('\n'));
+}
+
+const toBase64 = bytes => Buffer.from(bytes).toString('base64');
+
+const expectedVertices = TRIANGLES.flatMap(triangle => triangle.vertices.flat());
+const expectedNormals = TRIANGLES.flatMap(triangle => [triangle.normal, triangle.normal, triangle.normal].flat());
+
+describe('Embedded STLParser', () => {
+    const { STLParser } = loadEmbedded(['STLParser']);
+
+    it('should parse binary STL into typed arrays', () => {
+        const parsed = STLParser.parse(binarySTL(TRIANGLES));
+
+        expect(parsed.vertices).toBeInstanceOf(Float32Array);
+        expect(Array.from(parsed.vertices)).toEqual(expectedVertices);
+        expect(Array.from(parsed.normals)).toEqual(expectedNormals);
+    });
+
+    it('should parse ASCII STL into exact-size typed arrays', () => {
+        const parsed = STLParser.parse(asciiSTL(TRIANGLES));
+
+        expect(parsed.vertices).toBeInstanceOf(Float32Array);
+        expect(parsed.vertices.buffer.byteLength).toBe(expectedVertices.length * 4);
+        expect(Array.from(parsed.vertices)).toEqual(expectedVertices);
+        expect(Array.from(parsed.normals)).toEqual(expectedNormals);
+    });
+
+    it('should grow ASCII buffers past the initial capacity', () => {
+        const many = Array.from({ length: 1500 }, (_, i) => ({
+            normal: [0, 0, 1],
+            vertices: [[i, 0, 0], [i + 1, 0, 0], [i, 1, 0]]
+        }));
+
+        const parsed = STLParser.parse(asciiSTL(many));
+
+        expect(parsed.vertices).toHaveLength(1500 * 9);
+        expect(parsed.vertices[1499 * 9]).toBe(1499);
+    });
+
+    it('should reject a truncated binary STL before allocating', () => {
+        const bytes = binarySTL(TRIANGLES);
+        new DataView(bytes.buffer).setUint32(80, 1e9, true);
+
+        expect(() => STLParser.parseBinary(bytes.buffer)).toThrow('truncated');
+    });
+
+    it('should decode base64 STL data', () => {
+        const bytes = binarySTL(TRIANGLES);
+
+        expect(Array.from(STLParser.decodeBase64(toBase64(bytes)))).toEqual(Array.from(bytes));
+    });
+});
+
+describe('Embedded STLParseWorker', () => {
+    // Worker stand-in that runs the generated worker source in-process
+    class SourceWorker {
+        static sources = [];
+
+        constructor(url) {
+            const source = SourceWorker.sources.at(-1);
+            this.url = url;
+            this.terminated = false;
+            this.transfers = [];
+            this.scope = {
+                onmessage: null,
+                postMessage: (data, transfer = []) => {
+                    this.transfers.push(transfer);
+                    setTimeout(() => this.onmessage({ data }), 0);
+                }
+            };
+            new Function('self', 'performance', source)(this.scope, performance);
+        }
+
+        postMessage(data) {
+            this.scope.onmessage({ data });
+        }
+
+        terminate() {
+            this.terminated = true;
+        }
+    }
+
+    const scope = {
+        Worker: SourceWorker,
+        Blob: class {
+            constructor(parts) {
+                SourceWorker.sources.push(parts.join(''));
+            }
+        },
+        URL: { createObjectURL: () => 'blob:stl-parse', revokeObjectURL: () => {} }
+    };
+
+    it('should parse in the worker and transfer both buffers', async () => {
+        const { STLParseWorker } = loadEmbedded(['STLParser', 'stlParseWorkerMain', 'STLParseWorker'], scope);
+        const parseWorker = new STLParseWorker();
+
+        const parsed = await parseWorker.parse(toBase64(binarySTL(TRIANGLES)));
+
+        expect(parsed.mode).toBe('worker');
+        expect(Array.from(parsed.vertices)).toEqual(expectedVertices);
+        expect(Array.from(parsed.normals)).toEqual(expectedNormals);
+        expect(parseWorker.worker.transfers[0]).toEqual([parsed.vertices.buffer, parsed.normals.buffer]);
+    });
+
+    it('should parse on the main thread without Worker support', async () => {
+        const { STLParseWorker } = loadEmbedded(['STLParser', 'stlParseWorkerMain', 'STLParseWorker'], {
+            ...scope,
+            Worker: undefined
+        });
+        const parseWorker = new STLParseWorker();
+
+        const parsed = await parseWorker.parse(toBase64(asciiSTL(TRIANGLES)));
+
+        expect(parsed.mode).toBe('main-thread');
+        expect(Array.from(parsed.vertices)).toEqual(expectedVertices);
+    });
+
+    it('should finish outstanding jobs on the main thread when the worker fails', async () => {
+        const { STLParseWorker } = loadEmbedded(['STLParser', 'stlParseWorkerMain', 'STLParseWorker'], scope);
+        const parseWorker = new STLParseWorker();
+        const worker = parseWorker.ensureWorker();
+        vi.spyOn(worker, 'postMessage').mockImplementation(() => {});
+
+        const pending = parseWorker.parse(toBase64(binarySTL(TRIANGLES)));
+        worker.onerror({ message: 'worker crashed' });
+
+        const parsed = await pending;
+        expect(parsed.mode).toBe('main-thread');
+        expect(worker.terminated).toBe(true);
+        expect(Array.from(parsed.normals)).toEqual(expectedNormals);
+        vi.restoreAllMocks();
+    });
+});
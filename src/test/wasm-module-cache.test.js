@@ -0,0 +1,160 @@
+/**
+ * Compiled WASM module cache tests
+ * Runs WASMCacheManager.getCompiledModule against an in-memory module store
+ */
+
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
+import { CompiledModuleStore, WASMCacheManager } from '../js/wasm-cache-manager.js';
+
+const HASHED_URL = '/wasm/openscad.0123456789abcdef.wasm';
+
+class FakeModule {
+    constructor(source) {
+        this.source = source;
+    }
+}
+
+// IndexedDB stand-in with the CompiledModuleStore interface
+function createMemoryStore(entries = {}) {
+    const data = new Map(Object.entries(entries));
+    return {
+        enabled: true,
+        data,
+        get: vi.fn(async key => data.get(key) || null),
+        put: vi.fn(async (key, module) => {
+            data.set(key, { module });
+            return 'module';
+        }),
+        clear: vi.fn(async () => data.clear())
+    };
+}
+
+function wasmResponse({ etag = null } = {}) {
+    const headers = new Map([['content-type', 'application/wasm']]);
+    if (etag) {
+        headers.set('etag', etag);
+    }
+    const response = {
+        ok: true,
+        status: 200,
+        headers: { get: name => headers.get(name) || null },
+        body: null,
+        clone: () => response,
+        arrayBuffer: async () => new ArrayBuffer(8)
+    };
+    return response;
+}
+
+describe('Compiled WASM module cache', () => {
+    let manager;
+    let store;
+    let fetchMock;
+    let compileStreaming;
+    let compile;
+
+    beforeEach(() => {
+        compileStreaming = vi.fn(async () => new FakeModule('streaming'));
+        compile = vi.fn(async bytes => new FakeModule(bytes));
+        vi.stubGlobal('WebAssembly', { Module: FakeModule, compileStreaming, compile });
+        fetchMock = vi.fn(async () => wasmResponse({ etag: '"v1"' }));
+        vi.stubGlobal('fetch', fetchMock);
+
+        manager = new WASMCacheManager();
+        store = createMemoryStore();
+        manager.moduleStore = store;
+    });
+
+    afterEach(() => {
+        vi.unstubAllGlobals();
+    });
+
+    it('should compile concurrent requests once with streaming compilation', async () => {
+        const [first, second] = await Promise.all([
+            manager.getCompiledModule(HASHED_URL),
+            manager.getCompiledModule(HASHED_URL)
+        ]);
+
+        expect(first).toBe(second);
+        expect(fetchMock).toHaveBeenCalledTimes(1);
+        expect(compileStreaming).toHaveBeenCalledTimes(1);
+        expect(compile).not.toHaveBeenCalled();
+    });
+
+    it('should persist the module under the digest from the URL', async () => {
+        const module = await manager.getCompiledModule(HASHED_URL);
+
+        expect(store.data.get('sha256:0123456789abcdef').module).toBe(module);
+    });
+
+    it('should serve repeat requests from memory', async () => {
+        const module = await manager.getCompiledModule(HASHED_URL);
+
+        expect(await manager.getCompiledModule(HASHED_URL)).toBe(module);
+        expect(fetchMock).toHaveBeenCalledTimes(1);
+        expect(manager.moduleStats.memoryHits).toBe(1);
+    });
+
+    it('should instantiate a stored module without fetching', async () => {
+        const storedModule = new FakeModule('stored');
+        manager.moduleStore = createMemoryStore({
+            'sha256:0123456789abcdef': { module: storedModule }
+        });
+
+        expect(await manager.getCompiledModule(HASHED_URL)).toBe(storedModule);
+        expect(fetchMock).not.toHaveBeenCalled();
+        expect(manager.moduleStats.storeHits).toBe(1);
+    });
+
+    it('should recompile stored bytes without fetching', async () => {
+        const bytes = new ArrayBuffer(8);
+        manager.moduleStore = createMemoryStore({ 'sha256:0123456789abcdef': { bytes } });
+
+        const module = await manager.getCompiledModule(HASHED_URL);
+
+        expect(module.source).toBe(bytes);
+        expect(fetchMock).not.toHaveBeenCalled();
+        expect(manager.moduleStats.byteHits).toBe(1);
+    });
+
+    it('should key unhashed URLs by ETag', async () => {
+        await manager.getCompiledModule('/wasm/openscad.wasm');
+
+        expect(store.data.has('/wasm/openscad.wasm#"v1"')).toBe(true);
+    });
+
+    it('should prefer an explicit digest', async () => {
+        await manager.getCompiledModule('/wasm/openscad.wasm', { digest: 'feedface' });
+
+        expect(store.data.has('sha256:feedface')).toBe(true);
+    });
+});
+
+describe('CompiledModuleStore', () => {
+    it('should store bytes when the module cannot be cloned', async () => {
+        const store = new CompiledModuleStore();
+        const written = [];
+        vi.spyOn(store, '_request').mockImplementation(async (mode, operation) => {
+            const entry = {};
+            operation({ put: value => Object.assign(entry, value) });
+            if (entry.module) {
+                throw Object.assign(new Error('cannot clone'), { name: 'DataCloneError' });
+            }
+            written.push(entry);
+            return null;
+        });
+        const bytes = new ArrayBuffer(4);
+
+        expect(await store.put('sha256:abc', {}, async () => bytes)).toBe('bytes');
+        expect(written[0].bytes).toBe(bytes);
+        vi.restoreAllMocks();
+    });
+
+    it('should be disabled without IndexedDB', async () => {
+        vi.stubGlobal('indexedDB', undefined);
+        const store = new CompiledModuleStore();
+
+        expect(store.enabled).toBe(false);
+        expect(await store.get('sha256:abc')).toBeNull();
+        vi.unstubAllGlobals();
+    });
+});
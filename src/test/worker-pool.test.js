@@ -0,0 +1,188 @@
+/**
+ * OpenSCADWorkerPool behaviour tests
+ * Drives the pool through its createWorker hook with fake worker managers
+ */
+
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
+import { OpenSCADWorkerPool } from '../js/worker-manager.js';
+import { wasmCacheManager } from '../js/wasm-cache-manager.js';
+
+// Fake worker manager whose renders finish when the test says so
+function createFakeWorker({ startOk = true } = {}) {
+    const worker = {
+        initOptions: null,
+        jobs: [],
+        terminated: false,
+        initialize: vi.fn(async (options) => {
+            worker.initOptions = options;
+            return startOk;
+        }),
+        renderToSTL: vi.fn((scadCode) => new Promise((resolve, reject) => {
+            worker.jobs.push({ scadCode, resolve, reject });
+        })),
+        terminate: vi.fn(() => {
+            worker.terminated = true;
+        })
+    };
+    return worker;
+}
+
+// Let queued promise callbacks run
+const flush = () => new Promise(resolve => setTimeout(resolve, 0));
+
+describe('OpenSCADWorkerPool', () => {
+    afterEach(() => {
+        vi.restoreAllMocks();
+        vi.unstubAllGlobals();
+    });
+
+    describe('Pool sizing', () => {
+        it('should leave one core free and cap at maxWorkers', () => {
+            vi.stubGlobal('navigator', { hardwareConcurrency: 8 });
+            expect(OpenSCADWorkerPool.defaultSize()).toBe(4);
+            expect(OpenSCADWorkerPool.defaultSize(16)).toBe(7);
+        });
+
+        it('should keep at least one worker on single-core machines', () => {
+            vi.stubGlobal('navigator', { hardwareConcurrency: 1 });
+            expect(OpenSCADWorkerPool.defaultSize()).toBe(1);
+        });
+
+        it('should start one worker per slot', async () => {
+            const created = [];
+            const pool = new OpenSCADWorkerPool({
+                size: 3,
+                createWorker: () => {
+                    const worker = createFakeWorker();
+                    created.push(worker);
+                    return worker;
+                }
+            });
+
+            expect(await pool.initialize()).toBe(true);
+            expect(created).toHaveLength(3);
+            expect(pool.getStats().size).toBe(3);
+        });
+
+        it('should drop workers that fail to start', async () => {
+            const created = [];
+            const pool = new OpenSCADWorkerPool({
+                size: 3,
+                createWorker: () => {
+                    const worker = createFakeWorker({ startOk: created.length !== 1 });
+                    created.push(worker);
+                    return worker;
+                }
+            });
+
+            await pool.initialize();
+
+            expect(pool.getStats().size).toBe(2);
+            expect(created[1].terminated).toBe(true);
+        });
+    });
+
+    describe('Shared compiled module', () => {
+        it('should compile once and hand the module to every worker', async () => {
+            const compiledModule = { compiled: true };
+            const getCompiledModule = vi.spyOn(wasmCacheManager, 'getCompiledModule')
+                .mockResolvedValue(compiledModule);
+            const created = [];
+            const pool = new OpenSCADWorkerPool({
+                size: 3,
+                createWorker: () => {
+                    const worker = createFakeWorker();
+                    created.push(worker);
+                    return worker;
+                }
+            });
+
+            await pool.initialize({ wasmUrl: '/wasm/openscad.wasm', timeout: 1000 });
+
+            expect(getCompiledModule).toHaveBeenCalledTimes(1);
+            created.forEach(worker => {
+                expect(worker.initOptions.wasmModule).toBe(compiledModule);
+                expect(worker.initOptions.timeout).toBe(1000);
+                expect(worker.initOptions.wasmUrl).toBeUndefined();
+            });
+        });
+
+        it('should let workers compile their own module if precompiling fails', async () => {
+            vi.spyOn(wasmCacheManager, 'getCompiledModule')
+                .mockRejectedValue(new Error('offline'));
+            const worker = createFakeWorker();
+            const pool = new OpenSCADWorkerPool({ size: 1, createWorker: () => worker });
+
+            expect(await pool.initialize({ wasmUrl: '/wasm/openscad.wasm' })).toBe(true);
+            expect(worker.initOptions.wasmModule).toBeNull();
+        });
+    });
+
+    describe('Latest-wins scheduling', () => {
+        let worker;
+        let pool;
+
+        beforeEach(async () => {
+            worker = createFakeWorker();
+            pool = new OpenSCADWorkerPool({ size: 1, createWorker: () => worker });
+            await pool.initialize();
+        });
+
+        it('should supersede a waiting render from the same viewer', async () => {
+            const first = pool.render('viewer-a', 'cube(1);');
+            const second = pool.render('viewer-a', 'cube(2);');
+            const third = pool.render('viewer-a', 'cube(3);');
+
+            expect(await second).toMatchObject({ success: false, superseded: true });
+            expect(worker.jobs).toHaveLength(1);
+
+            // The running render finished after newer requests arrived
+            worker.jobs[0].resolve({ success: true, stlData: 'one' });
+            expect(await first).toMatchObject({ success: false, superseded: true });
+
+            await flush();
+            expect(worker.jobs).toHaveLength(2);
+            expect(worker.jobs[1].scadCode).toBe('cube(3);');
+            worker.jobs[1].resolve({ success: true, stlData: 'three' });
+
+            expect(await third).toEqual({ success: true, stlData: 'three' });
+            expect(pool.getStats()).toMatchObject({ completed: 1, superseded: 2 });
+        });
+
+        it('should not supersede renders from other viewers', async () => {
+            const fromA = pool.render('viewer-a', 'cube(1);');
+            const fromB = pool.render('viewer-b', 'sphere(1);');
+
+            worker.jobs[0].resolve({ success: true, stlData: 'a' });
+            expect(await fromA).toEqual({ success: true, stlData: 'a' });
+
+            await flush();
+            worker.jobs[1].resolve({ success: true, stlData: 'b' });
+            expect(await fromB).toEqual({ success: true, stlData: 'b' });
+        });
+
+        it('should run at most one render per viewer at a time', async () => {
+            const workers = [createFakeWorker(), createFakeWorker()];
+            const wide = new OpenSCADWorkerPool({ size: 2, createWorker: () => workers.shift() });
+            await wide.initialize();
+
+            wide.render('viewer-a', 'cube(1);');
+            wide.render('viewer-a', 'cube(2);');
+            wide.render('viewer-b', 'sphere(1);');
+
+            expect(wide.getStats()).toMatchObject({ busy: 2, queued: 1 });
+            expect(wide.runningByViewer.get('viewer-a').scadCode).toBe('cube(1);');
+            expect(wide.runningByViewer.get('viewer-b').scadCode).toBe('sphere(1);');
+        });
+
+        it('should reject waiting renders on terminate', async () => {
+            pool.render('viewer-a', 'cube(1);');
+            const waiting = pool.render('viewer-b', 'cube(2);');
+
+            pool.terminate();
+
+            await expect(waiting).rejects.toThrow('Worker pool terminated');
+            expect(worker.terminated).toBe(true);
+        });
+    });
+});
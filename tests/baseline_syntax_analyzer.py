@@ -0,0 +1,271 @@
+"""
+The OpenSCAD syntax analyzer as it was before scad_parser: a per-line
+regex scan. Kept verbatim as the baseline for the analyzer benchmark in
+test_scad_parser.py.
+"""
+
+import re
+from typing import Dict, List
+
+from src.marimo_openscad.migration_engine import SyntaxIssue, SyntaxIssueType
+
+
+class BaselineSyntaxAnalyzer:
+    """Per-line regex analyzer, OpenSCADSyntaxAnalyzer before the parser."""
+    
+    def __init__(self):
+        self.deprecated_patterns = self._load_deprecated_patterns()
+    
+    def _load_deprecated_patterns(self) -> List[Dict]:
+        """Load patterns for deprecated syntax."""
+        return [
+            {
+                "pattern": r"assign\s*\(",
+                "message": "assign() is deprecated, use direct assignment",
+                "replacement": "// Use direct assignment: variable = value;",
+                "severity": "warning",
+                "deprecated_in": "2019.05"
+            },
+            {
+                "pattern": r"child\s*\(\s*\d+\s*\)",
+                "message": "child() is deprecated, use children() instead",
+                "replacement": "children()",
+                "severity": "warning", 
+                "deprecated_in": "2019.05"
+            },
+            {
+                "pattern": r"import_stl\s*\(",
+                "message": "import_stl() is deprecated, use import() instead",
+                "replacement": "import()",
+                "severity": "warning",
+                "deprecated_in": "2019.05"
+            },
+            {
+                "pattern": r"import_dxf\s*\(",
+                "message": "import_dxf() is deprecated, use import() instead", 
+                "replacement": "import()",
+                "severity": "warning",
+                "deprecated_in": "2019.05"
+            }
+        ]
+    
+    def analyze_scad_code(self, scad_code: str) -> List[SyntaxIssue]:
+        """
+        Analyze OpenSCAD code for syntax issues.
+        
+        Args:
+            scad_code: OpenSCAD code to analyze
+            
+        Returns:
+            List of detected syntax issues
+        """
+        issues = []
+        lines = scad_code.split('\n')
+        
+        for line_num, line in enumerate(lines, 1):
+            # Check for deprecated patterns
+            issues.extend(self._check_deprecated_patterns(line, line_num))
+            
+            # Check for version-specific features
+            issues.extend(self._check_version_features(line, line_num))
+            
+            # Check for performance issues
+            issues.extend(self._check_performance_issues(line, line_num))
+            
+            # Check for modernization opportunities
+            issues.extend(self._check_modernization_opportunities(line, line_num))
+        
+        # Check for overall structure issues
+        issues.extend(self._check_structure_issues(scad_code))
+        
+        return issues
+    
+    def _check_deprecated_patterns(self, line: str, line_num: int) -> List[SyntaxIssue]:
+        """Check for deprecated syntax patterns."""
+        issues = []
+        
+        for pattern_info in self.deprecated_patterns:
+            pattern = pattern_info["pattern"]
+            matches = re.finditer(pattern, line, re.IGNORECASE)
+            
+            for match in matches:
+                issue = SyntaxIssue(
+                    issue_type=SyntaxIssueType.DEPRECATED_SYNTAX,
+                    line_number=line_num,
+                    column_start=match.start(),
+                    column_end=match.end(),
+                    original_text=match.group(),
+                    message=pattern_info["message"],
+                    severity=pattern_info["severity"],
+                    suggested_replacement=pattern_info["replacement"],
+                    migration_notes=f"Deprecated in {pattern_info['deprecated_in']}"
+                )
+                issues.append(issue)
+        
+        return issues
+    
+    def _check_version_features(self, line: str, line_num: int) -> List[SyntaxIssue]:
+        """Check for version-specific features."""
+        issues = []
+        
+        # Check for exponent operator (2023.06+)
+        if "**" in line:
+            matches = re.finditer(r'\*\*', line)
+            for match in matches:
+                issue = SyntaxIssue(
+                    issue_type=SyntaxIssueType.VERSION_INCOMPATIBLE,
+                    line_number=line_num,
+                    column_start=match.start(),
+                    column_end=match.end(),
+                    original_text="**",
+                    message="Exponent operator requires OpenSCAD 2023.06 or later",
+                    severity="error",
+                    min_version_required="2023.06",
+                    suggested_replacement="pow(base, exponent)",
+                    migration_notes="Use pow() function for older versions"
+                )
+                issues.append(issue)
+        
+        # Check for assert function (2019.05+)
+        if "assert(" in line:
+            matches = re.finditer(r'assert\s*\(', line)
+            for match in matches:
+                issue = SyntaxIssue(
+                    issue_type=SyntaxIssueType.VERSION_INCOMPATIBLE,
+                    line_number=line_num,
+                    column_start=match.start(),
+                    column_end=match.end(),
+                    original_text=match.group(),
+                    message="assert() function requires OpenSCAD 2019.05 or later",
+                    severity="warning",
+                    min_version_required="2019.05",
+                    migration_notes="Remove assert() calls for older versions"
+                )
+                issues.append(issue)
+        
+        # Check for text primitive (2019.05+)
+        if "text(" in line:
+            matches = re.finditer(r'text\s*\(', line)
+            for match in matches:
+                issue = SyntaxIssue(
+                    issue_type=SyntaxIssueType.VERSION_INCOMPATIBLE,
+                    line_number=line_num,
+                    column_start=match.start(),
+                    column_end=match.end(),
+                    original_text=match.group(),
+                    message="text() primitive requires OpenSCAD 2019.05 or later",
+                    severity="warning",
+                    min_version_required="2019.05",
+                    migration_notes="Use external text generation for older versions"
+                )
+                issues.append(issue)
+        
+        return issues
+    
+    def _check_performance_issues(self, line: str, line_num: int) -> List[SyntaxIssue]:
+        """Check for potential performance issues."""
+        issues = []
+        
+        # Check for excessive union operations
+        union_count = line.count("union(")
+        if union_count > 10:
+            issue = SyntaxIssue(
+                issue_type=SyntaxIssueType.PERFORMANCE_WARNING,
+                line_number=line_num,
+                column_start=0,
+                column_end=len(line),
+                original_text=line.strip(),
+                message=f"Line contains {union_count} union operations, consider optimization",
+                severity="info",
+                suggested_replacement="Consider grouping operations or using hull()",
+                migration_notes="Large numbers of union operations can be slow"
+            )
+            issues.append(issue)
+        
+        # Check for nested for loops
+        if "for" in line and line.count("for") > 1:
+            issue = SyntaxIssue(
+                issue_type=SyntaxIssueType.PERFORMANCE_WARNING,
+                line_number=line_num,
+                column_start=0,
+                column_end=len(line),
+                original_text=line.strip(),
+                message="Nested for loops detected, may impact performance",
+                severity="info",
+                migration_notes="Consider alternative approaches for complex iterations"
+            )
+            issues.append(issue)
+        
+        return issues
+    
+    def _check_modernization_opportunities(self, line: str, line_num: int) -> List[SyntaxIssue]:
+        """Check for modernization opportunities."""
+        issues = []
+        
+        # Suggest list comprehensions where appropriate
+        if re.search(r'for\s*\([^)]+\)\s*\{[^}]*\}', line):
+            issue = SyntaxIssue(
+                issue_type=SyntaxIssueType.MODERNIZATION_OPPORTUNITY,
+                line_number=line_num,
+                column_start=0,
+                column_end=len(line),
+                original_text=line.strip(),
+                message="Consider using list comprehension for better readability",
+                severity="info",
+                suggested_replacement="[for (item = list) expression]",
+                migration_notes="List comprehensions are more concise and readable"
+            )
+            issues.append(issue)
+        
+        # Suggest pow() instead of repeated multiplication
+        if re.search(r'\w+\s*\*\s*\w+\s*\*\s*\w+', line):
+            issue = SyntaxIssue(
+                issue_type=SyntaxIssueType.MODERNIZATION_OPPORTUNITY,
+                line_number=line_num,
+                column_start=0,
+                column_end=len(line),
+                original_text=line.strip(),
+                message="Consider using pow() function for exponentiation",
+                severity="info",
+                suggested_replacement="pow(base, exponent)",
+                migration_notes="pow() is clearer for exponentiation operations"
+            )
+            issues.append(issue)
+        
+        return issues
+    
+    def _check_structure_issues(self, scad_code: str) -> List[SyntaxIssue]:
+        """Check for overall structure issues."""
+        issues = []
+        
+        # Check for very long lines
+        lines = scad_code.split('\n')
+        for line_num, line in enumerate(lines, 1):
+            if len(line) > 120:
+                issue = SyntaxIssue(
+                    issue_type=SyntaxIssueType.MODERNIZATION_OPPORTUNITY,
+                    line_number=line_num,
+                    column_start=0,
+                    column_end=len(line),
+                    original_text=line[:50] + "..." if len(line) > 50 else line,
+                    message=f"Long line ({len(line)} characters), consider breaking up",
+                    severity="info",
+                    migration_notes="Break long lines for better readability"
+                )
+                issues.append(issue)
+        
+        # Check for missing module documentation
+        if "module " in scad_code and "/*" not in scad_code and "//" not in scad_code:
+            issue = SyntaxIssue(
+                issue_type=SyntaxIssueType.MODERNIZATION_OPPORTUNITY,
+                line_number=1,
+                column_start=0,
+                column_end=0,
+                original_text="",
+                message="Consider adding documentation comments to modules",
+                severity="info",
+                migration_notes="Documentation improves code maintainability"
+            )
+            issues.append(issue)
+        
+        return issues
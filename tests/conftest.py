@@ -17,14 +17,16 @@ def mock_openscad_executable():
     """Mock OpenSCAD executable to avoid requiring actual installation"""
     with mock.patch('subprocess.run') as mock_run, \
          mock.patch('os.path.exists') as mock_exists, \
-         mock.patch('marimo_openscad.openscad_renderer.subprocess.run') as mock_renderer_run:
+         mock.patch('marimo_openscad.openscad_renderer.subprocess.run') as mock_renderer_run, \
+         mock.patch('marimo_openscad.openscad_renderer.resource', None):
         
         # Mock subprocess.run for OpenSCAD calls
         mock_run.return_value.returncode = 0
         mock_run.return_value.stderr = ""
         mock_run.return_value.stdout = "OpenSCAD version 2021.01"
         
-        # Mock the renderer's subprocess calls too
+        # Mock the renderer's subprocess calls too; without the resource module
+        # the renderer launches OpenSCAD through subprocess.run
         mock_renderer_run.return_value.returncode = 0
         mock_renderer_run.return_value.stderr = ""
         mock_renderer_run.return_value.stdout = "OpenSCAD version 2021.01"
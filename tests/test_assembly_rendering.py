@@ -0,0 +1,157 @@
+"""
+Assembly Rendering Tests
+Tests that assemblies render one cached mesh per part and that only changed
+parts are re-rendered and re-sent to the viewer
+"""
+
+import threading
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+solid2 = pytest.importorskip("solid2")
+from solid2 import cube, cylinder, translate
+
+from marimo_openscad.openscad_wasm_renderer import HybridOpenSCADRenderer, OpenSCADWASMRenderer
+from marimo_openscad.solid_bridge import split_assembly
+from marimo_openscad.viewer import OpenSCADViewer
+
+
+class RecordingRenderer:
+    """Thread-safe renderer stub that records every SCAD program it renders"""
+
+    def __init__(self):
+        self.rendered = []
+        self.lock = threading.Lock()
+
+    def render_scad_to_stl(self, scad_code):
+        with self.lock:
+            self.rendered.append(scad_code)
+        return f"solid part\n{scad_code}\nendsolid\n".encode()
+
+
+@pytest.fixture
+def viewer():
+    viewer = OpenSCADViewer(renderer_type="wasm")
+    viewer.renderer = RecordingRenderer()
+    return viewer
+
+
+def machine(bracket_height=5):
+    return {
+        "base": cube([50, 50, 2]),
+        "bracket": translate([10, 10, 2])(cube([5, 5, bracket_height])),
+        "shaft": translate([25, 25, 2])(cylinder(r=2, h=30)),
+    }
+
+
+class TestSplitAssembly:
+    """Test how models are split into parts"""
+
+    def test_dict_kept(self):
+        parts = machine()
+
+        assert split_assembly(parts) == parts
+        assert split_assembly(parts) is not parts
+
+    def test_union_children_become_parts(self):
+        model = cube(1) + translate([2, 0, 0])(cube(1)) + cylinder(r=1, h=2)
+
+        assert list(split_assembly(model)) == ["part_0", "part_1", "part_2"]
+
+    def test_single_model_is_one_part(self):
+        assert list(split_assembly(cube(1) - cube(0.5))) == ["part_0"]
+
+
+class TestUpdateAssembly:
+    """Test per-part rendering and caching"""
+
+    def test_all_parts_rendered_first(self, viewer):
+        rendered = viewer.update_assembly(machine())
+
+        assert sorted(rendered) == ["base", "bracket", "shaft"]
+        assert len(viewer.renderer.rendered) == 3
+        assert set(viewer.assembly_manifest) == {"base", "bracket", "shaft"}
+        assert viewer.stl_data == ""
+
+    def test_only_changed_part_rerendered(self, viewer):
+        viewer.update_assembly(machine())
+        manifest = dict(viewer.assembly_manifest)
+
+        rendered = viewer.update_assembly(machine(bracket_height=8))
+
+        assert rendered == ["bracket"]
+        assert len(viewer.renderer.rendered) == 4
+        assert viewer.assembly_manifest["bracket"] != manifest["bracket"]
+        assert viewer.assembly_manifest["base"] == manifest["base"]
+
+    def test_force_render_rerenders_all(self, viewer):
+        viewer.update_assembly(machine())
+
+        assert len(viewer.update_assembly(machine(), force_render=True)) == 3
+
+    def test_removed_parts_dropped(self, viewer):
+        viewer.update_assembly(machine())
+        parts = machine()
+        del parts["shaft"]
+
+        viewer.update_assembly(parts)
+
+        assert set(viewer.assembly_manifest) == {"base", "bracket"}
+        assert "shaft" not in viewer._assembly_parts
+
+    @pytest.mark.parametrize("browser_renderer", [
+        OpenSCADWASMRenderer,
+        lambda: HybridOpenSCADRenderer(prefer_wasm=True, fallback_to_local=False),
+    ])
+    def test_rejected_when_rendering_in_browser(self, browser_renderer):
+        viewer = OpenSCADViewer(renderer_type="wasm")
+        viewer.renderer = browser_renderer()
+
+        assert viewer.update_assembly({"a": "cube(1);", "b": "sphere(2);"}) == []
+        assert "local OpenSCAD renderer" in viewer.error_message
+        assert viewer._assembly_parts == {}
+        assert viewer.assembly_manifest == {}
+
+    def test_update_model_leaves_assembly_mode(self, viewer):
+        viewer.update_assembly(machine())
+
+        viewer.update_model(cube(1))
+
+        assert viewer.assembly_manifest == {}
+        assert viewer.stl_data
+
+
+class TestAssemblyMessages:
+    """Test that the frontend fetches parts by name"""
+
+    def test_requested_parts_sent(self, viewer, monkeypatch):
+        sent = []
+        monkeypatch.setattr(viewer, "send", lambda content, buffers=None: sent.append(content))
+        viewer.update_assembly(machine())
+
+        viewer._handle_custom_msg(viewer, {"type": "request_assembly_parts", "names": ["bracket", "missing"]}, [])
+
+        assert len(sent) == 1
+        assert sent[0]["type"] == "assembly_part"
+        assert sent[0]["name"] == "bracket"
+        assert sent[0]["hash"] == viewer.assembly_manifest["bracket"]
+
+    def test_other_messages_ignored(self, viewer, monkeypatch):
+        sent = []
+        monkeypatch.setattr(viewer, "send", lambda content, buffers=None: sent.append(content))
+
+        viewer._handle_custom_msg(viewer, {"type": "something_else"}, [])
+
+        assert sent == []
+
+    def test_frontend_keeps_one_mesh_per_part(self):
+        js_code = OpenSCADViewer._esm
+
+        assert 'model.on("change:assembly_manifest", syncAssembly)' in js_code
+        assert 'model.send({ type: "request_assembly_parts", names: missing })' in js_code
+        assert 'const assemblyMeshes = new Map();' in js_code
+        assert 'writeSTLGeometry(entry.mesh.geometry, parsed.vertices, parsed.normals)' in js_code
@@ -22,6 +22,7 @@ from src.marimo_openscad.community_model_tester import (
     CommunityModelTester,
     create_compatibility_test_suite
 )
+import json
 from src.marimo_openscad.migration_engine import SyntaxIssueType, SyntaxIssue
 
 
@@ -587,6 +588,87 @@ class TestCommunityModelTester:
         assert mock_model.author in report
 
 
+class TestCorpusRunner:
+    """Test the offline corpus mode."""
+    
+    def setup_method(self):
+        """Create a small corpus."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.tester = CommunityModelTester(cache_dir=self.temp_dir / "cache")
+        self.corpus = self.temp_dir / "corpus"
+        (self.corpus / "parts").mkdir(parents=True)
+        (self.corpus / "plain.scad").write_text("cube(10);\n")
+        for i in range(4):
+            (self.corpus / "parts" / f"legacy_{i}.scad").write_text(
+                f"module part_{i}() {{ assign(x = {i}) cube(x); child(0); }}\npart_{i}();\n"
+            )
+        (self.corpus / "notes.txt").write_text("not a model")
+        self.output = self.temp_dir / "results.jsonl"
+    
+    def teardown_method(self):
+        """Cleanup test environment."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _records(self):
+        return [json.loads(line) for line in self.output.read_text().splitlines()]
+    
+    def test_results_streamed_to_jsonl(self):
+        """Test that every .scad file gets one JSON line."""
+        suite = self.tester.run_corpus(self.corpus, self.output, max_workers=1)
+        
+        records = {record["path"]: record for record in self._records()}
+        assert set(records) == {"plain.scad"} | {f"parts/legacy_{i}.scad" for i in range(4)}
+        assert records["plain.scad"]["status"] == "passed"
+        assert "deprecated_syntax" in {issue["issue_type"] for issue in records["parts/legacy_0.scad"]["issues"]}
+        assert suite.total_models == 5
+        assert suite.passed_models + suite.failed_models == 5
+    
+    def test_process_pool_matches_inline(self):
+        """Test that the process pool produces the same records."""
+        inline = self.tester.run_corpus(self.corpus, self.output, max_workers=1, resume=False)
+        pooled = self.tester.run_corpus(self.corpus, self.output, max_workers=2, resume=False)
+        
+        assert [r.model.name for r in pooled.test_results] == [r.model.name for r in inline.test_results]
+        assert [len(r.syntax_issues) for r in pooled.test_results] == [len(r.syntax_issues) for r in inline.test_results]
+        assert len(self._records()) == 5
+    
+    def test_resume_skips_recorded_files(self):
+        """Test that a resumed run only tests what is missing."""
+        self.tester.run_corpus(self.corpus, self.output, max_workers=1)
+        lines = self.output.read_text().splitlines()
+        # Interrupted run: two complete records and a cut-off third
+        self.output.write_text(lines[0] + "\n" + lines[1] + "\n" + lines[2][:20])
+        
+        with patch.object(self.tester, "_evaluate_model", wraps=self.tester._evaluate_model) as evaluate:
+            suite = self.tester.run_corpus(self.corpus, self.output, max_workers=1)
+        
+        assert evaluate.call_count == 3
+        assert len(self._records()) == 5
+        assert suite.total_models == 5
+    
+    def test_render_recorded(self):
+        """Test that rendering results are recorded in the metrics."""
+        with patch("src.marimo_openscad.community_model_tester.OpenSCADRenderer") as renderer_class:
+            renderer_class.return_value.openscad_path = "/usr/bin/openscad"
+            renderer_class.return_value.render_scad_to_stl.return_value = b"solid test\nendsolid test\n"
+            self.tester.run_corpus(self.corpus, self.output, render=True, max_workers=1)
+        
+        metrics = {record["path"]: record["metrics"] for record in self._records()}
+        assert metrics["plain.scad"]["stl_bytes"] == 25
+        assert "render_seconds" in metrics["plain.scad"]
+    
+    def test_report_written(self):
+        """Test that the summary report is produced at the end."""
+        report_path = self.temp_dir / "report.md"
+        
+        self.tester.run_corpus(self.corpus, self.output, max_workers=1, report_path=report_path)
+        
+        report = report_path.read_text()
+        assert "Community Model Test Report" in report
+        assert "parts/legacy_3.scad" in report
+
+
 class TestConvenienceFunctions:
     """Test convenience functions."""
     
@@ -0,0 +1,191 @@
+"""
+Parallel CSG Planner Tests
+Tests conservative bounding boxes, disjoint grouping of top-level union
+children and concatenation of the per-group meshes
+"""
+
+import shutil
+import struct
+import threading
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+solid2 = pytest.importorskip("solid2")
+from solid2 import (cube, cylinder, sphere, square, text, translate, rotate,
+                    linear_extrude, rotate_extrude, circle)
+
+from marimo_openscad.csg_planner import (
+    BoundingBox,
+    ParallelCSGRenderer,
+    bounding_box,
+    concatenate_stl,
+    plan_union,
+    read_stl_triangles,
+    write_binary_stl,
+)
+from marimo_openscad.openscad_renderer import OpenSCADError, OpenSCADRenderer
+
+
+def triangle(offset):
+    return (0, 0, 1, offset, 0, 0, offset + 1, 0, 0, offset, 1, 0)
+
+
+class RecordingRenderer:
+    """Renderer stub returning one triangle per render"""
+
+    def __init__(self, fail_on=None):
+        self.rendered = []
+        self.fail_on = fail_on
+        self.lock = threading.Lock()
+
+    def render_scad_to_stl(self, scad_code):
+        with self.lock:
+            self.rendered.append(scad_code)
+            index = len(self.rendered)
+        if self.fail_on and self.fail_on in scad_code and "union" not in scad_code:
+            raise OpenSCADError("Current top level object is empty.")
+        return write_binary_stl([triangle(index)])
+
+
+def stl_volume(stl_data):
+    volume = 0.0
+    for t in read_stl_triangles(stl_data):
+        (x1, y1, z1), (x2, y2, z2), (x3, y3, z3) = t[3:6], t[6:9], t[9:12]
+        volume += (x1 * (y2 * z3 - y3 * z2) - x2 * (y1 * z3 - y3 * z1) + x3 * (y1 * z2 - y2 * z1)) / 6
+    return volume
+
+
+def stl_bounds(stl_data):
+    coords = [t[3:] for t in read_stl_triangles(stl_data)]
+    return [f(c[i + axis] for c in coords for i in (0, 3, 6)) for f in (min, max) for axis in range(3)]
+
+
+class TestBoundingBox:
+    """Test conservative bounding boxes of SolidPython2 nodes"""
+
+    def test_primitives(self):
+        assert bounding_box(cube(3)) == BoundingBox((0, 0, 0), (3, 3, 3))
+        assert bounding_box(cube([2, 4, 6], center=True)) == BoundingBox((-1, -2, -3), (1, 2, 3))
+        assert bounding_box(sphere(d=4)) == BoundingBox((-2, -2, -2), (2, 2, 2))
+        assert bounding_box(cylinder(r1=1, r2=3, h=5)) == BoundingBox((-3, -3, 0), (3, 3, 5))
+
+    def test_transforms(self):
+        box = bounding_box(translate([10, 0, 0])(rotate([0, 0, 90])(cube([2, 1, 1]))))
+
+        assert box.min == pytest.approx((9, 0, 0))
+        assert box.max == pytest.approx((10, 2, 1))
+
+    def test_csg_operations(self):
+        assert bounding_box(cube(2) - sphere(5)) == BoundingBox((0, 0, 0), (2, 2, 2))
+        assert bounding_box(cube(4) * translate([2, 2, 2])(cube(4))) == BoundingBox((2, 2, 2), (4, 4, 4))
+
+    def test_extrusions(self):
+        assert bounding_box(linear_extrude(height=3)(square(2))) == BoundingBox((0, 0, 0), (2, 2, 3))
+        box = bounding_box(rotate_extrude()(translate([5, 0])(circle(1))))
+        assert box == BoundingBox((-6, -6, -1), (6, 6, 1))
+
+    def test_unknown_geometry_unbounded(self):
+        assert bounding_box(linear_extrude(height=1)(text("x"))) is None
+        assert bounding_box(translate(["offset", 0, 0])(cube(1))) is None
+
+    def test_touching_counts_as_overlap(self):
+        a = BoundingBox((0, 0, 0), (1, 1, 1))
+
+        assert a.overlaps(BoundingBox((1, 0, 0), (2, 1, 1)))
+        assert not a.overlaps(BoundingBox((1.5, 0, 0), (2, 1, 1)))
+
+
+class TestPlanUnion:
+    """Test grouping of top-level union children"""
+
+    def test_disjoint_children_split(self):
+        model = cube(1) + translate([5, 0, 0])(cube(1)) + translate([10, 0, 0])(sphere(1))
+
+        plan = plan_union(model)
+
+        assert plan.is_parallel
+        assert [len(group) for group in plan.groups] == [1, 1, 1]
+
+    def test_overlapping_children_share_group(self):
+        model = (cube(1) + translate([5, 0, 0])(cube(1))
+                 + translate([0.5, 0, 0])(sphere(1)) + translate([20, 0, 0])(cube(1)))
+
+        assert [len(group) for group in plan_union(model).groups] == [2, 1, 1]
+
+    def test_unbounded_child_collapses_plan(self):
+        model = cube(1) + translate([5, 0, 0])(cube(1)) + linear_extrude(height=1)(text("x"))
+
+        assert not plan_union(model).is_parallel
+
+    def test_non_union_is_single_group(self):
+        assert not plan_union(cube(1) - sphere(1)).is_parallel
+
+
+class TestSTLConcatenation:
+    """Test STL reading and concatenation"""
+
+    def test_binary_round_trip(self):
+        stl_data = write_binary_stl([triangle(0), triangle(2)])
+
+        assert len(stl_data) == 84 + 2 * 50
+        assert read_stl_triangles(stl_data) == [triangle(0), triangle(2)]
+
+    def test_ascii_read(self):
+        ascii_stl = (b"solid t\nfacet normal 0 0 1\nouter loop\nvertex 0 0 0\nvertex 1 0 0\n"
+                     b"vertex 0 1 0\nendloop\nendfacet\nendsolid t\n")
+
+        assert read_stl_triangles(ascii_stl) == [triangle(0)]
+
+    def test_concatenate_mixed(self):
+        ascii_stl = (b"solid t\nfacet normal 0 0 1\nouter loop\nvertex 0 0 0\nvertex 1 0 0\n"
+                     b"vertex 0 1 0\nendloop\nendfacet\nendsolid t\n")
+
+        combined = concatenate_stl([ascii_stl, write_binary_stl([triangle(3)])])
+
+        assert struct.unpack_from("<I", combined, 80)[0] == 2
+
+
+class TestParallelCSGRenderer:
+    """Test rendering disjoint groups in separate processes"""
+
+    def test_one_render_per_group(self):
+        renderer = RecordingRenderer()
+        model = cube(1) + translate([5, 0, 0])(cube(1)) + translate([10, 0, 0])(cube(1))
+
+        stl_data = ParallelCSGRenderer(renderer=renderer).render_solidpython_to_stl(model)
+
+        assert len(renderer.rendered) == 3
+        assert len(read_stl_triangles(stl_data)) == 3
+
+    def test_overlapping_model_rendered_monolithically(self):
+        renderer = RecordingRenderer()
+        model = cube(2) + translate([1, 1, 1])(cube(2))
+
+        ParallelCSGRenderer(renderer=renderer).render_solidpython_to_stl(model)
+
+        assert renderer.rendered == [model.as_scad()]
+
+    def test_failed_group_falls_back_to_monolithic(self):
+        renderer = RecordingRenderer(fail_on="sphere")
+        model = cube(1) + translate([5, 0, 0])(sphere(1))
+
+        stl_data = ParallelCSGRenderer(renderer=renderer).render_solidpython_to_stl(model)
+
+        assert renderer.rendered[-1] == model.as_scad()
+        assert len(read_stl_triangles(stl_data)) == 1
+
+    @pytest.mark.skipif(shutil.which("openscad") is None, reason="OpenSCAD not installed")
+    def test_matches_monolithic_render(self):
+        model = (cube(4) + translate([10, 0, 0])(cylinder(r=2, h=4))
+                 + translate([0, 10, 0])(cube(2) + translate([1, 1, 1])(cube(2))))
+        openscad = OpenSCADRenderer()
+
+        monolithic = openscad.render_scad_to_stl(model.as_scad())
+        parallel = ParallelCSGRenderer(renderer=openscad).render_solidpython_to_stl(model)
+
+        assert stl_bounds(parallel) == pytest.approx(stl_bounds(monolithic))
+        assert stl_volume(parallel) == pytest.approx(stl_volume(monolithic), rel=1e-6)
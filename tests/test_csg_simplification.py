@@ -0,0 +1,131 @@
+"""
+CSG Simplification Tests
+Tests that simplify_csg() removes redundant nodes without changing the
+geometry and that the bridge reports the node-count reduction
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+solid2 = pytest.importorskip("solid2")
+from solid2 import cube, cylinder, sphere, translate, rotate, union
+
+from marimo_openscad.solid_bridge import SolidPythonBridge, count_nodes, simplify_csg
+
+
+class RecordingRenderer:
+    """Renderer stub that records every SCAD program it is asked to render"""
+
+    def __init__(self):
+        self.rendered = []
+
+    def render_scad_to_stl(self, scad_code):
+        self.rendered.append(scad_code)
+        return b"solid test\nendsolid test\n"
+
+
+class TestSimplifyCSG:
+    """Test the individual simplification rules"""
+
+    def test_nested_unions_flattened(self):
+        model = union()(union()(cube(1), union()(sphere(1))), cylinder(r=1, h=2))
+
+        simplified, _ = simplify_csg(model)
+
+        assert simplified.as_scad() == union()(cube(1), sphere(1), cylinder(r=1, h=2)).as_scad()
+
+    def test_single_child_union_removed(self):
+        simplified, _ = simplify_csg(union()(union()(cube(1))))
+
+        assert simplified.as_scad() == cube(1).as_scad()
+
+    def test_chained_translates_folded(self):
+        simplified, _ = simplify_csg(translate([1, 0, 0])(translate([0, 2, 0])(translate([0, 0, 3])(cube(1)))))
+
+        assert simplified._name == "translate"
+        assert simplified._params["v"] == [1, 2, 3]
+        assert count_nodes(simplified) == 2
+
+    def test_mixed_transforms_folded_to_multmatrix(self):
+        simplified, _ = simplify_csg(translate([1, 0, 0])(rotate([0, 0, 90])(cube(1))))
+
+        assert simplified._name == "multmatrix"
+        assert simplified._params["m"][0] == [0.0, -1.0, 0.0, 1.0]
+
+    def test_identity_transforms_removed(self):
+        model = translate([0, 0, 0])(rotate([0, 0, 90])(rotate([0, 0, -90])(cube(1))))
+
+        simplified, _ = simplify_csg(model)
+
+        assert simplified.as_scad() == cube(1).as_scad()
+
+    def test_empty_groups_removed(self):
+        simplified, _ = simplify_csg(union()(cube(1), union(), translate([1, 0, 0])()))
+
+        assert simplified.as_scad() == cube(1).as_scad()
+
+    def test_identical_siblings_deduplicated(self):
+        model = union()(cube(1), cube(1), sphere(1)) - cube(0.5) - cube(0.5)
+
+        simplified, _ = simplify_csg(model)
+
+        assert simplified.as_scad() == (union()(cube(1), sphere(1)) - cube(0.5)).as_scad()
+
+    def test_difference_base_kept(self):
+        model = cube(2) - cube(2)
+
+        assert simplify_csg(model)[0].as_scad() == model.as_scad()
+
+    def test_symbolic_transforms_kept(self):
+        model = translate(["offset", 0, 0])(translate([1, 0, 0])(cube(1)))
+
+        assert simplify_csg(model)[0].as_scad() == model.as_scad()
+
+    def test_modifiers_kept(self):
+        model = cube(3) + union()(cube(1), cube(2)).debug()
+
+        assert "#union()" in simplify_csg(model)[0].as_scad()
+
+    def test_input_not_modified(self):
+        model = union()(union()(cube(1)), translate([1, 0, 0])(translate([1, 0, 0])(cube(1))))
+        before = model.as_scad()
+
+        simplify_csg(model)
+
+        assert model.as_scad() == before
+
+    def test_node_count_reduction_reported(self):
+        model = union()(*[union()(translate([i, 0, 0])(translate([0, 0, 0])(cube(1)))) for i in range(5)])
+
+        _, stats = simplify_csg(model)
+
+        assert stats.nodes_before == 21
+        assert stats.nodes_after == 10
+        assert stats.reduction == pytest.approx(11 / 21)
+
+
+class TestBridgeSimplification:
+    """Test the simplification pass in SolidPythonBridge"""
+
+    def test_render_uses_simplified_code(self):
+        renderer = RecordingRenderer()
+        bridge = SolidPythonBridge(renderer=renderer)
+
+        bridge.render_to_stl(union()(union()(cube(1))))
+
+        assert renderer.rendered == [cube(1).as_scad()]
+        assert bridge.last_simplification.nodes_removed == 2
+
+    def test_simplification_can_be_disabled(self):
+        renderer = RecordingRenderer()
+        model = union()(union()(cube(1)))
+        bridge = SolidPythonBridge(renderer=renderer, simplify=False)
+
+        bridge.render_to_stl(model)
+
+        assert renderer.rendered == [model.as_scad()]
+        assert bridge.last_simplification is None
@@ -0,0 +1,81 @@
+"""
+In-Place Geometry Update Tests
+Tests that STL updates reuse buffer attributes, one shared material and the
+ResourceOptimizationEngine geometry pool instead of rebuilding meshes
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from marimo_openscad.viewer import OpenSCADViewer
+
+
+class TestInPlaceGeometryUpdates:
+    """Test the STL in-place update path"""
+    
+    def test_attributes_updated_in_place(self):
+        """Test that fitting models overwrite the existing attributes"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'function canUpdateSTLInPlace(vertexCount)' in js_code
+        assert 'writeSTLGeometry(stlMesh.geometry, parsed.vertices, parsed.normals)' in js_code
+        assert 'geometry.setDrawRange(0, vertexCount)' in js_code
+        assert 'position.needsUpdate = true' in js_code
+    
+    def test_only_used_range_uploaded(self):
+        """Test that partial uploads are limited to the used vertices"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'position.updateRange.count = vertexCount * 3' in js_code
+        assert 'THREE.DynamicDrawUsage' in js_code
+    
+    def test_capacity_headroom(self):
+        """Test that buffers are allocated with room to grow"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'const STL_CAPACITY_HEADROOM = 1.25;' in js_code
+        assert 'vertexCount * 4 >= capacity' in js_code
+    
+    def test_shared_material(self):
+        """Test that STL meshes share one material that is never disposed"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'function getSharedSTLMaterial()' in js_code
+        assert 'sharedSTLMaterial.userData.shared = true' in js_code
+        assert 'function releaseMeshMaterial(material)' in js_code
+    
+    def test_optimizer_respects_draw_range(self):
+        """Test that LOD simplification ignores buffer capacity past the draw range"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'geometry.drawRange.count' in js_code
+        assert 'new THREE.Float32Array' not in js_code
+
+
+class TestGeometryPool:
+    """Test that retired STL buffers go through the geometry pool"""
+    
+    def test_pool_acquire_release(self):
+        """Test the pool API on ResourceOptimizationEngine"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'acquireGeometry(vertexCount)' in js_code
+        assert 'releaseGeometry(geometry)' in js_code
+        assert 'stl-buffer:${geometry.uuid}' in js_code
+    
+    def test_pooled_buffers_released_not_disposed(self):
+        """Test that mesh cleanup hands pooled geometry back to the pool"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'resourceOptimizer.releaseGeometry(geometry)' in js_code
+        assert 'resourceOptimizer.acquireGeometry(vertexCount)' in js_code
+    
+    def test_evicted_buffers_disposed(self):
+        """Test that the pool frees GPU buffers when it evicts them"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'removeCachedGeometry(key)' in js_code
@@ -0,0 +1,193 @@
+"""
+Instanced Rendering Tests
+Tests that repeated identical subtrees are rendered once and drawn with
+one InstancedMesh per unique body
+"""
+
+import base64
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+solid2 = pytest.importorskip("solid2")
+from solid2 import cube, cylinder, sphere, translate, rotate, mirror, scale
+
+from marimo_openscad.openscad_wasm_renderer import HybridOpenSCADRenderer, OpenSCADWASMRenderer
+from marimo_openscad.solid_bridge import (
+    SolidPythonBridge,
+    find_instanced_subtrees,
+    transform_matrix,
+)
+from marimo_openscad.render_scheduler import RenderScheduler
+from marimo_openscad.tracing import Tracer
+from marimo_openscad.viewer import OpenSCADViewer
+
+
+class RecordingRenderer:
+    """Renderer stub that records every SCAD program it is asked to render"""
+
+    def __init__(self):
+        self.rendered = []
+
+    def render_scad_to_stl(self, scad_code):
+        self.rendered.append(scad_code)
+        return f"solid part{len(self.rendered)}\nendsolid\n".encode()
+
+
+def pin_plate():
+    plate = cube([40, 20, 2]) - translate([20, 10, -1])(cylinder(r=3, h=4))
+    pins = [translate([x, y, 2])(cylinder(r=1, h=5)) for x in (5, 20, 35) for y in (5, 15)]
+    model = plate
+    for pin in pins:
+        model = model + pin
+    return model + translate([0, 0, 10])(sphere(r=2))
+
+
+class TestTransformMatrix:
+    """Test conversion of SCAD transforms to 4x4 matrices"""
+
+    def test_translate(self):
+        matrix = transform_matrix(translate([1, 2, 3]))
+
+        assert [row[3] for row in matrix[:3]] == [1, 2, 3]
+        assert matrix[3] == [0, 0, 0, 1]
+
+    def test_rotate_z(self):
+        matrix = transform_matrix(rotate([0, 0, 90]))
+
+        assert matrix[0][1] == pytest.approx(-1)
+        assert matrix[1][0] == pytest.approx(1)
+        assert matrix[0][0] == pytest.approx(0, abs=1e-12)
+
+    def test_mirror_and_scale(self):
+        assert transform_matrix(mirror([1, 0, 0]))[0][0] == pytest.approx(-1)
+        assert transform_matrix(scale([2, 3, 4]))[2][2] == 4
+
+    def test_symbolic_parameters_rejected(self):
+        with pytest.raises(ValueError):
+            transform_matrix(translate(["x", 0, 0]))
+
+
+class TestFindInstancedSubtrees:
+    """Test detection of repeated bodies"""
+
+    def test_repeated_bodies_grouped(self):
+        plan = find_instanced_subtrees(pin_plate())
+
+        assert len(plan.groups) == 1
+        assert plan.instance_count == 6
+        assert "cylinder" in plan.groups[0].scad_code
+
+    def test_transforms_are_column_major(self):
+        group = find_instanced_subtrees(pin_plate()).groups[0]
+        transform = group.transforms[0]
+
+        assert len(transform) == 16
+        assert transform[12:15] == [5, 5, 2]
+        assert transform[15] == 1
+
+    def test_remainder_keeps_unique_geometry(self):
+        plan = find_instanced_subtrees(pin_plate())
+        remainder = "".join(body.as_scad() for _, body in plan.remainder)
+
+        assert "difference" in remainder
+        assert "sphere" in remainder
+
+    def test_below_threshold_not_instanced(self):
+        model = translate([1, 0, 0])(cube(1)) + translate([2, 0, 0])(cube(1))
+
+        assert find_instanced_subtrees(model).groups
+        assert not find_instanced_subtrees(model, min_instances=3).groups
+
+    def test_difference_children_not_split(self):
+        model = cube(10) - translate([1, 1, -1])(cube(2)) - translate([5, 5, -1])(cube(2))
+
+        assert not find_instanced_subtrees(model).groups
+
+
+class TestRenderInstanced:
+    """Test that each unique body is rendered once"""
+
+    def test_unique_body_rendered_once(self):
+        renderer = RecordingRenderer()
+        bridge = SolidPythonBridge(renderer=renderer)
+
+        result = bridge.render_instanced(pin_plate())
+
+        assert len(result.parts) == 1
+        assert len(result.parts[0].transforms) == 6
+        assert len(renderer.rendered) == 2
+        assert result.remainder_stl
+
+    def test_parts_cached_between_renders(self):
+        renderer = RecordingRenderer()
+        bridge = SolidPythonBridge(renderer=renderer)
+
+        bridge.render_instanced(pin_plate())
+        bridge.render_instanced(pin_plate())
+
+        assert len(renderer.rendered) == 2
+
+
+class TestViewerInstancing:
+    """Test the viewer side of instanced rendering"""
+
+    def test_instancing_disabled_by_default(self):
+        viewer = OpenSCADViewer(renderer_type="wasm")
+
+        assert viewer.enable_instancing is False
+        assert viewer.instanced_parts == []
+
+    def test_instanced_parts_sent_to_frontend(self):
+        viewer = OpenSCADViewer(renderer_type="wasm", enable_instancing=True)
+        viewer.renderer = RecordingRenderer()
+
+        assert viewer._update_instanced_model(pin_plate())
+        assert len(viewer.instanced_parts) == 1
+        assert len(viewer.instanced_parts[0]['transforms']) == 6
+        assert base64.b64decode(viewer.instanced_parts[0]['stl_data']).startswith(b"solid")
+        assert viewer.stl_data
+
+    def test_models_without_repeats_use_regular_pipeline(self):
+        viewer = OpenSCADViewer(renderer_type="wasm", enable_instancing=True)
+        viewer.renderer = RecordingRenderer()
+
+        assert not viewer._update_instanced_model(cube(10))
+        assert viewer.renderer.rendered == []
+
+    @pytest.mark.parametrize("browser_renderer", [
+        OpenSCADWASMRenderer,
+        lambda: HybridOpenSCADRenderer(prefer_wasm=True, fallback_to_local=False),
+    ])
+    def test_not_instanced_when_rendering_in_browser(self, browser_renderer):
+        viewer = OpenSCADViewer(renderer_type="wasm", enable_instancing=True)
+        viewer.renderer = browser_renderer()
+
+        assert not viewer._update_instanced_model(pin_plate())
+        assert viewer.instanced_parts == []
+
+    def test_instanced_renders_use_viewer_render_path(self):
+        scheduler = RenderScheduler(max_concurrent=1)
+        tracer = Tracer()
+        viewer = OpenSCADViewer(renderer_type="local", enable_instancing=True, tracer=tracer,
+                                render_scheduler=scheduler)
+        viewer.renderer = RecordingRenderer()
+
+        with tracer.trace("update"):
+            assert viewer._update_instanced_model(pin_plate())
+
+        render_spans = [s for s in tracer.last_trace if s.name == "render"]
+        assert len(render_spans) == len(viewer.renderer.rendered) == 2
+        assert scheduler.get_client_stats(viewer.render_client_id)["renders"] == 2
+        assert viewer.render_estimate["tier"] == "full"
+
+    def test_instanced_mesh_in_bundle(self):
+        js_code = OpenSCADViewer._esm
+
+        assert 'model.on("change:instanced_parts", updateInstancedParts)' in js_code
+        assert 'new THREE.InstancedMesh(geometry, getSharedSTLMaterial(), part.transforms.length)' in js_code
+        assert 'mesh.setMatrixAt(index, matrix.fromArray(transform))' in js_code
+        assert 'mesh.instanceMatrix.needsUpdate = true' in js_code
@@ -16,10 +16,12 @@ from src.marimo_openscad.migration_engine import (
     MigrationSuggestion,
     MigrationResult,
     OpenSCADSyntaxAnalyzer,
+    IncrementalSyntaxAnalyzer,
     MigrationEngine,
     analyze_openscad_syntax,
     migrate_openscad_code,
-    get_minimum_openscad_version
+    get_minimum_openscad_version,
+    get_scad_feature_manifest
 )
 
 
@@ -226,6 +228,109 @@ class TestOpenSCADSyntaxAnalyzer:
         
         # Should return the highest requirement (2023.06 for **)
         assert min_version == "2023.06"
+    
+    def test_feature_manifest_plain_model(self):
+        """Test that plain geometry needs no optional libraries."""
+        manifest = self.analyzer.get_feature_manifest("cube([10, 10, 10]);")
+        
+        assert manifest == {'mcad': False, 'fonts': False, 'libraries': []}
+    
+    def test_feature_manifest_detects_mcad(self):
+        """Test MCAD detection via include and use statements."""
+        scad_code = '''
+        include <MCAD/involute_gears.scad>
+        use <MCAD/nuts_and_bolts.scad>
+        gear(number_of_teeth=17);
+        '''
+        
+        manifest = self.analyzer.get_feature_manifest(scad_code)
+        
+        assert manifest['mcad'] is True
+        assert manifest['fonts'] is False
+        assert manifest['libraries'] == ['MCAD/involute_gears.scad', 'MCAD/nuts_and_bolts.scad']
+    
+    def test_feature_manifest_detects_fonts(self):
+        """Test font detection for text() calls."""
+        manifest = self.analyzer.get_feature_manifest('linear_extrude(2) text("Hello");')
+        
+        assert manifest['fonts'] is True
+        assert manifest['mcad'] is False
+    
+    def test_feature_manifest_ignores_comments_and_strings(self):
+        """Test that keywords in comments, strings and identifiers are ignored."""
+        scad_code = '''
+        // include <MCAD/gears.scad>
+        /* text("commented out"); */
+        echo("text(");
+        my_text(3);
+        '''
+        
+        manifest = self.analyzer.get_feature_manifest(scad_code)
+        
+        assert manifest['mcad'] is False
+        assert manifest['fonts'] is False
+
+
+class TestIncrementalSyntaxAnalyzer:
+    """Test region-cached re-analysis during live editing."""
+    
+    CODE = """// Parts
+x = 2 ** 3; assign(a = 1) cube(a);
+module part() {
+    for (i = [0:3]) for (j = [0:3]) translate([i, j]) cube(i * i * i);
+    assert(x > 0);
+}
+text("label"); child(0);
+"""
+
+    def setup_method(self):
+        """Setup test environment."""
+        self.analyzer = OpenSCADSyntaxAnalyzer()
+        self.incremental = IncrementalSyntaxAnalyzer(self.analyzer)
+    
+    @staticmethod
+    def _positions(issues):
+        return sorted((i.line_number, i.column_start, i.column_end, i.message) for i in issues)
+    
+    def test_matches_full_analysis(self):
+        """Test that merged region results equal a full analysis."""
+        issues = self.incremental.analyze_scad_code(self.CODE)
+        
+        assert self._positions(issues) == self._positions(self.analyzer.analyze_scad_code(self.CODE))
+        assert self.incremental.last_stats.regions_analyzed == self.incremental.last_stats.regions_total
+    
+    def test_edit_reanalyzes_changed_region_only(self):
+        """Test that a one-statement edit re-analyzes one region."""
+        self.incremental.analyze_scad_code(self.CODE)
+        edited = self.CODE.replace('text("label")', 'text("other label")')
+        
+        issues = self.incremental.analyze_scad_code(edited)
+        
+        assert self.incremental.last_stats.regions_analyzed == 1
+        assert self._positions(issues) == self._positions(self.analyzer.analyze_scad_code(edited))
+    
+    def test_cached_issues_move_with_their_region(self):
+        """Test that cached issues follow lines inserted above them."""
+        self.incremental.analyze_scad_code(self.CODE)
+        edited = self.CODE.replace("// Parts\n", "// Parts\ny = 1;\n\n")
+        
+        issues = self.incremental.analyze_scad_code(edited)
+        
+        assert self.incremental.last_stats.regions_analyzed == 2
+        assert self._positions(issues) == self._positions(self.analyzer.analyze_scad_code(edited))
+    
+    def test_minimum_version(self):
+        """Test the minimum version from merged issues."""
+        assert self.incremental.get_minimum_version_required(self.CODE) == "2023.06"
+        assert self.incremental.get_minimum_version_required("cube(1);") == "2015.03"
+    
+    def test_cache_is_bounded(self):
+        """Test LRU eviction of region results."""
+        incremental = IncrementalSyntaxAnalyzer(max_cache_entries=3)
+        
+        incremental.analyze_scad_code("\n".join(f"cube({i});" for i in range(10)))
+        
+        assert len(incremental._region_cache) == 3
 
 
 class TestMigrationEngine:
@@ -419,6 +524,99 @@ class TestMigrationEngine:
         if result.manual_review_required:
             assert "Manual Review Required" in report
 
+    def test_plan_scans_rules_in_source_order(self):
+        """Test that suggestions carry their offsets and arrive in source order."""
+        scad_code = 'child(0);\nassign(x = 1) cube(x);\nimport_stl("a.stl");\nchild(1);'
+        
+        suggestions = self.engine.create_migration_plan(scad_code, "any", "2019.05+")
+        
+        assert [s.start for s in suggestions] == sorted(s.start for s in suggestions)
+        assert len(suggestions) == 4
+        for suggestion in suggestions:
+            assert scad_code[suggestion.start:suggestion.end] == suggestion.original_code
+    
+    def test_apply_migration_single_pass(self):
+        """Test that every suggestion is applied at its own offset."""
+        scad_code = "module a() { child(0); }\nmodule b() { child(1); }\nmodule c() { child(2); }"
+        
+        suggestions = self.engine.create_migration_plan(scad_code, "any", "2019.05+")
+        result = self.engine.apply_migration(scad_code, suggestions)
+        
+        assert result.migrated_code == (
+            "module a() { children(0); }\nmodule b() { children(1); }\nmodule c() { children(2); }"
+        )
+        assert [issue.issue_type for issue in result.issues_resolved] == [SyntaxIssueType.DEPRECATED_SYNTAX] * 3
+    
+    def test_apply_migration_overlap_prefers_higher_confidence(self):
+        """Test that overlapping suggestions are resolved by confidence."""
+        scad_code = "child(0);"
+        
+        def suggestion(rule_id, replacement, confidence):
+            rule = MigrationRule(
+                rule_id=rule_id, name=rule_id, description=rule_id,
+                from_version="any", to_version="any",
+                pattern=r"child\s*\(\s*(\d+)\s*\)", replacement=replacement,
+                action=MigrationAction.REPLACE, confidence=confidence
+            )
+            return MigrationSuggestion(
+                rule=rule, issue=None, original_code="child(0)", suggested_code=replacement.replace(r"\1", "0"),
+                confidence=confidence, explanation=rule_id, start=0, end=8
+            )
+        
+        result = self.engine.apply_migration(
+            scad_code, [suggestion("weaker", r"kids(\1)", 0.85), suggestion("stronger", r"children(\1)", 0.95)]
+        )
+        
+        assert result.migrated_code == "children(0);"
+        assert [rule.rule_id for rule in result.applied_rules] == ["stronger"]
+        assert "Manual review needed (overlapping change): weaker" in result.migration_notes
+    
+    def test_apply_migration_without_offsets(self):
+        """Test that suggestions without offsets fall back to the rule pattern."""
+        scad_code = "cube(1);\nchild(0);"
+        rule = next(r for r in self.engine.migration_rules if r.rule_id == "fix_child_deprecated")
+        suggestion = MigrationSuggestion(
+            rule=rule, issue=None, original_code="child(0)", suggested_code="children(0)",
+            confidence=rule.confidence, explanation=rule.description
+        )
+        
+        result = self.engine.apply_migration(scad_code, [suggestion])
+        
+        assert result.migrated_code == "cube(1);\nchildren(0);"
+        assert len(result.issues_resolved) == 1
+
+    
+    def test_plan_pairs_issues_by_offset(self):
+        """Test that each suggestion gets the issue at its own offset."""
+        scad_code = "module a() { child(0); child(0); }"
+        
+        suggestions = self.engine.create_migration_plan(scad_code, "any", "2019.05+")
+        
+        assert [(s.start, s.issue.column_start) for s in suggestions] == [(13, 13), (23, 23)]
+    
+    def test_comments_and_strings_are_not_migrated(self):
+        """Test that rule matches inside comments and strings are left alone."""
+        scad_code = 'echo("child(0)");\n// assign(x = 1) cube(x);\n/* import_stl("a.stl"); */\nchild(1);'
+        
+        suggestions = self.engine.create_migration_plan(scad_code, "any", "2019.05+")
+        result = self.engine.apply_migration(scad_code, suggestions)
+        
+        assert [s.original_code for s in suggestions] == ["child(1)"]
+        assert result.migrated_code == scad_code.replace("\nchild(1);", "\nchildren(1);")
+    
+    def test_apply_migration_without_offsets_skips_comments(self):
+        """Test that the rule pattern fallback skips matches in comments."""
+        scad_code = "// child(0) is old\nchild(0);"
+        rule = next(r for r in self.engine.migration_rules if r.rule_id == "fix_child_deprecated")
+        suggestion = MigrationSuggestion(
+            rule=rule, issue=None, original_code="child(0)", suggested_code="children(0)",
+            confidence=rule.confidence, explanation=rule.description
+        )
+        
+        result = self.engine.apply_migration(scad_code, [suggestion])
+        
+        assert result.migrated_code == "// child(0) is old\nchildren(0);"
+
 
 class TestConvenienceFunctions:
     """Test convenience functions."""
@@ -454,6 +652,13 @@ class TestConvenienceFunctions:
         
         assert min_version == "2023.06"
 
+    def test_get_scad_feature_manifest(self):
+        """Test quick feature manifest function."""
+        manifest = get_scad_feature_manifest('include <MCAD/boxes.scad>\ntext("A");')
+        
+        assert manifest['mcad'] is True
+        assert manifest['fonts'] is True
+
 
 class TestRealWorldScenarios:
     """Test real-world migration scenarios."""
@@ -0,0 +1,80 @@
+"""
+On-Demand Rendering Tests
+Tests that the viewer redraws only when something changed, pauses while
+off screen and reports idle frames through PerformanceMonitor
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from marimo_openscad.viewer import OpenSCADViewer
+
+
+class TestRenderModeTrait:
+    """Test the render_mode trait"""
+    
+    def test_on_demand_by_default(self):
+        """Test that viewers render on demand unless asked otherwise"""
+        viewer = OpenSCADViewer(renderer_type="wasm")
+        
+        assert viewer.render_mode == "on-demand"
+    
+    def test_continuous_mode_selectable(self):
+        """Test that the previous continuous loop can be requested"""
+        viewer = OpenSCADViewer(renderer_type="wasm", render_mode="continuous")
+        
+        assert viewer.render_mode == "continuous"
+
+
+class TestOnDemandRenderLoop:
+    """Test the on-demand render loop in the embedded bundle"""
+    
+    def test_continuous_animate_loop_removed(self):
+        """Test that no loop redraws unconditionally every frame"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'requestAnimationFrame(animate)' not in js_code
+        assert 'requestAnimationFrame(monitorFrame)' not in js_code
+        assert 'requestAnimationFrame(monitor)' not in js_code
+    
+    def test_render_loop_present(self):
+        """Test that frames are requested and coalesced by the loop"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'class OnDemandRenderLoop' in js_code
+        assert 'function requestRender()' in js_code
+        assert 'this.frameId = requestAnimationFrame(this.frame)' in js_code
+    
+    def test_redraw_triggers(self):
+        """Test that camera input, mesh changes and resizes request frames"""
+        js_code = OpenSCADViewer._esm
+        
+        assert js_code.count('requestRender();') >= 5
+        assert 'addAnimation(step)' in js_code
+    
+    def test_offscreen_viewers_pause(self):
+        """Test that an IntersectionObserver pauses hidden viewers"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'new IntersectionObserver(' in js_code
+        assert 'this.setVisible(entry.isIntersecting)' in js_code
+        assert 'cancelAnimationFrame(this.frameId)' in js_code
+    
+    def test_render_mode_synced(self):
+        """Test that the loop follows the render_mode trait"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'model.get("render_mode")' in js_code
+        assert 'change:render_mode' in js_code
+    
+    def test_idle_reported_by_performance_monitor(self):
+        """Test that rendered frames and idle time reach the HUD"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'performanceMonitor.recordFrame(now)' in js_code
+        assert 'getRenderLoopStats(' in js_code
+        assert 'rendersPerSecond' in js_code
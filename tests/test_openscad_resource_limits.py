@@ -0,0 +1,180 @@
+"""
+OpenSCAD Resource Limit Tests
+Tests CPU/RSS accounting of render child processes and the memory, CPU
+time and wall time limits, using a Python script in place of OpenSCAD
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import unittest.mock as mock
+from pathlib import Path
+
+import pytest
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from marimo_openscad.openscad_renderer import OpenSCADError, OpenSCADRenderer, OpenSCADResourceLimitError
+from marimo_openscad.tracing import Tracer
+
+resource = pytest.importorskip("resource")
+if not hasattr(os, "wait4"):
+    pytest.skip("os.wait4 not available", allow_module_level=True)
+
+# conftest stubs these for every test; the limits need real child processes
+_REAL_RUN = subprocess.run
+_REAL_EXISTS = os.path.exists
+
+FAKE_OPENSCAD = """\
+import sys, time
+args = sys.argv[1:]
+if "--version" in args:
+    print("OpenSCAD version 2021.01")
+    sys.exit(0)
+mode = open(args[-1]).read().strip()
+if mode == "burn":
+    while True:
+        pass
+elif mode == "hog":
+    blocks = [bytearray(64 * 2**20) for _ in range(64)]
+elif mode == "sleep":
+    time.sleep(30)
+elif mode == "fail":
+    sys.stderr.write("ERROR: Parser error in line 1: syntax error\\n")
+    sys.exit(1)
+with open(args[args.index("-o") + 1], "wb") as out:
+    out.write(b"solid test\\nendsolid test\\n")
+"""
+
+
+@pytest.fixture
+def fake_openscad(tmp_path):
+    script = tmp_path / "openscad"
+    script.write_text(f"#!{sys.executable}\n" + FAKE_OPENSCAD)
+    script.chmod(0o755)
+    with mock.patch("subprocess.run", _REAL_RUN), \
+         mock.patch("marimo_openscad.openscad_renderer.subprocess.run", _REAL_RUN), \
+         mock.patch("marimo_openscad.openscad_renderer.resource", resource), \
+         mock.patch("os.path.exists", _REAL_EXISTS):
+        yield str(script)
+
+
+class TestRenderAccounting:
+    """Test the stats recorded for every render"""
+
+    def test_stats_recorded(self, fake_openscad):
+        renderer = OpenSCADRenderer(openscad_path=fake_openscad)
+
+        stl = renderer.render_scad_to_stl("cube")
+
+        stats = renderer.last_render_stats
+        assert stl.startswith(b"solid test")
+        assert stats.returncode == 0
+        assert stats.limit_exceeded is None
+        assert stats.cpu_seconds > 0
+        assert stats.peak_rss_bytes > 2**20
+        assert stats.wall_seconds > 0
+
+    def test_stats_on_render_span(self, fake_openscad):
+        tracer = Tracer()
+        renderer = OpenSCADRenderer(openscad_path=fake_openscad)
+
+        with tracer.trace("update"):
+            renderer.render_scad_to_stl("cube")
+
+        process_span = next(s for s in tracer.last_trace if s.name == "openscad_subprocess")
+        assert process_span.attributes["peak_rss_bytes"] == renderer.last_render_stats.peak_rss_bytes
+        assert process_span.attributes["cpu_seconds"] == renderer.last_render_stats.cpu_seconds
+
+    def test_stats_are_per_thread(self, fake_openscad):
+        renderer = OpenSCADRenderer(openscad_path=fake_openscad, memory_limit_bytes=512 * 2**20)
+        renderer.render_scad_to_stl("cube")
+        mine = renderer.last_render_stats
+        other = threading.Thread(target=lambda: pytest.raises(OpenSCADError, renderer.render_scad_to_stl, "hog"))
+
+        other.start()
+        other.join(timeout=30)
+
+        assert renderer.last_render_stats is mine
+        assert mine.limit_exceeded is None
+
+    def test_limits_from_config(self, fake_openscad):
+        with mock.patch.dict(os.environ, {"MARIMO_OPENSCAD_MEMORY_LIMIT_MB": "512",
+                                          "MARIMO_OPENSCAD_CPU_LIMIT": "5"}):
+            from marimo_openscad.renderer_config import RendererConfig
+            with mock.patch("marimo_openscad.openscad_renderer.get_config", return_value=RendererConfig()):
+                renderer = OpenSCADRenderer(openscad_path=fake_openscad)
+
+        assert renderer.memory_limit_bytes == 512 * 2**20
+        assert renderer.cpu_limit_seconds == 5
+
+
+class TestRenderLimits:
+    """Test that runaway renders are killed with a typed error"""
+
+    def test_cpu_limit(self, fake_openscad):
+        renderer = OpenSCADRenderer(openscad_path=fake_openscad, cpu_limit_seconds=1)
+
+        with pytest.raises(OpenSCADResourceLimitError) as error:
+            renderer.render_scad_to_stl("burn")
+
+        assert error.value.limit == "cpu"
+        assert error.value.stats.returncode in (-signal.SIGXCPU, -signal.SIGKILL)
+        # rusage accounting lags the kernel's limit check; only require real CPU burn
+        assert error.value.stats.cpu_seconds > 0.5
+        assert renderer.last_render_stats is error.value.stats
+
+    def test_memory_limit(self, fake_openscad):
+        renderer = OpenSCADRenderer(openscad_path=fake_openscad, memory_limit_bytes=512 * 2**20)
+
+        with pytest.raises(OpenSCADResourceLimitError) as error:
+            renderer.render_scad_to_stl("hog")
+
+        assert error.value.limit == "memory"
+        assert "512 MB" in str(error.value)
+
+    def test_timeout(self, fake_openscad):
+        renderer = OpenSCADRenderer(openscad_path=fake_openscad, timeout=0.5)
+        start = time.perf_counter()
+
+        with pytest.raises(OpenSCADResourceLimitError) as error:
+            renderer.render_scad_to_stl("sleep")
+
+        assert error.value.limit == "timeout"
+        assert time.perf_counter() - start < 10
+
+    def test_timeout_without_waitid(self, fake_openscad, monkeypatch):
+        if hasattr(os, "waitid"):
+            monkeypatch.delattr(os, "waitid")
+        renderer = OpenSCADRenderer(openscad_path=fake_openscad, timeout=0.5)
+        start = time.perf_counter()
+
+        with pytest.raises(OpenSCADResourceLimitError) as error:
+            renderer.render_scad_to_stl("sleep")
+
+        assert error.value.limit == "timeout"
+        assert time.perf_counter() - start < 10
+        assert renderer.render_scad_to_stl("cube").startswith(b"solid test")
+
+    def test_ordinary_failure_is_not_a_limit_error(self, fake_openscad):
+        renderer = OpenSCADRenderer(openscad_path=fake_openscad, memory_limit_bytes=512 * 2**20,
+                                    cpu_limit_seconds=5)
+
+        with pytest.raises(OpenSCADError) as error:
+            renderer.render_scad_to_stl("fail")
+
+        assert not isinstance(error.value, OpenSCADResourceLimitError)
+        assert "syntax error" in str(error.value)
+        assert renderer.last_render_stats.returncode == 1
+
+    def test_limits_do_not_apply_to_parent(self, fake_openscad):
+        before = resource.getrlimit(resource.RLIMIT_AS)
+        renderer = OpenSCADRenderer(openscad_path=fake_openscad, memory_limit_bytes=512 * 2**20)
+
+        renderer.render_scad_to_stl("cube")
+
+        assert resource.getrlimit(resource.RLIMIT_AS) == before
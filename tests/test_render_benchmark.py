@@ -0,0 +1,249 @@
+"""
+Render Benchmark Tests
+Tests the golden-model benchmark: mesh digests, measurements per backend
+and regression detection against a stored baseline
+"""
+
+import os
+import shutil
+import subprocess
+import pytest
+import sys
+import time
+import unittest.mock as mock
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from marimo_openscad.csg_planner import write_binary_stl
+from marimo_openscad.openscad_renderer import OpenSCADError
+from marimo_openscad.render_benchmark import (
+    GOLDEN_MODELS,
+    BenchmarkResult,
+    GoldenModel,
+    RenderBenchmark,
+    available_backends,
+    mesh_digest,
+)
+
+# conftest stubs these for every test; the golden benchmark needs the real ones
+_REAL_RUN = subprocess.run
+_REAL_EXISTS = os.path.exists
+
+BASELINE_PATH = Path(__file__).parent / "render_benchmark_baseline.json"
+
+TETRAHEDRON = [
+    (0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0),
+    (0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 0, 0),
+    (0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1),
+    (0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 1, 0),
+]
+
+
+class FakeRenderer:
+    """Renderer stub returning a tetrahedron after an optional delay"""
+
+    def __init__(self, delay=0.0, triangles=TETRAHEDRON):
+        self.delay = delay
+        self.triangles = triangles
+
+    def render_scad_to_stl(self, scad_code):
+        time.sleep(self.delay)
+        return write_binary_stl(self.triangles)
+
+    def render_solidpython_to_stl(self, model):
+        return self.render_scad_to_stl(model.as_scad())
+
+
+SCAD_ONLY = [GoldenModel("cube", "cube(1);"), GoldenModel("sphere", "sphere(1);")]
+
+
+def _result(times, digest="abc", triangles=4, rss=None, error=None):
+    return BenchmarkResult(model="cube", backend="fake", wall_times=times, peak_rss_bytes=rss,
+                           triangle_count=triangles, mesh_digest=digest, error=error)
+
+
+def _baseline(result):
+    return {"results": {result.key: {
+        "wall_times": result.wall_times, "peak_rss_bytes": result.peak_rss_bytes,
+        "triangle_count": result.triangle_count, "mesh_digest": result.mesh_digest, "error": result.error,
+    }}}
+
+
+class TestMeshDigest:
+    """Test that the digest tracks geometry, not encoding"""
+
+    def test_binary_and_ascii_agree(self):
+        ascii_stl = "solid t\n" + "".join(
+            f"facet normal {t[0]} {t[1]} {t[2]}\nouter loop\n"
+            f"vertex {t[3]} {t[4]} {t[5]}\nvertex {t[6]} {t[7]} {t[8]}\nvertex {t[9]} {t[10]} {t[11]}\n"
+            "endloop\nendfacet\n" for t in TETRAHEDRON) + "endsolid t\n"
+
+        assert mesh_digest(ascii_stl.encode()) == mesh_digest(write_binary_stl(TETRAHEDRON))
+
+    def test_triangle_order_and_rotation_ignored(self):
+        rotated = [TETRAHEDRON[1][:3] + TETRAHEDRON[1][6:] + TETRAHEDRON[1][3:6]] + TETRAHEDRON[2:] + TETRAHEDRON[:1]
+
+        assert mesh_digest(write_binary_stl(rotated)) == mesh_digest(write_binary_stl(TETRAHEDRON))
+
+    def test_moved_vertex_changes_digest(self):
+        moved = TETRAHEDRON[:3] + [(0, 0, 0, 1, 0, 0, 0, 0, 1.01, 0, 1, 0)]
+
+        assert mesh_digest(write_binary_stl(moved)) != mesh_digest(write_binary_stl(TETRAHEDRON))
+
+
+class TestGoldenModels:
+    """Test the golden model set"""
+
+    def test_models_build(self):
+        pytest.importorskip("solid2")
+
+        for model in GOLDEN_MODELS:
+            scad_code = model.source if model.kind == "scad" else model.source().as_scad()
+            assert scad_code.strip(), model.name
+
+    def test_examples_covered(self):
+        names = {model.name for model in GOLDEN_MODELS}
+
+        assert {"basic_shapes", "castle", "mechanical_bracket"} <= names
+        assert {"scad", "solidpython"} == {model.kind for model in GOLDEN_MODELS}
+
+
+class TestRenderBenchmark:
+    """Test measuring and comparing"""
+
+    def test_run_measures_every_model_and_backend(self):
+        benchmark = RenderBenchmark(models=SCAD_ONLY, backends={"a": FakeRenderer(), "b": FakeRenderer()},
+                                    repeats=3, warmup=0, isolate=False)
+
+        results = benchmark.run()
+
+        assert [r.key for r in results] == ["cube/a", "sphere/a", "cube/b", "sphere/b"]
+        assert all(len(r.wall_times) == 3 and r.triangle_count == 4 for r in results)
+        assert results[0].mesh_digest == mesh_digest(write_binary_stl(TETRAHEDRON))
+        assert results[0].peak_rss_bytes is None
+
+    def test_isolated_run_reports_peak_rss(self):
+        pytest.importorskip("resource")
+        benchmark = RenderBenchmark(models=SCAD_ONLY[:1], backends={"fake": FakeRenderer()},
+                                    repeats=1, warmup=0)
+
+        result = benchmark.run()[0]
+
+        assert result.error is None
+        assert result.triangle_count == 4
+        assert result.peak_rss_bytes is not None
+
+    def test_render_error_recorded(self):
+        class FailingRenderer(FakeRenderer):
+            def render_scad_to_stl(self, scad_code):
+                raise RuntimeError("boom")
+
+        benchmark = RenderBenchmark(models=SCAD_ONLY[:1], backends={"bad": FailingRenderer()}, isolate=False)
+
+        assert benchmark.run()[0].error == "boom"
+
+    def test_no_regression_against_itself(self):
+        result = _result([1.0, 1.1, 0.9, 1.0, 1.05], rss=100 * 2**20)
+
+        assert RenderBenchmark(backends={}).compare([result], _baseline(result)) == []
+
+    def test_slowdown_flagged(self):
+        baseline = _baseline(_result([1.0, 1.01, 0.99, 1.0, 1.02]))
+
+        regressions = RenderBenchmark(backends={}).compare([_result([1.3, 1.31, 1.29])], baseline)
+
+        assert [r.kind for r in regressions] == ["slowdown"]
+
+    def test_noisy_baseline_tolerates_noise(self):
+        baseline = _baseline(_result([1.0, 1.4, 0.7, 1.2, 0.8]))
+
+        assert RenderBenchmark(backends={}).compare([_result([1.3, 1.25, 1.35])], baseline) == []
+
+    def test_geometry_drift_flagged(self):
+        baseline = _baseline(_result([1.0] * 3))
+
+        regressions = RenderBenchmark(backends={}).compare([_result([1.0] * 3, digest="def", triangles=6)], baseline)
+
+        assert [r.kind for r in regressions] == ["geometry_drift"]
+        assert "4 -> 6 triangles" in regressions[0].message
+
+    def test_geometry_only_comparison_ignores_timing(self):
+        baseline = _baseline(_result([1.0] * 3, rss=100 * 2**20))
+        benchmark = RenderBenchmark(backends={})
+
+        assert benchmark.compare([_result([5.0] * 3, rss=500 * 2**20)], baseline, timing=False) == []
+        drift = benchmark.compare([_result([5.0] * 3, digest="def")], baseline, timing=False)
+        assert [r.kind for r in drift] == ["geometry_drift"]
+
+    def test_memory_growth_and_new_errors_flagged(self):
+        baseline = _baseline(_result([1.0] * 3, rss=100 * 2**20))
+        benchmark = RenderBenchmark(backends={})
+
+        assert [r.kind for r in benchmark.compare([_result([1.0] * 3, rss=150 * 2**20)], baseline)] == ["memory"]
+        assert [r.kind for r in benchmark.compare([_result([], error="failed")], baseline)] == ["error"]
+
+    def test_no_backends_without_openscad(self):
+        with mock.patch("marimo_openscad.render_benchmark.OpenSCADRenderer", side_effect=OpenSCADError("missing")):
+            assert available_backends() == {}
+
+    def test_baseline_round_trip(self, tmp_path):
+        results = RenderBenchmark(models=SCAD_ONLY, backends={"fake": FakeRenderer()},
+                                  repeats=2, warmup=0, isolate=False).run()
+        path = tmp_path / "baseline.json"
+
+        RenderBenchmark.save_baseline(results, path, openscad_version="OpenSCAD version 2021.01")
+        baseline = RenderBenchmark.load_baseline(path)
+
+        assert set(baseline["results"]) == {"cube/fake", "sphere/fake"}
+        assert baseline["openscad_version"] == "OpenSCAD version 2021.01"
+        assert RenderBenchmark(backends={}).compare(results, baseline) == []
+
+    def test_openscad_version_from_backends(self):
+        local = FakeRenderer()
+        local.version = "OpenSCAD version 2021.01"
+        parallel = FakeRenderer()
+        parallel.renderer = local
+
+        assert RenderBenchmark(backends={"parallel_csg": parallel}).openscad_version == local.version
+        assert RenderBenchmark(backends={"fake": FakeRenderer()}).openscad_version is None
+
+
+@pytest.mark.slow
+def test_golden_models_against_baseline():
+    """
+    Render the golden models with the real backends and compare their
+    geometry with the stored baseline. Set MARIMO_OPENSCAD_UPDATE_RENDER_BASELINE=1
+    to record it, and MARIMO_OPENSCAD_BENCHMARK_TIMING=1 to also compare
+    time and memory against a baseline recorded on this machine
+    """
+    openscad = shutil.which("openscad")
+    if openscad is None:
+        pytest.skip("OpenSCAD not installed")
+    pytest.importorskip("solid2")
+    update = bool(os.environ.get("MARIMO_OPENSCAD_UPDATE_RENDER_BASELINE"))
+    timing = update or bool(os.environ.get("MARIMO_OPENSCAD_BENCHMARK_TIMING"))
+
+    with mock.patch("subprocess.run", _REAL_RUN), \
+         mock.patch("marimo_openscad.openscad_renderer.subprocess.run", _REAL_RUN), \
+         mock.patch("os.path.exists", _REAL_EXISTS):
+        # Geometry needs one render per model; timing needs repeats
+        benchmark = (RenderBenchmark(openscad_path=openscad) if timing
+                     else RenderBenchmark(openscad_path=openscad, repeats=1, warmup=0, isolate=False))
+        results = benchmark.run()
+
+    assert not [r for r in results if r.error], [r.error for r in results if r.error]
+    if update:
+        RenderBenchmark.save_baseline(results, BASELINE_PATH, openscad_version=benchmark.openscad_version)
+        pytest.skip(f"Render baseline written to {BASELINE_PATH}")
+    if not BASELINE_PATH.exists():
+        pytest.skip("No render baseline recorded")
+
+    baseline = RenderBenchmark.load_baseline(BASELINE_PATH)
+    # Meshes legitimately change between OpenSCAD releases
+    if baseline.get("openscad_version") != benchmark.openscad_version:
+        pytest.skip(f"Render baseline recorded with {baseline.get('openscad_version')}, "
+                    f"running {benchmark.openscad_version}")
+    regressions = benchmark.compare(results, baseline, timing=timing)
+    assert not regressions, "\n".join(f"{r.key}: {r.message}" for r in regressions)
@@ -0,0 +1,249 @@
+"""
+Render Cost Estimator Tests
+Tests polygon estimates from $fn/$fa/$fs, cost warnings, calibration of
+the time model and the viewer's preview/full tier choice
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from marimo_openscad.render_cost import (
+    PREVIEW_OVERRIDES,
+    RenderCostModel,
+    estimate_render_cost,
+    fragments,
+    preview_scad,
+)
+from marimo_openscad.render_history import RenderHistoryStore, RenderRecord, model_digest
+from marimo_openscad.viewer import OpenSCADViewer
+
+
+def _polygons(code):
+    return estimate_render_cost(code).polygons
+
+
+class TestPolygonEstimates:
+    """Test polygon counts from the resolution variables"""
+
+    def test_fragments_match_openscad(self):
+        assert fragments(10, 0, 12, 2) == 30
+        assert fragments(1, 0, 12, 2) == 5
+        assert fragments(10, 64, 12, 2) == 64
+        assert fragments(0, 0, 12, 2) == 3
+
+    def test_resolution_scoping(self):
+        assert _polygons("sphere(10, $fn=64);") == 2 * 64 * 32
+        assert _polygons("$fn = 32;\nsphere(1);") == 2 * 32 * 16
+        # $-variables reach into modules from the call site
+        assert _polygons("module ball() sphere(1);\nball($fn = 8);") == 2 * 8 * 4
+        assert _polygons("$fs = 0.1; $fa = 1; cylinder(r = 10, h = 5);") == 4 * 360
+
+    def test_module_arguments_and_loops(self):
+        code = "module peg(r = 1) cylinder(r = r, h = 2, $fn = r * 4);\nfor (i = [1:10]) translate([i * 10, 0, 0]) peg(3);"
+
+        estimate = estimate_render_cost(code)
+
+        assert estimate.polygons == 10 * 4 * 12
+        assert estimate.boolean_work > 0
+
+    def test_unknown_loop_and_modules(self):
+        estimate = estimate_render_cost("include <BOSL2/std.scad>\nfor (p = points) translate(p) cuboid(2);")
+
+        assert estimate.unknown_modules == ["cuboid"]
+
+    def test_disabled_objects_ignored(self):
+        assert _polygons("*sphere(100, $fn = 500);\n%cube(1);\ncube(1);") == 12
+
+    def test_known_if_branch(self):
+        assert _polygons("detail = false;\nif (detail) sphere(5, $fn = 100); else cube(1);") == 12
+
+
+class TestCostWarnings:
+    """Test the warnings for expensive constructs"""
+
+    def test_minkowski_over_high_poly_children(self):
+        estimate = estimate_render_cost("cube(1);\nminkowski() {\n  sphere(10, $fn = 64);\n  sphere(2, $fn = 64);\n}")
+
+        warning = next(w for w in estimate.warnings if w.kind == "minkowski")
+        assert warning.line == 2
+        assert estimate.minkowski_work == (2 * 64 * 32) ** 2
+
+    def test_hull_over_high_poly_children(self):
+        estimate = estimate_render_cost("hull() for (i = [0:3]) translate([i, 0, 0]) sphere(5, $fn = 100);")
+
+        assert [w.kind for w in estimate.warnings] == ["hull"]
+
+    def test_low_poly_minkowski_not_flagged(self):
+        estimate = estimate_render_cost("minkowski() { cube(10); sphere(1, $fn = 8); }")
+
+        assert not estimate.warnings
+
+    def test_nested_booleans(self):
+        code = "module layer(n) if (n > 0) difference() { cube(n); layer(n - 1); }\nlayer(12);"
+
+        estimate = estimate_render_cost(code)
+
+        assert estimate.max_boolean_depth == 11  # layer(1) differences against nothing
+        assert "boolean_depth" in [w.kind for w in estimate.warnings]
+
+    def test_runaway_recursion_cut_off(self):
+        estimate = estimate_render_cost("module grow(n) grow(n + 1);\ngrow(1);")
+
+        assert [w.kind for w in estimate.warnings] == ["recursion"]
+
+    def test_long_render_warning(self):
+        model = RenderCostModel(warn_threshold_s=1.0)
+
+        estimate = model.estimate("$fn = 200;\ndifference() { sphere(10); for (i = [0:20]) translate([i, 0, 0]) sphere(3); }")
+
+        assert estimate.seconds > 1.0
+        assert estimate.warnings[-1].kind == "long_render"
+
+
+class TestTimeModel:
+    """Test prediction, tier choice and calibration"""
+
+    def test_preview_is_cheaper(self):
+        model = RenderCostModel(preview_threshold_s=1.0)
+        code = "$fn = 256;\ndifference() { sphere(10); cylinder(r = 4, h = 30, center = true); }"
+
+        full = model.estimate(code)
+        preview = model.estimate(preview_scad(code))
+
+        assert preview.polygons < full.polygons / 10
+        assert model.choose_tier(full) == "preview"
+        assert model.choose_tier(preview) == "full"
+
+    def test_preview_overrides_per_call_resolution(self):
+        model = RenderCostModel(preview_threshold_s=1.0)
+        code = "\n".join(f"translate([{i * 5}, 0, 0]) sphere(r = 2, $fn = 128);" for i in range(50))
+
+        full = model.estimate(code)
+        preview = model.estimate(preview_scad(code))
+
+        assert "$fn = 128" not in preview_scad(code)
+        assert preview.seconds < full.seconds / 10
+        assert model.choose_tier(preview) == "full"
+
+    def test_preview_rewrites_nested_resolution(self):
+        code = "module m(r, $fn = 64) { $fa = 1; circle(r, $fs = 0.1); }\n$fn = 100;\nm(3);"
+
+        assert preview_scad(code) == ("module m(r, $fn = 0) { $fa = 12; circle(r, $fs = 2); }\n$fn = 100;\nm(3);"
+                                      + PREVIEW_OVERRIDES)
+
+    def test_calibrate_recovers_coefficients(self):
+        truth = RenderCostModel(coefficients={"polygons": 1e-5, "boolean_work": 2e-6,
+                                              "hull_work": 3e-6, "minkowski_work": 4e-7}, intercept=0.5)
+        models = [f"$fn = {fn};\ndifference() {{ sphere(10); cube({size}); }}\n"
+                  f"hull() {{ sphere(3); translate([{size}, 0, 0]) sphere(3); }}\n"
+                  f"minkowski() {{ cube(1); sphere(1, $fn = {fn // 4 + 3}); }}"
+                  for fn in (16, 32, 64, 96, 128) for size in (1, 5, 20)]
+        samples = [(code, truth.estimate(code).seconds) for code in models]
+
+        model = RenderCostModel().calibrate(samples)
+
+        for code, seconds in samples:
+            assert model.estimate(code).seconds == pytest.approx(seconds, rel=0.01)
+
+    def test_calibrate_from_history(self, tmp_path):
+        models = [f"sphere(10, $fn = {fn});" for fn in (16, 64, 128, 256)]
+        with RenderHistoryStore(tmp_path / "history.sqlite3") as store:
+            for code in models:
+                seconds = 0.3 + 1e-4 * estimate_render_cost(code).polygons
+                store.record(RenderRecord(model_digest(code), "OpenSCADRenderer", seconds, 100, quality="full"))
+
+            model = RenderCostModel().calibrate_from_history(store, models + ["cube(1);"])
+
+        assert model.intercept == pytest.approx(0.3, rel=0.01)
+        assert model.coefficients["polygons"] == pytest.approx(1e-4, rel=0.01)
+
+    def test_solidpython_model(self):
+        solid2 = pytest.importorskip("solid2")
+
+        model = solid2.difference()(solid2.cube(10), solid2.sphere(6, _fn=48))
+
+        assert estimate_render_cost(model).polygons == 12 + 2 * 48 * 24
+
+
+class RecordingRenderer:
+    """Renderer stub that keeps the SCAD code it was given"""
+
+    def __init__(self):
+        self.rendered = []
+
+    def render_scad_to_stl(self, scad_code):
+        self.rendered.append(scad_code)
+        return b"solid test\nendsolid test\n"
+
+
+class TestViewerTiers:
+    """Test that the viewer renders expensive models at the preview tier"""
+
+    EXPENSIVE = "$fn = 400;\nminkowski() { sphere(10); sphere(2); }"
+
+    def _viewer(self, **kwargs):
+        viewer = OpenSCADViewer(renderer_type="local", cost_model=RenderCostModel(preview_threshold_s=5.0), **kwargs)
+        viewer.renderer = RecordingRenderer()
+        return viewer
+
+    def test_cheap_model_renders_full(self):
+        viewer = self._viewer()
+
+        viewer._render_stl("cube(1);")
+
+        assert viewer.renderer.rendered == ["cube(1);"]
+        assert viewer.render_estimate["tier"] == "full"
+
+    def test_expensive_model_renders_full_by_default(self):
+        viewer = self._viewer()
+
+        viewer._render_stl(self.EXPENSIVE)
+
+        assert viewer.renderer.rendered == [self.EXPENSIVE]
+        assert viewer.render_estimate["tier"] == "full"
+
+    def test_expensive_model_renders_preview(self):
+        viewer = self._viewer(render_tier="auto")
+
+        viewer._render_stl(self.EXPENSIVE)
+
+        assert viewer.renderer.rendered == [self.EXPENSIVE + PREVIEW_OVERRIDES]
+        assert viewer.render_estimate["tier"] == "preview"
+
+    def test_preview_skipped_when_not_cheaper(self):
+        viewer = OpenSCADViewer(renderer_type="local", render_tier="auto",
+                                cost_model=RenderCostModel(preview_threshold_s=0.01))
+        viewer.renderer = RecordingRenderer()
+
+        viewer._render_stl("cube(1);")
+
+        assert viewer.renderer.rendered == ["cube(1);"]
+        assert viewer.render_estimate["tier"] == "full"
+
+    def test_forced_full_tier_warns(self, caplog):
+        viewer = self._viewer(render_tier="full")
+
+        with caplog.at_level("WARNING"):
+            viewer._render_stl(self.EXPENSIVE)
+
+        assert viewer.renderer.rendered == [self.EXPENSIVE]
+        assert any("estimated at" in record.message for record in caplog.records)
+        assert viewer.render_estimate["warnings"]
+
+    def test_preview_not_cached_as_full_render(self):
+        viewer = self._viewer(render_tier="auto")
+        realtime = viewer.realtime_renderer
+
+        for _ in range(2):
+            asyncio.run(realtime.render_scad_code(self.EXPENSIVE))
+            asyncio.run(realtime.render_scad_code("cube(1);"))
+
+        assert viewer.renderer.rendered == [self.EXPENSIVE + PREVIEW_OVERRIDES, "cube(1);",
+                                            self.EXPENSIVE + PREVIEW_OVERRIDES]
+        assert realtime.cache.get_stats()["entry_count"] == 1
@@ -0,0 +1,280 @@
+"""
+Render Daemon Tests
+Tests the shared local render service: the fair-share queue, rendering
+over HTTP through RenderDaemonClient, the shared cache, error mapping,
+the health endpoint and graceful drain
+"""
+
+import json
+import sys
+import threading
+import time
+import unittest.mock as mock
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from marimo_openscad.openscad_renderer import OpenSCADError, OpenSCADResourceLimitError, RenderStats
+from marimo_openscad.render_daemon import (
+    FairShareQueue,
+    RenderDaemon,
+    RenderDaemonClient,
+    RenderDaemonDraining,
+    RenderDaemonHandler,
+)
+from marimo_openscad.renderer_config import get_config
+from marimo_openscad.viewer import OpenSCADViewer
+
+STATS = RenderStats(wall_seconds=0.5, user_cpu_seconds=0.3, system_cpu_seconds=0.1,
+                    peak_rss_bytes=40 * 2**20, returncode=0)
+
+
+class GatedRenderer:
+    """Renderer stub that records its calls and can hold renders at a gate"""
+
+    version = "OpenSCAD version 2021.01"
+
+    def __init__(self, log, gate):
+        self.log = log
+        self.gate = gate
+        self.last_render_stats = None
+
+    def render_scad_to_stl(self, scad_code):
+        self.log.append(scad_code)
+        if scad_code.startswith("block"):
+            assert self.gate.wait(10)
+        if scad_code == "syntax error":
+            raise OpenSCADError("OpenSCAD failed with return code 1:\nParser error")
+        if scad_code == "hog":
+            raise OpenSCADResourceLimitError("OpenSCAD exceeded the memory limit of 512 MB", "memory", STATS)
+        self.last_render_stats = STATS
+        return f"solid {scad_code}\nendsolid\n".encode()
+
+
+@pytest.fixture
+def gate():
+    return threading.Event()
+
+
+@pytest.fixture
+def rendered():
+    return []
+
+
+@pytest.fixture
+def daemon(rendered, gate):
+    service = RenderDaemon(workers=1, renderer_factory=lambda: GatedRenderer(rendered, gate))
+    service.start()
+    yield service
+    gate.set()
+    service.stop()
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+class TestFairShareQueue:
+    """Test round-robin order across clients"""
+
+    def test_round_robin_across_clients(self):
+        queue = FairShareQueue()
+        for item in ["a1", "a2", "a3"]:
+            queue.put("a", item)
+        queue.put("b", "b1")
+        queue.put("c", "c1")
+
+        assert [queue.get() for _ in range(5)] == ["a1", "b1", "c1", "a2", "a3"]
+        assert queue.get(timeout=0) is None
+
+    def test_close_hands_out_remaining_items(self):
+        queue = FairShareQueue()
+        queue.put("a", "a1")
+        queue.close()
+
+        assert queue.get() == "a1"
+        assert queue.get() is None
+        with pytest.raises(RuntimeError):
+            queue.put("a", "a2")
+
+
+class TestRenderDaemon:
+    """Test rendering through the daemon"""
+
+    def test_client_renders_over_http(self, daemon):
+        client = RenderDaemonClient(daemon.get_base_url(), client_id="kernel-1")
+
+        stl = client.render_scad_to_stl("cube(10);")
+
+        assert stl == b"solid cube(10);\nendsolid\n"
+        assert client.last_render_stats == STATS
+        assert client.version == "OpenSCAD version 2021.01"
+        assert client.last_cache_hit is False
+
+    def test_shared_cache_across_clients(self, daemon, rendered):
+        first = RenderDaemonClient(daemon.get_base_url(), client_id="kernel-1")
+        second = RenderDaemonClient(daemon.get_base_url(), client_id="kernel-2")
+
+        first.render_scad_to_stl("sphere(5);")
+        stl = second.render_scad_to_stl("sphere(5);")
+
+        assert stl == b"solid sphere(5);\nendsolid\n"
+        assert second.last_cache_hit is True
+        assert rendered == ["sphere(5);"]
+
+    def test_fair_share_order(self, daemon, rendered, gate):
+        blocker = daemon.submit("block", "sweep")
+        _wait_until(lambda: rendered == ["block"])
+        futures = [daemon.submit(f"sweep {i};", "sweep") for i in range(3)]
+        futures.append(daemon.submit("interactive;", "viewer"))
+
+        gate.set()
+        for future in [blocker] + futures:
+            future.result(timeout=5)
+
+        assert rendered == ["block", "sweep 0;", "interactive;", "sweep 1;", "sweep 2;"]
+
+    def test_identical_queued_renders_shared(self, daemon, rendered, gate):
+        blocker = daemon.submit("block", "a")
+        first = daemon.submit("cube(2);", "a")
+        second = daemon.submit("cube(2);", "b")
+
+        gate.set()
+
+        assert first is second
+        assert first.result(timeout=5).stl_data == b"solid cube(2);\nendsolid\n"
+        blocker.result(timeout=5)
+        assert rendered.count("cube(2);") == 1
+
+    def test_render_errors_map_to_renderer_exceptions(self, daemon):
+        client = RenderDaemonClient(daemon.get_base_url())
+
+        with pytest.raises(OpenSCADError) as error:
+            client.render_scad_to_stl("syntax error")
+        assert "Parser error" in str(error.value)
+        assert not isinstance(error.value, OpenSCADResourceLimitError)
+
+        with pytest.raises(OpenSCADResourceLimitError) as error:
+            client.render_scad_to_stl("hog")
+        assert error.value.limit == "memory"
+        assert error.value.stats == STATS
+        assert "512 MB" in str(error.value)
+
+    def test_solidpython_model(self, daemon):
+        client = RenderDaemonClient(daemon.get_base_url())
+        model = mock.Mock()
+        model.as_scad.return_value = "cube(3);"
+
+        assert client.render_solidpython_to_stl(model) == b"solid cube(3);\nendsolid\n"
+
+    def test_unreachable_daemon(self):
+        client = RenderDaemonClient("http://localhost:9", timeout=2)
+
+        with pytest.raises(OpenSCADError, match="unreachable"):
+            client.render_scad_to_stl("cube(1);")
+        assert client.is_available() is False
+
+
+class TestHealthAndDrain:
+    """Test the health endpoint and graceful drain"""
+
+    def test_health_reports_queue_and_cache(self, daemon, rendered, gate):
+        client = RenderDaemonClient(daemon.get_base_url())
+        client.render_scad_to_stl("cube(1);")
+        daemon.submit("block", "a")
+        daemon.submit("cube(5);", "b")
+        _wait_until(lambda: "block" in rendered)
+
+        health = client.health()
+
+        assert health["status"] == "ok"
+        assert health["workers"] == 1
+        assert health["busy_workers"] == 1
+        assert health["queued_by_client"] == {"b": 1}
+        assert health["completed"] == 1
+        assert health["cache"]["entry_count"] == 1
+        assert client.is_available() is True
+
+    def test_drain_finishes_outstanding_renders(self, daemon, rendered, gate):
+        url = daemon.get_base_url()
+        running = daemon.submit("block", "a")
+        queued = daemon.submit("cube(7);", "b")
+        _wait_until(lambda: rendered == ["block"])
+
+        request = urllib.request.Request(f"{url}/drain", data=b"", method="POST")
+        with urllib.request.urlopen(request, timeout=5) as response:
+            assert response.status == 202
+            assert json.loads(response.read())["status"] == "draining"
+
+        with pytest.raises(RenderDaemonDraining):
+            RenderDaemonClient(url).render_scad_to_stl("sphere(1);")
+
+        gate.set()
+        assert running.result(timeout=5).stl_data.startswith(b"solid block")
+        assert queued.result(timeout=5).stl_data == b"solid cube(7);\nendsolid\n"
+        assert daemon.wait(timeout=5)
+        assert daemon.get_health()["status"] == "stopped"
+
+    def test_drain_waits_for_responses(self, daemon, rendered, gate):
+        client = RenderDaemonClient(daemon.get_base_url())
+        responses = []
+        request = threading.Thread(target=lambda: responses.append(client.render_scad_to_stl("block")))
+        request.start()
+        _wait_until(lambda: rendered == ["block"])
+        end_headers = RenderDaemonHandler.end_headers
+
+        def slow_end_headers(handler):
+            time.sleep(1.0)
+            end_headers(handler)
+
+        with mock.patch.object(RenderDaemonHandler, "end_headers", slow_end_headers):
+            drained = threading.Thread(target=lambda: responses.append(daemon.drain(timeout=5)))
+            drained.start()
+            gate.set()
+            drained.join(timeout=5)
+            request.join(timeout=5)
+
+        assert responses == [b"solid block\nendsolid\n", True]
+
+    def test_futures_resolved_when_drained(self, daemon, rendered, gate):
+        running = daemon.submit("block", "a")
+        queued = daemon.submit("cube(7);", "b")
+        _wait_until(lambda: rendered == ["block"])
+        gate.set()
+
+        assert daemon.drain(timeout=5)
+        assert running.done() and queued.done()
+        assert daemon.get_health()["open_requests"] == 0
+
+    def test_drain_timeout(self, daemon, rendered):
+        daemon.submit("block", "a")
+        queued = daemon.submit("cube(7);", "b")
+        _wait_until(lambda: rendered == ["block"])
+
+        assert daemon.drain(timeout=0.1) is False
+        with pytest.raises(RenderDaemonDraining):
+            queued.result(timeout=5)
+        assert not daemon.is_running()
+
+
+class TestViewerIntegration:
+    """Test that viewers pick up the daemon from the configuration"""
+
+    def test_local_viewer_uses_daemon(self, daemon):
+        with mock.patch.object(get_config(), "render_daemon_url", daemon.get_base_url()):
+            viewer = OpenSCADViewer(renderer_type="local")
+
+        assert isinstance(viewer.renderer, RenderDaemonClient)
+        assert viewer.renderer.url == daemon.get_base_url()
+
+    def test_client_url_from_config(self):
+        with mock.patch.object(get_config(), "render_daemon_url", None):
+            with pytest.raises(OpenSCADError):
+                RenderDaemonClient()
@@ -0,0 +1,159 @@
+"""
+Render History Tests
+Tests the SQLite render-timing store: persistence, percentile queries,
+predictions, slowdown detection and recording from RealTimeRenderer
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from marimo_openscad.openscad_renderer import RenderStats
+from marimo_openscad.realtime_renderer import RealTimeRenderer
+from marimo_openscad.render_history import RenderHistoryStore, RenderRecord, model_digest
+
+DIGEST = model_digest("cube(10);")
+
+
+def _record(wall, backend="OpenSCADRenderer", quality="default", version="2021.01", digest=DIGEST):
+    return RenderRecord(model_digest=digest, backend=backend, quality=quality, renderer_version=version,
+                        wall_seconds=wall, cpu_seconds=wall * 0.9, peak_rss_bytes=50 * 2**20,
+                        output_bytes=1234)
+
+
+@pytest.fixture
+def store(tmp_path):
+    with RenderHistoryStore(tmp_path / "history.sqlite3") as history:
+        yield history
+
+
+class TestRenderHistoryStore:
+    """Test storing and querying renders"""
+
+    def test_history_persists_across_reopen(self, tmp_path):
+        path = tmp_path / "history.sqlite3"
+        with RenderHistoryStore(path) as history:
+            history.record(_record(1.0))
+            history.record(_record(2.0))
+
+        with RenderHistoryStore(path) as history:
+            records = history.history(DIGEST)
+
+        assert [r.wall_seconds for r in records] == [1.0, 2.0]
+        assert records[0].peak_rss_bytes == 50 * 2**20
+        assert records[0].renderer_version == "2021.01"
+
+    def test_series_filters(self, store):
+        store.record(_record(1.0))
+        store.record(_record(5.0, backend="ParallelCSGRenderer"))
+        store.record(_record(9.0, quality="draft"))
+        store.record(_record(7.0, digest=model_digest("sphere(1);")))
+
+        assert len(store.history(DIGEST)) == 3
+        assert [r.wall_seconds for r in store.history(DIGEST, backend="ParallelCSGRenderer")] == [5.0]
+        assert [r.wall_seconds for r in store.history(DIGEST, quality="draft")] == [9.0]
+        assert [r.wall_seconds for r in store.history(DIGEST, limit=2)] == [5.0, 9.0]
+
+    def test_percentiles_and_prediction(self, store):
+        for wall in range(1, 11):
+            store.record(_record(float(wall)))
+
+        percentiles = store.percentiles(DIGEST, percents=(50, 90))
+
+        assert percentiles == {50: pytest.approx(5.5), 90: pytest.approx(9.1)}
+        assert store.predict(DIGEST) == pytest.approx(5.5)
+        assert store.predict(model_digest("unseen();")) is None
+        assert store.percentiles(DIGEST, metric="output_bytes", percents=(50,)) == {50: 1234}
+        with pytest.raises(ValueError):
+            store.percentiles(DIGEST, metric="id; DROP TABLE renders")
+
+    def test_prune_keeps_recent_renders_per_series(self, store):
+        for wall in range(5):
+            store.record(_record(float(wall)))
+            store.record(_record(float(wall), quality="draft"))
+
+        assert store.prune(keep=2) == 6
+        assert [r.wall_seconds for r in store.history(DIGEST, quality="default")] == [3.0, 4.0]
+
+
+class TestRegressionDetection:
+    """Test slowdown detection against a model's history"""
+
+    def test_stable_history_no_regression(self, store):
+        for wall in [1.0, 1.2, 0.9, 1.1, 1.0, 1.3, 0.95, 1.05]:
+            store.record(_record(wall))
+
+        assert store.detect_regression(DIGEST) is None
+
+    def test_single_slow_render_ignored(self, store):
+        for wall in [1.0] * 8 + [3.0]:
+            store.record(_record(wall))
+
+        assert store.detect_regression(DIGEST) is None
+
+    def test_sustained_slowdown_after_upgrade(self, store):
+        for wall in [1.0, 1.1, 0.9, 1.0, 1.05, 0.95]:
+            store.record(_record(wall))
+        for wall in [2.5, 2.6, 2.4]:
+            store.record(_record(wall, version="2024.12"))
+
+        regression = store.detect_regression(DIGEST, "OpenSCADRenderer", "default")
+
+        assert regression.kind == "slowdown"
+        assert regression.current == pytest.approx(2.5)
+        assert "2021.01 -> 2024.12" in regression.message
+
+    def test_too_little_history(self, store):
+        for wall in [1.0, 1.0, 5.0, 5.0, 5.0]:
+            store.record(_record(wall))
+
+        assert store.detect_regression(DIGEST) is None
+
+
+class _Viewer:
+    def __init__(self, renderer):
+        self.renderer = renderer
+
+
+class _Renderer:
+    version = "2021.01"
+
+    def __init__(self):
+        self.last_render_stats = RenderStats(wall_seconds=1.0, user_cpu_seconds=0.7, system_cpu_seconds=0.1,
+                                             peak_rss_bytes=80 * 2**20, returncode=0)
+
+
+class TestRealTimeRendererHistory:
+    """Test that RealTimeRenderer records into the store"""
+
+    def test_record_render(self, store):
+        viewer = _Viewer(_Renderer())
+        realtime = RealTimeRenderer(viewer, history=store, quality="preview")
+
+        realtime.record_render("cube(10);", b"x" * 84, 1.25)
+
+        record = store.history(DIGEST)[0]
+        assert (record.backend, record.quality, record.output_bytes) == ("_Renderer", "preview", 84)
+        assert record.cpu_seconds == pytest.approx(0.8)
+        assert record.peak_rss_bytes == 80 * 2**20
+        assert record.renderer_version == "2021.01"
+        assert realtime.predict_render_time("cube(10);") == pytest.approx(1.25)
+
+    def test_slowdown_reported(self, store):
+        realtime = RealTimeRenderer(_Viewer(_Renderer()), history=store)
+        for wall in [1.0] * 6 + [3.0] * 3:
+            realtime.record_render("cube(10);", b"stl", wall)
+
+        assert realtime.last_regression.kind == "slowdown"
+        assert realtime.get_performance_stats()["history"]["last_regression"]
+
+    def test_without_store(self):
+        realtime = RealTimeRenderer(_Viewer(_Renderer()))
+
+        realtime.record_render("cube(10);", b"stl", 1.0)
+
+        assert realtime.predict_render_time("cube(10);") is None
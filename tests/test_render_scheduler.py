@@ -0,0 +1,229 @@
+"""
+Render Scheduler Tests
+Tests weighted fair queuing across clients, interactive priority over
+batch renders, concurrency caps, per-client quotas and the queue-wait
+times viewers report
+"""
+
+import gc
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from marimo_openscad.render_scheduler import RenderQuotaExceeded, RenderScheduler
+from marimo_openscad.viewer import OpenSCADViewer
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+class Renders:
+    """Queues renders from threads one at a time and records their start order"""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.order = []
+        self.threads = []
+
+    def queue(self, client_id, label, priority="interactive", cost=1.0):
+        queued = self.scheduler.get_stats()["queued"][priority]
+
+        def render():
+            with self.scheduler.slot(client_id, priority, cost):
+                self.order.append(label)
+
+        thread = threading.Thread(target=render)
+        thread.start()
+        self.threads.append(thread)
+        _wait_until(lambda: self.scheduler.get_stats()["queued"][priority] == queued + 1)
+
+    def join(self):
+        for thread in self.threads:
+            thread.join(timeout=5)
+        return self.order
+
+
+class TestWeightedFairQueuing:
+    """Test the order waiting renders start in"""
+
+    def test_weights_share_slots(self):
+        scheduler = RenderScheduler(max_concurrent=1)
+        scheduler.configure_client("heavy", weight=4.0)
+        holder = scheduler.acquire("holder")
+        renders = Renders(scheduler)
+        for i in range(4):
+            renders.queue("light", f"light{i}")
+        for i in range(4):
+            renders.queue("heavy", f"heavy{i}")
+
+        scheduler.release(holder)
+
+        assert renders.join() == ["heavy0", "heavy1", "heavy2", "light0", "heavy3", "light1", "light2", "light3"]
+
+    def test_large_renders_wait_their_turn(self):
+        scheduler = RenderScheduler(max_concurrent=1)
+        holder = scheduler.acquire("holder")
+        renders = Renders(scheduler)
+        renders.queue("sweep", "big", cost=10.0)
+        renders.queue("sweep", "big2", cost=10.0)
+        for i in range(3):
+            renders.queue("viewer", f"small{i}", cost=1.0)
+
+        scheduler.release(holder)
+
+        assert renders.join() == ["small0", "small1", "small2", "big", "big2"]
+
+    def test_timed_out_render_gives_back_its_share(self):
+        scheduler = RenderScheduler(max_concurrent=1)
+        holder = scheduler.acquire("holder")
+        for _ in range(3):
+            with pytest.raises(TimeoutError):
+                scheduler.acquire("impatient", cost=10.0, timeout=0.01)
+        renders = Renders(scheduler)
+        renders.queue("viewer", "viewer", cost=2.0)
+        renders.queue("impatient", "impatient", cost=1.0)
+
+        scheduler.release(holder)
+
+        assert renders.join() == ["impatient", "viewer"]
+
+    def test_interactive_before_batch(self):
+        scheduler = RenderScheduler(max_concurrent=2, batch_slots=2)
+        first = scheduler.acquire("sweep", "batch")
+        second = scheduler.acquire("sweep", "batch")
+        renders = Renders(scheduler)
+        renders.queue("sweep", "batch", priority="batch")
+        renders.queue("viewer", "interactive")
+
+        scheduler.release(first)
+        _wait_until(lambda: renders.order)
+        scheduler.release(second)
+
+        assert renders.join() == ["interactive", "batch"]
+
+    def test_batch_leaves_a_slot_for_interactive(self):
+        scheduler = RenderScheduler(max_concurrent=2)
+        batch = scheduler.acquire("sweep", "batch")
+        renders = Renders(scheduler)
+        renders.queue("sweep", "batch", priority="batch")
+
+        ticket = scheduler.acquire("viewer", timeout=1)
+
+        assert scheduler.batch_slots == 1
+        assert ticket.wait_seconds < 1
+        scheduler.release(ticket)
+        scheduler.release(batch)
+        assert renders.join() == ["batch"]
+
+
+class TestQuotas:
+    """Test concurrency caps and per-client quotas"""
+
+    def test_client_concurrency_cap(self):
+        scheduler = RenderScheduler(max_concurrent=4)
+        scheduler.configure_client("sweep", max_concurrent=1)
+        ticket = scheduler.acquire("sweep")
+
+        with pytest.raises(TimeoutError):
+            scheduler.acquire("sweep", timeout=0.1)
+        other = scheduler.acquire("viewer", timeout=1)
+
+        scheduler.release(ticket)
+        scheduler.release(other)
+        assert scheduler.get_client_stats("sweep")["queued"] == 0
+
+    def test_queue_quota_rejects(self):
+        scheduler = RenderScheduler(max_concurrent=1)
+        scheduler.configure_client("sweep", max_queued=1)
+        holder = scheduler.acquire("holder")
+        renders = Renders(scheduler)
+        renders.queue("sweep", "queued")
+
+        with pytest.raises(RenderQuotaExceeded):
+            scheduler.acquire("sweep")
+
+        scheduler.release(holder)
+        assert renders.join() == ["queued"]
+        assert scheduler.get_client_stats("sweep")["rejected"] == 1
+
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError):
+            RenderScheduler(max_concurrent=2, batch_slots=3)
+        with pytest.raises(ValueError):
+            RenderScheduler().acquire("viewer", priority="urgent")
+        with pytest.raises(ValueError):
+            RenderScheduler().configure_client("viewer", weight=0)
+
+
+class RecordingRenderer:
+    """Renderer stub that keeps the SCAD code it was given"""
+
+    def __init__(self):
+        self.rendered = []
+
+    def render_scad_to_stl(self, scad_code):
+        self.rendered.append(scad_code)
+        return b"solid test\nendsolid test\n"
+
+
+class TestViewerQueueWait:
+    """Test that viewers render through the scheduler and report queue waits"""
+
+    def _viewer(self, scheduler, **kwargs):
+        viewer = OpenSCADViewer(renderer_type="local", render_scheduler=scheduler, **kwargs)
+        viewer.renderer = RecordingRenderer()
+        return viewer
+
+    def test_queue_wait_in_renderer_info(self):
+        scheduler = RenderScheduler(max_concurrent=1)
+        viewer = self._viewer(scheduler)
+        holder = scheduler.acquire("sweep", "batch")
+        render = threading.Thread(target=viewer._render_stl, args=("cube(1);",))
+        render.start()
+        _wait_until(lambda: scheduler.get_client_stats(viewer.render_client_id)["queued"] == 1)
+        time.sleep(0.2)
+
+        scheduler.release(holder)
+        render.join(timeout=5)
+
+        queue_wait = viewer.get_renderer_info()["queue_wait"]
+        assert viewer.renderer.rendered == ["cube(1);"]
+        assert queue_wait["renders"] == 1
+        assert queue_wait["last_wait_seconds"] >= 0.15
+        assert queue_wait["priority"] == "interactive"
+
+    def test_viewer_client_dropped_with_viewer(self):
+        scheduler = RenderScheduler(max_concurrent=1)
+        viewer = self._viewer(scheduler)
+        viewer._render_stl("cube(1);")
+        shared = self._viewer(scheduler, render_session="notebook-1")
+        shared._render_stl("cube(1);")
+        assert scheduler.get_stats()["clients"] == 2
+
+        viewer.close()
+        del viewer
+        gc.collect()
+
+        assert scheduler.get_stats()["clients"] == 1
+        assert scheduler.get_client_stats("notebook-1")["renders"] == 1
+
+    def test_viewers_share_a_session(self):
+        scheduler = RenderScheduler(max_concurrent=2)
+        first = self._viewer(scheduler, render_session="notebook-1")
+        second = self._viewer(scheduler, render_session="notebook-1", render_priority="batch")
+
+        first._render_stl("cube(1);")
+        second._render_stl("cube(2);")
+
+        assert first.get_renderer_info()["queue_wait"]["renders"] == 2
+        assert second.get_renderer_info()["queue_wait"]["priority"] == "batch"
@@ -0,0 +1,245 @@
+"""
+Tests for the OpenSCAD tokenizer and parser
+
+Tests tokens and AST positions, strings/comments/multi-line constructs,
+error recovery, lazy region parsing and the visitors shared by the
+syntax analyzer and the WASM version selector.
+"""
+
+import time
+
+import pytest
+
+from src.marimo_openscad.scad_parser import (
+    CallCollector,
+    FeatureVisitor,
+    IncludeCollector,
+    NodeVisitor,
+    find_features,
+    parse,
+    parse_cached,
+    split_regions,
+    tokenize,
+    visit_regions,
+    walk,
+)
+from src.marimo_openscad.migration_engine import OpenSCADSyntaxAnalyzer, SyntaxIssueType
+from src.marimo_openscad.wasm_version_manager import WASMVersionSelector
+from tests.baseline_syntax_analyzer import BaselineSyntaxAnalyzer
+
+
+class TestTokenizer:
+    """Test the single-pass tokenizer."""
+    
+    def test_token_kinds_and_positions(self):
+        tokens = tokenize('x = 2 ** 3;\n  cube("a");')
+        
+        assert [(t.kind, t.value) for t in tokens[:5]] == [
+            ("identifier", "x"), ("operator", "="), ("number", "2"), ("operator", "**"), ("number", "3"),
+        ]
+        cube = tokens[6]
+        assert (cube.value, cube.line, cube.column) == ("cube", 2, 2)
+        assert tokens[-1].kind == "eof"
+    
+    def test_comments_and_strings_are_single_tokens(self):
+        tokens = tokenize('/* a ** b\n */ echo("x ** y // z"); // assign(1)')
+        
+        assert [t.kind for t in tokens] == [
+            "comment", "identifier", "operator", "string", "operator", "operator", "comment", "eof",
+        ]
+
+
+class TestParser:
+    """Test the AST produced by the parser."""
+    
+    def test_statements(self):
+        tree = parse('include <MCAD/gears.scad>\n$fn = 32;\nmodule m(a = 1) { cube(a); }\n'
+                     'function f(x) = x > 0 ? x : -x;\nif (a) m(); else { sphere(1); }').tree
+        
+        assert [node.type for node in tree.children] == ["Include", "Assignment", "ModuleDef", "FunctionDef", "If"]
+        assert tree.children[0].value == "MCAD/gears.scad"
+        assert tree.children[2].args[0].name == "a"
+        assert tree.children[3].children[0].type == "Ternary"
+    
+    def test_operator_precedence(self):
+        expression = parse("x = 1 + 2 * 3 ^ 2;").tree.children[0].children[0]
+        
+        assert expression.value == "+"
+        assert expression.children[1].value == "*"
+        assert expression.children[1].children[1].value == "^"
+    
+    def test_multi_line_call_spans_lines(self):
+        parsed = parse("translate(\n  [1, 0, 0]\n)\n  cube(1);")
+        call = parsed.tree.children[0]
+        
+        assert call.name == "translate"
+        assert call.children[0].name == "cube"
+        assert call.children[0].line == 4
+    
+    def test_list_comprehension(self):
+        parsed = parse("v = [for (i = [0:2:10]) if (i > 2) each [i, i]];\nw = [for (i = 0; i < 3; i = i + 1) i];")
+        loops = [node for node in walk(parsed.tree) if node.type == "ListFor"]
+        
+        assert len(loops) == 2
+        assert loops[1].value == "c"
+    
+    def test_error_recovery(self):
+        parsed = parse('cube(1;\nassert(x > 0, "x must be positive");\nsphere(2);')
+        
+        assert parsed.errors
+        names = [node.name for node in walk(parsed.tree) if node.type == "ModuleCall"]
+        assert "sphere" in names
+        assert "assert" in names
+    
+    def test_node_text(self):
+        parsed = parse("x = (a + b) * c;")
+        expression = parsed.tree.children[0].children[0]
+        
+        assert parsed.text(expression) == "(a + b) * c"
+
+
+class TestRegions:
+    """Test region splitting and lazy parsing."""
+    
+    def test_regions_respect_strings_comments_and_else(self):
+        source = 'echo("a;}"); /* ; } */ x = 1;\nif (a) { cube(1); }\n// note\nelse cube(2);\nw = [for (i = 0; i < 3; i = i + 1) i];'
+        
+        regions = split_regions(source)
+        
+        texts = [source[r.start:r.end].strip() for r in regions]
+        assert texts[0] == 'echo("a;}");'
+        assert texts[2].startswith("if (a)") and texts[2].endswith("else cube(2);")
+        assert texts[3].startswith("w = [for")
+        assert parse(source).statements(3)[0].line == 5
+    
+    def test_unwanted_regions_never_parsed(self):
+        parsed = parse("module a() { cube(1); }\nmodule b() { assign(x = 1) cube(x); }\nmodule c() sphere(1);")
+        
+        collector = CallCollector(["assign"])
+        visit_regions(parsed, [collector])
+        
+        assert [call.name for call in collector.calls] == ["assign"]
+        assert set(parsed._parsed) == {1}
+    
+    def test_positions_from_lazy_regions(self):
+        parsed = parse("cube(1);\n\n  x = 2 ** 3;")
+        
+        line, column = parsed.position(parsed.source.index("**"))
+        
+        assert (line, column) == (3, 8)
+    
+    def test_parse_cached_shares_result(self):
+        source = "cube(1); // shared"
+        
+        assert parse_cached(source) is parse_cached(source)
+
+
+class TestVisitors:
+    """Test the visitors used by the analyzer and the version selector."""
+    
+    def test_features_ignore_strings_and_comments(self):
+        features = find_features('echo("a ** b, text(), assert()");\n// x = 2 ** 3;\n/* assert(1); */')
+        
+        assert features == {}
+    
+    def test_features_found(self):
+        features = find_features('x = 2 ** 3;\nassert(x > 0);\ntext("hi");\nv = [for (i = [0:3]) i];\nf = function(x) x;')
+        
+        assert set(features) == {"exponent_operator", "assert", "text", "list_comprehension", "function_literal"}
+    
+    def test_feature_subset(self):
+        visitor = FeatureVisitor(["assert"])
+        
+        visit_regions(parse("x = 2 ** 3; assert(true);"), [visitor])
+        
+        assert set(visitor.features) == {"assert"}
+    
+    def test_include_collector(self):
+        collector = IncludeCollector()
+        
+        visit_regions(parse('include <MCAD/gears.scad>\n// use <fake.scad>\nuse <lib.scad>\ncube(1);'), [collector])
+        
+        assert [node.value for node in collector.includes] == ["MCAD/gears.scad", "lib.scad"]
+    
+    def test_custom_visitor(self):
+        class Counter(NodeVisitor):
+            def __init__(self):
+                self.numbers = 0
+            
+            def visit_Number(self, node):
+                self.numbers += 1
+        
+        counter = Counter()
+        visit_regions(parse("cube([1, 2, 3]); sphere(r = 4);"), [counter])
+        
+        assert counter.numbers == 4
+
+
+class TestSharedUsers:
+    """Test the analyzer and the version selector on the same parse."""
+    
+    def test_analyzer_ignores_strings_and_comments(self):
+        issues = OpenSCADSyntaxAnalyzer().analyze_scad_code('echo("assign(x) and 2 ** 3");\n// import_stl("a.stl");')
+        
+        assert not [i for i in issues if i.issue_type != SyntaxIssueType.MODERNIZATION_OPPORTUNITY]
+    
+    def test_analyzer_multi_line_deprecation(self):
+        issues = OpenSCADSyntaxAnalyzer().analyze_scad_code("x = 1;\nassign(\n  a = 2\n) cube(a);")
+        
+        deprecated = [i for i in issues if i.issue_type == SyntaxIssueType.DEPRECATED_SYNTAX]
+        assert len(deprecated) == 1
+        assert deprecated[0].line_number == 2
+    
+    def test_deprecation_issue_reports_call_head(self):
+        code = 'assign(a = 1) child(0);\nx = import_stl("a.stl");'
+        
+        issues = OpenSCADSyntaxAnalyzer().analyze_scad_code(code)
+        
+        deprecated = [(i.original_text, i.column_start, i.column_end) for i in issues
+                      if i.issue_type == SyntaxIssueType.DEPRECATED_SYNTAX]
+        assert deprecated == [("assign(", 0, 7), ("child(0)", 14, 22), ("import_stl(", 4, 15)]
+    
+    def test_version_selector_uses_ast(self):
+        selector = WASMVersionSelector(loader=None)
+        
+        assert selector.analyze_scad_requirements('echo("2 ** 3");')["min_version"] == "2021.01"
+        requirements = selector.analyze_scad_requirements("x = 2 ** 3;\nv = [for (i = [0:3]) i];")
+        assert requirements["min_version"] == "2023.06"
+        assert "list_comprehension" in requirements["features"]
+
+
+@pytest.mark.slow
+def test_large_library_benchmark():
+    """The analyzer is at least 10x faster than the pre-parser per-line analyzer on a large library."""
+    # Code-dense, with no doc comments for the cheap comment checks to skip over
+    parts = []
+    for i in range(2000):
+        parts.append(f"""module part_{i}(size = [1, 2, 3], r = 2, center = false) {{
+    translate([size[0] * {i}, 0, 0]) difference() {{
+        cube(size, center = center);
+        for (k = [0 : 3]) rotate([0, 0, k * 90]) cylinder(r = r / 2, h = size[2] + 1, $fn = 32);
+    }}
+}}
+function f_{i}(x, y = 2) = x < 0 ? -x : (x + y) * {i} / 3 - len([for (j = [0:x]) j * j]);
+width_{i} = {i} * 2 + 1;
+""")
+    library = "\n".join(parts)
+    analyzer = OpenSCADSyntaxAnalyzer()
+    baseline = BaselineSyntaxAnalyzer()
+    
+    def analyze():
+        parse_cached.cache_clear()
+        return analyzer.analyze_scad_code(library)
+    
+    # Alternate the two so a slow patch of the machine hits both alike
+    legacy = current = float("inf")
+    for _ in range(7):
+        start = time.perf_counter()
+        baseline.analyze_scad_code(library)
+        legacy = min(legacy, time.perf_counter() - start)
+        start = time.perf_counter()
+        analyze()
+        current = min(current, time.perf_counter() - start)
+    
+    assert analyze() == baseline.analyze_scad_code(library)
+    assert legacy / current >= 10
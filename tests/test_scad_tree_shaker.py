@@ -0,0 +1,182 @@
+"""
+SCAD Tree-Shaker Tests
+Tests that include<> libraries are flattened down to the definitions the
+model reaches, and that results are cached per library digest
+"""
+
+import subprocess
+import pytest
+import sys
+import unittest.mock as mock
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from marimo_openscad.openscad_renderer import OpenSCADRenderer
+from marimo_openscad.scad_tree_shaker import SCADTreeShaker, split_statements
+
+
+LIBRARY = """// A large library
+include <sub/inner.scad>
+UNIT = 2;  // unit size
+unused_const = 99;
+$fn = 24;
+function scaled(x) = x * UNIT;
+function unused_fn(x) = x + unused_const;
+module used_box(s = 1) {
+    if (s > 1) { cube(scaled(s)); } else { inner_sphere(s); }
+}
+module unused_mod() { echo("a;b}"); /* } ; */ }
+"""
+
+INNER = """module inner_sphere(r) sphere(r * INNER_SCALE);
+INNER_SCALE = 1.5;
+module never() { echo("x"); }
+"""
+
+MODEL = "include <big.scad>\nused_box(3);\n"
+
+
+@pytest.fixture
+def library_dir(tmp_path):
+    (tmp_path / "lib" / "sub").mkdir(parents=True)
+    (tmp_path / "lib" / "big.scad").write_text(LIBRARY)
+    (tmp_path / "lib" / "sub" / "inner.scad").write_text(INNER)
+    (tmp_path / "lib" / "helpers.scad").write_text("module helper() cube(1);\n")
+    return tmp_path / "lib"
+
+
+@pytest.fixture
+def shaker(library_dir):
+    return SCADTreeShaker(library_paths=[library_dir])
+
+
+class TestSplitStatements:
+    """Test the top-level statement splitter"""
+
+    def test_statement_kinds(self):
+        statements = split_statements(LIBRARY)
+
+        assert [s.kind for s in statements] == [
+            "include", "assignment", "assignment", "assignment",
+            "function", "function", "module", "module",
+        ]
+        assert statements[-2].name == "used_box"
+
+    def test_strings_and_comments_do_not_split(self):
+        statements = split_statements('module m() { echo("a;b}"); /* } ; */ }\ncube(1);')
+
+        assert len(statements) == 2
+        assert statements[1].text == "cube(1);"
+
+    def test_if_else_is_one_statement(self):
+        statements = split_statements("if (a) { cube(1); }\n// note\nelse { sphere(1); }\ncube(2);")
+
+        assert len(statements) == 2
+
+    def test_references_ignore_strings(self):
+        statement = split_statements('echo("unused_fn", scaled(2));')[0]
+
+        assert "scaled" in statement.references
+        assert "unused_fn" not in statement.references
+
+
+class TestTreeShaker:
+    """Test flattening include<> dependencies"""
+
+    def test_only_reachable_definitions_kept(self, shaker, tmp_path):
+        result = shaker.shake(MODEL, base_dir=tmp_path)
+
+        assert "include <" not in result.scad_code
+        for name in ("module used_box", "function scaled", "UNIT = 2", "module inner_sphere", "INNER_SCALE"):
+            assert name in result.scad_code
+        for name in ("unused_fn", "unused_const", "unused_mod", "module never"):
+            assert name not in result.scad_code
+        assert result.definitions_total == 9
+        assert result.definitions_kept == 5
+
+    def test_special_variables_and_model_code_kept(self, shaker, tmp_path):
+        result = shaker.shake(MODEL, base_dir=tmp_path)
+
+        assert "$fn = 24;" in result.scad_code
+        assert result.scad_code.rstrip().endswith("used_box(3);")
+
+    def test_use_pinned_to_resolved_path(self, shaker, library_dir, tmp_path):
+        result = shaker.shake("include <big.scad>\nuse <helpers.scad>\nhelper();\n", base_dir=tmp_path)
+
+        assert f"use <{(library_dir / 'helpers.scad').resolve().as_posix()}>" in result.scad_code
+
+    def test_code_without_includes_unchanged(self, shaker):
+        assert shaker.flatten("cube(1);") == "cube(1);"
+
+    def test_unresolved_include_left_for_openscad(self, shaker, tmp_path):
+        code = "include <missing.scad>\ncube(1);"
+
+        assert shaker.flatten(code, base_dir=tmp_path) == code
+
+    def test_file_reading_libraries_not_flattened(self, library_dir, tmp_path):
+        (library_dir / "mesh.scad").write_text('module part() import("part.stl");\n')
+        code = "include <mesh.scad>\npart();\n"
+
+        assert SCADTreeShaker(library_paths=[library_dir]).flatten(code, base_dir=tmp_path) == code
+
+
+class TestTreeShakerCache:
+    """Test caching by library digest"""
+
+    def test_repeat_render_cached(self, shaker, tmp_path):
+        first = shaker.shake(MODEL, base_dir=tmp_path)
+        second = shaker.shake(MODEL, base_dir=tmp_path)
+
+        assert not first.cached
+        assert second.cached
+        assert second.scad_code == first.scad_code
+
+    def test_library_edit_invalidates(self, shaker, library_dir, tmp_path):
+        shaker.shake(MODEL, base_dir=tmp_path)
+        (library_dir / "big.scad").write_text(LIBRARY.replace("UNIT = 2", "UNIT = 3"))
+
+        result = shaker.shake(MODEL, base_dir=tmp_path)
+
+        assert not result.cached
+        assert "UNIT = 3" in result.scad_code
+
+    def test_parsed_libraries_shared_between_models(self, shaker, tmp_path):
+        shaker.shake(MODEL, base_dir=tmp_path)
+        shaker.shake("include <big.scad>\nused_box(1);\n", base_dir=tmp_path)
+
+        assert len(shaker._library_cache) == 2
+
+    def test_library_cache_bounded(self, library_dir, tmp_path):
+        shaker = SCADTreeShaker(library_paths=[library_dir], max_library_entries=1)
+        shaker.shake(MODEL, base_dir=tmp_path)
+
+        result = shaker.shake("include <big.scad>\nused_box(1);\n", base_dir=tmp_path)
+
+        assert len(shaker._library_cache) == 1
+        assert "module used_box" in result.scad_code
+
+
+class TestRendererIntegration:
+    """Test that OpenSCADRenderer renders the flattened program"""
+
+    def test_renderer_receives_flattened_code(self, shaker, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        rendered = []
+
+        def fake_openscad(cmd, **kwargs):
+            if "--version" in cmd:
+                return subprocess.CompletedProcess(cmd, 0, stdout="OpenSCAD version 2021.01", stderr="")
+            rendered.append(Path(cmd[-1]).read_text())
+            Path(cmd[cmd.index("-o") + 1]).write_bytes(b"solid test\nendsolid test\n")
+            return subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
+
+        # conftest stubs os.path.exists for every test; the renderer needs the real one here
+        with mock.patch("marimo_openscad.openscad_renderer.subprocess.run", side_effect=fake_openscad), \
+             mock.patch("os.path.exists", side_effect=lambda path: Path(path).exists()):
+            renderer = OpenSCADRenderer(openscad_path=sys.executable, tree_shaker=shaker)
+            renderer.render_scad_to_stl(MODEL)
+
+        assert "module used_box" in rendered[0]
+        assert "unused_mod" not in rendered[0]
@@ -0,0 +1,74 @@
+"""
+Shared WebGL Renderer Tests
+Tests the opt-in mode where all viewers on a page render through one
+WebGL context with scissored regions and central context-loss handling
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from marimo_openscad.viewer import OpenSCADViewer
+
+
+class TestSharedRendererTrait:
+    """Test the shared_renderer trait"""
+    
+    def test_dedicated_context_by_default(self):
+        """Test that viewers keep their own context unless opted in"""
+        viewer = OpenSCADViewer(renderer_type="wasm")
+        
+        assert viewer.shared_renderer is False
+    
+    def test_shared_mode_selectable(self):
+        """Test that the shared context can be requested"""
+        viewer = OpenSCADViewer(renderer_type="wasm", shared_renderer=True)
+        
+        assert viewer.shared_renderer is True
+
+
+class TestSharedWebGLRenderer:
+    """Test the shared renderer in the embedded bundle"""
+    
+    def test_single_page_wide_context(self):
+        """Test that one renderer instance is shared through window"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'class SharedWebGLRenderer' in js_code
+        assert 'window.__openscadSharedRenderer' in js_code
+        assert 'model.get("shared_renderer")' in js_code
+    
+    def test_scissored_regions_copied_to_viewer_canvas(self):
+        """Test that each viewer renders into a region and copies it out"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'renderer.setScissorTest(true)' in js_code
+        assert 'renderer.setViewport(0, 0, width, height)' in js_code
+        assert 'view.context.drawImage(this.canvas' in js_code
+    
+    def test_view_mimics_renderer_api(self):
+        """Test that viewers use the shared context through the renderer API"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'class SharedRendererView' in js_code
+        for method in ('setSize(width, height)', 'setPixelRatio(pixelRatio)',
+                       'getPixelRatio()', 'render(scene, camera)', 'get info()'):
+            assert method in js_code
+    
+    def test_context_loss_handled_centrally(self):
+        """Test that loss and restore are handled once for all viewers"""
+        js_code = OpenSCADViewer._esm
+        
+        assert "addEventListener('webglcontextlost'" in js_code
+        assert "addEventListener('webglcontextrestored'" in js_code
+        assert 'this.views.forEach(view => view.onContextRestored())' in js_code
+    
+    def test_context_released_with_last_viewer(self):
+        """Test that the shared context is disposed with its last viewer"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'releaseView(view)' in js_code
+        assert 'if (this.views.size === 0)' in js_code
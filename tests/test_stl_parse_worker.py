@@ -0,0 +1,78 @@
+"""
+STL Parse Worker Tests
+Tests that the embedded STL parser fills preallocated typed arrays, runs in
+a worker with transferred buffers and reports timings to the HUD
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from marimo_openscad.viewer import OpenSCADViewer
+
+
+class TestTypedArraySTLParser:
+    """Test the typed-array STL parser"""
+    
+    def test_binary_parser_preallocates(self):
+        """Test that binary parsing writes into preallocated typed arrays"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'const vertices = new Float32Array(faces * 9);' in js_code
+        assert 'const normals = new Float32Array(faces * 9);' in js_code
+        assert 'vertices.push(' not in js_code
+    
+    def test_binary_size_checked_before_allocation(self):
+        """Test that a bogus face count is rejected before allocating"""
+        js_code = OpenSCADViewer._esm
+        
+        assert '84 + faces * 50 > data.byteLength' in js_code
+    
+    def test_geometry_uses_parsed_buffer(self):
+        """Test that geometry creation does not copy typed arrays again"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'parsed.vertices instanceof Float32Array' in js_code
+
+
+class TestSTLParseWorker:
+    """Test off-main-thread STL parsing"""
+    
+    def test_worker_built_from_parser_source(self):
+        """Test that the worker runs the same parser from a Blob URL"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'class STLParseWorker' in js_code
+        assert "'const STLParser = ' + STLParser.toString()" in js_code
+        assert 'URL.createObjectURL(new Blob([source]' in js_code
+    
+    def test_buffers_transferred(self):
+        """Test that positions and normals are transferred, not copied"""
+        js_code = OpenSCADViewer._esm
+        
+        assert '[parsed.vertices.buffer, parsed.normals.buffer]' in js_code
+    
+    def test_main_thread_fallback(self):
+        """Test that parsing falls back to the main thread"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'parseOnMainThread(base64STL)' in js_code
+        assert "mode: 'main-thread'" in js_code
+    
+    def test_stale_parses_dropped(self):
+        """Test that a newer STL supersedes an in-flight parse"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'async function processSTLData(base64STL)' in js_code
+        assert 'parseId !== stlParseSequence' in js_code
+    
+    def test_parse_timing_reported_to_hud(self):
+        """Test that parse timings reach the PerformanceMonitor"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'recordParse(stats)' in js_code
+        assert 'performanceMonitor.recordParse(' in js_code
+        assert 'trianglesPerSecond' in js_code
@@ -0,0 +1,218 @@
+"""
+Pipeline Tracing Tests
+Tests spans, exporters and the per-stage trace of the viewer update path
+"""
+
+import json
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from marimo_openscad.tracing import (
+    NOOP_SPAN,
+    JsonlExporter,
+    OpenTelemetryExporter,
+    RingBufferExporter,
+    Tracer,
+    current_span,
+    span,
+)
+from marimo_openscad.viewer import OpenSCADViewer
+
+
+class RecordingRenderer:
+    """Renderer stub returning a fixed STL"""
+
+    def render_scad_to_stl(self, scad_code):
+        return b"solid test\nendsolid test\n"
+
+
+class TestSpans:
+    """Test span nesting, timing and errors"""
+
+    def test_nested_spans(self):
+        tracer = Tracer()
+
+        with tracer.trace("update", size=3):
+            with span("render") as render:
+                render.set_attribute("stl_bytes", 42)
+                with span("subprocess"):
+                    time.sleep(0.001)
+            with span("encode"):
+                pass
+
+        root, render, subprocess_span, encode = tracer.last_trace
+        assert [s.name for s in tracer.last_trace] == ["update", "render", "subprocess", "encode"]
+        assert root.parent_id is None and root.attributes == {"size": 3}
+        assert render.parent_id == root.span_id
+        assert subprocess_span.parent_id == render.span_id
+        assert encode.parent_id == root.span_id
+        assert len({s.trace_id for s in tracer.last_trace}) == 1
+        assert render.attributes["stl_bytes"] == 42
+        assert subprocess_span.duration_ns >= 1_000_000
+        assert render.start_ns <= subprocess_span.start_ns and subprocess_span.end_ns <= render.end_ns
+
+    def test_error_recorded(self):
+        tracer = Tracer()
+
+        with pytest.raises(ValueError):
+            with tracer.trace("update"):
+                with span("render"):
+                    raise ValueError("bad model")
+
+        assert [s.status for s in tracer.last_trace] == ["error", "error"]
+        assert tracer.last_trace[1].error == "ValueError: bad model"
+
+    def test_spans_outside_trace_are_noop(self):
+        assert span("render") is NOOP_SPAN
+        assert current_span() is NOOP_SPAN
+
+    def test_disabled_tracer_records_nothing(self):
+        exporter = RingBufferExporter()
+        tracer = Tracer(exporter, enabled=False)
+
+        with tracer.trace("update") as root:
+            root.set_attribute("ignored", 1)
+            assert span("render") is NOOP_SPAN
+
+        assert tracer.last_trace == []
+        assert exporter.traces() == []
+
+    def test_disabled_overhead_is_small(self):
+        tracer = Tracer(enabled=False)
+
+        def instrumented():
+            with tracer.trace("update"):
+                with span("render") as render:
+                    render.set_attribute("bytes", 1)
+
+        start = time.perf_counter()
+        for _ in range(10000):
+            instrumented()
+        per_call = (time.perf_counter() - start) / 10000
+
+        assert per_call < 20e-6
+
+
+class TestExporters:
+    """Test where finished traces go"""
+
+    def test_ring_buffer_keeps_latest(self):
+        exporter = RingBufferExporter(capacity=2)
+        tracer = Tracer(exporter)
+
+        for name in ("a", "b", "c"):
+            with tracer.trace(name):
+                pass
+
+        assert [trace[0].name for trace in exporter.traces()] == ["b", "c"]
+
+    def test_jsonl_lines(self, tmp_path):
+        path = tmp_path / "trace.jsonl"
+        tracer = Tracer(JsonlExporter(path))
+
+        with tracer.trace("update"):
+            with span("render", stl_bytes=10):
+                pass
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [r["name"] for r in records] == ["update", "render"]
+        assert records[1]["attributes"] == {"stl_bytes": 10}
+        assert records[1]["parent_id"] == records[0]["span_id"]
+
+    def test_export_failure_does_not_break_update(self):
+        class Broken:
+            def export(self, spans):
+                raise OSError("disk full")
+
+        tracer = Tracer(Broken())
+        with tracer.trace("update"):
+            pass
+
+        assert [s.name for s in tracer.last_trace] == ["update"]
+
+    def test_opentelemetry_replay(self):
+        pytest.importorskip("opentelemetry.sdk")
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+        memory = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(memory))
+        tracer = Tracer(OpenTelemetryExporter(provider.get_tracer("test")))
+
+        with tracer.trace("update"):
+            with span("render", stl_bytes=5):
+                pass
+
+        finished = {s.name: s for s in memory.get_finished_spans()}
+        assert finished["render"].parent.span_id == finished["update"].context.span_id
+        assert finished["render"].start_time == tracer.last_trace[1].start_ns
+        assert finished["render"].attributes["stl_bytes"] == 5
+
+
+class TestViewerTracing:
+    """Test the spans of the viewer update path"""
+
+    def test_tracing_off_by_default(self):
+        viewer = OpenSCADViewer(renderer_type="wasm")
+        viewer.renderer = RecordingRenderer()
+
+        viewer.update_scad_code("cube(1);", use_wasm=False)
+
+        assert viewer.last_trace() == []
+
+    def test_update_model_stages(self):
+        pytest.importorskip("solid2")
+        from solid2 import cube
+
+        viewer = OpenSCADViewer(renderer_type="wasm", tracer=Tracer())
+        viewer.renderer = RecordingRenderer()
+        viewer.wasm_enabled = False
+
+        viewer.update_model(cube(1))
+
+        spans = {s.name: s for s in viewer.last_trace()}
+        assert list(spans) == ["update_model", "as_scad", "cost_estimate", "render", "base64_encode", "trait_sync"]
+        assert spans["render"].attributes["stl_bytes"] == 25
+        assert spans["base64_encode"].attributes == {"bytes_in": 25, "bytes_out": 36}
+
+    def test_update_scad_code_stages(self):
+        viewer = OpenSCADViewer(renderer_type="wasm", tracer=Tracer())
+        viewer.renderer = RecordingRenderer()
+
+        viewer.update_scad_code("cube(1);", use_wasm=False)
+
+        names = [s.name for s in viewer.last_trace()]
+        assert names[0] == "update_scad_code"
+        assert "version_detection" in names
+        assert names[-3:] == ["render", "base64_encode", "trait_sync"]
+
+    def test_wasm_path_stages(self):
+        viewer = OpenSCADViewer(renderer_type="wasm", tracer=Tracer())
+
+        viewer.update_scad_code("sphere(1);", use_wasm=True)
+
+        names = [s.name for s in viewer.last_trace()]
+        assert names[-2:] == ["feature_manifest", "trait_sync"]
+        assert "render" not in names
+
+    def test_failed_update_marked_on_root(self):
+        class FailingRenderer:
+            def render_scad_to_stl(self, scad_code):
+                raise RuntimeError("OpenSCAD crashed")
+
+        viewer = OpenSCADViewer(renderer_type="wasm", tracer=Tracer())
+        viewer.renderer = FailingRenderer()
+
+        viewer.update_scad_code("cube(1);", use_wasm=False)
+
+        root = viewer.last_trace()[0]
+        render = next(s for s in viewer.last_trace() if s.name == "render")
+        assert "OpenSCAD crashed" in root.attributes["error"]
+        assert render.status == "error"
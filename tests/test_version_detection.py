@@ -444,6 +444,30 @@ class TestOpenSCADVersionManager:
         assert len(summary["wasm_installations"]) == 1
         assert summary["preferred_version"] == "2023.06.00"
 
+    def test_analyze_scad_code_required_version(self):
+        """Test detecting the version SCAD code requires."""
+        analysis = self.manager.analyze_scad_code("x = 2 ** 3;\ncube(x);")
+        
+        assert analysis["required_version"] == "2023.06"
+        assert analysis["issues"]
+    
+    def test_analyze_scad_code_is_incremental(self):
+        """Test that an edit only re-analyzes the changed statement."""
+        code = "\n".join(f"module m{i}() cube({i});" for i in range(50))
+        self.manager.analyze_scad_code(code)
+        
+        self.manager.analyze_scad_code(code.replace("cube(7)", "cube(8)"))
+        
+        assert self.manager._syntax_analyzer.last_stats.regions_analyzed == 1
+    
+    def test_check_compatibility(self):
+        """Test comparing the selected version against the required one."""
+        assert self.manager.check_compatibility("2023.06", "2019.05")["compatible"] is True
+        
+        result = self.manager.check_compatibility("2021.01", "2023.06")
+        assert result["compatible"] is False
+        assert "2023.06" in result["issues"][0]
+
 
 class TestConvenienceFunctions:
     """Test convenience functions."""
@@ -0,0 +1,255 @@
+"""
+Tests for the WASM HTTP asset server
+
+Covers in-memory serving, ETag revalidation, content negotiation and byte
+ranges against a temporary asset directory.
+"""
+
+import gzip
+import hashlib
+import os
+import unittest.mock as mock
+import urllib.error
+import urllib.request
+
+import pytest
+
+from marimo_openscad.wasm_asset_server import (
+    WASMAssetServer,
+    make_hashed_filename,
+    parse_hashed_filename,
+)
+from marimo_openscad.wasm_http_server import WASMHTTPServer
+
+
+WASM_BYTES = b"\x00asm\x01\x00\x00\x00" + bytes(range(256)) * 64
+
+
+@pytest.fixture
+def asset_server(tmp_path):
+    """Asset server backed by a temporary WASM directory"""
+    (tmp_path / "openscad.wasm").write_bytes(WASM_BYTES)
+    (tmp_path / "openscad.js").write_text("export default function OpenSCAD() {}\n" * 100)
+    return WASMAssetServer(wasm_dir=tmp_path)
+
+
+@pytest.fixture
+def http_server(asset_server):
+    """Running HTTP server on an ephemeral port"""
+    server = WASMHTTPServer(port=0, wasm_server=asset_server)
+    server.start()
+    yield server
+    server.stop()
+
+
+def _request(server, path, method="GET", headers=None):
+    request = urllib.request.Request(server.get_base_url() + path, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.headers, error.read()
+
+
+class TestWASMAssetServerMemory:
+    """Test in-memory asset records"""
+
+    def test_asset_loaded_once_and_cached(self, asset_server):
+        asset = asset_server.get_asset("openscad.wasm")
+
+        assert asset is not None
+        assert asset.data == WASM_BYTES
+        assert asset_server.get_asset("openscad.wasm") is asset
+
+    def test_etag_is_content_derived(self, asset_server, tmp_path):
+        etag = asset_server.get_asset("openscad.wasm").etag
+        other = WASMAssetServer(wasm_dir=tmp_path).get_asset("openscad.wasm")
+
+        assert etag == other.etag
+        assert etag.startswith('"') and etag.endswith('"')
+
+    def test_gzip_generated_in_memory(self, asset_server):
+        asset = asset_server.get_asset("openscad.wasm")
+        representation = asset_server.get_representation(asset, "gzip")
+
+        assert representation is not None
+        assert gzip.decompress(representation.data) == WASM_BYTES
+        assert representation.etag != asset.etag
+
+    def test_stale_precompressed_variant_ignored(self, tmp_path):
+        (tmp_path / "openscad.wasm").write_bytes(WASM_BYTES)
+        (tmp_path / "openscad.wasm.gz").write_bytes(gzip.compress(b"outdated build"))
+        server = WASMAssetServer(wasm_dir=tmp_path)
+
+        asset = server.get_asset("openscad.wasm")
+        representation = server.get_representation(asset, "gzip")
+
+        assert representation.path is None
+        assert gzip.decompress(representation.data) == WASM_BYTES
+
+    def test_get_asset_data_compatible(self, asset_server):
+        data, mime_type = asset_server.get_asset_data("openscad.wasm")
+
+        assert data == WASM_BYTES
+        assert mime_type == "application/wasm"
+        assert asset_server.get_asset_data("missing.wasm") is None
+
+
+class TestContentHashedURLs:
+    """Test digest-embedding asset URLs"""
+
+    def test_hashed_filename_round_trip(self):
+        digest = "0123456789abcdef" * 4
+        hashed = make_hashed_filename("openscad.wasm.js", digest)
+
+        assert hashed == "openscad.wasm.0123456789abcdef.js"
+        assert parse_hashed_filename(hashed) == ("openscad.wasm.js", "0123456789abcdef")
+        assert parse_hashed_filename("openscad.wasm.js") is None
+
+    def test_hashed_urls_embed_content_digest(self, asset_server):
+        digest = asset_server.get_asset("openscad.wasm").digest
+        urls = asset_server.get_asset_urls("http://localhost/wasm", hashed=True)
+
+        assert urls["openscad.wasm"] == f"http://localhost/wasm/openscad.{digest[:16]}.wasm"
+
+    def test_stable_urls_unchanged(self, asset_server):
+        urls = asset_server.get_asset_urls("http://localhost/wasm/")
+
+        assert urls["openscad.wasm"] == "http://localhost/wasm/openscad.wasm"
+
+    def test_manifest_digest_used_when_size_and_mtime_match(self, asset_server):
+        stat_result = asset_server.asset_registry["openscad.js"].stat()
+        asset_server._manifest_digests["openscad.js"] = (stat_result.st_size, stat_result.st_mtime_ns, "f" * 64)
+
+        assert asset_server.get_hashed_filename("openscad.js") == "openscad.ffffffffffffffff.js"
+        assert "openscad.js" not in asset_server._assets
+
+    def test_manifest_digest_ignored_when_size_differs(self, asset_server):
+        asset_server._manifest_digests["openscad.wasm"] = (1, None, "f" * 64)
+
+        digest = asset_server.get_asset_digest("openscad.wasm")
+
+        assert digest == asset_server.get_asset("openscad.wasm").digest
+
+    def test_same_size_rebuild_gets_new_digest(self, asset_server):
+        path = asset_server.asset_registry["openscad.wasm"]
+        stat_result = path.stat()
+        asset_server._manifest_digests["openscad.wasm"] = (stat_result.st_size, stat_result.st_mtime_ns, "f" * 64)
+        rebuilt = bytes(reversed(path.read_bytes()))
+        path.write_bytes(rebuilt)
+        os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9))
+
+        hashed = asset_server.get_hashed_filename("openscad.wasm")
+
+        assert hashed == f"openscad.{hashlib.sha256(rebuilt).hexdigest()[:16]}.wasm"
+        assert asset_server.resolve_hashed_filename(hashed) is not None
+
+    def test_digest_hashed_once_per_change(self, asset_server):
+        path = asset_server.asset_registry["openscad.js"]
+
+        first = asset_server.get_asset_digest("openscad.js")
+        with mock.patch("builtins.open", side_effect=AssertionError("hashed twice")):
+            assert asset_server.get_asset_digest("openscad.js") == first
+        assert "openscad.js" not in asset_server._assets
+        assert first == hashlib.sha256(path.read_bytes()).hexdigest()
+
+    def test_bundled_manifest_digests_match_assets(self):
+        server = WASMAssetServer()
+
+        for filename in server.asset_registry:
+            if filename in server._manifest_digests:
+                assert server.get_asset_digest(filename) == server.get_asset(filename).digest
+
+
+class TestWASMHTTPServer:
+    """Test HTTP semantics of the asset server"""
+
+    def test_full_response(self, http_server):
+        status, headers, body = _request(http_server, "/wasm/openscad.wasm")
+
+        assert status == 200
+        assert body == WASM_BYTES
+        assert headers["Content-Type"] == "application/wasm"
+        assert headers["Content-Length"] == str(len(WASM_BYTES))
+        assert headers["ETag"]
+        assert headers["Accept-Ranges"] == "bytes"
+
+    def test_if_none_match_returns_304(self, http_server):
+        _, headers, _ = _request(http_server, "/wasm/openscad.wasm")
+
+        status, _, body = _request(http_server, "/wasm/openscad.wasm",
+                                   headers={"If-None-Match": headers["ETag"]})
+
+        assert status == 304
+        assert body == b""
+
+    def test_gzip_negotiation(self, http_server):
+        status, headers, body = _request(http_server, "/wasm/openscad.wasm",
+                                         headers={"Accept-Encoding": "br;q=0, gzip"})
+
+        assert status == 200
+        assert headers["Content-Encoding"] == "gzip"
+        assert headers["Vary"] == "Accept-Encoding"
+        assert gzip.decompress(body) == WASM_BYTES
+
+    def test_identity_when_not_accepted(self, http_server):
+        _, headers, body = _request(http_server, "/wasm/openscad.wasm",
+                                    headers={"Accept-Encoding": "identity"})
+
+        assert headers.get("Content-Encoding") is None
+        assert body == WASM_BYTES
+
+    def test_byte_range(self, http_server):
+        status, headers, body = _request(http_server, "/wasm/openscad.wasm",
+                                         headers={"Range": "bytes=4-11"})
+
+        assert status == 206
+        assert body == WASM_BYTES[4:12]
+        assert headers["Content-Range"] == f"bytes 4-11/{len(WASM_BYTES)}"
+
+    def test_suffix_range(self, http_server):
+        status, _, body = _request(http_server, "/wasm/openscad.wasm",
+                                   headers={"Range": "bytes=-16"})
+
+        assert status == 206
+        assert body == WASM_BYTES[-16:]
+
+    def test_unsatisfiable_range(self, http_server):
+        status, headers, _ = _request(http_server, "/wasm/openscad.wasm",
+                                      headers={"Range": f"bytes={len(WASM_BYTES)}-"})
+
+        assert status == 416
+        assert headers["Content-Range"] == f"bytes */{len(WASM_BYTES)}"
+
+    def test_head_has_no_body(self, http_server):
+        status, headers, body = _request(http_server, "/wasm/openscad.wasm", method="HEAD")
+
+        assert status == 200
+        assert headers["Content-Length"] == str(len(WASM_BYTES))
+        assert body == b""
+
+    def test_missing_asset(self, http_server):
+        status, headers, body = _request(http_server, "/wasm/missing.wasm")
+
+        assert status == 404
+        assert headers["Content-Length"] == str(len(body))
+
+    def test_hashed_url_is_immutable(self, http_server, asset_server):
+        hashed = asset_server.get_hashed_filename("openscad.wasm")
+
+        status, headers, body = _request(http_server, f"/wasm/{hashed}")
+
+        assert status == 200
+        assert body == WASM_BYTES
+        assert "immutable" in headers["Cache-Control"]
+        assert "max-age=31536000" in headers["Cache-Control"]
+
+    def test_stable_url_revalidates(self, http_server):
+        _, headers, _ = _request(http_server, "/wasm/openscad.wasm")
+
+        assert "immutable" not in headers["Cache-Control"]
+
+    def test_outdated_hashed_url_not_found(self, http_server):
+        status, _, _ = _request(http_server, "/wasm/openscad.0000000000000000.wasm")
+
+        assert status == 404
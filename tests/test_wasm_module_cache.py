@@ -0,0 +1,73 @@
+"""
+Compiled WASM Module Cache Tests
+Tests that compiled WebAssembly modules are persisted in IndexedDB and
+compiled with streaming compilation on first load
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from marimo_openscad.viewer import OpenSCADViewer
+
+JS_DIRS = [
+    Path(__file__).parent.parent / "src" / "js",
+    Path(__file__).parent.parent / "src" / "marimo_openscad" / "js",
+]
+
+
+class TestEmbeddedCompiledModuleCache:
+    """Test compiled module caching in the embedded viewer bundle"""
+    
+    def test_compiled_module_store_present(self):
+        """Test that the IndexedDB module store is embedded"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'class CompiledModuleStore' in js_code
+        assert 'indexedDB.open(' in js_code
+        assert 'DataCloneError' in js_code
+    
+    def test_streaming_compilation_used(self):
+        """Test that first loads compile while downloading"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'WebAssembly.compileStreaming(response)' in js_code
+        assert 'async getCompiledModule(url' in js_code
+    
+    def test_modules_keyed_by_digest(self):
+        """Test that compiled modules are keyed by content digest"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'sha256:${digest}' in js_code
+        assert '[0-9a-f]{16}' in js_code
+    
+    def test_wasm_loader_instantiates_compiled_module(self):
+        """Test that the OpenSCAD loader instantiates the cached module"""
+        js_code = OpenSCADViewer._esm
+        
+        assert 'await wasmCache.getCompiledModule(wasmPath)' in js_code
+        assert 'WebAssembly.instantiate(compiledModule' in js_code
+
+
+class TestModuleCompiledModuleCache:
+    """Test compiled module caching in the standalone JS modules"""
+    
+    @pytest.mark.parametrize("js_dir", JS_DIRS)
+    def test_cache_manager_compiles_and_persists(self, js_dir):
+        """Test that WASMCacheManager exposes the compiled module cache"""
+        js_code = (js_dir / "wasm-cache-manager.js").read_text()
+        
+        assert 'export class CompiledModuleStore' in js_code
+        assert 'async getCompiledModule(url, options = {})' in js_code
+        assert 'WebAssembly.compileStreaming(response)' in js_code
+    
+    @pytest.mark.parametrize("js_dir", JS_DIRS)
+    def test_loader_uses_instantiate_hook(self, js_dir):
+        """Test that the Emscripten module is instantiated from the cache"""
+        js_code = (js_dir / "wasm-loader.js").read_text()
+        
+        assert 'instantiateWasm: (imports, successCallback)' in js_code
+        assert 'wasmCacheManager.getCompiledModule(wasmUrl)' in js_code
@@ -0,0 +1,68 @@
+"""
+WASM Worker Pool Tests
+Tests that the standalone JS modules provide a pool of render workers that
+share one compiled module and schedule renders latest-wins per viewer
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+JS_DIRS = [
+    Path(__file__).parent.parent / "src" / "js",
+    Path(__file__).parent.parent / "src" / "marimo_openscad" / "js",
+]
+
+
+class TestWorkerPool:
+    """Test the worker pool in worker-manager.js"""
+    
+    @pytest.mark.parametrize("js_dir", JS_DIRS)
+    def test_pool_sized_from_hardware_concurrency(self, js_dir):
+        """Test that the default pool size follows available cores"""
+        js_code = (js_dir / "worker-manager.js").read_text()
+        
+        assert 'export class OpenSCADWorkerPool' in js_code
+        assert 'navigator.hardwareConcurrency' in js_code
+        assert 'export function getWorkerPool' in js_code
+    
+    @pytest.mark.parametrize("js_dir", JS_DIRS)
+    def test_pool_shares_compiled_module(self, js_dir):
+        """Test that the WASM module is compiled once for all workers"""
+        js_code = (js_dir / "worker-manager.js").read_text()
+        
+        assert 'wasmCacheManager.getCompiledModule(wasmUrl)' in js_code
+        assert 'worker.initialize({ ...workerOptions, wasmModule })' in js_code
+    
+    @pytest.mark.parametrize("js_dir", JS_DIRS)
+    def test_latest_wins_per_viewer(self, js_dir):
+        """Test that newer renders supersede older ones from the same viewer"""
+        js_code = (js_dir / "worker-manager.js").read_text()
+        
+        assert 'render(viewerId, scadCode, options = {})' in js_code
+        assert 'superseded: true' in js_code
+    
+    @pytest.mark.parametrize("js_dir", JS_DIRS)
+    def test_benchmark_measures_pool_throughput(self, js_dir):
+        """Test that the benchmark reports pool throughput"""
+        js_code = (js_dir / "worker-manager.js").read_text()
+        
+        assert 'results.pool' in js_code
+        assert 'throughput:' in js_code
+    
+    @pytest.mark.parametrize("js_dir", JS_DIRS)
+    def test_worker_accepts_precompiled_module(self, js_dir):
+        """Test that workers instantiate a module handed in by the pool"""
+        js_code = (js_dir / "wasm-loader.js").read_text()
+        
+        assert '? Promise.resolve(wasmModule)' in js_code
+    
+    @pytest.mark.parametrize("js_dir", JS_DIRS)
+    def test_stl_result_transferred(self, js_dir):
+        """Test that STL buffers are transferred instead of copied"""
+        js_code = (js_dir / "openscad-worker.js").read_text()
+        
+        assert 'transfer.push(result.stlData.buffer)' in js_code